@@ -78,6 +78,31 @@ class Impala:
         else:
             raise ValueError(f"Acción desconocida: {accion}")
     
+    def aplicar_accion(self, accion: AccionImpala):
+        """
+        Aplica una acción del impala sin generar la descripción narrativa.
+        
+        Versión silenciosa de ejecutar_accion para el modo rápido de
+        entrenamiento; deja al impala exactamente en el mismo estado.
+        
+        Args:
+            accion: Acción a ejecutar
+        """
+        if self.esta_huyendo:
+            self.tiempo_huyendo += 1
+            self.velocidad_huida = self.tiempo_huyendo
+        elif accion == AccionImpala.VER_IZQUIERDA:
+            self.direccion_vista = Direccion((self.direccion_vista.value - 90) % 360)
+        elif accion == AccionImpala.VER_DERECHA:
+            self.direccion_vista = Direccion((self.direccion_vista.value + 90) % 360)
+        elif accion == AccionImpala.HUIR:
+            self.esta_huyendo = True
+            self.velocidad_huida = 1
+            self.tiempo_huyendo = 1
+            self.direccion_huida = self._elegir_direccion_huida()
+        elif accion not in (AccionImpala.VER_FRENTE, AccionImpala.BEBER_AGUA):
+            raise ValueError(f"Acción desconocida: {accion}")
+    
     def _ver_izquierda(self) -> str:
         """Gira la vista 90 grados a la izquierda"""
         angulo_actual = self.direccion_vista.value
@@ -113,6 +138,17 @@ class Impala:
         self.velocidad_huida = 1
         self.tiempo_huyendo = 1
         
+        self.direccion_huida = self._elegir_direccion_huida()
+        
+        return f"¡IMPALA INICIA HUIDA hacia {self.direccion_huida.name}! (Velocidad: {self.velocidad_huida} cuadros/T)"
+    
+    def _elegir_direccion_huida(self) -> Direccion:
+        """
+        Elige la dirección de huida según la posición donde se detectó al león.
+        
+        Returns:
+            Dirección de la huida
+        """
         # Determinar dirección de huida basada en la posición del león
         if self.posicion_leon_detectada is not None:
             # Huir en dirección opuesta al león
@@ -123,21 +159,19 @@ class Impala:
             # Para otras posiciones, elegir el más lejano (Este u Oeste)
             
             if self.posicion_leon_detectada in [1, 2, 8]:  # Norte, NE, NO
-                self.direccion_huida = Direccion.SUR
+                return Direccion.SUR
             elif self.posicion_leon_detectada in [5, 6, 4]:  # Sur, SO, SE
-                self.direccion_huida = Direccion.NORTE
+                return Direccion.NORTE
             elif self.posicion_leon_detectada == 3:  # Este
-                self.direccion_huida = Direccion.OESTE
+                return Direccion.OESTE
             elif self.posicion_leon_detectada == 7:  # Oeste
-                self.direccion_huida = Direccion.ESTE
+                return Direccion.ESTE
             else:
                 # Por defecto, elegir aleatoriamente
-                self.direccion_huida = random.choice([Direccion.ESTE, Direccion.OESTE])
+                return random.choice([Direccion.ESTE, Direccion.OESTE])
         else:
             # Si no sabe dónde está el león, huir aleatoriamente (Este u Oeste)
-            self.direccion_huida = random.choice([Direccion.ESTE, Direccion.OESTE])
-        
-        return f"¡IMPALA INICIA HUIDA hacia {self.direccion_huida.name}! (Velocidad: {self.velocidad_huida} cuadros/T)"
+            return random.choice([Direccion.ESTE, Direccion.OESTE])
     
     def _continuar_huida(self) -> str:
         """Continúa la huida aumentando la velocidad"""
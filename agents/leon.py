@@ -90,6 +90,29 @@ class Leon:
         else:
             raise ValueError(f"Acción desconocida: {accion}")
     
+    def aplicar_accion(self, accion: AccionLeon):
+        """
+        Aplica una acción del león sin generar la descripción narrativa.
+        
+        Versión silenciosa de ejecutar_accion para el modo rápido de
+        entrenamiento; deja al león exactamente en el mismo estado.
+        
+        Args:
+            accion: Acción a ejecutar (SITUARSE no está soportada)
+        """
+        if self.esta_atacando:
+            return
+        
+        if accion == AccionLeon.AVANZAR:
+            self.esta_escondido = False
+        elif accion == AccionLeon.ESCONDERSE:
+            self.esta_escondido = True
+        elif accion == AccionLeon.ATACAR:
+            self.esta_atacando = True
+            self.esta_escondido = False
+        else:
+            raise ValueError(f"Acción no soportada en modo silencioso: {accion}")
+    
     def _avanzar(self) -> str:
         """
         Avanza 1 cuadro en línea recta hacia el impala.
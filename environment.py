@@ -3,10 +3,16 @@ Módulo de gestión del entorno del abrevadero.
 Maneja el mapa, posiciones, distancias y línea de visión.
 """
 
+from array import array
 import math
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Sequence, Union
 from enum import Enum
 
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
 
 class Direccion(Enum):
     """Direcciones cardinales para la orientación del impala"""
@@ -44,7 +50,54 @@ class Abrevadero:
     
     def __init__(self):
         """Inicializa el abrevadero con las 8 posiciones predefinidas"""
+        self._parametros_tablas = None
+        self.actualizar_tablas()
+    
+    def actualizar_tablas(self):
+        """
+        Construye (o reconstruye) las tablas precalculadas de geometría.
+        
+        Se llama al inicializar y antes de cada consulta; solo recalcula si
+        RADIO o ANGULO_VISION cambiaron (en la clase o en la instancia).
+        
+        Tablas:
+            posiciones: Coordenadas (x, y) de cada posición (1-8)
+            distancias_posiciones: Distancia al centro, indexada por posición
+                                   (el índice 0 no se usa)
+            vectores_aproximacion: Vector unitario de cada posición hacia el centro
+            mascara_vision: Una máscara de 8 bits por Direccion; el bit
+                            posicion-1 indica si esa posición está dentro
+                            del ángulo de visión
+            tabla_vision: La misma información como lista [dirección][posición - 1]
+        """
+        parametros = (self.RADIO, self.ANGULO_VISION)
+        if parametros == self._parametros_tablas:
+            return
+        
         self.posiciones = self._calcular_posiciones()
+        
+        self.distancias_posiciones = [0.0]
+        self.vectores_aproximacion = {}
+        for pos, coord in self.posiciones.items():
+            distancia = self.calcular_distancia(coord, self.CENTRO)
+            self.distancias_posiciones.append(distancia)
+            x, y = coord
+            self.vectores_aproximacion[pos] = (-x / distancia, -y / distancia) if distancia else (0.0, 0.0)
+        
+        self.mascara_vision = {}
+        for direccion in Direccion:
+            mascara = 0
+            for pos in range(1, 9):
+                if self._calcular_vision(pos, direccion):
+                    mascara |= 1 << (pos - 1)
+            self.mascara_vision[direccion] = mascara
+        
+        self.tabla_vision = [
+            [bool(mascara >> (pos - 1) & 1) for pos in range(1, 9)]
+            for mascara in self.mascara_vision.values()
+        ]
+        
+        self._parametros_tablas = parametros
     
     def _calcular_posiciones(self) -> Dict[int, Tuple[float, float]]:
         """
@@ -90,6 +143,8 @@ class Abrevadero:
         """
         if posicion not in range(1, 9):
             raise ValueError(f"Posición debe estar entre 1 y 8, recibido: {posicion}")
+        if self._parametros_tablas != (self.RADIO, self.ANGULO_VISION):
+            self.actualizar_tablas()
         return self.posiciones[posicion]
     
     def calcular_distancia(self, pos1: Tuple[float, float], 
@@ -108,6 +163,33 @@ class Abrevadero:
         x2, y2 = pos2
         return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
     
+    def calcular_distancias(self, x1: Sequence[float], y1: Sequence[float],
+                            x2: Union[float, Sequence[float]] = 0.0,
+                            y2: Union[float, Sequence[float]] = 0.0):
+        """
+        Calcula distancias euclidianas para arreglos de puntos.
+        
+        Args:
+            x1: Coordenadas x de los puntos origen
+            y1: Coordenadas y de los puntos origen
+            x2: Coordenada(s) x destino (default: centro)
+            y2: Coordenada(s) y destino (default: centro)
+        
+        Returns:
+            Arreglo de distancias (np.ndarray con NumPy, array('d') sin él)
+        """
+        if np is not None:
+            dx = np.asarray(x2, dtype=np.float64) - np.asarray(x1, dtype=np.float64)
+            dy = np.asarray(y2, dtype=np.float64) - np.asarray(y1, dtype=np.float64)
+            return np.sqrt(dx**2 + dy**2)
+        
+        destinos_x = [x2] * len(x1) if isinstance(x2, (int, float)) else x2
+        destinos_y = [y2] * len(y1) if isinstance(y2, (int, float)) else y2
+        return array('d', [
+            math.sqrt((bx - ax)**2 + (by - ay)**2)
+            for ax, ay, bx, by in zip(x1, y1, destinos_x, destinos_y)
+        ])
+    
     def distancia_leon_impala(self, posicion_leon: int) -> float:
         """
         Calcula la distancia entre el león y el impala.
@@ -118,8 +200,11 @@ class Abrevadero:
         Returns:
             Distancia en cuadros
         """
-        coord_leon = self.obtener_coordenadas(posicion_leon)
-        return self.calcular_distancia(coord_leon, self.CENTRO)
+        if posicion_leon not in self.posiciones:
+            raise ValueError(f"Posición debe estar entre 1 y 8, recibido: {posicion_leon}")
+        if self._parametros_tablas != (self.RADIO, self.ANGULO_VISION):
+            self.actualizar_tablas()
+        return self.distancias_posiciones[posicion_leon]
     
     def calcular_angulo(self, desde: Tuple[float, float], 
                        hacia: Tuple[float, float]) -> float:
@@ -146,11 +231,41 @@ class Abrevadero:
             
         return angulo
     
+    def calcular_angulos(self, x1: Sequence[float], y1: Sequence[float],
+                         x2: Union[float, Sequence[float]],
+                         y2: Union[float, Sequence[float]]):
+        """
+        Calcula ángulos (en grados, 0° = Norte) para arreglos de puntos.
+        
+        Args:
+            x1: Coordenadas x de los puntos origen
+            y1: Coordenadas y de los puntos origen
+            x2: Coordenada(s) x destino
+            y2: Coordenada(s) y destino
+        
+        Returns:
+            Arreglo de ángulos en grados (0-360)
+        """
+        if np is not None:
+            dx = np.asarray(x2, dtype=np.float64) - np.asarray(x1, dtype=np.float64)
+            dy = np.asarray(y2, dtype=np.float64) - np.asarray(y1, dtype=np.float64)
+            angulos = np.degrees(np.arctan2(dx, dy))
+            return np.where(angulos < 0, angulos + 360, angulos)
+        
+        destinos_x = [x2] * len(x1) if isinstance(x2, (int, float)) else x2
+        destinos_y = [y2] * len(y1) if isinstance(y2, (int, float)) else y2
+        return array('d', [
+            self.calcular_angulo((ax, ay), (bx, by))
+            for ax, ay, bx, by in zip(x1, y1, destinos_x, destinos_y)
+        ])
+    
     def leon_en_angulo_vision(self, posicion_leon: int, 
                               direccion_impala: Direccion) -> bool:
         """
         Verifica si el león está dentro del ángulo de visión del impala.
         
+        Consulta la máscara de visibilidad precalculada.
+        
         Args:
             posicion_leon: Posición actual del león (1-8)
             direccion_impala: Dirección hacia donde mira el impala
@@ -158,7 +273,27 @@ class Abrevadero:
         Returns:
             True si el león está visible, False en caso contrario
         """
-        coord_leon = self.obtener_coordenadas(posicion_leon)
+        if posicion_leon not in self.posiciones:
+            raise ValueError(f"Posición debe estar entre 1 y 8, recibido: {posicion_leon}")
+        if self._parametros_tablas != (self.RADIO, self.ANGULO_VISION):
+            self.actualizar_tablas()
+        return bool(self.mascara_vision[direccion_impala] >> (posicion_leon - 1) & 1)
+    
+    def _calcular_vision(self, posicion_leon: int,
+                         direccion_impala: Direccion) -> bool:
+        """
+        Calcula geométricamente si el león está dentro del ángulo de visión.
+        
+        Se usa para construir mascara_vision.
+        
+        Args:
+            posicion_leon: Posición actual del león (1-8)
+            direccion_impala: Dirección hacia donde mira el impala
+        
+        Returns:
+            True si el león está visible, False en caso contrario
+        """
+        coord_leon = self.posiciones[posicion_leon]
         
         # Ángulo desde el impala hacia el león
         angulo_leon = self.calcular_angulo(self.CENTRO, coord_leon)
@@ -190,15 +325,14 @@ class Abrevadero:
         
         # Vector unitario desde el león hacia el impala (o viceversa)
         x, y = coord_actual
-        distancia = self.calcular_distancia(coord_actual, self.CENTRO)
-        
-        if distancia == 0:
+        if self.distancias_posiciones[posicion_actual] == 0:
             return coord_actual
         
-        # Normalizar y avanzar 1 cuadro
+        # Avanzar 1 cuadro
         factor = 1 if hacia_impala else -1
-        dx = -x / distancia * factor
-        dy = -y / distancia * factor
+        ux, uy = self.vectores_aproximacion[posicion_actual]
+        dx = ux * factor
+        dy = uy * factor
         
         nueva_x = x + dx
         nueva_y = y + dy
@@ -226,3 +360,7 @@ if __name__ == "__main__":
     for pos in range(1, 9):
         visible = abrevadero.leon_en_angulo_vision(pos, Direccion.NORTE)
         print(f"  Posición {pos}: {'Sí' if visible else 'No'}")
+
+    print("\nMáscaras de visibilidad (bit = posición - 1):")
+    for direccion, mascara in abrevadero.mascara_vision.items():
+        print(f"  {direccion.name:<9} {mascara:08b}")
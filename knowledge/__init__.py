@@ -1,6 +1,20 @@
 """Módulo de conocimiento: Base de conocimientos y generalización"""
 
 from .base_conocimientos import BaseConocimientos, Estado, Experiencia
-from .generalizacion import Generalizador
+from .generalizacion import Generalizador, IndiceSimilitud
+from .codificacion import CodificadorEstados
+from .base_densa import BaseConocimientosDensa
+from .motor_reglas import MotorReglas
+from .mineria_reglas import minar_reglas
 
-__all__ = ['BaseConocimientos', 'Estado', 'Experiencia', 'Generalizador']
+__all__ = [
+    'BaseConocimientos',
+    'Estado',
+    'Experiencia',
+    'Generalizador',
+    'IndiceSimilitud',
+    'CodificadorEstados',
+    'BaseConocimientosDensa',
+    'MotorReglas',
+    'minar_reglas'
+]
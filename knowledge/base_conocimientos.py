@@ -4,10 +4,16 @@ Almacena y gestiona el conocimiento adquirido por el león.
 """
 
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 from collections import defaultdict
+from array import array
 import json
 
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
 
 @dataclass
 class Estado:
@@ -60,6 +66,58 @@ class Estado:
         return f"Estado({', '.join(partes)})"
 
 
+def _resolver_numpy(usar_numpy: Optional[bool]) -> bool:
+    """Decide si una consulta por lotes usa NumPy (None = si está instalado)"""
+    if usar_numpy and np is None:
+        raise ValueError("NumPy no está instalado")
+    return (np is not None) if usar_numpy is None else usar_numpy
+
+
+def _mejores_de_filas(filas: Any, mascara: Any = None,
+                     usar_numpy: Optional[bool] = None) -> Tuple[Any, Any]:
+    """
+    Elige la mejor acción permitida de cada fila de valores Q.
+    
+    Igual que obtener_mejor_accion, gana la primera acción (en el orden de
+    las columnas) con el valor máximo. Una fila sin acciones permitidas
+    devuelve la acción -1 con valor -inf.
+    
+    Args:
+        filas: Matriz [estados, acciones] (ndarray o lista de listas)
+        mascara: Acciones permitidas: una fila de booleanos para todos los
+                 estados o una por estado (None = todas)
+        usar_numpy: Forzar (True) o evitar (False) NumPy; None = automático
+    
+    Returns:
+        Tupla (códigos de acción, valores): ndarrays con NumPy, si no
+        array('b') y array('d')
+    """
+    if _resolver_numpy(usar_numpy):
+        filas = np.asarray(filas, dtype=np.float64)
+        if mascara is not None:
+            permitidas = np.broadcast_to(np.asarray(mascara, dtype=bool), filas.shape)
+            filas = np.where(permitidas, filas, -np.inf)
+        mejores = filas.argmax(axis=1) if filas.size else np.zeros(len(filas), dtype=np.intp)
+        valores = filas[np.arange(len(filas)), mejores]
+        mejores = mejores.astype(np.int8)
+        if mascara is not None:
+            mejores[~permitidas.any(axis=1)] = -1
+        return mejores, valores
+    
+    por_estado = mascara is not None and len(mascara) > 0 and hasattr(mascara[0], '__len__')
+    mejores = array('b', bytes(len(filas)))
+    valores = array('d', bytes(8 * len(filas)))
+    for i, fila in enumerate(filas):
+        permitidas = mascara[i] if por_estado else mascara
+        mejor, mejor_valor = -1, float('-inf')
+        for accion, valor in enumerate(fila):
+            if (permitidas is None or permitidas[accion]) and (mejor < 0 or valor > mejor_valor):
+                mejor, mejor_valor = accion, valor
+        mejores[i] = mejor
+        valores[i] = mejor_valor
+    return mejores, valores
+
+
 @dataclass
 class Experiencia:
     """
@@ -106,21 +164,100 @@ class BaseConocimientos:
     Almacena experiencias y permite consultas eficientes.
     """
     
-    def __init__(self):
-        """Inicializa la base de conocimientos vacía"""
+    def __init__(self, capacidad_experiencias: int = 10000):
+        """
+        Inicializa la base de conocimientos vacía.
+        
+        Args:
+            capacidad_experiencias: Máximo de experiencias recientes guardadas
+        """
+        from knowledge.memoria_experiencias import MemoriaExperiencias
+        
         # Tabla Q: (estado, accion) -> valor Q
         self.q_table: Dict[Tuple[Estado, str], float] = defaultdict(float)
         
         # Contador de visitas: (estado, accion) -> número de veces vista
         self.visitas: Dict[Tuple[Estado, str], int] = defaultdict(int)
         
-        # Experiencias almacenadas (para análisis posterior)
-        self.experiencias: List[Experiencia] = []
+        # Fila de valores Q por estado conocido: estado -> {accion: valor Q}.
+        # Se mantiene junto con q_table, así que sus claves son los estados
+        # conocidos. La tabla Q se escribe solo con actualizar_valor_q.
+        self._filas: Dict[Estado, Dict[str, float]] = {}
+        
+        # Experiencias recientes (para análisis posterior), en un buffer
+        # circular de capacidad fija
+        self.experiencias = MemoriaExperiencias(capacidad_experiencias)
         
         # Estadísticas
         self.total_experiencias = 0
         self.cacerias_exitosas = 0
         self.cacerias_fallidas = 0
+        
+        # Pares modificados desde la última extracción (None = sin seguimiento)
+        self._cambios: Optional[Set] = None
+        
+        # Índices que siguen qué estados son conocidos (ver registrar_indice)
+        self._indices: List = []
+    
+    def activar_seguimiento_cambios(self):
+        """Empieza a registrar qué pares (estado, acción) se modifican"""
+        if self._cambios is None:
+            self._cambios = set()
+    
+    def extraer_cambios(self) -> List[Tuple[Estado, str]]:
+        """
+        Obtiene los pares modificados desde la última extracción y los olvida.
+        
+        Returns:
+            Lista de pares (estado, accion) cuyo valor Q o visitas cambiaron
+        """
+        if self._cambios is None:
+            return []
+        cambios, self._cambios = self._cambios, set()
+        return list(cambios)
+    
+    def devolver_cambios(self, cambios: List[Tuple[Estado, str]]):
+        """
+        Vuelve a marcar como modificados pares ya extraídos.
+        
+        Sirve para no perder cambios cuando no se pudieron guardar.
+        
+        Args:
+            cambios: Pares (estado, accion) devueltos por extraer_cambios
+        """
+        if self._cambios is not None:
+            self._cambios.update(cambios)
+    
+    def registrar_indice(self, indice):
+        """
+        Suscribe un índice a los cambios del conjunto de estados conocidos.
+        
+        El índice se reconstruye con los estados actuales y desde entonces
+        recibe agregar(estado) cada vez que un estado obtiene su primer
+        valor Q, quitar(estado) cuando lo pierde y limpiar() cuando la base
+        se vacía (ver generalizacion.IndiceSimilitud).
+        
+        Args:
+            indice: Objeto con reconstruir, agregar, quitar y limpiar
+        """
+        indice.reconstruir(self.obtener_estados_conocidos())
+        self._indices.append(indice)
+    
+    def __getstate__(self) -> Dict:
+        """
+        Estado para pickle y deepcopy, sin los índices suscritos.
+        
+        Los índices pertenecen a quien los registró (p. ej. un Generalizador)
+        y no se pueden serializar; la base restaurada empieza sin índices.
+        """
+        estado = self.__dict__.copy()
+        estado['_indices'] = []
+        return estado
+    
+    def __setstate__(self, estado: Dict):
+        """Restaura la base desde __getstate__"""
+        self.__dict__.update(estado)
+        self._indices = []
     
     def agregar_experiencia(self, experiencia: Experiencia):
         """
@@ -141,6 +278,8 @@ class BaseConocimientos:
         # Actualizar contador de visitas
         key = (experiencia.estado, experiencia.accion)
         self.visitas[key] += 1
+        if self._cambios is not None:
+            self._cambios.add(key)
     
     def actualizar_valor_q(self, estado: Estado, accion: str, valor: float):
         """
@@ -152,7 +291,15 @@ class BaseConocimientos:
             valor: Nuevo valor Q
         """
         key = (estado, accion)
+        fila = self._filas.get(estado)
+        if fila is None:
+            fila = self._filas[estado] = {}
+            for indice in self._indices:
+                indice.agregar(estado)
+        fila[accion] = valor
         self.q_table[key] = valor
+        if self._cambios is not None:
+            self._cambios.add(key)
     
     def obtener_valor_q(self, estado: Estado, accion: str) -> float:
         """
@@ -180,11 +327,16 @@ class BaseConocimientos:
         Returns:
             Tupla (mejor_accion, valor_q)
         """
+        # Una sola búsqueda del estado; las acciones se leen de su fila
+        fila = self._filas.get(estado)
+        if fila is None:
+            return acciones_posibles[0], 0.0
+        
         mejor_accion = None
         mejor_valor = float('-inf')
         
         for accion in acciones_posibles:
-            valor = self.obtener_valor_q(estado, accion)
+            valor = fila.get(accion, 0.0)
             if valor > mejor_valor:
                 mejor_valor = valor
                 mejor_accion = accion
@@ -196,6 +348,67 @@ class BaseConocimientos:
         
         return mejor_accion, mejor_valor
     
+    def obtener_valores_q_lote(self, estados: Sequence[Any],
+                               usar_numpy: Optional[bool] = None) -> Any:
+        """
+        Obtiene las filas de valores Q de muchos estados en una llamada.
+        
+        Args:
+            estados: Estados o códigos de estado (ver CodificadorEstados;
+                     -1 o fuera de rango = desconocido), también como arreglo
+                     de NumPy
+            usar_numpy: Forzar (True) o evitar (False) NumPy; None = automático
+        
+        Returns:
+            Matriz [estados, acciones] en el orden de ACCIONES_LEON, con 0.0
+            en los pares nunca vistos (ndarray o lista de listas)
+        """
+        from knowledge.codificacion import ACCIONES_LEON
+        
+        usar_numpy = _resolver_numpy(usar_numpy)
+        codificador = self.experiencias.codificador
+        decodificar = codificador.decodificar
+        num_estados = codificador.num_estados
+        filas_conocidas = self._filas
+        vacia = {}
+        
+        filas = []
+        for estado in estados:
+            if not isinstance(estado, Estado):
+                codigo = int(estado)
+                estado = decodificar(codigo) if 0 <= codigo < num_estados else None
+            fila = filas_conocidas.get(estado, vacia)
+            filas.append([fila.get(accion, 0.0) for accion in ACCIONES_LEON])
+        
+        if usar_numpy:
+            return np.array(filas, dtype=np.float64).reshape(len(filas), len(ACCIONES_LEON))
+        return filas
+    
+    def obtener_mejor_accion_lote(self, estados: Sequence[Any], mascara: Any = None,
+                                  usar_numpy: Optional[bool] = None) -> Tuple[Any, Any, Any]:
+        """
+        Obtiene la mejor acción, su valor y la fila Q de muchos estados.
+        
+        Equivale a llamar obtener_mejor_accion con las acciones permitidas
+        en el orden de ACCIONES_LEON, pero la elección se hace sobre la
+        matriz completa (vectorizada con NumPy).
+        
+        Args:
+            estados: Estados o códigos de estado, también como arreglo de NumPy
+            mascara: Acciones permitidas (booleanos en el orden de
+                     ACCIONES_LEON): una fila para todos los estados o una
+                     por estado (None = todas)
+            usar_numpy: Forzar (True) o evitar (False) NumPy; None = automático
+        
+        Returns:
+            Tupla (códigos de acción, valores, filas Q); acción -1 y valor
+            -inf en estados sin acciones permitidas
+        """
+        usar_numpy = _resolver_numpy(usar_numpy)
+        filas = self.obtener_valores_q_lote(estados, usar_numpy)
+        mejores, valores = _mejores_de_filas(filas, mascara, usar_numpy)
+        return mejores, valores, filas
+    
     def obtener_visitas(self, estado: Estado, accion: str) -> int:
         """
         Obtiene el número de veces que se ha visitado un par (estado, acción).
@@ -217,10 +430,7 @@ class BaseConocimientos:
         Returns:
             Conjunto de estados únicos
         """
-        estados = set()
-        for (estado, _) in self.q_table.keys():
-            estados.add(estado)
-        return estados
+        return set(self._filas)
     
     def obtener_estadisticas(self) -> dict:
         """
@@ -237,7 +447,7 @@ class BaseConocimientos:
             'cacerias_exitosas': self.cacerias_exitosas,
             'cacerias_fallidas': self.cacerias_fallidas,
             'tasa_exito': round(tasa_exito, 2),
-            'estados_unicos': len(self.obtener_estados_conocidos()),
+            'estados_unicos': len(self._filas),
             'pares_estado_accion': len(self.q_table)
         }
     
@@ -245,10 +455,37 @@ class BaseConocimientos:
         """Limpia toda la base de conocimientos"""
         self.q_table.clear()
         self.visitas.clear()
+        self._filas.clear()
         self.experiencias.clear()
         self.total_experiencias = 0
         self.cacerias_exitosas = 0
         self.cacerias_fallidas = 0
+        for indice in self._indices:
+            indice.limpiar()
+    
+    def copiar(self) -> 'BaseConocimientos':
+        """
+        Crea una instantánea independiente de la base.
+        
+        Crea una base nueva con __init__ y le copia la tabla Q, las
+        visitas, las experiencias y las estadísticas (sin seguimiento de
+        cambios ni índices); los cambios posteriores en la base no afectan
+        a la copia. Es barata (copias de diccionarios y arreglos, sin
+        serializar), así que sirve para guardar en segundo plano sin
+        detener el entrenamiento.
+        
+        Returns:
+            Nueva base de conocimientos con el mismo contenido
+        """
+        copia = BaseConocimientos(self.experiencias.capacidad)
+        copia.q_table.update(self.q_table)
+        copia.visitas.update(self.visitas)
+        copia._filas = {estado: dict(fila) for estado, fila in self._filas.items()}
+        copia.experiencias = self.experiencias.copiar()
+        copia.total_experiencias = self.total_experiencias
+        copia.cacerias_exitosas = self.cacerias_exitosas
+        copia.cacerias_fallidas = self.cacerias_fallidas
+        return copia
     
     def exportar_a_json(self) -> str:
         """
@@ -257,6 +494,15 @@ class BaseConocimientos:
         Returns:
             String JSON con toda la información
         """
+        return json.dumps(self.exportar_a_dict(), indent=2, ensure_ascii=False)
+    
+    def exportar_a_dict(self) -> dict:
+        """
+        Exporta la base de conocimientos a un diccionario serializable.
+        
+        Returns:
+            Diccionario con q_table, estadísticas y experiencias recientes
+        """
         # Convertir q_table a formato serializable
         q_table_list = [
             {
@@ -268,7 +514,7 @@ class BaseConocimientos:
         ]
         
         # Convertir experiencias
-        experiencias_list = [exp.to_dict() for exp in self.experiencias[-1000:]]  # Últimas 1000
+        experiencias_list = [exp.to_dict() for exp in self.experiencias.ultimas(1000)]  # Últimas 1000
         
         data = {
             'q_table': q_table_list,
@@ -276,7 +522,7 @@ class BaseConocimientos:
             'experiencias_recientes': experiencias_list
         }
         
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return data
     
     def importar_desde_json(self, json_str: str):
         """
@@ -295,7 +541,7 @@ class BaseConocimientos:
             estado = Estado.from_dict(item['estado'])
             accion = item['accion']
             valor = item['valor_q']
-            self.q_table[(estado, accion)] = valor
+            self.actualizar_valor_q(estado, accion, valor)
         
         # Importar estadísticas
         stats = data['estadisticas']
@@ -0,0 +1,570 @@
+"""
+Módulo de base de conocimientos densa.
+Guarda la tabla Q y las visitas en arreglos contiguos [estados, acciones].
+"""
+
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Iterator, List, Optional, Sequence, Set, Tuple
+
+from knowledge.base_conocimientos import BaseConocimientos, Estado, Experiencia, _resolver_numpy
+from knowledge.codificacion import CodificadorEstados
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+class _VistaTabla(MutableMapping):
+    """
+    Vista tipo diccionario (estado, accion) -> valor sobre un arreglo denso.
+    
+    Mantiene compatibilidad con el código que recorre `q_table` o `visitas`
+    como diccionarios (exportación, reportes, fusión). Igual que los
+    defaultdict de BaseConocimientos, leer un par ausente devuelve 0.
+    """
+    
+    def __init__(self, base: 'BaseConocimientosDensa', valores: array, presentes):
+        self._base = base
+        self._valores = valores
+        self._presentes = presentes
+    
+    def _indice(self, key: Tuple[Estado, str]) -> int:
+        estado, accion = key
+        return self._base.codificador.codificar_par(estado, accion)
+    
+    def __getitem__(self, key):
+        return self._valores[self._indice(key)]
+    
+    def __contains__(self, key) -> bool:
+        try:
+            return bool(self._presentes(self._indice(key)))
+        except (TypeError, ValueError):
+            return False
+    
+    def __setitem__(self, key, valor):
+        estado, accion = key
+        if self._valores is self._base._q:
+            self._base.actualizar_valor_q(estado, accion, valor)
+        else:
+            self._valores[self._indice(key)] = valor
+    
+    def __delitem__(self, key):
+        indice = self._indice(key)
+        if not self._presentes(indice):
+            raise KeyError(key)
+        if self._valores is self._base._q:
+            self._base._olvidar(indice)
+        else:
+            self._valores[indice] = 0
+    
+    def __iter__(self) -> Iterator[Tuple[Estado, str]]:
+        decodificar_par = self._base.codificador.decodificar_par
+        for indice in range(len(self._valores)):
+            if self._presentes(indice):
+                yield decodificar_par(indice)
+    
+    def __len__(self) -> int:
+        if self._valores is self._base._q:
+            return self._base._num_pares
+        return sum(1 for v in self._valores if v)
+
+
+class BaseConocimientosDensa(BaseConocimientos):
+    """
+    Base de conocimientos con backend de arreglos densos.
+    
+    Cada estado se codifica a un entero con CodificadorEstados y la tabla Q
+    se guarda como un arreglo contiguo de forma [estados, acciones]: la mejor
+    acción de un estado es una sola lectura de fila y cada par ocupa
+    8 (Q) + 8 (visitas) + 1 (bandera) bytes en lugar de una entrada de dict.
+    Expone la misma API que BaseConocimientos.
+    """
+    
+    def __init__(self, codificador: Optional[CodificadorEstados] = None,
+                 capacidad_experiencias: int = 10000):
+        """
+        Inicializa la base de conocimientos vacía.
+        
+        Args:
+            codificador: Codificador de estados (default: según Abrevadero.RADIO)
+            capacidad_experiencias: Máximo de experiencias recientes guardadas
+        """
+        super().__init__(capacidad_experiencias)
+        self.codificador = codificador or self.experiencias.codificador
+        self.experiencias.codificador = self.codificador
+        self._reservar()
+    
+    def _reservar(self):
+        """Reserva los arreglos densos y las vistas tipo diccionario"""
+        num_estados = self.codificador.num_estados
+        num_acciones = self.codificador.num_acciones
+        
+        self.asignar_arreglos(
+            array('d', bytes(8 * num_estados * num_acciones)),
+            array('q', bytes(8 * num_estados * num_acciones)),
+            bytearray(num_estados * num_acciones),
+            bytearray(num_estados),
+            num_pares=0,
+            num_estados=0
+        )
+    
+    def asignar_arreglos(self, q, visitas, conocidos, acciones_por_estado,
+                         num_pares: int, num_estados: int):
+        """
+        Usa arreglos ya construidos como almacenamiento de la tabla.
+        
+        Admite cualquier objeto indexable con el protocolo de buffer
+        (array, bytearray o memoryview, p. ej. sobre un mmap), así que un
+        checkpoint binario se usa sin copiar ni parsear.
+        
+        Args:
+            q: Valores Q ('d'), num_estados × num_acciones
+            visitas: Contadores de visitas ('q'), mismo tamaño
+            conocidos: Banderas de pares conocidos ('B'), mismo tamaño
+            acciones_por_estado: Pares conocidos por estado ('B'), num_estados
+            num_pares: Número de pares conocidos
+            num_estados: Número de estados con algún par conocido
+        """
+        tamano = self.codificador.num_estados * self.codificador.num_acciones
+        if not len(q) == len(visitas) == len(conocidos) == tamano:
+            raise ValueError(f"Los arreglos no coinciden con el codificador ({tamano} pares)")
+        if len(acciones_por_estado) != self.codificador.num_estados:
+            raise ValueError(f"acciones_por_estado debe tener {self.codificador.num_estados} elementos")
+        
+        self._q = q
+        self._visitas = visitas
+        self._conocidos = conocidos
+        self._acciones_por_estado = acciones_por_estado
+        self._num_pares = num_pares
+        self._num_estados = num_estados
+        
+        self.q_table = _VistaTabla(self, self._q, self._conocidos.__getitem__)
+        self.visitas = _VistaTabla(self, self._visitas, self._visitas.__getitem__)
+        
+        for indice in self._indices:
+            indice.reconstruir(self.obtener_estados_conocidos())
+    
+    def _olvidar(self, indice: int):
+        """Marca un par como desconocido y reinicia su valor Q"""
+        if self._conocidos[indice]:
+            self._conocidos[indice] = 0
+            self._q[indice] = 0.0
+            self._num_pares -= 1
+            
+            codigo = indice // self.codificador.num_acciones
+            self._acciones_por_estado[codigo] -= 1
+            if self._acciones_por_estado[codigo] == 0:
+                self._num_estados -= 1
+                for indice_estados in self._indices:
+                    indice_estados.quitar(self.codificador.decodificar(codigo))
+    
+    def agregar_experiencia(self, experiencia: Experiencia):
+        """
+        Agrega una nueva experiencia a la base de conocimientos.
+        
+        Args:
+            experiencia: Experiencia a agregar
+        """
+        codificador = self.codificador
+        codigo_estado = codificador.codificar(experiencia.estado)
+        codigo_accion = codificador.codificar_accion(experiencia.accion)
+        siguiente = experiencia.siguiente_estado
+        
+        # Reutiliza los códigos en la memoria de experiencias
+        self.experiencias.agregar_codificada(
+            codigo_estado,
+            codigo_accion,
+            experiencia.recompensa,
+            codificador.codificar(siguiente) if siguiente is not None else self.experiencias.SIN_ESTADO,
+            experiencia.exito
+        )
+        self.total_experiencias += 1
+        
+        if experiencia.exito:
+            self.cacerias_exitosas += 1
+        elif siguiente is None:
+            self.cacerias_fallidas += 1
+        
+        indice = codigo_estado * codificador.num_acciones + codigo_accion
+        self._visitas[indice] += 1
+        if self._cambios is not None:
+            self._cambios.add(indice)
+    
+    def actualizar_valor_q_codigo(self, codigo_estado: int, codigo_accion: int, valor: float):
+        """
+        Actualiza el valor Q de un par ya codificado.
+        
+        Args:
+            codigo_estado: Código del estado
+            codigo_accion: Código de la acción
+            valor: Nuevo valor Q
+        """
+        indice = codigo_estado * self.codificador.num_acciones + codigo_accion
+        self._q[indice] = valor
+        if self._cambios is not None:
+            self._cambios.add(indice)
+        
+        if not self._conocidos[indice]:
+            self._conocidos[indice] = 1
+            self._num_pares += 1
+            if self._acciones_por_estado[codigo_estado] == 0:
+                self._num_estados += 1
+                if self._indices:
+                    estado = self.codificador.decodificar(codigo_estado)
+                    for indice_estados in self._indices:
+                        indice_estados.agregar(estado)
+            self._acciones_por_estado[codigo_estado] += 1
+    
+    def actualizar_valor_q(self, estado: Estado, accion: str, valor: float):
+        """
+        Actualiza el valor Q de un par (estado, acción).
+        
+        Args:
+            estado: Estado del mundo
+            accion: Acción ejecutada
+            valor: Nuevo valor Q
+        """
+        self.actualizar_valor_q_codigo(
+            self.codificador.codificar(estado),
+            self.codificador.codificar_accion(accion),
+            valor
+        )
+    
+    def extraer_cambios(self) -> List[Tuple[Estado, str]]:
+        """
+        Obtiene los pares modificados desde la última extracción y los olvida.
+        
+        Returns:
+            Lista de pares (estado, accion) cuyo valor Q o visitas cambiaron
+        """
+        decodificar_par = self.codificador.decodificar_par
+        return [decodificar_par(indice) for indice in self.extraer_indices_cambiados()]
+    
+    def extraer_indices_cambiados(self) -> List[int]:
+        """
+        Igual que extraer_cambios, pero con los índices planos de los pares.
+        
+        Returns:
+            Lista de índices (codigo_estado * num_acciones + codigo_accion)
+        """
+        if self._cambios is None:
+            return []
+        cambios, self._cambios = self._cambios, set()
+        return sorted(cambios)
+    
+    def devolver_cambios(self, cambios: List[Tuple[Estado, str]]):
+        """
+        Vuelve a marcar como modificados pares ya extraídos.
+        
+        Args:
+            cambios: Pares (estado, accion) devueltos por extraer_cambios
+        """
+        codificar_par = self.codificador.codificar_par
+        self.devolver_indices_cambiados([codificar_par(estado, accion) for estado, accion in cambios])
+    
+    def devolver_indices_cambiados(self, indices: List[int]):
+        """
+        Igual que devolver_cambios, pero con los índices planos de los pares.
+        
+        Args:
+            indices: Índices devueltos por extraer_indices_cambiados
+        """
+        if self._cambios is not None:
+            self._cambios.update(indices)
+    
+    def obtener_valor_q(self, estado: Estado, accion: str) -> float:
+        """
+        Obtiene el valor Q de un par (estado, acción).
+        
+        Args:
+            estado: Estado del mundo
+            accion: Acción a consultar
+        
+        Returns:
+            Valor Q (0.0 si nunca se ha visto)
+        """
+        return self._q[self.codificador.codificar_par(estado, accion)]
+    
+    def obtener_fila_q(self, codigo_estado: int) -> array:
+        """
+        Obtiene todos los valores Q de un estado codificado.
+        
+        Args:
+            codigo_estado: Código del estado
+        
+        Returns:
+            Arreglo con un valor Q por acción (orden de ACCIONES_LEON)
+        """
+        inicio = codigo_estado * self.codificador.num_acciones
+        return self._q[inicio:inicio + self.codificador.num_acciones]
+    
+    def obtener_valores_q_lote(self, estados: Sequence[Any],
+                               usar_numpy: Optional[bool] = None) -> Any:
+        """
+        Obtiene las filas de valores Q de muchos estados en una llamada.
+        
+        Con NumPy la tabla se ve como una matriz [estados, acciones] sin
+        copiarla y las filas salen de un solo índice vectorizado; con un
+        arreglo de códigos como entrada no hay ningún bucle en Python.
+        
+        Args:
+            estados: Estados o códigos de estado (-1 o fuera de rango =
+                     desconocido), también como arreglo de NumPy
+            usar_numpy: Forzar (True) o evitar (False) NumPy; None = automático
+        
+        Returns:
+            Matriz [estados, acciones] en el orden de ACCIONES_LEON, con 0.0
+            en los pares nunca vistos (ndarray o lista de listas)
+        """
+        usar_numpy = _resolver_numpy(usar_numpy)
+        num_estados = self.codificador.num_estados
+        num_acciones = self.codificador.num_acciones
+        
+        if usar_numpy and isinstance(estados, np.ndarray):
+            codigos = estados.astype(np.intp, copy=False).ravel()
+        else:
+            codigos = self.codificar_lote(estados)
+        
+        if usar_numpy:
+            tabla = np.frombuffer(self._q, dtype=np.float64).reshape(num_estados, num_acciones)
+            codigos = np.asarray(codigos, dtype=np.intp)
+            desconocidos = (codigos < 0) | (codigos >= num_estados)
+            filas = tabla[np.where(desconocidos, 0, codigos)]
+            filas[desconocidos] = 0.0
+            return filas
+        
+        q = self._q
+        vacia = [0.0] * num_acciones
+        return [
+            q[codigo * num_acciones:(codigo + 1) * num_acciones].tolist()
+            if 0 <= codigo < num_estados else list(vacia)
+            for codigo in codigos
+        ]
+    
+    def codificar_lote(self, estados: Sequence[Any]) -> List[int]:
+        """
+        Codifica muchos estados (los códigos se dejan como están).
+        
+        Args:
+            estados: Estados o códigos de estado
+        
+        Returns:
+            Lista de códigos (-1 para estados fuera del codificador)
+        """
+        codificar = self.codificador.codificar
+        codigos = []
+        for estado in estados:
+            if isinstance(estado, Estado):
+                try:
+                    codigos.append(codificar(estado))
+                except ValueError:
+                    codigos.append(-1)
+            else:
+                codigos.append(int(estado))
+        return codigos
+    
+    def obtener_mejor_accion(self, estado: Estado,
+                            acciones_posibles: List[str]) -> Tuple[str, float]:
+        """
+        Obtiene la mejor acción para un estado dado con una sola lectura de fila.
+        
+        Args:
+            estado: Estado actual
+            acciones_posibles: Lista de acciones válidas
+        
+        Returns:
+            Tupla (mejor_accion, valor_q)
+        """
+        fila = self.obtener_fila_q(self.codificador.codificar(estado))
+        codificar_accion = self.codificador.codificar_accion
+        
+        mejor_accion = acciones_posibles[0]
+        mejor_valor = fila[codificar_accion(mejor_accion)]
+        
+        for accion in acciones_posibles[1:]:
+            valor = fila[codificar_accion(accion)]
+            if valor > mejor_valor:
+                mejor_valor = valor
+                mejor_accion = accion
+        
+        return mejor_accion, mejor_valor
+    
+    def obtener_visitas(self, estado: Estado, accion: str) -> int:
+        """
+        Obtiene el número de veces que se ha visitado un par (estado, acción).
+        
+        Args:
+            estado: Estado del mundo
+            accion: Acción a consultar
+        
+        Returns:
+            Número de visitas
+        """
+        return self._visitas[self.codificador.codificar_par(estado, accion)]
+    
+    def obtener_estados_conocidos(self) -> Set[Estado]:
+        """
+        Obtiene todos los estados conocidos.
+        
+        Returns:
+            Conjunto de estados únicos
+        """
+        decodificar = self.codificador.decodificar
+        return {
+            decodificar(codigo)
+            for codigo, num in enumerate(self._acciones_por_estado) if num
+        }
+    
+    def obtener_estadisticas(self) -> dict:
+        """
+        Obtiene estadísticas de la base de conocimientos.
+        
+        Returns:
+            Diccionario con estadísticas
+        """
+        stats = super().obtener_estadisticas()
+        stats['estados_unicos'] = self._num_estados
+        stats['pares_estado_accion'] = self._num_pares
+        return stats
+    
+    def limpiar(self):
+        """Limpia toda la base de conocimientos"""
+        self.experiencias.clear()
+        self.total_experiencias = 0
+        self.cacerias_exitosas = 0
+        self.cacerias_fallidas = 0
+        self._reservar()
+    
+    def importar_desde_json(self, json_str: str):
+        """
+        Importa la base de conocimientos desde JSON.
+        
+        Args:
+            json_str: String JSON con la información
+        """
+        import json
+        
+        data = json.loads(json_str)
+        self.limpiar()
+        
+        for item in data['q_table']:
+            estado = Estado.from_dict(item['estado'])
+            self.actualizar_valor_q(estado, item['accion'], item['valor_q'])
+        
+        stats = data['estadisticas']
+        self.total_experiencias = stats['total_experiencias']
+        self.cacerias_exitosas = stats['cacerias_exitosas']
+        self.cacerias_fallidas = stats['cacerias_fallidas']
+    
+    @classmethod
+    def desde_base(cls, base: BaseConocimientos,
+                   codificador: Optional[CodificadorEstados] = None) -> 'BaseConocimientosDensa':
+        """
+        Convierte una BaseConocimientos (dict) al backend denso.
+        
+        Args:
+            base: Base de conocimientos de origen
+            codificador: Codificador de estados (default: según Abrevadero.RADIO)
+        
+        Returns:
+            Nueva base densa con los mismos valores Q, visitas y estadísticas
+        """
+        densa = cls(codificador, base.experiencias.capacidad)
+        
+        for (estado, accion), valor in base.q_table.items():
+            densa.actualizar_valor_q(estado, accion, valor)
+        for (estado, accion), visitas in base.visitas.items():
+            densa._visitas[densa.codificador.codificar_par(estado, accion)] = visitas
+        
+        densa.experiencias.extend(base.experiencias)
+        densa.total_experiencias = base.total_experiencias
+        densa.cacerias_exitosas = base.cacerias_exitosas
+        densa.cacerias_fallidas = base.cacerias_fallidas
+        
+        return densa
+    
+    def copiar(self) -> 'BaseConocimientosDensa':
+        """
+        Crea una instantánea independiente de la base.
+        
+        La copia se crea con __init__ (tiene todos los atributos de una base
+        nueva, sin seguimiento de cambios ni índices) y los arreglos se
+        copian byte a byte sobre los suyos (también si son vistas sobre un
+        checkpoint mapeado en memoria), así que cuesta lo mismo que un
+        memcpy de la tabla.
+        
+        Returns:
+            Nueva base densa con el mismo contenido
+        """
+        copia = BaseConocimientosDensa(self.codificador, self.experiencias.capacidad)
+        memoryview(copia._q).cast('B')[:] = memoryview(self._q).cast('B')
+        memoryview(copia._visitas).cast('B')[:] = memoryview(self._visitas).cast('B')
+        copia._conocidos[:] = self._conocidos
+        copia._acciones_por_estado[:] = self._acciones_por_estado
+        copia._num_pares = self._num_pares
+        copia._num_estados = self._num_estados
+        
+        copia.experiencias = self.experiencias.copiar()
+        copia.total_experiencias = self.total_experiencias
+        copia.cacerias_exitosas = self.cacerias_exitosas
+        copia.cacerias_fallidas = self.cacerias_fallidas
+        return copia
+    
+    def memoria_tabla_bytes(self) -> int:
+        """
+        Calcula la memoria ocupada por los arreglos de la tabla.
+        
+        Returns:
+            Bytes ocupados por Q, visitas y banderas
+        """
+        return (self._q.itemsize * len(self._q) +
+                self._visitas.itemsize * len(self._visitas) +
+                len(self._conocidos) + len(self._acciones_por_estado))
+    
+    def __len__(self) -> int:
+        """Retorna el número de pares (estado, acción) conocidos"""
+        return self._num_pares
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    print("=== Pruebas de Base de Conocimientos Densa ===\n")
+    
+    bc = BaseConocimientosDensa()
+    print(f"{bc.codificador}")
+    print(f"Memoria de la tabla: {bc.memoria_tabla_bytes() / 1024:.1f} KB\n")
+    
+    estado1 = Estado(1, 5.0, "ver_frente", False, True)
+    estado2 = Estado(1, 4.0, "beber_agua", True, False)
+    
+    bc.agregar_experiencia(Experiencia(estado1, "esconderse", -1.0, estado2, False))
+    bc.actualizar_valor_q(estado1, "esconderse", 10.5)
+    bc.actualizar_valor_q(estado1, "avanzar", 5.2)
+    
+    print(f"Base de conocimientos: {bc}")
+    
+    mejor_accion, valor = bc.obtener_mejor_accion(estado1, ["esconderse", "avanzar", "atacar"])
+    print(f"Mejor acción para {estado1}: {mejor_accion} (Q={valor})")
+    print(f"Visitas (estado1, esconderse): {bc.obtener_visitas(estado1, 'esconderse')}")
+
+    # Consulta por lote: todos los estados del codificador en una llamada
+    import time
+    codigos = list(range(bc.codificador.num_estados))
+    estados = [bc.codificador.decodificar(codigo) for codigo in codigos]
+    acciones = ["avanzar", "esconderse", "atacar"]
+    
+    inicio = time.perf_counter()
+    for estado in estados:
+        bc.obtener_mejor_accion(estado, acciones)
+    t_uno = time.perf_counter() - inicio
+    
+    entrada = np.array(codigos) if np is not None else codigos
+    inicio = time.perf_counter()
+    mejores, valores, filas = bc.obtener_mejor_accion_lote(entrada, mascara=[True, True, False])
+    t_lote = time.perf_counter() - inicio
+    print(f"\n{len(codigos)} estados: uno a uno {t_uno * 1000:.1f} ms, "
+          f"por lote {t_lote * 1000:.2f} ms (NumPy={np is not None})")
+    print(f"Mejor acción sin atacar para {estado1}: "
+          f"{acciones[mejores[bc.codificador.codificar(estado1)]]}")
@@ -0,0 +1,215 @@
+"""
+Módulo de codificación de estados.
+Empaqueta Estado y acciones en enteros densos para tablas basadas en arreglos.
+"""
+
+from typing import Optional, Tuple
+
+from environment import Abrevadero
+from knowledge.base_conocimientos import Estado
+
+
+# Acciones del impala en el orden de AccionImpala
+ACCIONES_IMPALA = ('ver_izquierda', 'ver_derecha', 'ver_frente', 'beber_agua', 'huir')
+
+# Acciones que aprende el león (SITUARSE no forma parte de la tabla Q)
+ACCIONES_LEON = ('avanzar', 'esconderse', 'atacar')
+
+
+class CodificadorEstados:
+    """
+    Convierte un Estado en un identificador entero denso y viceversa.
+    
+    El espacio de estados es finito:
+        8 posiciones × bins de distancia (0.5 cuadros) × 5 acciones del impala × 2 × 2
+    
+    Layout del código (el último campo varía más rápido):
+        ((((posicion - 1) * D + bin_distancia) * 5 + accion_impala) * 2 + escondido) * 2 + puede_ver
+    """
+    
+    def __init__(self, distancia_maxima: Optional[float] = None):
+        """
+        Inicializa el codificador.
+        
+        Args:
+            distancia_maxima: Mayor distancia representable (default: Abrevadero.RADIO)
+        """
+        if distancia_maxima is None:
+            distancia_maxima = Abrevadero.RADIO
+        
+        self.distancia_maxima = distancia_maxima
+        self.num_distancias = int(round(distancia_maxima * 2)) + 1
+        self.num_acciones_impala = len(ACCIONES_IMPALA)
+        self.num_estados = 8 * self.num_distancias * self.num_acciones_impala * 4
+        self.num_acciones = len(ACCIONES_LEON)
+        
+        self._indice_accion_impala = {a: i for i, a in enumerate(ACCIONES_IMPALA)}
+        self._indice_accion_leon = {a: i for i, a in enumerate(ACCIONES_LEON)}
+    
+    def codificar_componentes(self, posicion_leon: int, distancia_impala: float,
+                              accion_impala: int, leon_escondido: bool,
+                              impala_puede_ver: bool) -> int:
+        """
+        Codifica un estado a partir de sus componentes sin construir un Estado.
+        
+        Args:
+            posicion_leon: Posición del león (1-8)
+            distancia_impala: Distancia al impala (se redondea a 0.5 cuadros)
+            accion_impala: Código de la acción del impala (índice en ACCIONES_IMPALA)
+            leon_escondido: Si el león está escondido
+            impala_puede_ver: Si el impala puede ver al león
+        
+        Returns:
+            Código entero del estado
+        """
+        bin_distancia = int(round(distancia_impala * 2))
+        if not 0 <= bin_distancia < self.num_distancias:
+            raise ValueError(
+                f"Distancia fuera de rango: {distancia_impala} (máximo {self.distancia_maxima})"
+            )
+        if not 1 <= posicion_leon <= 8:
+            raise ValueError(f"Posición debe estar entre 1 y 8, recibido: {posicion_leon}")
+        
+        codigo = (posicion_leon - 1) * self.num_distancias + bin_distancia
+        codigo = codigo * self.num_acciones_impala + accion_impala
+        codigo = codigo * 2 + (1 if leon_escondido else 0)
+        return codigo * 2 + (1 if impala_puede_ver else 0)
+    
+    def codificar(self, estado: Estado) -> int:
+        """
+        Codifica un Estado como entero.
+        
+        Args:
+            estado: Estado a codificar
+        
+        Returns:
+            Código entero del estado (0 <= código < num_estados)
+        """
+        try:
+            accion_impala = self._indice_accion_impala[estado.accion_impala]
+        except KeyError:
+            raise ValueError(f"Acción del impala desconocida: {estado.accion_impala}")
+        
+        # Mismo cálculo que codificar_componentes, sin la llamada extra (camino caliente)
+        posicion_leon = estado.posicion_leon
+        bin_distancia = int(round(estado.distancia_impala * 2))
+        if not (0 <= bin_distancia < self.num_distancias and 1 <= posicion_leon <= 8):
+            return self.codificar_componentes(
+                posicion_leon,
+                estado.distancia_impala,
+                accion_impala,
+                estado.leon_escondido,
+                estado.impala_puede_ver
+            )
+        
+        codigo = ((posicion_leon - 1) * self.num_distancias + bin_distancia) * self.num_acciones_impala + accion_impala
+        return (codigo * 2 + (1 if estado.leon_escondido else 0)) * 2 + (1 if estado.impala_puede_ver else 0)
+    
+    def decodificar(self, codigo: int) -> Estado:
+        """
+        Reconstruye el Estado correspondiente a un código.
+        
+        Args:
+            codigo: Código entero del estado
+        
+        Returns:
+            Estado decodificado
+        """
+        if not 0 <= codigo < self.num_estados:
+            raise ValueError(f"Código de estado fuera de rango: {codigo}")
+        
+        codigo, puede_ver = divmod(codigo, 2)
+        codigo, escondido = divmod(codigo, 2)
+        codigo, accion_impala = divmod(codigo, self.num_acciones_impala)
+        posicion, bin_distancia = divmod(codigo, self.num_distancias)
+        
+        return Estado(
+            posicion_leon=posicion + 1,
+            distancia_impala=bin_distancia / 2,
+            accion_impala=ACCIONES_IMPALA[accion_impala],
+            leon_escondido=bool(escondido),
+            impala_puede_ver=bool(puede_ver)
+        )
+    
+    def codificar_accion(self, accion: str) -> int:
+        """
+        Codifica una acción del león como entero.
+        
+        Args:
+            accion: Nombre de la acción ("avanzar", "esconderse", "atacar")
+        
+        Returns:
+            Código de la acción (0-2)
+        """
+        try:
+            return self._indice_accion_leon[accion]
+        except KeyError:
+            raise ValueError(f"Acción del león desconocida: {accion}")
+    
+    def decodificar_accion(self, codigo: int) -> str:
+        """
+        Obtiene el nombre de la acción del león correspondiente a un código.
+        
+        Args:
+            codigo: Código de la acción (0-2)
+        
+        Returns:
+            Nombre de la acción
+        """
+        return ACCIONES_LEON[codigo]
+    
+    def codificar_par(self, estado: Estado, accion: str) -> int:
+        """
+        Codifica un par (estado, acción) como índice plano en una tabla [estados, acciones].
+        
+        Args:
+            estado: Estado del mundo
+            accion: Acción del león
+        
+        Returns:
+            Índice plano del par
+        """
+        return self.codificar(estado) * self.num_acciones + self.codificar_accion(accion)
+    
+    def decodificar_par(self, indice: int) -> Tuple[Estado, str]:
+        """
+        Reconstruye el par (estado, acción) de un índice plano.
+        
+        Args:
+            indice: Índice plano del par
+        
+        Returns:
+            Tupla (estado, accion)
+        """
+        codigo, accion = divmod(indice, self.num_acciones)
+        return self.decodificar(codigo), ACCIONES_LEON[accion]
+    
+    def es_compatible(self, otro: 'CodificadorEstados') -> bool:
+        """
+        Verifica si dos codificadores producen los mismos códigos.
+        
+        Args:
+            otro: Otro codificador
+        
+        Returns:
+            True si tienen las mismas dimensiones
+        """
+        return self.num_distancias == otro.num_distancias
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        return f"CodificadorEstados(Estados={self.num_estados}, Acciones={self.num_acciones})"
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    print("=== Pruebas del Codificador de Estados ===\n")
+    
+    codificador = CodificadorEstados()
+    print(f"{codificador}\n")
+    
+    estado = Estado(3, 7.5, "beber_agua", True, False)
+    codigo = codificador.codificar(estado)
+    print(f"{estado} -> {codigo}")
+    print(f"{codigo} -> {codificador.decodificar(codigo)}")
+    print(f"\n¿Ida y vuelta correcta? {codificador.decodificar(codigo) == estado}")
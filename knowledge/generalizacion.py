@@ -3,8 +3,169 @@ Módulo de generalización de conocimiento.
 Abstrae patrones para hacer más eficiente el aprendizaje.
 """
 
-from typing import List, Set, Dict
+from typing import Dict, Iterable, List, Set, Tuple
+import functools
+import weakref
+
 from knowledge.base_conocimientos import Estado, BaseConocimientos
+from knowledge.motor_reglas import MotorReglas
+
+
+# (zona, categoría de distancia, acción general del impala)
+Firma = Tuple[str, str, str]
+
+
+class IndiceSimilitud:
+    """
+    Índice invertido de estados conocidos por firma generalizada.
+    
+    Dos estados son similares si coinciden en al menos 2 de los 3 campos
+    de la firma (zona, distancia_categoria, impala_accion_general), es
+    decir, si comparten alguno de los pares (zona, distancia),
+    (zona, acción) o (distancia, acción). Por eso el índice guarda un
+    bucket por cada par y la consulta es la unión de 3 buckets, en vez de
+    comparar contra todos los estados conocidos. La base de conocimientos
+    lo mantiene al día (ver BaseConocimientos.registrar_indice).
+    """
+    
+    def __init__(self, generalizador: 'Generalizador'):
+        """
+        Inicializa el índice vacío.
+        
+        Args:
+            generalizador: Generalizador que define la firma de cada estado
+        """
+        self._calcular_firma = generalizador.firma
+        self._firmas: Dict[Estado, Firma] = {}
+        self._buckets: Tuple[Dict[tuple, Set[Estado]], ...] = ({}, {}, {})
+    
+    @staticmethod
+    def _claves(firma: Firma) -> Tuple[tuple, tuple, tuple]:
+        """Claves de los 3 buckets: pares de campos de la firma"""
+        zona, distancia, accion = firma
+        return (zona, distancia), (zona, accion), (distancia, accion)
+    
+    def agregar(self, estado: Estado):
+        """
+        Agrega un estado conocido (no hace nada si ya estaba).
+        
+        Args:
+            estado: Estado a indexar
+        """
+        if estado in self._firmas:
+            return
+        firma = self._calcular_firma(estado)
+        self._firmas[estado] = firma
+        for bucket, clave in zip(self._buckets, self._claves(firma)):
+            bucket.setdefault(clave, set()).add(estado)
+    
+    def quitar(self, estado: Estado):
+        """
+        Quita un estado que dejó de ser conocido.
+        
+        Args:
+            estado: Estado a quitar
+        """
+        firma = self._firmas.pop(estado, None)
+        if firma is None:
+            return
+        for bucket, clave in zip(self._buckets, self._claves(firma)):
+            miembros = bucket[clave]
+            miembros.discard(estado)
+            if not miembros:
+                del bucket[clave]
+    
+    def limpiar(self):
+        """Vacía el índice"""
+        self._firmas.clear()
+        for bucket in self._buckets:
+            bucket.clear()
+    
+    def reconstruir(self, estados: Iterable[Estado]):
+        """
+        Reemplaza el contenido del índice.
+        
+        Args:
+            estados: Estados conocidos
+        """
+        self.limpiar()
+        for estado in estados:
+            self.agregar(estado)
+    
+    def similares_por_firma(self, firma: Firma) -> Set[Estado]:
+        """
+        Obtiene los estados que coinciden en al menos 2 campos con una firma.
+        
+        Args:
+            firma: Firma generalizada
+        
+        Returns:
+            Conjunto de estados similares
+        """
+        similares: Set[Estado] = set()
+        for bucket, clave in zip(self._buckets, self._claves(firma)):
+            miembros = bucket.get(clave)
+            if miembros:
+                similares |= miembros
+        return similares
+    
+    def similares(self, estado: Estado) -> Set[Estado]:
+        """
+        Obtiene los estados conocidos similares a un estado.
+        
+        Args:
+            estado: Estado de referencia (no necesita ser conocido)
+        
+        Returns:
+            Conjunto de estados similares
+        """
+        firma = self._firmas.get(estado) or self._calcular_firma(estado)
+        return self.similares_por_firma(firma)
+    
+    def __len__(self) -> int:
+        """Retorna el número de estados indexados"""
+        return len(self._firmas)
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        return f"IndiceSimilitud(Estados={len(self)}, Buckets={sum(len(b) for b in self._buckets)})"
+
+
+def _incrementa_version(metodo):
+    """Envuelve un método de list para que incremente la versión de la lista"""
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        self.version += 1
+        return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+class _ListaReglas(list):
+    """
+    Lista de reglas que cuenta sus modificaciones.
+    
+    Cualquier cambio (agregar, quitar, reemplazar o reordenar) incrementa
+    version, con lo que el Generalizador sabe cuándo recompilar su
+    MotorReglas. Las reglas en sí se tratan como inmutables: para cambiar
+    una, reemplácela en la lista.
+    """
+    
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.version = 0
+    
+    append = _incrementa_version(list.append)
+    extend = _incrementa_version(list.extend)
+    insert = _incrementa_version(list.insert)
+    remove = _incrementa_version(list.remove)
+    pop = _incrementa_version(list.pop)
+    clear = _incrementa_version(list.clear)
+    sort = _incrementa_version(list.sort)
+    reverse = _incrementa_version(list.reverse)
+    __setitem__ = _incrementa_version(list.__setitem__)
+    __delitem__ = _incrementa_version(list.__delitem__)
+    __iadd__ = _incrementa_version(list.__iadd__)
+    __imul__ = _incrementa_version(list.__imul__)
 
 
 class Generalizador:
@@ -16,7 +177,27 @@ class Generalizador:
     def __init__(self):
         """Inicializa el generalizador"""
         # Reglas de generalización aprendidas
-        self.reglas_generalizacion: List[Dict] = []
+        self._reglas = _ListaReglas()
+        
+        # Reglas compiladas para consultar sin recorrer la lista, y versión
+        # de la lista que contienen
+        self.motor_reglas = MotorReglas()
+        self._version_compilada = 0
+        
+        # Índice de similitud de cada base de conocimientos consultada
+        self._indices: 'weakref.WeakKeyDictionary[BaseConocimientos, IndiceSimilitud]' = \
+            weakref.WeakKeyDictionary()
+    
+    @property
+    def reglas_generalizacion(self) -> List[Dict]:
+        """Reglas de generalización (cualquier cambio en la lista recompila el motor)"""
+        return self._reglas
+    
+    @reglas_generalizacion.setter
+    def reglas_generalizacion(self, reglas: List[Dict]):
+        """Reemplaza todas las reglas"""
+        self._reglas = _ListaReglas(reglas)
+        self._version_compilada = -1
     
     def generalizar_accion_impala(self, accion: str) -> str:
         """
@@ -101,11 +282,50 @@ class Generalizador:
         
         return zonas.get(posicion, 'desconocida')
     
+    def firma(self, estado: Estado) -> Firma:
+        """
+        Obtiene los campos generalizados que definen la similitud.
+        
+        Args:
+            estado: Estado específico
+        
+        Returns:
+            Tupla (zona, distancia_categoria, impala_accion_general)
+        """
+        return (
+            self._generalizar_posicion(estado.posicion_leon),
+            self.generalizar_distancia(estado.distancia_impala),
+            self.generalizar_accion_impala(estado.accion_impala)
+        )
+    
+    def indice_para(self, base_conocimientos: BaseConocimientos) -> IndiceSimilitud:
+        """
+        Obtiene el índice de similitud de una base (lo crea la primera vez).
+        
+        El índice se construye una vez con los estados conocidos y después
+        la base lo actualiza con cada estado nuevo.
+        
+        Args:
+            base_conocimientos: Base de conocimientos
+        
+        Returns:
+            Índice de similitud de la base
+        """
+        indice = self._indices.get(base_conocimientos)
+        if indice is None:
+            indice = IndiceSimilitud(self)
+            base_conocimientos.registrar_indice(indice)
+            self._indices[base_conocimientos] = indice
+        return indice
+    
     def encontrar_estados_similares(self, estado: Estado, 
                                    base_conocimientos: BaseConocimientos) -> List[Estado]:
         """
         Encuentra estados similares en la base de conocimientos.
         
+        Usa el índice de similitud de la base: el costo es el de unir
+        3 buckets, no el de recorrer todos los estados conocidos.
+        
         Args:
             estado: Estado de referencia
             base_conocimientos: Base de conocimientos donde buscar
@@ -113,17 +333,7 @@ class Generalizador:
         Returns:
             Lista de estados similares
         """
-        estado_gen = self.crear_estado_generalizado(estado)
-        estados_similares = []
-        
-        for estado_conocido in base_conocimientos.obtener_estados_conocidos():
-            estado_conocido_gen = self.crear_estado_generalizado(estado_conocido)
-            
-            # Comparar versiones generalizadas
-            if self._son_similares(estado_gen, estado_conocido_gen):
-                estados_similares.append(estado_conocido)
-        
-        return estados_similares
+        return list(self.indice_para(base_conocimientos).similares(estado))
     
     def _son_similares(self, estado_gen1: dict, estado_gen2: dict) -> bool:
         """
@@ -158,16 +368,62 @@ class Generalizador:
             base_conocimientos: Base de conocimientos a actualizar
             factor_propagacion: Factor de reducción al propagar (0-1)
         """
-        estados_similares = self.encontrar_estados_similares(estado_origen, base_conocimientos)
+        self.propagar_lote([(estado_origen, accion, valor_q)], base_conocimientos,
+                           factor_propagacion)
+        
+    def propagar_lote(self, actualizaciones: Iterable[Tuple[Estado, str, float]],
+                      base_conocimientos: BaseConocimientos,
+                      factor_propagacion: float = 0.5) -> int:
+        """
+        Propaga de una vez el conocimiento de muchos pares actualizados.
         
-        for estado_similar in estados_similares:
+        Los estados similares se calculan una sola vez por firma
+        generalizada, y cada par destino recibe el mejor valor propagado
+        (valor_q × factor) entre todos los orígenes que lo alcanzan, con la
+        misma regla que propagar_conocimiento: se escribe si el destino
+        vale 0.0 o si el valor propagado es mayor. Todos los valores se
+        calculan con la base antes de la pasada.
+        
+        Args:
+            actualizaciones: Tuplas (estado, accion, valor_q) de los orígenes
+            base_conocimientos: Base de conocimientos a actualizar
+            factor_propagacion: Factor de reducción al propagar (0-1)
+        
+        Returns:
+            Número de pares (estado, acción) escritos
+        """
+        indice = self.indice_para(base_conocimientos)
+        
+        # Mejor valor propagado por (firma, acción)
+        mejores: Dict[Tuple[Firma, str], float] = {}
+        for estado, accion, valor_q in actualizaciones:
+            clave = (self.firma(estado), accion)
+            nuevo_valor = valor_q * factor_propagacion
+            if clave not in mejores or nuevo_valor > mejores[clave]:
+                mejores[clave] = nuevo_valor
+        
+        # Mejor valor por par destino (un destino puede ser similar a varias firmas)
+        destinos: Dict[Tuple[Estado, str], float] = {}
+        similares_por_firma: Dict[Firma, Set[Estado]] = {}
+        for (firma, accion), nuevo_valor in mejores.items():
+            similares = similares_por_firma.get(firma)
+            if similares is None:
+                similares = similares_por_firma[firma] = indice.similares_por_firma(firma)
+            for estado_similar in similares:
+                par = (estado_similar, accion)
+                if par not in destinos or nuevo_valor > destinos[par]:
+                    destinos[par] = nuevo_valor
+        
+        escritos = 0
+        for (estado_similar, accion), nuevo_valor in destinos.items():
             # Solo propagar si el estado similar no tiene conocimiento previo
             # o si el nuevo conocimiento es mejor
             valor_actual = base_conocimientos.obtener_valor_q(estado_similar, accion)
-            nuevo_valor = valor_q * factor_propagacion
-            
             if valor_actual == 0.0 or nuevo_valor > valor_actual:
                 base_conocimientos.actualizar_valor_q(estado_similar, accion, nuevo_valor)
+                escritos += 1
+        
+        return escritos
     
     def extraer_patron(self, estados: List[Estado]) -> dict:
         """
@@ -211,7 +467,19 @@ class Generalizador:
             'efectividad': efectividad
         }
         
-        self.reglas_generalizacion.append(regla)
+        al_dia = self._version_compilada == self._reglas.version
+        self._reglas.append(regla)
+        if al_dia:
+            # Compilar solo la regla nueva
+            self.motor_reglas.agregar(patron, accion_recomendada, efectividad)
+            self._version_compilada = self._reglas.version
+    
+    def _sincronizar_motor(self):
+        """Recompila todas las reglas si la lista cambió fuera de crear_regla_generalizacion"""
+        self.motor_reglas.limpiar()
+        for regla in self._reglas:
+            self.motor_reglas.agregar(regla['patron'], regla['accion'], regla['efectividad'])
+        self._version_compilada = self._reglas.version
     
     def obtener_recomendacion_por_regla(self, estado: Estado) -> List[tuple]:
         """
@@ -223,22 +491,12 @@ class Generalizador:
         Returns:
             Lista de tuplas (accion, efectividad) ordenadas por efectividad
         """
-        estado_gen = self.crear_estado_generalizado(estado)
-        recomendaciones = []
+        if self._version_compilada != self._reglas.version:
+            self._sincronizar_motor()
         
-        for regla in self.reglas_generalizacion:
-            # Verificar si el estado coincide con el patrón
-            coincide = all(
-                estado_gen.get(key) == valor
-                for key, valor in regla['patron'].items()
-            )
-            
-            if coincide:
-                recomendaciones.append((regla['accion'], regla['efectividad']))
-        
-        # Ordenar por efectividad
-        recomendaciones.sort(key=lambda x: x[1], reverse=True)
-        return recomendaciones
+        # Clave en el orden de motor_reglas.CAMPOS (el de crear_estado_generalizado)
+        clave = self.firma(estado) + (estado.leon_escondido, estado.impala_puede_ver)
+        return self.motor_reglas.coincidencias(clave)
     
     def generar_reporte(self) -> str:
         """
@@ -301,6 +559,13 @@ if __name__ == "__main__":
     print(f"\nEstados similares a estado1:")
     similares = generalizador.encontrar_estados_similares(estado1, bc)
     print(f"  Encontrados: {len(similares)}")
+    print(f"  {generalizador.indice_para(bc)}")
+    
+    # Propagación por lotes
+    escritos = generalizador.propagar_lote(
+        [(estado1, "avanzar", 10.0), (estado3, "esconderse", 4.0)], bc
+    )
+    print(f"\nPropagación por lotes: {escritos} pares escritos")
     
     # Crear regla
     patron = generalizador.extraer_patron([estado1, estado2])
@@ -0,0 +1,284 @@
+"""
+Módulo de memoria de experiencias.
+Buffer circular de capacidad fija que guarda experiencias en arreglos tipados.
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from knowledge.base_conocimientos import Estado, Experiencia
+from knowledge.codificacion import CodificadorEstados
+
+
+class MemoriaExperiencias:
+    """
+    Buffer circular de experiencias con almacenamiento columnar.
+    
+    Cada experiencia ocupa una fila en arreglos paralelos (código del estado,
+    código de la acción, recompensa, código del siguiente estado y banderas
+    terminal/éxito), unos 18 bytes en total. Al llenarse, las experiencias
+    nuevas reemplazan a las más antiguas, así que la memoria no crece con la
+    duración del entrenamiento.
+    
+    Se comporta como una lista de solo lectura (len, iteración, índices y
+    slices); los objetos Experiencia se construyen solo al leerlos.
+    
+    Una experiencia que el codificador no representa exactamente (distancia
+    fuera de la grilla de 0.5 o del RADIO, acción desconocida) ocupa su
+    fila igual, pero se guarda tal cual en un diccionario aparte: se lee
+    sin cambios y se descarta cuando su fila se sobrescribe.
+    """
+    
+    # Código del siguiente estado cuando la cacería terminó
+    SIN_ESTADO = -1
+    
+    def __init__(self, capacidad: int = 10000,
+                 codificador: Optional[CodificadorEstados] = None):
+        """
+        Inicializa la memoria vacía.
+        
+        Args:
+            capacidad: Número máximo de experiencias guardadas
+            codificador: Codificador de estados (default: según Abrevadero.RADIO)
+        """
+        if capacidad <= 0:
+            raise ValueError(f"La capacidad debe ser positiva, recibido: {capacidad}")
+        
+        self.capacidad = capacidad
+        self.codificador = codificador or CodificadorEstados()
+        
+        self.estados = array('i', [0]) * capacidad
+        self.acciones = array('b', [0]) * capacidad
+        self.recompensas = array('d', [0.0]) * capacidad
+        self.siguientes_estados = array('i', [0]) * capacidad
+        self.terminales = bytearray(capacidad)
+        self.exitos = bytearray(capacidad)
+        
+        self._inicio = 0
+        self._tamano = 0
+        self.total_agregadas = 0
+        
+        # Experiencias no codificables por índice físico (normalmente vacío)
+        self._sin_codificar: Dict[int, Experiencia] = {}
+    
+    def agregar_codificada(self, codigo_estado: int, codigo_accion: int,
+                           recompensa: float, codigo_siguiente: int, exito: bool):
+        """
+        Agrega una experiencia ya codificada.
+        
+        Args:
+            codigo_estado: Código del estado
+            codigo_accion: Código de la acción del león
+            recompensa: Recompensa obtenida
+            codigo_siguiente: Código del siguiente estado (SIN_ESTADO si terminó)
+            exito: Si la cacería fue exitosa
+        """
+        if self._tamano < self.capacidad:
+            indice = (self._inicio + self._tamano) % self.capacidad
+            self._tamano += 1
+        else:
+            # Buffer lleno: se sobrescribe la experiencia más antigua
+            indice = self._inicio
+            self._inicio = (self._inicio + 1) % self.capacidad
+        
+        self.estados[indice] = codigo_estado
+        self.acciones[indice] = codigo_accion
+        self.recompensas[indice] = recompensa
+        self.siguientes_estados[indice] = codigo_siguiente
+        self.terminales[indice] = codigo_siguiente == self.SIN_ESTADO
+        self.exitos[indice] = bool(exito)
+        self.total_agregadas += 1
+        if self._sin_codificar:
+            self._sin_codificar.pop(indice, None)
+    
+    def append(self, experiencia: Experiencia):
+        """
+        Agrega una experiencia (la más antigua se descarta si está llena).
+        
+        Args:
+            experiencia: Experiencia a agregar
+        """
+        siguiente = experiencia.siguiente_estado
+        codigo_estado = self._codigo_exacto(experiencia.estado)
+        codigo_siguiente = self.SIN_ESTADO if siguiente is None else self._codigo_exacto(siguiente)
+        try:
+            codigo_accion = self.codificador.codificar_accion(experiencia.accion)
+        except ValueError:
+            codigo_accion = None
+        
+        if codigo_estado is None or codigo_siguiente is None or codigo_accion is None:
+            # Fila de relleno; la experiencia se guarda sin codificar
+            self.agregar_codificada(0, 0, experiencia.recompensa, self.SIN_ESTADO, experiencia.exito)
+            self._sin_codificar[self.indice_fisico(-1)] = experiencia
+            return
+        
+        self.agregar_codificada(codigo_estado, codigo_accion, experiencia.recompensa,
+                                codigo_siguiente, experiencia.exito)
+    
+    def _codigo_exacto(self, estado: Estado) -> Optional[int]:
+        """Código del estado, o None si el codificador no lo representa sin cambiarlo"""
+        try:
+            if estado.distancia_impala * 2 % 1 or not isinstance(estado.posicion_leon, int):
+                return None
+            return self.codificador.codificar(estado)
+        except (ValueError, TypeError):
+            return None
+    
+    def codificada(self, indice: int) -> bool:
+        """
+        Indica si la fila de un índice físico tiene códigos válidos.
+        
+        Args:
+            indice: Índice en los arreglos columnares
+        
+        Returns:
+            False si la experiencia se guardó sin codificar
+        """
+        return indice not in self._sin_codificar
+    
+    def extend(self, experiencias: Iterable[Experiencia]):
+        """
+        Agrega varias experiencias en orden.
+        
+        Args:
+            experiencias: Experiencias a agregar
+        """
+        for experiencia in experiencias:
+            self.append(experiencia)
+    
+    def clear(self):
+        """Descarta todas las experiencias guardadas"""
+        self._inicio = 0
+        self._tamano = 0
+        self.total_agregadas = 0
+        self._sin_codificar.clear()
+    
+    def copiar(self) -> 'MemoriaExperiencias':
+        """
+        Crea una copia independiente (copia directa de los arreglos).
+        
+        Returns:
+            Nueva memoria con las mismas experiencias y el mismo orden
+        """
+        copia = MemoriaExperiencias(self.capacidad, self.codificador)
+        copia.estados[:] = self.estados
+        copia.acciones[:] = self.acciones
+        copia.recompensas[:] = self.recompensas
+        copia.siguientes_estados[:] = self.siguientes_estados
+        copia.terminales[:] = self.terminales
+        copia.exitos[:] = self.exitos
+        copia._inicio = self._inicio
+        copia._tamano = self._tamano
+        copia.total_agregadas = self.total_agregadas
+        copia._sin_codificar = dict(self._sin_codificar)
+        return copia
+    
+    def indice_fisico(self, posicion: int) -> int:
+        """
+        Convierte una posición lógica (0 = más antigua) en índice de los arreglos.
+        
+        Args:
+            posicion: Posición lógica (admite negativos como en las listas)
+        
+        Returns:
+            Índice en los arreglos columnares
+        """
+        if posicion < 0:
+            posicion += self._tamano
+        if not 0 <= posicion < self._tamano:
+            raise IndexError("Índice de experiencia fuera de rango")
+        return (self._inicio + posicion) % self.capacidad
+    
+    def materializar(self, indice: int) -> Experiencia:
+        """
+        Construye la Experiencia guardada en un índice físico.
+        
+        Args:
+            indice: Índice en los arreglos columnares
+        
+        Returns:
+            Experiencia reconstruida
+        """
+        if self._sin_codificar:
+            experiencia = self._sin_codificar.get(indice)
+            if experiencia is not None:
+                return experiencia
+        
+        codificador = self.codificador
+        siguiente: Optional[Estado] = None
+        if not self.terminales[indice]:
+            siguiente = codificador.decodificar(self.siguientes_estados[indice])
+        
+        return Experiencia(
+            estado=codificador.decodificar(self.estados[indice]),
+            accion=codificador.decodificar_accion(self.acciones[indice]),
+            recompensa=self.recompensas[indice],
+            siguiente_estado=siguiente,
+            exito=bool(self.exitos[indice])
+        )
+    
+    def ultimas(self, n: int) -> Iterator[Experiencia]:
+        """
+        Itera las últimas n experiencias (de la más antigua a la más reciente).
+        
+        Args:
+            n: Número de experiencias
+        
+        Returns:
+            Iterador de Experiencia
+        """
+        inicio = max(0, self._tamano - n)
+        for posicion in range(inicio, self._tamano):
+            yield self.materializar((self._inicio + posicion) % self.capacidad)
+    
+    def __iter__(self) -> Iterator[Experiencia]:
+        """Itera las experiencias de la más antigua a la más reciente"""
+        return self.ultimas(self._tamano)
+    
+    def __getitem__(self, clave: Union[int, slice]) -> Union[Experiencia, List[Experiencia]]:
+        """Obtiene una experiencia por posición o una lista por slice"""
+        if isinstance(clave, slice):
+            return [
+                self.materializar((self._inicio + posicion) % self.capacidad)
+                for posicion in range(self._tamano)[clave]
+            ]
+        return self.materializar(self.indice_fisico(clave))
+    
+    def __len__(self) -> int:
+        """Retorna el número de experiencias guardadas"""
+        return self._tamano
+    
+    def memoria_bytes(self) -> int:
+        """
+        Calcula la memoria ocupada por los arreglos.
+        
+        Returns:
+            Bytes ocupados (constante para una capacidad dada)
+        """
+        return (self.estados.itemsize + self.acciones.itemsize +
+                self.recompensas.itemsize + self.siguientes_estados.itemsize + 2) * self.capacidad
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        return f"MemoriaExperiencias(Guardadas={self._tamano}/{self.capacidad}, Total={self.total_agregadas})"
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    print("=== Pruebas de Memoria de Experiencias ===\n")
+    
+    memoria = MemoriaExperiencias(capacidad=3)
+    
+    estado1 = Estado(1, 5.0, "ver_frente", False, True)
+    estado2 = Estado(1, 4.0, "beber_agua", True, False)
+    
+    for i in range(5):
+        memoria.append(Experiencia(estado1, "avanzar", float(i), estado2, False))
+    memoria.append(Experiencia(estado2, "atacar", 100.0, None, True))
+    
+    print(f"{memoria}")
+    print(f"Memoria: {memoria.memoria_bytes()} bytes\n")
+    
+    for experiencia in memoria:
+        print(f"  {experiencia.estado} -> {experiencia.accion} "
+              f"(r={experiencia.recompensa}, fin={experiencia.siguiente_estado is None})")
@@ -0,0 +1,348 @@
+"""
+Módulo de minería de reglas.
+Extrae de una tabla Q entrenada un conjunto pequeño de reglas de generalización
+que reproduce la política greedy.
+"""
+
+from itertools import combinations
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+import heapq
+import time
+
+from knowledge.base_conocimientos import BaseConocimientos, Estado
+from knowledge.codificacion import ACCIONES_LEON
+from knowledge.generalizacion import Generalizador
+from knowledge.motor_reglas import CAMPOS
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+def _orden_estado(estado: Estado) -> tuple:
+    """Clave de orden determinista de un estado (los sets no tienen orden fijo)"""
+    return (estado.posicion_leon, estado.distancia_impala, estado.accion_impala,
+            estado.leon_escondido, estado.impala_puede_ver)
+
+
+def _mascaras() -> List[Tuple[int, ...]]:
+    """Todos los subconjuntos de campos, de los más generales a los más específicos"""
+    return [mascara for tamano in range(len(CAMPOS) + 1)
+            for mascara in combinations(range(len(CAMPOS)), tamano)]
+
+
+class _Tabla:
+    """
+    Tabla Q alineada por estado: códigos de los campos generalizados,
+    acción greedy y ventaja de cada acción sobre la mejor alternativa.
+    """
+    
+    def __init__(self, base: BaseConocimientos, generalizador: Generalizador):
+        self.estados = sorted(base.obtener_estados_conocidos(), key=_orden_estado)
+        self.valores_campo: List[List] = [[] for _ in CAMPOS]
+        indices_campo: List[Dict] = [{} for _ in CAMPOS]
+        
+        self.codigos: List[Tuple[int, ...]] = []
+        self.etiquetas: List[int] = []
+        self.ventajas: List[Tuple[float, ...]] = []
+        
+        filas = base.obtener_valores_q_lote(self.estados, usar_numpy=False)
+        for estado, fila in zip(self.estados, filas):
+            clave = generalizador.firma(estado) + (estado.leon_escondido, estado.impala_puede_ver)
+            codigo = []
+            for valor, valores, indices in zip(clave, self.valores_campo, indices_campo):
+                if valor not in indices:
+                    indices[valor] = len(valores)
+                    valores.append(valor)
+                codigo.append(indices[valor])
+            self.codigos.append(tuple(codigo))
+            
+            # Misma elección que obtener_mejor_accion: la primera con el valor máximo
+            self.etiquetas.append(max(range(len(fila)), key=lambda a: (fila[a], -a)))
+            self.ventajas.append(tuple(
+                fila[a] - max(fila[b] for b in range(len(fila)) if b != a)
+                for a in range(len(fila))
+            ))
+    
+    def __len__(self) -> int:
+        return len(self.estados)
+
+
+def _agrupar_python(tabla: _Tabla, mascara: Tuple[int, ...]) -> List[tuple]:
+    """Grupos de una máscara: (códigos fijados, miembros, cuentas, sumas de ventaja)"""
+    if not mascara:
+        obtener = lambda codigo: ()
+    elif len(mascara) == 1:
+        indice = mascara[0]
+        obtener = lambda codigo: (codigo[indice],)
+    else:
+        obtener = itemgetter(*mascara)
+    
+    num_acciones = len(ACCIONES_LEON)
+    grupos: Dict[tuple, list] = {}
+    for s, codigo in enumerate(tabla.codigos):
+        clave = obtener(codigo)
+        grupo = grupos.get(clave)
+        if grupo is None:
+            grupo = grupos[clave] = [[], [0] * num_acciones, [0.0] * num_acciones]
+        grupo[0].append(s)
+        grupo[1][tabla.etiquetas[s]] += 1
+        ventajas = tabla.ventajas[s]
+        for a in range(num_acciones):
+            grupo[2][a] += ventajas[a]
+    
+    return [(clave, miembros, cuentas, sumas)
+            for clave, (miembros, cuentas, sumas) in grupos.items()]
+
+
+def _agrupar_numpy(tabla: _Tabla, mascara: Tuple[int, ...], matrices: dict) -> List[tuple]:
+    """Igual que _agrupar_python, con bincount sobre un identificador de grupo"""
+    codigos, etiquetas, ventajas = matrices['codigos'], matrices['etiquetas'], matrices['ventajas']
+    num_acciones = len(ACCIONES_LEON)
+    
+    identificador = np.zeros(len(tabla), dtype=np.int64)
+    for i in mascara:
+        identificador = identificador * len(tabla.valores_campo[i]) + codigos[:, i]
+    _, grupo = np.unique(identificador, return_inverse=True)
+    grupo = grupo.ravel()
+    num_grupos = int(grupo.max()) + 1
+    
+    cuentas = np.bincount(grupo * num_acciones + etiquetas,
+                          minlength=num_grupos * num_acciones).reshape(num_grupos, num_acciones)
+    sumas = np.stack([np.bincount(grupo, weights=ventajas[:, a], minlength=num_grupos)
+                      for a in range(num_acciones)], axis=1)
+    orden = np.argsort(grupo, kind='stable')
+    limites = np.concatenate(([0], np.cumsum(np.bincount(grupo, minlength=num_grupos))))
+    
+    grupos = []
+    for g in range(num_grupos):
+        miembros = orden[limites[g]:limites[g + 1]].tolist()
+        clave = tuple(int(codigos[miembros[0], i]) for i in mascara)
+        grupos.append((clave, miembros, cuentas[g].tolist(), sumas[g].tolist()))
+    return grupos
+
+
+def minar_reglas(base_conocimientos: BaseConocimientos,
+                 generalizador: Optional[Generalizador] = None,
+                 precision_objetivo: float = 0.5,
+                 soporte_minimo: int = 2,
+                 efectividad_minima: float = 0.5,
+                 max_reglas: Optional[int] = None,
+                 agregar: bool = True,
+                 usar_numpy: Optional[bool] = None) -> Tuple[List[Dict], Dict]:
+    """
+    Extrae reglas de generalización que reproducen la política greedy.
+    
+    La tabla Q se recorre una vez para alinear por estado los campos
+    generalizados y la acción greedy; después se agrupa por cada
+    subconjunto de campos (2^5 máscaras, los campos ausentes son
+    comodines) y cada grupo propone una regla con su acción dominante:
+    efectividad = fracción de estados del grupo cuya acción greedy es la
+    dominante, margen = ventaja media en Q de esa acción sobre la mejor
+    alternativa.
+    
+    Las reglas se eligen con un algoritmo voraz: en cada paso la que más
+    aciertos netos agrega, contando que ante varias reglas aplicables
+    gana la de mayor efectividad (como obtener_recomendacion_por_regla), y
+    a igual ganancia la más general. Se detiene al alcanzar la precisión
+    objetivo, cuando ninguna regla mejora o al llegar a max_reglas. Los
+    campos generalizados no distinguen todos los estados, así que la
+    precisión alcanzable tiene un tope (precision_maxima del reporte: la
+    acción dominante de cada estado generalizado completo); un objetivo
+    mayor se recorta a ese tope. Si aun así no se alcanza (la regla más
+    efectiva no siempre es la que acierta) se avisa y el reporte lo
+    indica en objetivo_alcanzado.
+    
+    Args:
+        base_conocimientos: Base con la tabla Q entrenada
+        generalizador: Generalizador que recibe las reglas (default: uno nuevo)
+        precision_objetivo: Fracción de estados conocidos en que la regla
+                            ganadora debe coincidir con la acción greedy
+                            (se recorta a precision_maxima)
+        soporte_minimo: Estados mínimos de un grupo para proponer una regla
+        efectividad_minima: Efectividad mínima de una regla candidata
+        max_reglas: Máximo de reglas a emitir (None = sin límite)
+        agregar: Si True, agrega las reglas con crear_regla_generalizacion
+        usar_numpy: Forzar (True) o evitar (False) NumPy; None = automático
+    
+    Returns:
+        Tupla (reglas, reporte). Cada regla tiene patron, accion,
+        efectividad, soporte y margen; el reporte tiene estados, reglas,
+        candidatas, precision, precision_maxima, precision_objetivo
+        (ya recortada), objetivo_alcanzado, usar_numpy y duracion_segundos
+    """
+    if not 0 < precision_objetivo <= 1:
+        raise ValueError(f"La precisión objetivo debe estar en (0, 1], recibido: {precision_objetivo}")
+    if usar_numpy and np is None:
+        raise ValueError("NumPy no está instalado")
+    usar_numpy = (np is not None) if usar_numpy is None else usar_numpy
+    
+    inicio = time.time()
+    generalizador = generalizador if generalizador is not None else Generalizador()
+    tabla = _Tabla(base_conocimientos, generalizador)
+    n = len(tabla)
+    
+    matrices = None
+    if usar_numpy and n:
+        matrices = {
+            'codigos': np.array(tabla.codigos, dtype=np.int64),
+            'etiquetas': np.array(tabla.etiquetas, dtype=np.int64),
+            'ventajas': np.array(tabla.ventajas, dtype=np.float64),
+        }
+    
+    # Candidatas: una por grupo, con su acción dominante
+    candidatas = []
+    aciertos_maximos = 0
+    for mascara in (_mascaras() if n else []):
+        if matrices is not None:
+            grupos = _agrupar_numpy(tabla, mascara, matrices)
+        else:
+            grupos = _agrupar_python(tabla, mascara)
+        for clave, miembros, cuentas, sumas in grupos:
+            soporte = len(miembros)
+            accion = max(range(len(cuentas)), key=lambda a: (cuentas[a], -a))
+            if len(mascara) == len(CAMPOS):
+                aciertos_maximos += cuentas[accion]
+            efectividad = cuentas[accion] / soporte
+            if soporte < soporte_minimo or efectividad < efectividad_minima:
+                continue
+            patron = {CAMPOS[i]: tabla.valores_campo[i][codigo] for i, codigo in zip(mascara, clave)}
+            candidatas.append({
+                'patron': patron,
+                'accion': accion,
+                'efectividad': efectividad,
+                'soporte': soporte,
+                'margen': sumas[accion] / soporte,
+                'miembros': miembros,
+            })
+    
+    # Más allá de precision_maxima ninguna combinación de reglas acierta
+    aciertos_objetivo = min(precision_objetivo * n, aciertos_maximos)
+    
+    # Efectividad de la regla que decide cada estado (-1 = ninguna) y si acierta
+    decisora = [-1.0] * n
+    acierta = [False] * n
+    etiquetas = tabla.etiquetas
+    
+    def ganancia(candidata: dict) -> int:
+        efectividad, accion = candidata['efectividad'], candidata['accion']
+        total = 0
+        for s in candidata['miembros']:
+            # A igual efectividad gana la regla creada antes
+            if efectividad > decisora[s]:
+                total += (etiquetas[s] == accion) - acierta[s]
+        return total
+    
+    # Cola con ganancias posiblemente desactualizadas (evaluación perezosa)
+    cola = [(-ganancia(c), len(c['patron']), -c['efectividad'], i) for i, c in enumerate(candidatas)]
+    heapq.heapify(cola)
+    
+    elegidas = []
+    aciertos = 0
+    while cola and aciertos < aciertos_objetivo:
+        if max_reglas is not None and len(elegidas) >= max_reglas:
+            break
+        _, generalidad, orden_efectividad, i = heapq.heappop(cola)
+        actual = ganancia(candidatas[i])
+        if actual <= 0:
+            continue
+        if cola and (-actual, generalidad, orden_efectividad, i) > cola[0]:
+            heapq.heappush(cola, (-actual, generalidad, orden_efectividad, i))
+            continue
+        
+        candidata = candidatas[i]
+        for s in candidata['miembros']:
+            if candidata['efectividad'] > decisora[s]:
+                decisora[s] = candidata['efectividad']
+                acierta[s] = etiquetas[s] == candidata['accion']
+        aciertos += actual
+        elegidas.append(candidata)
+    
+    reglas = []
+    for candidata in elegidas:
+        regla = {
+            'patron': candidata['patron'],
+            'accion': ACCIONES_LEON[candidata['accion']],
+            'efectividad': candidata['efectividad'],
+            'soporte': candidata['soporte'],
+            'margen': candidata['margen'],
+        }
+        reglas.append(regla)
+        if agregar:
+            generalizador.crear_regla_generalizacion(regla['patron'], regla['accion'],
+                                                     regla['efectividad'])
+    
+    objetivo_alcanzado = aciertos >= aciertos_objetivo
+    if not objetivo_alcanzado:
+        print(f"Advertencia: las reglas minadas aciertan {aciertos / n:.1%} de los estados, "
+              f"por debajo del objetivo {aciertos_objetivo / n:.1%}")
+    
+    reporte = {
+        'estados': n,
+        'reglas': len(reglas),
+        'candidatas': len(candidatas),
+        'precision': aciertos / n if n else 1.0,
+        'precision_maxima': aciertos_maximos / n if n else 1.0,
+        'precision_objetivo': aciertos_objetivo / n if n else 1.0,
+        'objetivo_alcanzado': objetivo_alcanzado,
+        'usar_numpy': usar_numpy,
+        'duracion_segundos': time.time() - inicio,
+    }
+    return reglas, reporte
+
+
+def precision_reglas(generalizador: Generalizador, base_conocimientos: BaseConocimientos) -> float:
+    """
+    Mide qué tan bien reproducen las reglas de un generalizador la política greedy.
+    
+    Args:
+        generalizador: Generalizador con reglas
+        base_conocimientos: Base con la tabla Q de referencia
+    
+    Returns:
+        Fracción de estados conocidos en que la primera recomendación
+        coincide con obtener_mejor_accion (sin recomendación cuenta como fallo)
+    """
+    estados = base_conocimientos.obtener_estados_conocidos()
+    if not estados:
+        return 1.0
+    
+    aciertos = 0
+    for estado in estados:
+        recomendaciones = generalizador.obtener_recomendacion_por_regla(estado)
+        greedy, _ = base_conocimientos.obtener_mejor_accion(estado, list(ACCIONES_LEON))
+        if recomendaciones and recomendaciones[0][0] == greedy:
+            aciertos += 1
+    return aciertos / len(estados)
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    from knowledge.base_densa import BaseConocimientosDensa
+    from learning.entrenamiento import Entrenador
+    
+    print("=== Pruebas de Minería de Reglas ===\n")
+    
+    entrenador = Entrenador(BaseConocimientosDensa())
+    entrenador.entrenar(5000, verbose=False)
+    print(f"{entrenador.base_conocimientos}\n")
+    
+    for objetivo in (0.25, 0.4, 0.5, 1.0):
+        generalizador = Generalizador()
+        reglas, reporte = minar_reglas(entrenador.base_conocimientos, generalizador,
+                                       precision_objetivo=objetivo, soporte_minimo=1)
+        print(f"Objetivo {objetivo:.0%}: {reporte['reglas']} reglas "
+              f"(de {reporte['candidatas']} candidatas, {reporte['estados']} estados), "
+              f"precisión {precision_reglas(generalizador, entrenador.base_conocimientos):.1%} "
+              f"(máxima {reporte['precision_maxima']:.1%}, "
+              f"objetivo {'alcanzado' if reporte['objetivo_alcanzado'] else 'no alcanzado'}), "
+              f"{reporte['duracion_segundos'] * 1000:.0f} ms, NumPy={reporte['usar_numpy']}")
+    
+    print("\nPrimeras reglas (objetivo 80%):")
+    reglas, _ = minar_reglas(entrenador.base_conocimientos, precision_objetivo=0.8, agregar=False)
+    for regla in reglas[:5]:
+        print(f"  {regla['patron']} -> {regla['accion']} "
+              f"(efectividad {regla['efectividad']:.0%}, soporte {regla['soporte']}, "
+              f"margen {regla['margen']:.2f})")
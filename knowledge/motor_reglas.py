@@ -0,0 +1,174 @@
+"""
+Módulo del motor de reglas.
+Compila las reglas de generalización en tablas hash para consultarlas sin recorrerlas.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+import bisect
+import heapq
+
+
+# Campos de un estado generalizado, en el orden de las claves de consulta
+CAMPOS = (
+    'posicion_zona',
+    'distancia_categoria',
+    'impala_accion_general',
+    'leon_escondido',
+    'impala_puede_ver'
+)
+
+# Máximo de consultas distintas memorizadas
+MAX_CACHE = 4096
+
+
+class MotorReglas:
+    """
+    Reglas de generalización compiladas en tablas hash.
+    
+    Un patrón fija algunos campos del estado generalizado; los que no
+    aparecen son comodines. Las reglas se agrupan por máscara (qué campos
+    fijan) y, dentro de cada máscara, en una tabla hash por los valores
+    fijados, con cada bucket ordenado por efectividad. Una consulta hace
+    una búsqueda por máscara distinta (como mucho 2^5) y mezcla los
+    buckets ya ordenados, así que su costo no depende del número de reglas
+    sino de las reglas que coinciden. Los resultados se memorizan por clave
+    generalizada hasta que se agrega otra regla.
+    """
+    
+    def __init__(self, campos: Iterable[str] = CAMPOS):
+        """
+        Inicializa el motor sin reglas.
+        
+        Args:
+            campos: Campos del estado generalizado, en el orden de las claves
+        """
+        self.campos = tuple(campos)
+        self._posiciones = {campo: i for i, campo in enumerate(self.campos)}
+        
+        # máscara (índices de campos fijados) -> valores fijados -> reglas ordenadas
+        self._tablas: Dict[Tuple[int, ...], Dict[tuple, List[tuple]]] = {}
+        self._cache: Dict[tuple, List[Tuple[str, float]]] = {}
+        self.num_reglas = 0
+    
+    def agregar(self, patron: dict, accion: str, efectividad: float):
+        """
+        Compila una regla (solo toca el bucket de su patrón).
+        
+        Args:
+            patron: Campos generalizados que deben coincidir
+            accion: Acción recomendada
+            efectividad: Efectividad de la regla (0-1)
+        """
+        orden = self.num_reglas
+        self.num_reglas += 1
+        self._cache.clear()
+        
+        fijados = []
+        for campo, valor in patron.items():
+            if campo in self._posiciones:
+                fijados.append(self._posiciones[campo])
+            elif valor is not None:
+                # Un campo que el estado generalizado no tiene vale None:
+                # con cualquier otro valor la regla nunca coincide
+                return
+        
+        mascara = tuple(sorted(fijados))
+        valores = tuple(patron[self.campos[i]] for i in mascara)
+        
+        # Orden: efectividad descendente y, a igual efectividad, orden de creación
+        bucket = self._tablas.setdefault(mascara, {}).setdefault(valores, [])
+        bisect.insort(bucket, (-efectividad, orden, accion, efectividad))
+    
+    def coincidencias(self, clave: tuple) -> List[Tuple[str, float]]:
+        """
+        Obtiene las reglas que coinciden con un estado generalizado.
+        
+        Args:
+            clave: Valores del estado generalizado en el orden de campos
+        
+        Returns:
+            Lista de tuplas (accion, efectividad) ordenadas por efectividad
+        """
+        resultado = self._cache.get(clave)
+        if resultado is None:
+            buckets = []
+            for mascara, tabla in self._tablas.items():
+                bucket = tabla.get(tuple([clave[i] for i in mascara]))
+                if bucket:
+                    buckets.append(bucket)
+            
+            if len(buckets) == 1:
+                resultado = [(regla[2], regla[3]) for regla in buckets[0]]
+            else:
+                resultado = [(regla[2], regla[3]) for regla in heapq.merge(*buckets)]
+            
+            if len(self._cache) >= MAX_CACHE:
+                self._cache.clear()
+            self._cache[clave] = resultado
+        
+        return list(resultado)
+    
+    def limpiar(self):
+        """Elimina todas las reglas"""
+        self._tablas.clear()
+        self._cache.clear()
+        self.num_reglas = 0
+    
+    def __len__(self) -> int:
+        """Retorna el número de reglas compiladas"""
+        return self.num_reglas
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        return (f"MotorReglas(Reglas={self.num_reglas}, Máscaras={len(self._tablas)}, "
+                f"Consultas en caché={len(self._cache)})")
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    import random
+    import time
+    from knowledge.base_conocimientos import Estado
+    from knowledge.codificacion import CodificadorEstados
+    from knowledge.generalizacion import Generalizador
+    from environment import Abrevadero
+    
+    print("=== Pruebas del Motor de Reglas ===\n")
+    
+    rng = random.Random(0)
+    codificador = CodificadorEstados(Abrevadero.RADIO)
+    generalizador = Generalizador()
+    estados = [codificador.decodificar(rng.randrange(codificador.num_estados)) for _ in range(2000)]
+    
+    # Reglas con comodines: patrones de estados reales con algunos campos quitados
+    for _ in range(5000):
+        patron = generalizador.crear_estado_generalizado(rng.choice(estados))
+        for campo in rng.sample(CAMPOS, rng.randint(0, 4)):
+            del patron[campo]
+        generalizador.crear_regla_generalizacion(
+            patron, rng.choice(["avanzar", "esconderse", "atacar"]), round(rng.random(), 3)
+        )
+    print(f"{generalizador.motor_reglas}")
+    
+    def lineal(estado: Estado) -> List[Tuple[str, float]]:
+        estado_gen = generalizador.crear_estado_generalizado(estado)
+        recomendaciones = [
+            (regla['accion'], regla['efectividad'])
+            for regla in generalizador.reglas_generalizacion
+            if all(estado_gen.get(k) == v for k, v in regla['patron'].items())
+        ]
+        recomendaciones.sort(key=lambda x: x[1], reverse=True)
+        return recomendaciones
+    
+    inicio = time.perf_counter()
+    esperado = [lineal(estado) for estado in estados[:200]]
+    t_lineal = (time.perf_counter() - inicio) / 200
+    
+    inicio = time.perf_counter()
+    obtenido = [generalizador.obtener_recomendacion_por_regla(estado) for estado in estados]
+    t_motor = (time.perf_counter() - inicio) / len(estados)
+    
+    print(f"Recorrido lineal: {t_lineal * 1e6:.0f} µs por consulta")
+    print(f"Motor compilado:  {t_motor * 1e6:.0f} µs por consulta")
+    print(f"¿Mismos resultados? {obtenido[:200] == esperado}")
+    print(f"\n{generalizador.motor_reglas}")
@@ -1,7 +1,15 @@
 """Módulo de aprendizaje: Q-Learning y entrenamiento"""
 
 from .recompensas import SistemaRecompensas
+from .repeticion import RepeticionPriorizada
+from .planificacion import PlanificacionPriorizada
 from .q_learning import QLearning
 from .entrenamiento import Entrenador
+from .mdp_exacto import ModeloCaceria, resolver_caceria, evaluar_politica
+from .politica import PoliticaCompilada
+from .evaluacion import evaluar_monte_carlo
+from .servidor_politica import ServidorPolitica, ClientePolitica
 
-__all__ = ['SistemaRecompensas', 'QLearning', 'Entrenador']
+__all__ = ['SistemaRecompensas', 'RepeticionPriorizada', 'PlanificacionPriorizada', 'QLearning', 'Entrenador',
+           'ModeloCaceria', 'resolver_caceria', 'evaluar_politica', 'evaluar_monte_carlo',
+           'PoliticaCompilada', 'ServidorPolitica', 'ClientePolitica']
@@ -3,8 +3,13 @@ Módulo de entrenamiento.
 Orquesta ciclos de entrenamiento automático.
 """
 
-from typing import List, Dict, Optional, Callable
+from multiprocessing.connection import wait
+from typing import TYPE_CHECKING, List, Dict, Optional, Callable, Tuple
+import multiprocessing
+import os
+import random
 import time
+import traceback
 
 from environment import Abrevadero
 from agents.leon import Leon, AccionLeon
@@ -13,22 +18,44 @@ from simulation.caceria import Caceria, ResultadoCaceria, ModoBehaviorImpala
 from knowledge.base_conocimientos import BaseConocimientos, Estado, Experiencia
 from knowledge.generalizacion import Generalizador
 from learning.q_learning import QLearning
+from learning.repeticion import RepeticionPriorizada
+from learning.planificacion import PlanificacionPriorizada
 from learning.recompensas import SistemaRecompensas
 
+if TYPE_CHECKING:
+    # Solo para las anotaciones: storage importa learning
+    from storage.registro_cambios import RegistroCambios
+
 
 class Entrenador:
     """
     Orquesta ciclos de entrenamiento automático del león.
     """
     
-    def __init__(self):
-        """Inicializa el entrenador"""
+    def __init__(self, base_conocimientos: Optional[BaseConocimientos] = None,
+                 repeticion: Optional[RepeticionPriorizada] = None,
+                 planificacion: Optional[PlanificacionPriorizada] = None):
+        """
+        Inicializa el entrenador.
+        
+        Args:
+            base_conocimientos: Base de conocimientos a entrenar
+                                (default: BaseConocimientos vacía; admite BaseConocimientosDensa)
+            repeticion: Memoria de repetición priorizada (default: sin repetición)
+            planificacion: Modelo para planificar con barrido priorizado
+                           (default: sin planificación)
+        """
         # Componentes del sistema
         self.abrevadero = Abrevadero()
-        self.base_conocimientos = BaseConocimientos()
+        self.base_conocimientos = base_conocimientos if base_conocimientos is not None else BaseConocimientos()
         self.generalizador = Generalizador()
         self.sistema_recompensas = SistemaRecompensas()
-        self.q_learning = QLearning(self.base_conocimientos, self.sistema_recompensas)
+        self.q_learning = QLearning(self.base_conocimientos, self.sistema_recompensas,
+                                    repeticion=repeticion,
+                                    planificacion=planificacion)
+        
+        # Cacería reutilizada en cada episodio, en modo silencioso
+        self.caceria = Caceria(self.abrevadero, silenciosa=True)
         
         # Estadísticas globales
         self.total_cacerias = 0
@@ -67,6 +94,8 @@ class Entrenador:
             progreso = episodio / num_episodios
             self.q_learning.ajustar_epsilon(progreso)
             self.q_learning.ajustar_alpha(progreso)
+            if self.q_learning.repeticion is not None:
+                self.q_learning.repeticion.ajustar_beta(progreso)
             
             # Posición inicial aleatoria
             posicion_inicial = random.choice(posiciones_iniciales)
@@ -100,6 +129,185 @@ class Entrenador:
         # Generar reporte
         return self._generar_reporte_entrenamiento(num_episodios, exitosas_en_ciclo)
     
+    def entrenar_paralelo(self, num_episodios: int,
+                          num_trabajadores: Optional[int] = None,
+                          episodios_por_sincronizacion: int = 500,
+                          posiciones_iniciales: List[int] = None,
+                          comportamiento_impala: ModoBehaviorImpala = ModoBehaviorImpala.ALEATORIO,
+                          verbose: bool = False,
+                          callback_progreso: Optional[Callable] = None,
+                          semilla: Optional[int] = None) -> Dict:
+        """
+        Ejecuta un ciclo de entrenamiento repartiendo episodios entre procesos.
+        
+        Cada trabajador es un proceso que vive todo el entrenamiento y
+        entrena sobre una copia local de la tabla Q. Al final de cada ronda
+        las tablas se fusionan en la base maestra ponderando cada valor Q
+        por las visitas que recibió en la ronda, y la tabla fusionada
+        reemplaza los valores Q locales al empezar la ronda siguiente. El
+        resto del estado del trabajador (memoria de repetición priorizada
+        con sus prioridades, modelo y cola de la planificación) se conserva
+        entre rondas, igual que en un entrenamiento secuencial.
+        
+        Args:
+            num_episodios: Número de cacerías a simular
+            num_trabajadores: Procesos en paralelo (default: os.cpu_count())
+            episodios_por_sincronizacion: Episodios de cada trabajador entre fusiones
+            posiciones_iniciales: Posiciones iniciales posibles (default: todas 1-8)
+            comportamiento_impala: Modo de comportamiento del impala
+            verbose: Si True, imprime información de cada ronda
+            callback_progreso: Función a llamar con el progreso agregado de
+                               todos los trabajadores (misma firma que en entrenar)
+            semilla: Semilla para reproducir las semillas de los trabajadores
+            
+        Returns:
+            Diccionario con resultados del entrenamiento (con repetición o
+            planificación incluye además las transiciones guardadas y los
+            pares del modelo de todos los trabajadores al terminar)
+        """
+        if posiciones_iniciales is None:
+            posiciones_iniciales = list(range(1, 9))
+        if num_trabajadores is None:
+            num_trabajadores = os.cpu_count() or 1
+        if num_trabajadores < 1 or episodios_por_sincronizacion < 1:
+            raise ValueError("num_trabajadores y episodios_por_sincronizacion deben ser positivos")
+        
+        generador = random.Random(semilla)
+        configuracion = {
+            'clase_base': type(self.base_conocimientos),
+            'repeticion': None,
+            'planificacion': None
+        }
+        if self.q_learning.repeticion is not None:
+            configuracion['repeticion'] = self.q_learning.repeticion.configuracion()
+        if self.q_learning.planificacion is not None:
+            configuracion['planificacion'] = self.q_learning.planificacion.configuracion()
+        
+        self.tiempo_inicio = time.time()
+        exitosas_en_ciclo = 0
+        completados = 0
+        ronda = 0
+        ultimos = {}
+        
+        # Procesos persistentes: el trabajador i recibe siempre la tarea i
+        contexto = multiprocessing.get_context()
+        trabajadores = []
+        try:
+            for _ in range(num_trabajadores):
+                conexion, conexion_hijo = contexto.Pipe()
+                proceso = contexto.Process(target=_ciclo_trabajador,
+                                           args=(conexion_hijo, configuracion), daemon=True)
+                proceso.start()
+                conexion_hijo.close()
+                trabajadores.append((proceso, conexion))
+            
+            while completados < num_episodios:
+                # Repartir la ronda entre los trabajadores
+                q_table = dict(self.base_conocimientos.q_table)
+                pendientes = []
+                inicio = completados
+                for _, conexion in trabajadores:
+                    episodios = min(episodios_por_sincronizacion, num_episodios - inicio)
+                    if episodios <= 0:
+                        break
+                    conexion.send({
+                        'q_table': q_table,
+                        'episodios': episodios,
+                        'inicio': inicio,
+                        'total': num_episodios,
+                        'posiciones': posiciones_iniciales,
+                        'comportamiento': comportamiento_impala,
+                        'semilla': generador.randrange(2**32),
+                        # Solo vuelven las experiencias recientes (exportar_a_json guarda 1000)
+                        'max_experiencias': max(1, 1000 // num_trabajadores)
+                    })
+                    pendientes.append(conexion)
+                    inicio += episodios
+                
+                resultados = []
+                while pendientes:
+                    for conexion in wait(pendientes):
+                        pendientes.remove(conexion)
+                        try:
+                            resultado = conexion.recv()
+                        except EOFError:
+                            raise RuntimeError("Un trabajador de entrenamiento terminó inesperadamente")
+                        if 'error' in resultado:
+                            raise RuntimeError(f"Error en un trabajador de entrenamiento:\n{resultado['error']}")
+                        resultados.append(resultado)
+                        ultimos[conexion] = resultado
+                
+                        completados += resultado['episodios']
+                        exitosas_en_ciclo += resultado['exitosas']
+                        self.total_cacerias += resultado['episodios']
+                        self.cacerias_exitosas += resultado['exitosas']
+                    
+                        if callback_progreso:
+                            callback_progreso(
+                                completados,
+                                num_episodios,
+                                exitosas_en_ciclo,
+                                self.cacerias_exitosas,
+                                self.total_cacerias
+                            )
+                
+                _fusionar_por_visitas(self.base_conocimientos, [r['tabla'] for r in resultados])
+                self._acumular_estadisticas_trabajadores(resultados)
+                ronda += 1
+                
+                if verbose:
+                    tasa = (exitosas_en_ciclo / completados) * 100
+                    print(f"Ronda {ronda} - Episodio {completados}/{num_episodios} - Tasa éxito: {tasa:.1f}%")
+        finally:
+            for _, conexion in trabajadores:
+                try:
+                    conexion.send(None)
+                except (OSError, ValueError):
+                    pass
+            for proceso, conexion in trabajadores:
+                proceso.join(timeout=5)
+                if proceso.is_alive():
+                    proceso.terminate()
+                conexion.close()
+        
+        # Dejar los hiperparámetros como al final de un entrenamiento secuencial
+        progreso = (num_episodios - 1) / num_episodios if num_episodios > 0 else 0
+        self.q_learning.ajustar_epsilon(progreso)
+        self.q_learning.ajustar_alpha(progreso)
+        
+        self.tiempo_fin = time.time()
+        
+        reporte = self._generar_reporte_entrenamiento(num_episodios, exitosas_en_ciclo)
+        reporte['num_trabajadores'] = num_trabajadores
+        reporte['rondas_sincronizacion'] = ronda
+        if configuracion['repeticion'] is not None:
+            reporte['transiciones_repeticion'] = sum(r['transiciones_repeticion'] for r in ultimos.values())
+        if configuracion['planificacion'] is not None:
+            reporte['pares_modelo_planificacion'] = sum(r['pares_modelo_planificacion'] for r in ultimos.values())
+        return reporte
+    
+    def _acumular_estadisticas_trabajadores(self, resultados: List[Dict]):
+        """
+        Suma a la base y al Q-Learning maestros las estadísticas de una ronda.
+        
+        Args:
+            resultados: Resultados devueltos por los trabajadores
+        """
+        bc = self.base_conocimientos
+        ql = self.q_learning
+        
+        for resultado in resultados:
+            bc.total_experiencias += resultado['total_experiencias']
+            bc.cacerias_exitosas += resultado['cacerias_exitosas']
+            bc.cacerias_fallidas += resultado['cacerias_fallidas']
+            bc.experiencias.extend(resultado['experiencias'])
+            
+            ql.total_actualizaciones += resultado['actualizaciones_q']
+            ql.exploraciones += resultado['exploraciones']
+            ql.explotaciones += resultado['explotaciones']
+            ql.actualizaciones_repeticion += resultado['actualizaciones_repeticion']
+            ql.actualizaciones_planificacion += resultado['actualizaciones_planificacion']
+    
     def _ejecutar_caceria_entrenamiento(self, posicion_inicial: int,
                                        comportamiento_impala: ModoBehaviorImpala) -> ResultadoCaceria:
         """
@@ -112,7 +320,7 @@ class Entrenador:
         Returns:
             Resultado de la cacería
         """
-        caceria = Caceria(self.abrevadero)
+        caceria = self.caceria
         caceria.inicializar_caceria(posicion_inicial, comportamiento_impala)
         
         acciones_leon = ["avanzar", "esconderse", "atacar"]
@@ -181,40 +389,7 @@ class Entrenador:
         Returns:
             Estado representado
         """
-        # Redondear distancia a 0.5 cuadros para generalización
-        distancia = caceria.verificador.calcular_distancia_actual(caceria.leon)
-        distancia_redondeada = round(distancia * 2) / 2
-        
-        # Obtener acción del impala (mapeo de AccionImpala a string)
-        accion_impala_map = {
-            'ver_izquierda': 'ver_izquierda',
-            'ver_derecha': 'ver_derecha',
-            'ver_frente': 'ver_frente',
-            'beber_agua': 'beber_agua',
-            'huir': 'huir'
-        }
-        
-        # Usar la última acción registrada
-        from agents.impala import AccionImpala
-        accion_impala_enum = AccionImpala.VER_FRENTE  # Default
-        accion_impala_str = "ver_frente"
-        
-        if caceria.impala.esta_huyendo:
-            accion_impala_enum = AccionImpala.HUIR
-            accion_impala_str = "huir"
-        
-        # Verificar si el impala puede ver al león
-        impala_puede_ver = caceria.verificador.impala_puede_ver_leon(
-            caceria.leon, caceria.impala, accion_impala_enum
-        )
-        
-        return Estado(
-            posicion_leon=caceria.leon.posicion,
-            distancia_impala=distancia_redondeada,
-            accion_impala=accion_impala_str,
-            leon_escondido=caceria.leon.esta_escondido,
-            impala_puede_ver=impala_puede_ver
-        )
+        return crear_estado_desde_caceria(caceria)
     
     def _generar_reporte_entrenamiento(self, num_episodios: int,
                                       exitosas: int) -> Dict:
@@ -244,14 +419,23 @@ class Entrenador:
     
     def entrenar_incremental(self, num_episodios: int,
                            checkpoint_cada: int = 1000,
-                           callback_checkpoint: Optional[Callable] = None) -> List[Dict]:
+                           callback_checkpoint: Optional[Callable] = None,
+                           registro: Optional['RegistroCambios'] = None,
+                           compactar_cada_entradas: int = 50000) -> List[Dict]:
         """
         Entrenamiento incremental con checkpoints.
         
+        Con un registro (storage.registro_cambios.RegistroCambios) cada
+        checkpoint agrega al log solo los pares modificados en el bloque, y
+        cuando el log acumula compactar_cada_entradas entradas se incorpora
+        al snapshot en segundo plano.
+        
         Args:
             num_episodios: Total de episodios
             checkpoint_cada: Guardar checkpoint cada N episodios
             callback_checkpoint: Función a llamar en cada checkpoint
+            registro: Registro de cambios donde persistir cada checkpoint (opcional)
+            compactar_cada_entradas: Tamaño del log que dispara una compactación
             
         Returns:
             Lista de reportes de cada checkpoint
@@ -259,10 +443,24 @@ class Entrenador:
         reportes = []
         episodios_restantes = num_episodios
         
+        if registro is not None:
+            registro.adjuntar(self.base_conocimientos)
+        
         while episodios_restantes > 0:
             batch = min(checkpoint_cada, episodios_restantes)
             
             reporte = self.entrenar(batch, verbose=True)
+            
+            if registro is not None:
+                inicio = time.time()
+                entradas = registro.registrar(self.base_conocimientos)
+                if registro.entradas_en_registro >= compactar_cada_entradas:
+                    registro.compactar()
+                reporte['checkpoint'] = {
+                    'entradas': entradas,
+                    'segundos': time.time() - inicio
+                }
+            
             reportes.append(reporte)
             
             if callback_checkpoint:
@@ -330,6 +528,180 @@ class Entrenador:
         self.cacerias_exitosas = 0
 
 
+def crear_estado_desde_caceria(caceria: Caceria) -> Estado:
+    """
+    Crea un Estado desde el estado actual de la cacería.
+    
+    Args:
+        caceria: Cacería en curso
+        
+    Returns:
+        Estado representado
+    """
+    # Redondear distancia a 0.5 cuadros para generalización
+    distancia = caceria.verificador.calcular_distancia_actual(caceria.leon)
+    distancia_redondeada = round(distancia * 2) / 2
+    
+    # Usar la última acción registrada
+    from agents.impala import AccionImpala
+    accion_impala_enum = AccionImpala.VER_FRENTE  # Default
+    accion_impala_str = "ver_frente"
+    
+    if caceria.impala.esta_huyendo:
+        accion_impala_enum = AccionImpala.HUIR
+        accion_impala_str = "huir"
+    
+    # Verificar si el impala puede ver al león
+    impala_puede_ver = caceria.verificador.impala_puede_ver_leon(
+        caceria.leon, caceria.impala, accion_impala_enum
+    )
+    
+    return Estado(
+        posicion_leon=caceria.leon.posicion,
+        distancia_impala=distancia_redondeada,
+        accion_impala=accion_impala_str,
+        leon_escondido=caceria.leon.esta_escondido,
+        impala_puede_ver=impala_puede_ver
+    )
+
+
+def _ciclo_trabajador(conexion, configuracion: Dict):
+    """
+    Proceso trabajador de entrenar_paralelo.
+    
+    Crea un Entrenador al iniciar y lo conserva entre rondas: la memoria de
+    repetición y el modelo de planificación siguen acumulando experiencia
+    como en un entrenamiento secuencial. Atiende tareas hasta recibir None.
+    
+    Args:
+        conexion: Extremo del Pipe hacia el proceso principal
+        configuracion: Clase de la base y configuración de la repetición y
+                       la planificación (None = sin ellas)
+    """
+    repeticion = None
+    if configuracion['repeticion'] is not None:
+        repeticion = RepeticionPriorizada(**configuracion['repeticion'])
+    
+    planificacion = None
+    if configuracion['planificacion'] is not None:
+        planificacion = PlanificacionPriorizada(**configuracion['planificacion'])
+    
+    entrenador = Entrenador(configuracion['clase_base'](), repeticion, planificacion)
+    
+    while True:
+        try:
+            tarea = conexion.recv()
+        except EOFError:
+            break
+        if tarea is None:
+            break
+        try:
+            resultado = _entrenar_ronda(entrenador, tarea)
+        except Exception:
+            resultado = {'error': traceback.format_exc()}
+        conexion.send(resultado)
+    
+    conexion.close()
+
+
+def _entrenar_ronda(entrenador: Entrenador, tarea: Dict) -> Dict:
+    """
+    Entrena una ronda de episodios en un proceso trabajador.
+    
+    Args:
+        entrenador: Entrenador del trabajador (se conserva entre rondas)
+        tarea: Diccionario con la tabla Q fusionada, el rango de episodios,
+               la configuración de la cacería y la semilla de la ronda
+        
+    Returns:
+        Diccionario con la tabla de la ronda {(estado, accion): (valor_q, visitas)}
+        (solo pares visitados en la ronda) y las estadísticas de la ronda
+    """
+    random.seed(tarea['semilla'])
+    bc = entrenador.base_conocimientos
+    ql = entrenador.q_learning
+    
+    # La tabla fusionada reemplaza los valores Q locales (contiene todos los
+    # pares que el trabajador visitó en rondas anteriores)
+    for (estado, accion), valor in tarea['q_table'].items():
+        bc.actualizar_valor_q(estado, accion, valor)
+    
+    visitas_antes = dict(bc.visitas)
+    antes = (bc.total_experiencias, bc.cacerias_exitosas, bc.cacerias_fallidas,
+             bc.experiencias.total_agregadas, ql.total_actualizaciones, ql.exploraciones,
+             ql.explotaciones, ql.actualizaciones_repeticion, ql.actualizaciones_planificacion)
+    
+    exitosas = 0
+    for i in range(tarea['episodios']):
+        progreso = (tarea['inicio'] + i) / tarea['total']
+        ql.ajustar_epsilon(progreso)
+        ql.ajustar_alpha(progreso)
+        if ql.repeticion is not None:
+            ql.repeticion.ajustar_beta(progreso)
+        
+        posicion_inicial = random.choice(tarea['posiciones'])
+        resultado = entrenador._ejecutar_caceria_entrenamiento(posicion_inicial, tarea['comportamiento'])
+        if resultado == ResultadoCaceria.EXITO:
+            exitosas += 1
+    
+    tabla = {}
+    for par, visitas in bc.visitas.items():
+        visitas_ronda = visitas - visitas_antes.get(par, 0)
+        if visitas_ronda > 0:
+            tabla[par] = (bc.q_table.get(par, 0.0), visitas_ronda)
+    
+    despues = (bc.total_experiencias, bc.cacerias_exitosas, bc.cacerias_fallidas,
+               bc.experiencias.total_agregadas, ql.total_actualizaciones, ql.exploraciones,
+               ql.explotaciones, ql.actualizaciones_repeticion, ql.actualizaciones_planificacion)
+    delta = [d - a for a, d in zip(antes, despues)]
+    nuevas = min(tarea['max_experiencias'], delta[3], len(bc.experiencias))
+    
+    return {
+        'tabla': tabla,
+        'episodios': tarea['episodios'],
+        'exitosas': exitosas,
+        'total_experiencias': delta[0],
+        'cacerias_exitosas': delta[1],
+        'cacerias_fallidas': delta[2],
+        'experiencias': bc.experiencias[-nuevas:] if nuevas > 0 else [],
+        'actualizaciones_q': delta[4],
+        'exploraciones': delta[5],
+        'explotaciones': delta[6],
+        'actualizaciones_repeticion': delta[7],
+        'actualizaciones_planificacion': delta[8],
+        'transiciones_repeticion': len(ql.repeticion) if ql.repeticion is not None else 0,
+        'pares_modelo_planificacion': len(ql.planificacion) if ql.planificacion is not None else 0
+    }
+
+
+def _fusionar_por_visitas(base: BaseConocimientos,
+                          tablas: List[Dict[Tuple[Estado, str], Tuple[float, int]]]):
+    """
+    Fusiona en la base las tablas de una ronda ponderando por visitas.
+    
+    Para cada par visitado en la ronda:
+        Q = Σ(visitas_i × Q_i) / Σ visitas_i
+    Los pares que ningún trabajador visitó conservan su valor.
+    
+    Args:
+        base: Base de conocimientos maestra (se modifica en el lugar)
+        tablas: Tablas {(estado, accion): (valor_q, visitas)} de cada trabajador
+    """
+    acumulado = {}
+    for tabla in tablas:
+        for par, (valor, visitas) in tabla.items():
+            suma = acumulado.get(par)
+            if suma is None:
+                acumulado[par] = [valor * visitas, visitas]
+            else:
+                suma[0] += valor * visitas
+                suma[1] += visitas
+    
+    for (estado, accion), (suma_ponderada, visitas) in acumulado.items():
+        base.actualizar_valor_q(estado, accion, suma_ponderada / visitas)
+        base.visitas[(estado, accion)] += visitas
+
+
 if __name__ == "__main__":
     # Pruebas básicas
     print("=== Pruebas del Entrenador ===\n")
@@ -0,0 +1,321 @@
+"""
+Módulo de evaluación por Monte Carlo.
+Mide la política greedy de un checkpoint con cacerías en paralelo,
+estratificadas por posición inicial y con parada adaptativa.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import math
+import os
+import random
+import time
+
+from environment import Abrevadero
+from agents.leon import AccionLeon
+from agents.impala import AccionImpala
+from simulation.caceria import Caceria, ResultadoCaceria, ModoBehaviorImpala
+from simulation.verificador import CondicionHuida
+from knowledge.base_conocimientos import BaseConocimientos
+from knowledge.codificacion import ACCIONES_LEON
+from learning.politica import PoliticaCompilada, codificar_caceria
+
+
+# Política del proceso trabajador (se envía una sola vez, al crear el pool)
+_politica_trabajador: Optional[PoliticaCompilada] = None
+
+
+def semiancho_wilson(exitos: int, n: int, confianza: float = 0.95) -> Tuple[float, float, float]:
+    """
+    Calcula el intervalo de Wilson para una tasa de éxito.
+    
+    A diferencia del intervalo normal, no colapsa a ancho cero cuando todas
+    las cacerías salen igual, así que una posición fácil (o imposible) se
+    detiene tras unas decenas de cacerías y no tras la primera.
+    
+    Args:
+        exitos: Cacerías exitosas
+        n: Cacerías totales
+        confianza: Nivel de confianza (0-1)
+    
+    Returns:
+        Tupla (limite_inferior, limite_superior, semiancho)
+    """
+    if n == 0:
+        return 0.0, 1.0, 0.5
+    z = NormalDist().inv_cdf((1 + confianza) / 2)
+    p = exitos / n
+    denominador = 1 + z * z / n
+    centro = (p + z * z / (2 * n)) / denominador
+    semiancho = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominador
+    return max(0.0, centro - semiancho), min(1.0, centro + semiancho), semiancho
+
+
+def _iniciar_trabajador(politica: PoliticaCompilada):
+    """Guarda la política en el proceso trabajador"""
+    global _politica_trabajador
+    _politica_trabajador = politica
+
+
+def _evaluar_en_trabajador(tarea: Dict) -> Dict:
+    """
+    Ejecuta un bloque de cacerías greedy desde una posición.
+    
+    Args:
+        tarea: Diccionario con posicion, episodios, comportamiento,
+               secuencia y semilla
+    
+    Returns:
+        Diccionario con los conteos del bloque
+    """
+    random.seed(tarea['semilla'])
+    politica = _politica_trabajador
+    tabla, codificador = politica.tabla, politica.codificador
+    acciones = [AccionLeon(nombre) for nombre in ACCIONES_LEON]
+    caceria = Caceria(Abrevadero(), silenciosa=True)
+    
+    exitosas = 0
+    duracion_total = 0
+    condiciones = {condicion.name: 0 for condicion in CondicionHuida}
+    exitos_por_condicion = dict(condiciones)
+    
+    for _ in range(tarea['episodios']):
+        caceria.inicializar_caceria(tarea['posicion'], tarea['comportamiento'], tarea['secuencia'])
+        while caceria.resultado == ResultadoCaceria.EN_PROGRESO:
+            caceria.ejecutar_turno(acciones[tabla[codificar_caceria(caceria, codificador)]])
+        
+        exito = caceria.resultado == ResultadoCaceria.EXITO
+        exitosas += exito
+        duracion_total += caceria.tiempo.tiempo_actual
+        condiciones[caceria.condicion_huida.name] += 1
+        exitos_por_condicion[caceria.condicion_huida.name] += exito
+    
+    return {
+        'posicion': tarea['posicion'],
+        'episodios': tarea['episodios'],
+        'exitosas': exitosas,
+        'duracion_total': duracion_total,
+        'condiciones_huida': condiciones,
+        'exitos_por_condicion': exitos_por_condicion
+    }
+
+
+def _cargar_politica(politica: Union[BaseConocimientos, PoliticaCompilada, str]) -> PoliticaCompilada:
+    """Compila la política de una base o de la ruta de un checkpoint"""
+    if isinstance(politica, PoliticaCompilada):
+        return politica
+    if isinstance(politica, str):
+        from storage.carga import cargar_conocimiento
+        
+        base = cargar_conocimiento(politica)
+        if base is None:
+            raise ValueError(f"No se pudo cargar el checkpoint: {politica}")
+        politica = base
+    return PoliticaCompilada.desde_base(politica)
+
+
+def evaluar_monte_carlo(politica: Union[BaseConocimientos, PoliticaCompilada, str],
+                        comportamiento_impala: ModoBehaviorImpala = ModoBehaviorImpala.ALEATORIO,
+                        secuencia_impala: Optional[List[AccionImpala]] = None,
+                        posiciones_iniciales: Optional[List[int]] = None,
+                        semiancho_objetivo: float = 0.02,
+                        confianza: float = 0.95,
+                        min_episodios: int = 100,
+                        max_episodios: int = 20000,
+                        episodios_por_tarea: int = 100,
+                        num_trabajadores: Optional[int] = None,
+                        semilla: Optional[int] = None,
+                        callback_progreso: Optional[Callable[[int, Dict], None]] = None,
+                        verbose: bool = False) -> Tuple[Dict[int, Dict], Dict]:
+    """
+    Evalúa la política greedy (epsilon = 0) con cacerías simuladas en paralelo.
+    
+    Cada posición inicial es un estrato. Los bloques de cacerías se reparten
+    entre los procesos y sus resultados se acumulan a medida que llegan; un
+    estrato deja de recibir bloques cuando el semiancho del intervalo de
+    Wilson de su tasa de éxito baja de semiancho_objetivo (con al menos
+    min_episodios) o cuando llega a max_episodios. Las posiciones con tasa
+    cercana a 0 o 1 terminan pronto y las dudosas reciben más cacerías.
+    Los bloques que ya estaban en curso al detenerse un estrato también se
+    cuentan.
+    
+    Para la política exacta del modo aleatorio sin muestreo ver
+    mdp_exacto.evaluar_politica; esta función admite además cualquier
+    secuencia PROGRAMADO.
+    
+    Args:
+        politica: Base de conocimientos, política compilada o ruta de un checkpoint
+        comportamiento_impala: Modo de comportamiento del impala
+        secuencia_impala: Secuencia programada (si modo PROGRAMADO)
+        posiciones_iniciales: Estratos (default: todas 1-8)
+        semiancho_objetivo: Semiancho del intervalo de confianza para detenerse
+        confianza: Nivel de confianza del intervalo (0-1)
+        min_episodios: Cacerías mínimas por posición
+        max_episodios: Cacerías máximas por posición
+        episodios_por_tarea: Cacerías de cada bloque enviado a un proceso
+        num_trabajadores: Procesos en paralelo (default: os.cpu_count())
+        semilla: Semilla para reproducir las semillas de los bloques
+        callback_progreso: Función llamada con (posicion, resultado parcial)
+                           tras cada bloque recibido
+        verbose: Si True, imprime cada estrato al detenerse
+    
+    Returns:
+        Tupla (por_posicion, reporte): por_posicion[posicion] tiene
+        episodios, exitosas, tasa_exito, intervalo, semiancho,
+        duracion_media, condiciones_huida, exitos_por_condicion y
+        detenida_por ('precision' o 'maximo'); reporte tiene la tasa de
+        éxito promedio de las posiciones, el total de cacerías y los tiempos
+    """
+    if comportamiento_impala == ModoBehaviorImpala.PROGRAMADO and not secuencia_impala:
+        raise ValueError("Modo PROGRAMADO requiere secuencia_impala")
+    if posiciones_iniciales is None:
+        posiciones_iniciales = list(range(1, 9))
+    if num_trabajadores is None:
+        num_trabajadores = os.cpu_count() or 1
+    if num_trabajadores < 1 or episodios_por_tarea < 1 or max_episodios < 1:
+        raise ValueError("num_trabajadores, episodios_por_tarea y max_episodios deben ser positivos")
+    
+    inicio = time.time()
+    politica = _cargar_politica(politica)
+    generador = random.Random(semilla)
+    
+    por_posicion = {
+        posicion: {
+            'episodios': 0,
+            'exitosas': 0,
+            'duracion_total': 0,
+            'condiciones_huida': {condicion.name: 0 for condicion in CondicionHuida},
+            'exitos_por_condicion': {condicion.name: 0 for condicion in CondicionHuida},
+            'enviados': 0,
+            'detenida_por': None
+        }
+        for posicion in posiciones_iniciales
+    }
+    
+    def siguiente_tarea() -> Optional[Dict]:
+        """Bloque para el estrato activo con menos cacerías enviadas"""
+        activos = [
+            posicion for posicion, r in por_posicion.items()
+            if r['detenida_por'] is None and r['enviados'] < max_episodios
+        ]
+        if not activos:
+            return None
+        posicion = min(activos, key=lambda p: por_posicion[p]['enviados'])
+        estrato = por_posicion[posicion]
+        episodios = min(episodios_por_tarea, max_episodios - estrato['enviados'])
+        estrato['enviados'] += episodios
+        return {
+            'posicion': posicion,
+            'episodios': episodios,
+            'comportamiento': comportamiento_impala,
+            'secuencia': secuencia_impala,
+            'semilla': generador.randrange(2**32)
+        }
+    
+    with ProcessPoolExecutor(max_workers=num_trabajadores, initializer=_iniciar_trabajador,
+                             initargs=(politica,)) as ejecutor:
+        pendientes = set()
+        for _ in range(2 * num_trabajadores):
+            tarea = siguiente_tarea()
+            if tarea is None:
+                break
+            pendientes.add(ejecutor.submit(_evaluar_en_trabajador, tarea))
+        
+        while pendientes:
+            listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                bloque = futuro.result()
+                estrato = por_posicion[bloque['posicion']]
+                estrato['episodios'] += bloque['episodios']
+                estrato['exitosas'] += bloque['exitosas']
+                estrato['duracion_total'] += bloque['duracion_total']
+                for nombre, cuenta in bloque['condiciones_huida'].items():
+                    estrato['condiciones_huida'][nombre] += cuenta
+                    estrato['exitos_por_condicion'][nombre] += bloque['exitos_por_condicion'][nombre]
+                
+                if estrato['detenida_por'] is None:
+                    _, _, semiancho = semiancho_wilson(estrato['exitosas'], estrato['episodios'], confianza)
+                    if estrato['episodios'] >= min_episodios and semiancho <= semiancho_objetivo:
+                        estrato['detenida_por'] = 'precision'
+                    elif estrato['episodios'] >= max_episodios:
+                        estrato['detenida_por'] = 'maximo'
+                    if verbose and estrato['detenida_por']:
+                        print(f"Posición {bloque['posicion']}: {estrato['exitosas']}/{estrato['episodios']} "
+                              f"éxitos (±{semiancho:.3f}, {estrato['detenida_por']})")
+                
+                if callback_progreso:
+                    callback_progreso(bloque['posicion'], _resumir_estrato(estrato, confianza))
+            
+            while len(pendientes) < 2 * num_trabajadores:
+                tarea = siguiente_tarea()
+                if tarea is None:
+                    break
+                pendientes.add(ejecutor.submit(_evaluar_en_trabajador, tarea))
+    
+    resultados = {
+        posicion: _resumir_estrato(estrato, confianza)
+        for posicion, estrato in por_posicion.items()
+    }
+    duracion = time.time() - inicio
+    total = sum(r['episodios'] for r in resultados.values())
+    reporte = {
+        'tasa_exito': sum(r['tasa_exito'] for r in resultados.values()) / len(resultados),
+        'duracion_media': sum(r['duracion_media'] for r in resultados.values()) / len(resultados),
+        'episodios': total,
+        'comportamiento_impala': comportamiento_impala.value,
+        'semiancho_objetivo': semiancho_objetivo,
+        'confianza': confianza,
+        'num_trabajadores': num_trabajadores,
+        'duracion_segundos': round(duracion, 2),
+        'episodios_por_segundo': round(total / duracion, 1) if duracion > 0 else 0.0
+    }
+    return resultados, reporte
+
+
+def _resumir_estrato(estrato: Dict, confianza: float) -> Dict:
+    """Convierte los conteos de un estrato en su resultado"""
+    n = estrato['episodios']
+    inferior, superior, semiancho = semiancho_wilson(estrato['exitosas'], n, confianza)
+    return {
+        'episodios': n,
+        'exitosas': estrato['exitosas'],
+        'tasa_exito': estrato['exitosas'] / n if n else 0.0,
+        'intervalo': (inferior, superior),
+        'semiancho': semiancho,
+        'duracion_media': estrato['duracion_total'] / n if n else 0.0,
+        'condiciones_huida': dict(estrato['condiciones_huida']),
+        'exitos_por_condicion': dict(estrato['exitos_por_condicion']),
+        'detenida_por': estrato['detenida_por']
+    }
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    from learning.entrenamiento import Entrenador
+    from learning.mdp_exacto import evaluar_politica
+    
+    print("=== Pruebas de Evaluación por Monte Carlo ===\n")
+    
+    entrenador = Entrenador(BaseConocimientos())
+    entrenador.entrenar(3000, verbose=False)
+    base = entrenador.base_conocimientos
+    
+    por_posicion, reporte = evaluar_monte_carlo(base, semilla=0, verbose=True)
+    print()
+    for clave, valor in reporte.items():
+        print(f"  {clave}: {valor}")
+    
+    exacto, _ = evaluar_politica(base)
+    print("\nPosición: Monte Carlo (intervalo) vs exacto")
+    for posicion, resultado in por_posicion.items():
+        inferior, superior = resultado['intervalo']
+        print(f"  {posicion}: {resultado['tasa_exito']:.3f} ({inferior:.3f}-{superior:.3f}, "
+              f"n={resultado['episodios']}) vs {exacto[posicion]['probabilidad_exito']:.3f}")
+    
+    print("\nImpala que siempre bebe (PROGRAMADO):")
+    por_posicion, reporte = evaluar_monte_carlo(
+        base, ModoBehaviorImpala.PROGRAMADO, [AccionImpala.BEBER_AGUA], semilla=0
+    )
+    print(f"  Tasa de éxito {reporte['tasa_exito']:.2%} con {reporte['episodios']} cacerías")
+    print(f"  Condiciones de huida (posición 1): {por_posicion[1]['condiciones_huida']}")
@@ -0,0 +1,780 @@
+"""
+Módulo de solución exacta.
+Extrae el modelo exacto (MDP) de la cacería y lo resuelve por programación dinámica.
+"""
+
+from collections import defaultdict, deque
+from typing import Dict, List, Optional, Tuple, Union
+import time
+
+from environment import Abrevadero, Direccion
+from agents.leon import AccionLeon
+from agents.impala import AccionImpala
+from simulation.caceria import Caceria, ResultadoCaceria, ModoBehaviorImpala
+from knowledge.base_conocimientos import BaseConocimientos, Estado
+from knowledge.codificacion import ACCIONES_LEON
+from learning.recompensas import SistemaRecompensas
+from learning.entrenamiento import crear_estado_desde_caceria
+from learning.politica import PoliticaCompilada
+
+
+# Acciones que el impala elige al azar (mismo orden que Caceria._obtener_accion_impala)
+ACCIONES_IMPALA_ALEATORIAS = (
+    AccionImpala.VER_IZQUIERDA,
+    AccionImpala.VER_DERECHA,
+    AccionImpala.VER_FRENTE,
+    AccionImpala.BEBER_AGUA
+)
+
+# Transición: (probabilidad, destino: índice, TERMINAL o EXITO, recompensa)
+Transicion = Tuple[float, int, float]
+
+# Diferencia con la que la acción de la política queda por encima de las
+# demás en la base que escribe resolver_caceria
+MARGEN_POLITICA = 1e-6
+
+
+class ModeloCaceria:
+    """
+    Modelo exacto de la cacería como proceso de decisión de Markov.
+    
+    El estado oculto del simulador es la tupla
+        (posicion, posicion_exacta, escondido, atacando, direccion_vista,
+         huyendo, tiempo_huyendo, tiempo, indice_secuencia)
+    y las transiciones se obtienen ejecutando turnos reales de una Caceria
+    silenciosa, así que siguen exactamente las reglas del simulador. La
+    única fuente de azar relevante es la acción del impala (1/4 cada una en
+    modo ALEATORIO); la dirección de huida también es aleatoria, pero no
+    influye en distancias, visión ni en el resultado, por lo que no forma
+    parte del estado.
+    
+    Como el tiempo avanza en cada turno y la cacería termina en MAX_TIEMPO,
+    el grafo de estados es acíclico y se enumera por capas de tiempo.
+    """
+    
+    # Índices de destino de las transiciones que terminan la cacería
+    # (ambos negativos: "destino >= 0" distingue los estados no terminales)
+    TERMINAL = -1
+    EXITO = -2
+    
+    def __init__(self, abrevadero: Optional[Abrevadero] = None,
+                 sistema_recompensas: Optional[SistemaRecompensas] = None,
+                 comportamiento_impala: ModoBehaviorImpala = ModoBehaviorImpala.ALEATORIO,
+                 secuencia_impala: Optional[List[AccionImpala]] = None,
+                 posiciones_iniciales: Optional[List[int]] = None):
+        """
+        Inicializa el modelo (vacío hasta llamar a construir).
+        
+        Args:
+            abrevadero: Instancia del abrevadero (default: Abrevadero())
+            sistema_recompensas: Recompensas del entrenamiento (default: SistemaRecompensas())
+            comportamiento_impala: Modo de comportamiento del impala
+            secuencia_impala: Secuencia programada (si modo PROGRAMADO)
+            posiciones_iniciales: Posiciones de inicio del león (default: 1-8)
+        """
+        if comportamiento_impala == ModoBehaviorImpala.PROGRAMADO and not secuencia_impala:
+            raise ValueError("Modo PROGRAMADO requiere secuencia_impala")
+        
+        self.abrevadero = abrevadero or Abrevadero()
+        self.sistema_recompensas = sistema_recompensas or SistemaRecompensas()
+        self.comportamiento_impala = comportamiento_impala
+        self.secuencia_impala = list(secuencia_impala) if secuencia_impala else None
+        self.posiciones_iniciales = posiciones_iniciales or list(range(1, 9))
+        
+        self.caceria = Caceria(self.abrevadero, silenciosa=True)
+        
+        # Estados ocultos en orden de descubrimiento (ordenados por tiempo)
+        self.estados: List[tuple] = []
+        self.indices: Dict[tuple, int] = {}
+        # transiciones[estado][accion] -> lista de Transicion
+        self.transiciones: List[List[List[Transicion]]] = []
+        # Estado observable (el que ve el león) de cada estado oculto
+        self.observaciones: List[Estado] = []
+        self.iniciales: List[int] = []
+    
+    def construir(self) -> 'ModeloCaceria':
+        """
+        Enumera todos los estados alcanzables con sus transiciones.
+        
+        Returns:
+            El propio modelo (para encadenar llamadas)
+        """
+        caceria = self.caceria
+        self.estados.clear()
+        self.indices.clear()
+        self.transiciones.clear()
+        self.observaciones.clear()
+        
+        pendientes = deque()
+        self.iniciales = []
+        for posicion in self.posiciones_iniciales:
+            caceria.inicializar_caceria(posicion, self.comportamiento_impala, self.secuencia_impala)
+            indice = self._registrar(self._clave(), pendientes)
+            self.iniciales.append(indice)
+        
+        while pendientes:
+            indice = pendientes.popleft()
+            clave = self.estados[indice]
+            filas = []
+            for nombre_accion in ACCIONES_LEON:
+                accion_leon = AccionLeon[nombre_accion.upper()]
+                resultados: Dict[int, List[float]] = {}
+                for probabilidad, accion_impala in self._acciones_impala(clave):
+                    self._cargar(clave, accion_impala)
+                    destino, recompensa = self._ejecutar(nombre_accion, accion_leon, pendientes)
+                    # Agrupar resultados idénticos (p. ej. mismas reglas de visión)
+                    acumulado = resultados.setdefault(destino, [0.0, 0.0])
+                    acumulado[0] += probabilidad
+                    acumulado[1] += probabilidad * recompensa
+                filas.append([
+                    (p, destino, suma / p) for destino, (p, suma) in resultados.items()
+                ])
+            self.transiciones[indice] = filas
+        
+        return self
+    
+    def _acciones_impala(self, clave: tuple) -> List[Tuple[float, Optional[AccionImpala]]]:
+        """
+        Obtiene las acciones posibles del impala en un estado con su probabilidad.
+        
+        Args:
+            clave: Estado oculto
+        
+        Returns:
+            Lista de (probabilidad, accion); None deja que la Caceria decida
+            (huida en curso o secuencia programada, ambas deterministas)
+        """
+        huyendo = clave[5]
+        if huyendo or self.comportamiento_impala == ModoBehaviorImpala.PROGRAMADO:
+            return [(1.0, None)]
+        probabilidad = 1.0 / len(ACCIONES_IMPALA_ALEATORIAS)
+        return [(probabilidad, accion) for accion in ACCIONES_IMPALA_ALEATORIAS]
+    
+    def _clave(self) -> tuple:
+        """Obtiene el estado oculto actual de la cacería"""
+        leon = self.caceria.leon
+        impala = self.caceria.impala
+        return (
+            leon.posicion,
+            leon.posicion_exacta,
+            leon.esta_escondido,
+            leon.esta_atacando,
+            impala.direccion_vista.value,
+            impala.esta_huyendo,
+            impala.tiempo_huyendo,
+            self.caceria.tiempo.tiempo_actual,
+            self.caceria.indice_secuencia
+        )
+    
+    def _cargar(self, clave: tuple, accion_impala: Optional[AccionImpala]):
+        """
+        Deja la cacería en un estado oculto.
+        
+        Args:
+            clave: Estado oculto
+            accion_impala: Acción forzada del impala en el próximo turno
+                           (None = según el modo de comportamiento)
+        """
+        (posicion, posicion_exacta, escondido, atacando, direccion,
+         huyendo, tiempo_huyendo, tiempo, indice_secuencia) = clave
+        caceria = self.caceria
+        
+        leon = caceria.leon
+        leon.posicion = posicion
+        leon.posicion_exacta = posicion_exacta
+        leon.esta_escondido = escondido
+        leon.esta_atacando = atacando
+        
+        impala = caceria.impala
+        impala.direccion_vista = Direccion(direccion)
+        impala.esta_huyendo = huyendo
+        impala.tiempo_huyendo = tiempo_huyendo
+        impala.velocidad_huida = tiempo_huyendo if huyendo else 0
+        
+        caceria.tiempo.tiempo_actual = tiempo
+        caceria.resultado = ResultadoCaceria.EN_PROGRESO
+        
+        if accion_impala is None:
+            caceria.comportamiento_impala = self.comportamiento_impala
+            caceria.secuencia_impala = self.secuencia_impala
+            caceria.indice_secuencia = indice_secuencia
+        else:
+            # Una secuencia de un solo elemento fuerza la acción del impala
+            caceria.comportamiento_impala = ModoBehaviorImpala.PROGRAMADO
+            caceria.secuencia_impala = [accion_impala]
+            caceria.indice_secuencia = 0
+    
+    def _ejecutar(self, nombre_accion: str, accion_leon: AccionLeon,
+                  pendientes: deque) -> Tuple[int, float]:
+        """
+        Ejecuta un turno desde el estado cargado.
+        
+        Args:
+            nombre_accion: Nombre de la acción del león
+            accion_leon: Acción del león
+            pendientes: Cola de estados por expandir
+        
+        Returns:
+            Tupla (destino, recompensa); destino es EXITO o TERMINAL si la
+            cacería terminó con éxito o sin él
+        """
+        caceria = self.caceria
+        distancia_anterior = caceria.verificador.calcular_distancia_actual(caceria.leon)
+        terminada, _ = caceria.ejecutar_turno(accion_leon)
+        
+        # Misma recompensa que calcula el Entrenador
+        accion_impala = AccionImpala.HUIR if caceria.impala.esta_huyendo else AccionImpala.VER_FRENTE
+        recompensa = self.sistema_recompensas.calcular_recompensa_total(
+            distancia_anterior=distancia_anterior,
+            distancia_nueva=caceria.verificador.calcular_distancia_actual(caceria.leon),
+            accion=nombre_accion,
+            leon_escondido=caceria.leon.esta_escondido,
+            impala_puede_ver=caceria.verificador.impala_puede_ver_leon(
+                caceria.leon, caceria.impala, accion_impala
+            ),
+            impala_huye=caceria.impala.esta_huyendo,
+            caceria_terminada=terminada,
+            exito=(caceria.resultado == ResultadoCaceria.EXITO)
+        )
+        
+        if terminada:
+            if caceria.resultado == ResultadoCaceria.EXITO:
+                return self.EXITO, recompensa
+            return self.TERMINAL, recompensa
+        return self._registrar(self._clave(), pendientes), recompensa
+    
+    def _registrar(self, clave: tuple, pendientes: deque) -> int:
+        """
+        Obtiene el índice de un estado oculto, registrándolo si es nuevo.
+        
+        Args:
+            clave: Estado oculto (la cacería debe estar en ese estado)
+            pendientes: Cola de estados por expandir
+        
+        Returns:
+            Índice del estado
+        """
+        indice = self.indices.get(clave)
+        if indice is None:
+            indice = len(self.estados)
+            self.indices[clave] = indice
+            self.estados.append(clave)
+            self.transiciones.append([])
+            self.observaciones.append(crear_estado_desde_caceria(self.caceria))
+            pendientes.append(indice)
+        return indice
+    
+    @property
+    def num_estados(self) -> int:
+        """Número de estados ocultos alcanzables"""
+        return len(self.estados)
+    
+    def num_observaciones(self) -> int:
+        """
+        Cuenta los Estado observables distintos.
+        
+        Returns:
+            Número de estados observables
+        """
+        return len(set(self.observaciones))
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        return (f"ModeloCaceria(Estados ocultos={self.num_estados}, "
+                f"Observables={self.num_observaciones()}, "
+                f"Impala={self.comportamiento_impala.value})")
+
+
+def _valor_accion(resultados: List[Transicion], valores: List[float], gamma: float) -> float:
+    """Calcula el valor esperado de una acción: Σ p (r + γ V(s'))"""
+    total = 0.0
+    for probabilidad, destino, recompensa in resultados:
+        if destino >= 0:
+            total += probabilidad * (recompensa + gamma * valores[destino])
+        else:
+            total += probabilidad * recompensa
+    return total
+
+
+def iteracion_de_valores(modelo: ModeloCaceria, gamma: float = 0.9,
+                         tolerancia: float = 1e-9,
+                         max_iteraciones: int = 1000) -> Tuple[List[List[float]], int]:
+    """
+    Calcula los valores Q óptimos por iteración de valores.
+    
+    Los barridos recorren los estados del último tiempo al primero
+    (Gauss-Seidel), así que en un grafo acíclico el primer barrido ya es
+    exacto y el segundo solo confirma la convergencia.
+    
+    Args:
+        modelo: Modelo construido
+        gamma: Factor de descuento (0-1)
+        tolerancia: Cambio máximo de V para detenerse
+        max_iteraciones: Máximo de barridos
+    
+    Returns:
+        Tupla (q, iteraciones) donde q[estado][accion] sigue ACCIONES_LEON
+    """
+    valores = [0.0] * modelo.num_estados
+    q = [[0.0] * len(ACCIONES_LEON) for _ in range(modelo.num_estados)]
+    
+    for iteracion in range(1, max_iteraciones + 1):
+        delta = 0.0
+        for indice in range(modelo.num_estados - 1, -1, -1):
+            fila = q[indice]
+            for accion, resultados in enumerate(modelo.transiciones[indice]):
+                fila[accion] = _valor_accion(resultados, valores, gamma)
+            valor = max(fila)
+            delta = max(delta, abs(valor - valores[indice]))
+            valores[indice] = valor
+        if delta < tolerancia:
+            return q, iteracion
+    
+    return q, max_iteraciones
+
+
+def iteracion_de_politicas(modelo: ModeloCaceria, gamma: float = 0.9,
+                           tolerancia: float = 1e-9,
+                           max_iteraciones: int = 100) -> Tuple[List[List[float]], int]:
+    """
+    Calcula los valores Q óptimos por iteración de políticas.
+    
+    Alterna evaluación de la política (barridos hasta converger) y mejora
+    voraz, hasta que la política no cambia.
+    
+    Args:
+        modelo: Modelo construido
+        gamma: Factor de descuento (0-1)
+        tolerancia: Cambio máximo de V en la evaluación
+        max_iteraciones: Máximo de mejoras de política
+    
+    Returns:
+        Tupla (q, iteraciones) donde q[estado][accion] sigue ACCIONES_LEON
+    """
+    n = modelo.num_estados
+    politica = [0] * n
+    valores = [0.0] * n
+    q = [[0.0] * len(ACCIONES_LEON) for _ in range(n)]
+    
+    for iteracion in range(1, max_iteraciones + 1):
+        # Evaluación
+        while True:
+            delta = 0.0
+            for indice in range(n - 1, -1, -1):
+                valor = _valor_accion(modelo.transiciones[indice][politica[indice]], valores, gamma)
+                delta = max(delta, abs(valor - valores[indice]))
+                valores[indice] = valor
+            if delta < tolerancia:
+                break
+        
+        # Mejora (solo se cambia de acción si es estrictamente mejor)
+        estable = True
+        for indice in range(n):
+            fila = q[indice]
+            for accion, resultados in enumerate(modelo.transiciones[indice]):
+                fila[accion] = _valor_accion(resultados, valores, gamma)
+            mejor = max(range(len(fila)), key=fila.__getitem__)
+            if fila[mejor] > fila[politica[indice]] + tolerancia:
+                politica[indice] = mejor
+                estable = False
+        if estable:
+            return q, iteracion
+    
+    return q, max_iteraciones
+
+
+def _visitas_esperadas(modelo: ModeloCaceria, acciones: List[int],
+                       epsilon: float) -> List[float]:
+    """
+    Calcula las visitas esperadas por episodio de cada estado oculto.
+    
+    Sigue la política epsilon-greedy respecto a las acciones dadas,
+    partiendo de cada posición inicial con igual probabilidad.
+    
+    Args:
+        modelo: Modelo construido
+        acciones: Acción de la política en cada estado oculto
+        epsilon: Probabilidad de exploración (0 = solo la política)
+    
+    Returns:
+        Masa de visitas por estado oculto
+    """
+    num_acciones = len(ACCIONES_LEON)
+    visitas = [0.0] * modelo.num_estados
+    for indice in modelo.iniciales:
+        visitas[indice] += 1.0 / len(modelo.iniciales)
+    
+    # Los estados están ordenados por tiempo: una pasada hacia adelante basta
+    for indice in range(modelo.num_estados):
+        masa = visitas[indice]
+        if masa == 0.0:
+            continue
+        mejor = acciones[indice]
+        for accion, resultados in enumerate(modelo.transiciones[indice]):
+            p_accion = epsilon / num_acciones + (1.0 - epsilon if accion == mejor else 0.0)
+            if p_accion == 0.0:
+                continue
+            for probabilidad, destino, _ in resultados:
+                if destino >= 0:
+                    visitas[destino] += masa * p_accion * probabilidad
+    return visitas
+    
+
+def _agregar(modelo: ModeloCaceria, q: List[List[float]],
+             visitas: List[float]) -> Dict[Estado, Tuple[List[float], float]]:
+    """Promedia q por Estado observable ponderando con las visitas"""
+    num_acciones = len(ACCIONES_LEON)
+    sumas: Dict[Estado, List[float]] = defaultdict(lambda: [0.0] * num_acciones)
+    pesos: Dict[Estado, float] = defaultdict(float)
+    for indice, estado in enumerate(modelo.observaciones):
+        peso = visitas[indice]
+        if peso == 0.0:
+            continue
+        suma = sumas[estado]
+        for accion in range(num_acciones):
+            suma[accion] += peso * q[indice][accion]
+        pesos[estado] += peso
+    
+    return {
+        estado: ([valor / pesos[estado] for valor in suma], pesos[estado])
+        for estado, suma in sumas.items()
+    }
+
+
+def _valores_de_politica(modelo: ModeloCaceria, acciones: List[int],
+                         gamma: float) -> Tuple[List[float], float]:
+    """
+    Evalúa exactamente una política fija sobre los estados ocultos.
+    
+    Args:
+        modelo: Modelo construido
+        acciones: Acción de la política en cada estado oculto
+        gamma: Factor de descuento (0-1)
+    
+    Returns:
+        Tupla (valores, valor_inicio): valor de cada estado oculto y
+        promedio del valor de las posiciones iniciales
+    """
+    valores = [0.0] * modelo.num_estados
+    for indice in range(modelo.num_estados - 1, -1, -1):
+        valores[indice] = _valor_accion(modelo.transiciones[indice][acciones[indice]], valores, gamma)
+    valor_inicio = sum(valores[i] for i in modelo.iniciales) / len(modelo.iniciales)
+    return valores, valor_inicio
+
+
+def _q_desde_valores(modelo: ModeloCaceria, valores: List[float], gamma: float,
+                     visitas: List[float]) -> List[Optional[List[float]]]:
+    """
+    Calcula q[estado][accion]: tomar la acción y seguir la política que dio los valores.
+    
+    Solo se calculan las filas de los estados con visitas (las demás son None).
+    """
+    return [
+        [_valor_accion(resultados, valores, gamma) for resultados in filas] if visita > 0.0 else None
+        for filas, visita in zip(modelo.transiciones, visitas)
+    ]
+
+
+def agregar_por_observacion(modelo: ModeloCaceria, q: List[List[float]],
+                            epsilon: float = 0.1) -> Dict[Estado, Tuple[List[float], float]]:
+    """
+    Promedia los valores Q de los estados ocultos que comparten Estado observable.
+    
+    Los pesos son la frecuencia de visita bajo la política epsilon-greedy
+    respecto a q, partiendo de cada posición inicial con igual probabilidad;
+    con epsilon > 0 se cubren todos los estados alcanzables.
+    
+    El promedio de los Q óptimos de estados ocultos no da una buena política
+    para el león, que solo ve el Estado: esos valores suponen que en cada
+    estado oculto se actúa sabiendo lo que el Estado no muestra.
+    resolver_caceria solo lo usa como punto de partida.
+    
+    Args:
+        modelo: Modelo construido
+        q: Valores Q por estado oculto
+        epsilon: Probabilidad de exploración de la política de visita
+    
+    Returns:
+        Diccionario Estado -> (valores Q por acción, visitas esperadas por episodio)
+    """
+    acciones = [max(range(len(fila)), key=fila.__getitem__) for fila in q]
+    return _agregar(modelo, q, _visitas_esperadas(modelo, acciones, epsilon))
+
+
+def mejorar_politica_observable(modelo: ModeloCaceria, politica: Dict[Estado, int],
+                                gamma: float = 0.9, tolerancia: float = 1e-9,
+                                max_iteraciones: int = 200) -> Tuple[Dict[Estado, int], float, int]:
+    """
+    Mejora una política determinista sobre los Estado observables.
+    
+    Como en la iteración de políticas, cada paso evalúa exactamente la
+    política y propone en cada Estado la acción con mayor Q promediado por
+    las visitas de la política. Con estados ocultos que comparten Estado la
+    mejora completa no garantiza un mejor retorno (puede oscilar), así que
+    cada propuesta se evalúa antes de aceptarla: primero todos los cambios,
+    luego la mitad con más ganancia estimada, y así hasta probarlos de uno
+    en uno. Termina cuando ningún cambio mejora el valor esperado desde las
+    posiciones iniciales, que nunca baja: es un óptimo local.
+    
+    Args:
+        modelo: Modelo construido
+        politica: Política inicial, Estado -> índice en ACCIONES_LEON (debe
+                  cubrir todos los Estado del modelo)
+        gamma: Factor de descuento (0-1)
+        tolerancia: Mejora mínima del valor para aceptar un cambio
+        max_iteraciones: Máximo de cambios aceptados
+    
+    Returns:
+        Tupla (politica, valor_inicio, iteraciones)
+    """
+    politica = dict(politica)
+    acciones = [politica[estado] for estado in modelo.observaciones]
+    ocultos: Dict[Estado, List[int]] = defaultdict(list)
+    for indice, estado in enumerate(modelo.observaciones):
+        ocultos[estado].append(indice)
+    valores, valor = _valores_de_politica(modelo, acciones, gamma)
+    
+    for iteracion in range(max_iteraciones):
+        visitas = _visitas_esperadas(modelo, acciones, 0.0)
+        agregados = _agregar(modelo, _q_desde_valores(modelo, valores, gamma, visitas), visitas)
+        candidatos = []
+        for estado, (fila, peso) in agregados.items():
+            mejor = max(range(len(fila)), key=fila.__getitem__)
+            ganancia = peso * (fila[mejor] - fila[politica[estado]])
+            if ganancia > tolerancia:
+                candidatos.append((ganancia, estado, mejor))
+        candidatos.sort(key=lambda candidato: candidato[0], reverse=True)
+        
+        propuestas = []
+        cantidad = len(candidatos)
+        while cantidad > 1:
+            propuestas.append(candidatos[:cantidad])
+            cantidad //= 2
+        propuestas.extend([candidato] for candidato in candidatos)
+        
+        for cambios in propuestas:
+            nueva = dict(politica)
+            nuevas_acciones = list(acciones)
+            for _, estado, accion in cambios:
+                nueva[estado] = accion
+                for indice in ocultos[estado]:
+                    nuevas_acciones[indice] = accion
+            nuevos_valores, nuevo_valor = _valores_de_politica(modelo, nuevas_acciones, gamma)
+            if nuevo_valor > valor + tolerancia:
+                politica, acciones, valores, valor = nueva, nuevas_acciones, nuevos_valores, nuevo_valor
+                break
+        else:
+            return politica, valor, iteracion
+    
+    return politica, valor, max_iteraciones
+
+
+def resolver_caceria(base_conocimientos: Optional[BaseConocimientos] = None,
+                     metodo: str = "valores",
+                     gamma: float = 0.9,
+                     epsilon_visitas: float = 0.1,
+                     modelo: Optional[ModeloCaceria] = None) -> Tuple[BaseConocimientos, Dict]:
+    """
+    Busca con el modelo exacto una política para el Estado observable y la escribe en una base.
+    
+    El león no ve el estado oculto, así que la tabla Q óptima del MDP no
+    se puede seguir: resolverla (por iteración de valores o de políticas)
+    da una cota superior del valor y, promediada por Estado, la política de
+    partida. mejorar_politica_observable la mejora hasta un óptimo local
+    sobre las políticas deterministas del Estado, que no tiene por qué ser
+    el óptimo global. El reporte incluye la evaluación exacta (gamma = 1)
+    de la base resultante.
+    
+    La base se guarda y carga como cualquier conocimiento entrenado
+    (storage.guardar_conocimiento / cargar_conocimiento).
+    
+    Args:
+        base_conocimientos: Base donde escribir (default: BaseConocimientos vacía;
+                            admite BaseConocimientosDensa)
+        metodo: "valores" (iteración de valores) o "politicas" (iteración de políticas)
+        gamma: Factor de descuento (el mismo que usa QLearning)
+        epsilon_visitas: Exploración de la política que pondera los promedios
+                         por Estado (cubre los Estado que la política no visita)
+        modelo: Modelo ya construido (default: modelo estándar, impala ALEATORIO)
+    
+    Returns:
+        Tupla (base_conocimientos, reporte)
+    """
+    if metodo not in ("valores", "politicas"):
+        raise ValueError(f"Método desconocido: {metodo} (use 'valores' o 'politicas')")
+    
+    inicio = time.time()
+    if modelo is None:
+        modelo = ModeloCaceria()
+    if not modelo.estados:
+        modelo.construir()
+    tiempo_modelo = time.time() - inicio
+    
+    if metodo == "valores":
+        q, iteraciones = iteracion_de_valores(modelo, gamma)
+    else:
+        q, iteraciones = iteracion_de_politicas(modelo, gamma)
+    cota_inicio = sum(max(q[i]) for i in modelo.iniciales) / len(modelo.iniciales)
+    
+    inicial = {
+        estado: max(range(len(valores)), key=valores.__getitem__)
+        for estado, (valores, _) in agregar_por_observacion(modelo, q, epsilon_visitas).items()
+    }
+    politica, valor_inicio, mejoras = mejorar_politica_observable(modelo, inicial, gamma)
+    
+    # Valores Q de la política encontrada, promediados por Estado
+    acciones = [politica[estado] for estado in modelo.observaciones]
+    valores, _ = _valores_de_politica(modelo, acciones, gamma)
+    visitas = _visitas_esperadas(modelo, acciones, epsilon_visitas)
+    agregados = _agregar(modelo, _q_desde_valores(modelo, valores, gamma, visitas), visitas)
+    
+    if base_conocimientos is None:
+        base_conocimientos = BaseConocimientos()
+    for estado, (valores, _) in agregados.items():
+        elegida = politica[estado]
+        for accion, (nombre, valor) in enumerate(zip(ACCIONES_LEON, valores)):
+            # Una acción que promedia más pero no mejora el retorno no debe
+            # ganarle a la de la política
+            if accion != elegida:
+                valor = min(valor, valores[elegida] - MARGEN_POLITICA)
+            base_conocimientos.actualizar_valor_q(estado, nombre, valor)
+    
+    _, evaluacion = evaluar_politica(base_conocimientos, modelo)
+    reporte = {
+        'metodo': metodo,
+        'gamma': gamma,
+        'iteraciones': iteraciones,
+        'iteraciones_mejora': mejoras,
+        'estados_ocultos': modelo.num_estados,
+        'estados_observables': len(agregados),
+        'pares_estado_accion': len(agregados) * len(ACCIONES_LEON),
+        'valor_esperado_inicio': round(valor_inicio, 4),
+        'cota_valor_inicio': round(cota_inicio, 4),
+        'probabilidad_exito': evaluacion['probabilidad_exito'],
+        'duracion_esperada': evaluacion['duracion_esperada'],
+        'tiempo_modelo_segundos': round(tiempo_modelo, 2),
+        'tiempo_total_segundos': round(time.time() - inicio, 2)
+    }
+    return base_conocimientos, reporte
+
+
+def evaluar_politica(politica: Union[BaseConocimientos, PoliticaCompilada],
+                     modelo: Optional[ModeloCaceria] = None,
+                     gamma: float = 1.0) -> Tuple[Dict[int, Dict], Dict]:
+    """
+    Evalúa exactamente la política greedy de un checkpoint, sin simular.
+    
+    La política es fija, así que desde cada posición inicial basta con
+    propagar la distribución de probabilidad sobre los estados ocultos
+    turno a turno (cada capa es un tiempo) hasta que toda la masa termina,
+    como mucho en Caceria.MAX_TIEMPO. Solo se visitan los estados que la
+    política alcanza. El resultado no tiene varianza: es el límite al que
+    convergen las cacerías de Monte Carlo con epsilon = 0.
+    
+    Construir el modelo es lo costoso; un mismo modelo sirve para evaluar
+    cualquier número de checkpoints.
+    
+    Args:
+        politica: Base de conocimientos (acción de obtener_mejor_accion) o
+                  política compilada
+        modelo: Modelo ya construido (default: modelo estándar, impala ALEATORIO)
+        gamma: Descuento del retorno (1.0 = suma de recompensas del episodio)
+    
+    Returns:
+        Tupla (por_posicion, reporte): por_posicion[posicion] tiene
+        probabilidad_exito, duracion_esperada (turnos), retorno_esperado y
+        probabilidad_por_turno (masa que termina en cada turno); reporte
+        tiene los promedios sobre las posiciones y los tiempos
+    """
+    inicio = time.time()
+    if modelo is None:
+        modelo = ModeloCaceria()
+    if not modelo.estados:
+        modelo.construir()
+    tiempo_modelo = time.time() - inicio
+    
+    inicio = time.time()
+    # Una consulta por Estado observable distinto (hay muchos menos que ocultos)
+    distintas = list(dict.fromkeys(modelo.observaciones))
+    if isinstance(politica, BaseConocimientos):
+        mejores, _, _ = politica.obtener_mejor_accion_lote(distintas, usar_numpy=False)
+    else:
+        mejores = [ACCIONES_LEON.index(politica.act(estado)) for estado in distintas]
+    accion_por_observacion = dict(zip(distintas, mejores))
+    acciones = [accion_por_observacion[estado] for estado in modelo.observaciones]
+    
+    transiciones = modelo.transiciones
+    exito = ModeloCaceria.EXITO
+    por_posicion = {}
+    
+    for posicion, inicial in zip(modelo.posiciones_iniciales, modelo.iniciales):
+        capa = {inicial: 1.0}
+        probabilidad_exito = duracion = retorno = 0.0
+        probabilidad_por_turno = []
+        descuento = 1.0
+        turno = 0
+        
+        while capa:
+            turno += 1
+            siguiente: Dict[int, float] = defaultdict(float)
+            terminada = 0.0
+            for indice, masa in capa.items():
+                for probabilidad, destino, recompensa in transiciones[indice][acciones[indice]]:
+                    p = masa * probabilidad
+                    retorno += p * descuento * recompensa
+                    if destino >= 0:
+                        siguiente[destino] += p
+                    else:
+                        terminada += p
+                        if destino == exito:
+                            probabilidad_exito += p
+            duracion += terminada * turno
+            probabilidad_por_turno.append(terminada)
+            descuento *= gamma
+            capa = siguiente
+        
+        por_posicion[posicion] = {
+            'probabilidad_exito': probabilidad_exito,
+            'duracion_esperada': duracion,
+            'retorno_esperado': retorno,
+            'probabilidad_por_turno': probabilidad_por_turno
+        }
+    
+    n = len(por_posicion)
+    reporte = {
+        'probabilidad_exito': sum(r['probabilidad_exito'] for r in por_posicion.values()) / n,
+        'duracion_esperada': sum(r['duracion_esperada'] for r in por_posicion.values()) / n,
+        'retorno_esperado': sum(r['retorno_esperado'] for r in por_posicion.values()) / n,
+        'gamma': gamma,
+        'estados_ocultos': modelo.num_estados,
+        'tiempo_modelo_segundos': round(tiempo_modelo, 2),
+        'tiempo_evaluacion_segundos': round(time.time() - inicio, 4)
+    }
+    return por_posicion, reporte
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    print("=== Pruebas de Solución Exacta ===\n")
+    
+    modelo = ModeloCaceria().construir()
+    print(f"{modelo}\n")
+    
+    base, reporte = resolver_caceria(modelo=modelo)
+    for clave, valor in reporte.items():
+        print(f"  {clave}: {valor}")
+    
+    print("\nPolítica encontrada al inicio de cada posición:")
+    for indice in modelo.iniciales:
+        estado = modelo.observaciones[indice]
+        accion, valor = base.obtener_mejor_accion(estado, list(ACCIONES_LEON))
+        print(f"  {estado} -> {accion} (Q={valor:.2f})")
+
+    print("\nEvaluación exacta de la política encontrada:")
+    por_posicion, resumen = evaluar_politica(base, modelo)
+    for posicion, resultado in por_posicion.items():
+        print(f"  Posición {posicion}: éxito {resultado['probabilidad_exito']:.2%}, "
+              f"duración {resultado['duracion_esperada']:.2f} turnos, "
+              f"retorno {resultado['retorno_esperado']:.2f}")
+    print(f"  Promedio: éxito {resumen['probabilidad_exito']:.2%} "
+          f"({resumen['tiempo_evaluacion_segundos'] * 1000:.1f} ms)")
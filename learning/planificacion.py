@@ -0,0 +1,188 @@
+"""
+Módulo de planificación basada en modelo.
+Aprende un modelo de transiciones y recompensas y planifica con barrido priorizado (Dyna-Q).
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+import heapq
+import itertools
+
+from knowledge.base_conocimientos import BaseConocimientos, Estado, Experiencia
+
+
+Par = Tuple[Estado, str]
+
+
+class PlanificacionPriorizada:
+    """
+    Modelo aprendido del entorno con barrido priorizado.
+    
+    Para cada par (estado, acción) observado cuenta los siguientes estados
+    (None = la cacería terminó) y acumula la recompensa, así que el modelo es
+    la estimación de máxima verosimilitud de las probabilidades y de la
+    recompensa esperada. Después de cada paso real se hacen hasta
+    pasos_por_paso_real actualizaciones con el valor esperado del modelo:
+        Q(s,a) = R(s,a) + γ Σ P(s'|s,a) max Q(s',a')
+    eligiendo siempre el par con mayor error TD. Cuando max Q(s,·) cambia,
+    los predecesores de s entran a la cola con el cambio de su error TD,
+    γ P(s|s̄,ā) |ΔV(s)|, sin recalcular su valor esperado completo.
+    """
+    
+    def __init__(self, pasos_por_paso_real: int = 5,
+                 umbral_prioridad: float = 1e-3):
+        """
+        Inicializa el modelo vacío.
+        
+        Args:
+            pasos_por_paso_real: Actualizaciones de planificación por cada
+                                 paso real (presupuesto de planificación)
+            umbral_prioridad: Error TD mínimo para entrar a la cola
+        """
+        if pasos_por_paso_real < 0:
+            raise ValueError(f"Los pasos de planificación no pueden ser negativos, recibido: {pasos_por_paso_real}")
+        
+        self.pasos_por_paso_real = pasos_por_paso_real
+        self.umbral_prioridad = umbral_prioridad
+        
+        # Modelo: (estado, accion) -> {siguiente_estado: veces}
+        self.transiciones: Dict[Par, Dict[Optional[Estado], int]] = defaultdict(lambda: defaultdict(int))
+        self.recompensas: Dict[Par, float] = defaultdict(float)
+        self.conteos: Dict[Par, int] = defaultdict(int)
+        
+        # estado -> pares (estado_previo, accion) que llevaron a él
+        self.predecesores: Dict[Estado, Set[Par]] = defaultdict(set)
+        
+        # Cola de prioridad (max-heap con prioridades negadas) y prioridad
+        # vigente de cada par; las entradas obsoletas se descartan al extraer
+        self._cola: List[Tuple[float, int, Par]] = []
+        self._prioridades: Dict[Par, float] = {}
+        self._contador = itertools.count()
+    
+    def observar(self, experiencia: Experiencia):
+        """
+        Incorpora una transición real al modelo.
+        
+        Args:
+            experiencia: Transición observada
+        """
+        par = (experiencia.estado, experiencia.accion)
+        siguiente = experiencia.siguiente_estado
+        
+        self.transiciones[par][siguiente] += 1
+        self.recompensas[par] += experiencia.recompensa
+        self.conteos[par] += 1
+        if siguiente is not None:
+            self.predecesores[siguiente].add(par)
+    
+    def valor_esperado(self, par: Par, base_conocimientos: BaseConocimientos,
+                       acciones_posibles: List[str], gamma: float) -> float:
+        """
+        Calcula el objetivo de Bellman de un par según el modelo.
+        
+        Args:
+            par: Par (estado, acción) observado al menos una vez
+            base_conocimientos: Base con los valores Q actuales
+            acciones_posibles: Acciones posibles en el siguiente estado
+            gamma: Factor de descuento
+        
+        Returns:
+            R(s,a) + γ Σ P(s'|s,a) max Q(s',a')
+        """
+        conteo = self.conteos[par]
+        futuro = 0.0
+        for siguiente, veces in self.transiciones[par].items():
+            if siguiente is not None:
+                _, max_q = base_conocimientos.obtener_mejor_accion(siguiente, acciones_posibles)
+                futuro += veces * max_q
+        return (self.recompensas[par] + gamma * futuro) / conteo
+    
+    def probabilidad(self, par: Par, siguiente: Optional[Estado]) -> float:
+        """
+        Estima P(siguiente | estado, accion) con las frecuencias observadas.
+        
+        Args:
+            par: Par (estado, acción) observado al menos una vez
+            siguiente: Siguiente estado (None = la cacería terminó)
+        
+        Returns:
+            Probabilidad estimada
+        """
+        return self.transiciones[par].get(siguiente, 0) / self.conteos[par]
+    
+    def encolar(self, par: Par, prioridad: float):
+        """
+        Agrega un par a la cola (o sube su prioridad si ya estaba).
+        
+        Args:
+            par: Par (estado, acción)
+            prioridad: Magnitud del error TD
+        """
+        if prioridad < self.umbral_prioridad:
+            return
+        if prioridad <= self._prioridades.get(par, 0.0):
+            return
+        
+        self._prioridades[par] = prioridad
+        heapq.heappush(self._cola, (-prioridad, next(self._contador), par))
+    
+    def extraer(self) -> Optional[Par]:
+        """
+        Saca de la cola el par con mayor prioridad.
+        
+        Returns:
+            Par (estado, acción), o None si la cola está vacía
+        """
+        while self._cola:
+            prioridad, _, par = heapq.heappop(self._cola)
+            if self._prioridades.get(par) == -prioridad:
+                del self._prioridades[par]
+                return par
+        return None
+    
+    def configuracion(self) -> dict:
+        """
+        Obtiene los parámetros para crear una planificación equivalente (vacía).
+        
+        Returns:
+            Diccionario con los argumentos del constructor
+        """
+        return {
+            'pasos_por_paso_real': self.pasos_por_paso_real,
+            'umbral_prioridad': self.umbral_prioridad
+        }
+    
+    def pendientes(self) -> int:
+        """Retorna el número de pares en la cola"""
+        return len(self._prioridades)
+    
+    def __len__(self) -> int:
+        """Retorna el número de pares (estado, acción) en el modelo"""
+        return len(self.conteos)
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        return (f"PlanificacionPriorizada(Pares={len(self)}, En cola={self.pendientes()}, "
+                f"Pasos={self.pasos_por_paso_real})")
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    print("=== Pruebas de Planificación Priorizada ===\n")
+    
+    planificacion = PlanificacionPriorizada(pasos_por_paso_real=3)
+    bc = BaseConocimientos()
+    acciones = ["avanzar", "esconderse", "atacar"]
+    
+    estado1 = Estado(1, 3.0, "ver_frente", False, False)
+    estado2 = Estado(1, 2.0, "ver_frente", False, False)
+    
+    planificacion.observar(Experiencia(estado1, "avanzar", 1.0, estado2, False))
+    planificacion.observar(Experiencia(estado2, "atacar", 100.0, None, True))
+    planificacion.observar(Experiencia(estado2, "atacar", -50.0, None, False))
+    
+    print(f"{planificacion}")
+    for par in [(estado1, "avanzar"), (estado2, "atacar")]:
+        objetivo = planificacion.valor_esperado(par, bc, acciones, 0.9)
+        print(f"  {par[0]} {par[1]} -> objetivo={objetivo:.2f}")
+    print(f"  Predecesores de {estado2}: {len(planificacion.predecesores[estado2])}")
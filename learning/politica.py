@@ -0,0 +1,275 @@
+"""
+Módulo de política compilada.
+Congela la política greedy de una base de conocimientos en una tabla plana
+indexada por estado codificado.
+"""
+
+from array import array
+from typing import List, Optional, Sequence, Union
+
+from agents.impala import AccionImpala
+from knowledge.base_conocimientos import BaseConocimientos, Estado
+from knowledge.base_densa import BaseConocimientosDensa
+from knowledge.codificacion import CodificadorEstados, ACCIONES_IMPALA, ACCIONES_LEON
+from simulation.caceria import Caceria
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+# Código de las observaciones que el codificador no representa
+CODIGO_DESCONOCIDO = -1
+
+_VER_FRENTE = ACCIONES_IMPALA.index(AccionImpala.VER_FRENTE.value)
+_HUIR = ACCIONES_IMPALA.index(AccionImpala.HUIR.value)
+
+Observacion = Union[Estado, Caceria, int]
+
+
+def codificar_caceria(caceria: Caceria, codificador: CodificadorEstados) -> int:
+    """
+    Codifica el estado actual de una cacería sin construir un Estado.
+    
+    Usa las mismas reglas que entrenamiento.crear_estado_desde_caceria
+    (distancia redondeada a 0.5, el impala "huir" o "ver_frente").
+    
+    Args:
+        caceria: Cacería en curso
+        codificador: Codificador de estados
+    
+    Returns:
+        Código del estado (CODIGO_DESCONOCIDO si queda fuera del codificador)
+    """
+    leon = caceria.leon
+    huyendo = caceria.impala.esta_huyendo
+    distancia = caceria.verificador.calcular_distancia_actual(leon)
+    puede_ver = caceria.verificador.impala_puede_ver_leon(
+        leon, caceria.impala, AccionImpala.HUIR if huyendo else AccionImpala.VER_FRENTE
+    )
+    try:
+        return codificador.codificar_componentes(
+            leon.posicion, round(distancia * 2) / 2, _HUIR if huyendo else _VER_FRENTE,
+            leon.esta_escondido, puede_ver
+        )
+    except ValueError:
+        return CODIGO_DESCONOCIDO
+
+
+class PoliticaCompilada:
+    """
+    Política greedy de solo lectura: una acción por estado codificado.
+    
+    La tabla tiene num_estados + 1 posiciones; la última guarda la acción
+    por defecto y es la que lee el código -1 (estados nunca vistos o fuera
+    del codificador), así que act() es siempre un índice en un bytearray,
+    sin diccionarios ni contadores. También guarda la fila de valores Q de
+    cada estado (q, por filas de num_acciones). Es una instantánea: si la
+    base sigue aprendiendo hay que volver a compilar.
+    """
+    
+    def __init__(self, codificador: Optional[CodificadorEstados] = None,
+                 accion_por_defecto: str = ACCIONES_LEON[0]):
+        """
+        Inicializa una política que siempre devuelve la acción por defecto.
+        
+        Args:
+            codificador: Codificador de estados (default: según Abrevadero.RADIO)
+            accion_por_defecto: Acción para estados sin valores Q
+        """
+        self.codificador = codificador or CodificadorEstados()
+        self.accion_por_defecto = accion_por_defecto
+        
+        codigo_defecto = self.codificador.codificar_accion(accion_por_defecto)
+        self.tabla = bytearray([codigo_defecto]) * (self.codificador.num_estados + 1)
+        self.valores = array('d', bytes(8 * (self.codificador.num_estados + 1)))
+        self.q = array('d', bytes(8 * (self.codificador.num_estados + 1) * self.codificador.num_acciones))
+        self.estados_compilados = 0
+        self._tabla_numpy = None
+    
+    @classmethod
+    def desde_base(cls, base_conocimientos: BaseConocimientos,
+                   codificador: Optional[CodificadorEstados] = None,
+                   accion_por_defecto: str = ACCIONES_LEON[0]) -> 'PoliticaCompilada':
+        """
+        Compila la política greedy de una base de conocimientos.
+        
+        Cada estado conocido toma la acción de obtener_mejor_accion (la
+        primera de ACCIONES_LEON con el máximo valor Q).
+        
+        Args:
+            base_conocimientos: Base de conocimientos entrenada
+            codificador: Codificador de estados (default: el de la base densa
+                         o uno según Abrevadero.RADIO)
+            accion_por_defecto: Acción para estados sin valores Q
+        
+        Returns:
+            Política compilada
+        """
+        densa = isinstance(base_conocimientos, BaseConocimientosDensa)
+        if codificador is None and densa:
+            codificador = base_conocimientos.codificador
+        politica = cls(codificador, accion_por_defecto)
+        tabla, valores, q = politica.tabla, politica.valores, politica.q
+        num_acciones = politica.codificador.num_acciones
+        
+        if densa and base_conocimientos.codificador.es_compatible(politica.codificador):
+            # Filas de los arreglos densos: sin decodificar estados
+            for codigo, conocidas in enumerate(base_conocimientos._acciones_por_estado):
+                if not conocidas:
+                    continue
+                fila = base_conocimientos.obtener_fila_q(codigo)
+                mejor = 0
+                for accion in range(1, num_acciones):
+                    if fila[accion] > fila[mejor]:
+                        mejor = accion
+                tabla[codigo] = mejor
+                valores[codigo] = fila[mejor]
+                q[codigo * num_acciones:(codigo + 1) * num_acciones] = array('d', fila)
+                politica.estados_compilados += 1
+            return politica
+        
+        # Fuera del codificador: act() devuelve la acción por defecto
+        pares = [(politica.codificar(estado), estado)
+                 for estado in base_conocimientos.obtener_estados_conocidos()]
+        pares = [(codigo, estado) for codigo, estado in pares if codigo != CODIGO_DESCONOCIDO]
+        mejores, valores_lote, filas = base_conocimientos.obtener_mejor_accion_lote(
+            [estado for _, estado in pares], usar_numpy=False
+        )
+        for (codigo, _), mejor, valor, fila in zip(pares, mejores, valores_lote, filas):
+            tabla[codigo] = mejor
+            valores[codigo] = valor
+            q[codigo * num_acciones:(codigo + 1) * num_acciones] = array('d', fila)
+            politica.estados_compilados += 1
+        return politica
+    
+    def codificar(self, observacion: Observacion) -> int:
+        """
+        Obtiene el código de estado de una observación.
+        
+        Args:
+            observacion: Estado, cacería en curso o código ya calculado
+        
+        Returns:
+            Código del estado (CODIGO_DESCONOCIDO si no es representable)
+        """
+        if isinstance(observacion, Estado):
+            try:
+                return self.codificador.codificar(observacion)
+            except ValueError:
+                return CODIGO_DESCONOCIDO
+        if isinstance(observacion, Caceria):
+            return codificar_caceria(observacion, self.codificador)
+        return int(observacion)
+    
+    def act(self, observacion: Observacion) -> str:
+        """
+        Obtiene la acción greedy para una observación.
+        
+        Args:
+            observacion: Estado, cacería en curso o código de estado
+        
+        Returns:
+            Nombre de la acción del león
+        """
+        return ACCIONES_LEON[self.tabla[self.codificar(observacion)]]
+    
+    def valor(self, observacion: Observacion) -> float:
+        """
+        Obtiene el valor Q de la acción greedy (0.0 en estados sin valores).
+        
+        Args:
+            observacion: Estado, cacería en curso o código de estado
+        
+        Returns:
+            Valor Q compilado
+        """
+        return self.valores[self.codificar(observacion)]
+    
+    def valores_q(self, observacion: Observacion) -> List[float]:
+        """
+        Obtiene la fila de valores Q (en el orden de ACCIONES_LEON).
+        
+        Args:
+            observacion: Estado, cacería en curso o código de estado
+        
+        Returns:
+            Valores Q de cada acción (ceros en estados sin valores)
+        """
+        codigo = self.codificar(observacion)
+        if codigo < 0:
+            codigo = self.codificador.num_estados
+        num_acciones = self.codificador.num_acciones
+        return self.q[codigo * num_acciones:(codigo + 1) * num_acciones].tolist()
+    
+    def act_lote(self, codigos: Sequence[int]) -> Sequence[int]:
+        """
+        Obtiene el código de acción (0-2) para muchos estados codificados.
+        
+        Args:
+            codigos: Códigos de estado (-1 = desconocido); con un arreglo de
+                     NumPy la consulta es un solo índice vectorizado
+        
+        Returns:
+            Códigos de acción en el mismo orden (arreglo de NumPy o array('b'))
+        """
+        if np is not None and isinstance(codigos, np.ndarray):
+            if self._tabla_numpy is None:
+                self._tabla_numpy = np.frombuffer(bytes(self.tabla), dtype=np.int8)
+            return self._tabla_numpy[codigos]
+        tabla = self.tabla
+        return array('b', [tabla[codigo] for codigo in codigos])
+    
+    def __len__(self) -> int:
+        """Retorna el número de estados con acción compilada"""
+        return self.estados_compilados
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        return (f"PoliticaCompilada(Estados={self.estados_compilados}/{self.codificador.num_estados}, "
+                f"Por defecto={self.accion_por_defecto})")
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    import random
+    import time
+    from environment import Abrevadero
+    from learning.entrenamiento import Entrenador
+    from simulation.caceria import ModoBehaviorImpala
+    from agents.leon import AccionLeon
+    
+    print("=== Pruebas de Política Compilada ===\n")
+    
+    entrenador = Entrenador(BaseConocimientos())
+    entrenador.entrenar(3000, verbose=False)
+    base = entrenador.base_conocimientos
+    
+    inicio = time.perf_counter()
+    politica = PoliticaCompilada.desde_base(base)
+    print(f"{politica} compilada en {(time.perf_counter() - inicio) * 1000:.1f} ms\n")
+    
+    estados = list(base.obtener_estados_conocidos())
+    acciones = list(ACCIONES_LEON)
+    codigos = [politica.codificar(estado) for estado in estados]
+    
+    inicio = time.perf_counter()
+    for estado in estados:
+        base.obtener_mejor_accion(estado, acciones)
+    t_base = (time.perf_counter() - inicio) / len(estados)
+    
+    inicio = time.perf_counter()
+    for codigo in codigos:
+        politica.act(codigo)
+    t_politica = (time.perf_counter() - inicio) / len(codigos)
+    print(f"obtener_mejor_accion: {t_base * 1e6:.2f} µs, act(código): {t_politica * 1e6:.2f} µs")
+    
+    # Una cacería completa decidida con act()
+    caceria = Caceria(Abrevadero())
+    caceria.inicializar_caceria(random.randint(1, 8), ModoBehaviorImpala.ALEATORIO)
+    while caceria.resultado.value == "en_progreso":
+        terminada, mensaje = caceria.ejecutar_turno(AccionLeon(politica.act(caceria)))
+        if terminada:
+            print(f"\nCacería con act(): {mensaje}")
+            break
@@ -8,6 +8,8 @@ from typing import List, Optional, Tuple
 
 from knowledge.base_conocimientos import BaseConocimientos, Estado, Experiencia
 from learning.recompensas import SistemaRecompensas
+from learning.repeticion import RepeticionPriorizada
+from learning.planificacion import PlanificacionPriorizada
 
 
 class QLearning:
@@ -19,7 +21,9 @@ class QLearning:
                  sistema_recompensas: SistemaRecompensas,
                  alpha: float = 0.1,
                  gamma: float = 0.9,
-                 epsilon: float = 0.1):
+                 epsilon: float = 0.1,
+                 repeticion: Optional[RepeticionPriorizada] = None,
+                 planificacion: Optional[PlanificacionPriorizada] = None):
         """
         Inicializa el algoritmo Q-Learning.
         
@@ -29,6 +33,10 @@ class QLearning:
             alpha: Tasa de aprendizaje (0-1)
             gamma: Factor de descuento (0-1)
             epsilon: Probabilidad de exploración (0-1)
+            repeticion: Memoria de repetición priorizada (None = aprendizaje
+                        solo en línea)
+            planificacion: Modelo aprendido para planificar con barrido
+                           priorizado (None = sin planificación)
         """
         self.base_conocimientos = base_conocimientos
         self.sistema_recompensas = sistema_recompensas
@@ -38,10 +46,18 @@ class QLearning:
         self.gamma = gamma      # Discount factor
         self.epsilon = epsilon  # Exploration rate
         
+        # Repetición de experiencias (opcional)
+        self.repeticion = repeticion
+        
+        # Planificación con modelo aprendido (opcional)
+        self.planificacion = planificacion
+        
         # Estadísticas de aprendizaje
         self.total_actualizaciones = 0
         self.exploraciones = 0
         self.explotaciones = 0
+        self.actualizaciones_repeticion = 0
+        self.actualizaciones_planificacion = 0
     
     def seleccionar_accion(self, estado: Estado,
                           acciones_posibles: List[str],
@@ -135,8 +151,110 @@ class QLearning:
             acciones_posibles
         )
         
+        # Guardar para repetir y repasar los lotes que tocan en este paso
+        if self.repeticion is not None:
+            self.repeticion.agregar(experiencia)
+            for _ in range(self.repeticion.lotes_pendientes()):
+                self.repetir_experiencias(acciones_posibles)
+        
+        # Actualizar el modelo y planificar con el presupuesto de este paso
+        if self.planificacion is not None:
+            par = (experiencia.estado, experiencia.accion)
+            self.planificacion.observar(experiencia)
+            objetivo = self.planificacion.valor_esperado(
+                par, self.base_conocimientos, acciones_posibles, self.gamma
+            )
+            self.planificacion.encolar(par, abs(objetivo - nuevo_q))
+            self.planificar(acciones_posibles)
+        
         return nuevo_q
     
+    def repetir_experiencias(self, acciones_posibles: List[str]) -> int:
+        """
+        Vuelve a aprender de un lote de transiciones priorizadas por error TD.
+        
+        Cada paso se pondera con su peso de importancia:
+            Q(s,a) = Q(s,a) + α·w[r + γ max Q(s',a') - Q(s,a)]
+        
+        Args:
+            acciones_posibles: Acciones posibles en el siguiente estado
+            
+        Returns:
+            Número de transiciones repetidas
+        """
+        if self.repeticion is None:
+            return 0
+        
+        bc = self.base_conocimientos
+        lote = self.repeticion.muestrear()
+        
+        for indice, experiencia, peso in lote:
+            q_actual = bc.obtener_valor_q(experiencia.estado, experiencia.accion)
+            
+            max_q_siguiente = 0.0
+            if experiencia.siguiente_estado is not None:
+                _, max_q_siguiente = bc.obtener_mejor_accion(
+                    experiencia.siguiente_estado, acciones_posibles
+                )
+            
+            error_td = experiencia.recompensa + self.gamma * max_q_siguiente - q_actual
+            bc.actualizar_valor_q(experiencia.estado, experiencia.accion,
+                                  q_actual + self.alpha * peso * error_td)
+            self.repeticion.actualizar_prioridad(indice, error_td)
+        
+        self.actualizaciones_repeticion += len(lote)
+        return len(lote)
+    
+    def planificar(self, acciones_posibles: List[str],
+                   pasos: Optional[int] = None) -> int:
+        """
+        Ejecuta actualizaciones de barrido priorizado sobre el modelo aprendido.
+        
+        Cada actualización usa el valor esperado del modelo:
+            Q(s,a) = R(s,a) + γ Σ P(s'|s,a) max Q(s',a')
+        y vuelve a encolar los predecesores de s con el cambio de su error TD.
+        
+        Args:
+            acciones_posibles: Acciones posibles en el siguiente estado
+            pasos: Máximo de actualizaciones (default: pasos_por_paso_real)
+            
+        Returns:
+            Número de actualizaciones realizadas
+        """
+        planificacion = self.planificacion
+        if planificacion is None:
+            return 0
+        
+        bc = self.base_conocimientos
+        if pasos is None:
+            pasos = planificacion.pasos_por_paso_real
+        
+        realizadas = 0
+        while realizadas < pasos:
+            par = planificacion.extraer()
+            if par is None:
+                break
+            
+            estado, accion = par
+            _, valor_anterior = bc.obtener_mejor_accion(estado, acciones_posibles)
+            bc.actualizar_valor_q(estado, accion, planificacion.valor_esperado(
+                par, bc, acciones_posibles, self.gamma
+            ))
+            realizadas += 1
+            
+            # Si max Q(s,·) cambió, el error TD de cada predecesor cambia en
+            # γ P(s|s̄,ā) |ΔV(s)|
+            _, valor_nuevo = bc.obtener_mejor_accion(estado, acciones_posibles)
+            cambio = self.gamma * abs(valor_nuevo - valor_anterior)
+            if cambio > 0:
+                for predecesor in planificacion.predecesores.get(estado, ()):
+                    planificacion.encolar(
+                        predecesor, cambio * planificacion.probabilidad(predecesor, estado)
+                    )
+        
+        self.actualizaciones_planificacion += realizadas
+        return realizadas
+    
     def ajustar_epsilon(self, progreso: float):
         """
         Ajusta epsilon (exploración) según el progreso del entrenamiento.
@@ -172,7 +290,7 @@ class QLearning:
         total_decisiones = self.exploraciones + self.explotaciones
         tasa_exploracion = (self.exploraciones / total_decisiones * 100) if total_decisiones > 0 else 0
         
-        return {
+        stats = {
             'actualizaciones_q': self.total_actualizaciones,
             'exploraciones': self.exploraciones,
             'explotaciones': self.explotaciones,
@@ -181,12 +299,25 @@ class QLearning:
             'gamma': round(self.gamma, 3),
             'epsilon': round(self.epsilon, 3)
         }
+        
+        if self.repeticion is not None:
+            stats['actualizaciones_repeticion'] = self.actualizaciones_repeticion
+            stats['transiciones_en_memoria'] = len(self.repeticion)
+        
+        if self.planificacion is not None:
+            stats['pasos_planificacion'] = self.planificacion.pasos_por_paso_real
+            stats['actualizaciones_planificacion'] = self.actualizaciones_planificacion
+            stats['pares_en_modelo'] = len(self.planificacion)
+        
+        return stats
     
     def resetear_estadisticas(self):
         """Resetea las estadísticas de aprendizaje"""
         self.total_actualizaciones = 0
         self.exploraciones = 0
         self.explotaciones = 0
+        self.actualizaciones_repeticion = 0
+        self.actualizaciones_planificacion = 0
     
     def __str__(self) -> str:
         """Representación en string"""
@@ -0,0 +1,277 @@
+"""
+Módulo de repetición de experiencias priorizada.
+Vuelve a aprender de transiciones pasadas, con prioridad proporcional al error TD.
+"""
+
+from array import array
+from typing import List, Optional, Tuple
+import random
+
+from knowledge.base_conocimientos import Experiencia
+from knowledge.codificacion import CodificadorEstados
+from knowledge.memoria_experiencias import MemoriaExperiencias
+
+
+class ArbolSuma:
+    """
+    Árbol de sumas sobre un arreglo (heap implícito).
+    
+    Las hojas guardan la prioridad de cada posición y cada nodo interno la
+    suma de sus hijos, así que muestrear proporcionalmente a la prioridad y
+    actualizar una prioridad cuestan O(log n). El número de hojas se
+    redondea a potencia de 2 para que queden en orden de izquierda a derecha.
+    """
+    
+    def __init__(self, capacidad: int):
+        """
+        Inicializa el árbol con todas las prioridades en 0.
+        
+        Args:
+            capacidad: Número de hojas
+        """
+        if capacidad <= 0:
+            raise ValueError(f"La capacidad debe ser positiva, recibido: {capacidad}")
+        
+        self.capacidad = capacidad
+        self._hojas = 1 << (capacidad - 1).bit_length()
+        self._arbol = array('d', [0.0]) * (2 * self._hojas)
+    
+    def actualizar(self, indice: int, prioridad: float):
+        """
+        Cambia la prioridad de una hoja y propaga la diferencia hacia la raíz.
+        
+        Args:
+            indice: Índice de la hoja (0 <= indice < capacidad)
+            prioridad: Nueva prioridad (>= 0)
+        """
+        if prioridad < 0:
+            raise ValueError(f"La prioridad no puede ser negativa, recibido: {prioridad}")
+        if not 0 <= indice < self.capacidad:
+            raise IndexError(f"Índice fuera de rango: {indice}")
+        
+        nodo = indice + self._hojas
+        diferencia = prioridad - self._arbol[nodo]
+        while nodo >= 1:
+            self._arbol[nodo] += diferencia
+            nodo //= 2
+    
+    def buscar(self, valor: float) -> int:
+        """
+        Busca la hoja cuya suma acumulada contiene a `valor`.
+        
+        Args:
+            valor: Valor en [0, total())
+        
+        Returns:
+            Índice de la hoja
+        """
+        arbol = self._arbol
+        nodo = 1
+        while nodo < self._hojas:
+            izquierdo = 2 * nodo
+            # Nunca se baja a un subárbol vacío (protege contra errores de redondeo)
+            if valor < arbol[izquierdo] or arbol[izquierdo + 1] <= 0:
+                nodo = izquierdo
+            else:
+                valor -= arbol[izquierdo]
+                nodo = izquierdo + 1
+        return nodo - self._hojas
+    
+    def total(self) -> float:
+        """Retorna la suma de todas las prioridades"""
+        return self._arbol[1]
+    
+    def __getitem__(self, indice: int) -> float:
+        """Retorna la prioridad de una hoja"""
+        return self._arbol[indice + self._hojas]
+
+
+class RepeticionPriorizada:
+    """
+    Memoria de repetición con priorización proporcional (PER).
+    
+    Cada transición se muestrea con probabilidad P(i) = p_i / Σ p_k, donde
+    p_i = (|error TD| + epsilon_prioridad) ^ alpha_prioridad. Los pesos de
+    importancia (N × P(i)) ^ -beta corrigen el sesgo del muestreo.
+    
+    Las experiencias se guardan en una MemoriaExperiencias (buffer circular)
+    y el árbol de sumas se indexa con la misma posición física.
+    """
+    
+    def __init__(self, capacidad: int = 10000,
+                 tamano_lote: int = 32,
+                 proporcion_repeticion: float = 1.0,
+                 alpha_prioridad: float = 0.6,
+                 beta_inicial: float = 0.4,
+                 epsilon_prioridad: float = 0.01,
+                 codificador: Optional[CodificadorEstados] = None):
+        """
+        Inicializa la memoria de repetición.
+        
+        Args:
+            capacidad: Máximo de transiciones guardadas
+            tamano_lote: Transiciones repetidas en cada lote
+            proporcion_repeticion: Actualizaciones repetidas por cada paso real
+                                   (se ejecutan en lotes de tamano_lote)
+            alpha_prioridad: Cuánto influye el error TD (0 = muestreo uniforme)
+            beta_inicial: Corrección de importancia al inicio (sube hasta 1)
+            epsilon_prioridad: Prioridad mínima para no olvidar transiciones
+            codificador: Codificador de estados (default: según Abrevadero.RADIO)
+        """
+        if tamano_lote <= 0:
+            raise ValueError(f"El tamaño de lote debe ser positivo, recibido: {tamano_lote}")
+        if proporcion_repeticion < 0:
+            raise ValueError(f"La proporción no puede ser negativa, recibido: {proporcion_repeticion}")
+        
+        self.memoria = MemoriaExperiencias(capacidad, codificador)
+        self.arbol = ArbolSuma(capacidad)
+        
+        self.tamano_lote = tamano_lote
+        self.proporcion_repeticion = proporcion_repeticion
+        self.alpha_prioridad = alpha_prioridad
+        self.beta_inicial = beta_inicial
+        self.beta = beta_inicial
+        self.epsilon_prioridad = epsilon_prioridad
+        
+        self.prioridad_maxima = 1.0
+        self.credito = 0.0
+    
+    def prioridad(self, error_td: float) -> float:
+        """
+        Convierte un error TD en prioridad.
+        
+        Args:
+            error_td: Error de diferencia temporal
+        
+        Returns:
+            Prioridad (> 0)
+        """
+        return (abs(error_td) + self.epsilon_prioridad) ** self.alpha_prioridad
+    
+    def agregar(self, experiencia: Experiencia):
+        """
+        Agrega una transición con la prioridad máxima vista.
+        
+        Así cada transición nueva se repite al menos una vez pronto.
+        
+        Args:
+            experiencia: Transición a guardar
+        """
+        self.memoria.append(experiencia)
+        self.arbol.actualizar(self.memoria.indice_fisico(-1), self.prioridad_maxima)
+    
+    def muestrear(self, tamano: Optional[int] = None) -> List[Tuple[int, Experiencia, float]]:
+        """
+        Muestrea un lote estratificado proporcional a la prioridad.
+        
+        Args:
+            tamano: Tamaño del lote (default: tamano_lote)
+        
+        Returns:
+            Lista de (indice, experiencia, peso_importancia); los pesos se
+            normalizan para que el mayor del lote valga 1
+        """
+        if len(self.memoria) == 0:
+            return []
+        
+        tamano = tamano or self.tamano_lote
+        total = self.arbol.total()
+        segmento = total / tamano
+        n = len(self.memoria)
+        
+        lote = []
+        for j in range(tamano):
+            valor = random.uniform(segmento * j, segmento * (j + 1))
+            indice = self.arbol.buscar(min(valor, total * (1 - 1e-12)))
+            probabilidad = self.arbol[indice] / total
+            peso = (n * probabilidad) ** -self.beta
+            lote.append((indice, self.memoria.materializar(indice), peso))
+        
+        peso_maximo = max(peso for _, _, peso in lote)
+        return [(indice, experiencia, peso / peso_maximo) for indice, experiencia, peso in lote]
+    
+    def actualizar_prioridad(self, indice: int, error_td: float):
+        """
+        Actualiza la prioridad de una transición tras repetirla.
+        
+        Args:
+            indice: Índice devuelto por muestrear
+            error_td: Nuevo error TD de la transición
+        """
+        prioridad = self.prioridad(error_td)
+        self.arbol.actualizar(indice, prioridad)
+        if prioridad > self.prioridad_maxima:
+            self.prioridad_maxima = prioridad
+    
+    def lotes_pendientes(self) -> int:
+        """
+        Suma el crédito de un paso real y retorna cuántos lotes tocan ahora.
+        
+        Returns:
+            Número de lotes a repetir en este paso
+        """
+        self.credito += self.proporcion_repeticion
+        lotes = int(self.credito // self.tamano_lote)
+        self.credito -= lotes * self.tamano_lote
+        return lotes
+    
+    def ajustar_beta(self, progreso: float):
+        """
+        Sube beta linealmente hasta 1 según el progreso del entrenamiento.
+        
+        Args:
+            progreso: Progreso del entrenamiento (0-1)
+        """
+        self.beta = self.beta_inicial + (1.0 - self.beta_inicial) * progreso
+    
+    def configuracion(self) -> dict:
+        """
+        Obtiene los parámetros para crear una memoria equivalente (vacía).
+        
+        Returns:
+            Diccionario con los argumentos del constructor
+        """
+        return {
+            'capacidad': self.memoria.capacidad,
+            'tamano_lote': self.tamano_lote,
+            'proporcion_repeticion': self.proporcion_repeticion,
+            'alpha_prioridad': self.alpha_prioridad,
+            'beta_inicial': self.beta_inicial,
+            'epsilon_prioridad': self.epsilon_prioridad
+        }
+    
+    def __len__(self) -> int:
+        """Retorna el número de transiciones guardadas"""
+        return len(self.memoria)
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        return (f"RepeticionPriorizada(Guardadas={len(self.memoria)}/{self.memoria.capacidad}, "
+                f"Lote={self.tamano_lote}, Proporción={self.proporcion_repeticion})")
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    from knowledge.base_conocimientos import Estado
+    
+    print("=== Pruebas de Repetición Priorizada ===\n")
+    
+    arbol = ArbolSuma(4)
+    for indice, prioridad in enumerate([1.0, 2.0, 3.0, 4.0]):
+        arbol.actualizar(indice, prioridad)
+    
+    conteo = [0] * 4
+    for _ in range(10000):
+        conteo[arbol.buscar(random.uniform(0, arbol.total()))] += 1
+    print(f"Total del árbol: {arbol.total()}")
+    print(f"Frecuencias (esperado ~1:2:3:4): {conteo}\n")
+    
+    repeticion = RepeticionPriorizada(capacidad=100, tamano_lote=4)
+    estado1 = Estado(1, 5.0, "ver_frente", False, True)
+    estado2 = Estado(1, 4.0, "beber_agua", True, False)
+    for i in range(10):
+        repeticion.agregar(Experiencia(estado1, "avanzar", float(i), estado2, False))
+    
+    print(f"{repeticion}")
+    for indice, experiencia, peso in repeticion.muestrear():
+        print(f"  [{indice}] recompensa={experiencia.recompensa} peso={peso:.2f}")
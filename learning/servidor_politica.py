@@ -0,0 +1,457 @@
+"""
+Módulo del servidor de política.
+Sirve la política greedy de un checkpoint por un socket local (asyncio),
+con consultas por lotes y recarga al aparecer un checkpoint más reciente.
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
+import socket
+import time
+
+from knowledge.base_conocimientos import Estado
+from knowledge.codificacion import CodificadorEstados, ACCIONES_LEON
+from learning.politica import PoliticaCompilada, CODIGO_DESCONOCIDO
+
+
+# Tamaño máximo de una línea de solicitud (lotes grandes caben en una línea)
+LIMITE_LINEA = 64 * 1024 * 1024
+
+# Latencias guardadas para calcular percentiles
+VENTANA_LATENCIAS = 10000
+
+
+class _Modelo:
+    """Política compilada de un checkpoint; se reemplaza completa al recargar"""
+    
+    def __init__(self, politica: PoliticaCompilada, entrada: Dict):
+        self.politica = politica
+        self.archivo = entrada['archivo']
+        self.mtime_ns = entrada.get('mtime_ns')
+        self.cargado = time.time()
+
+
+def _percentil(ordenadas: List[float], fraccion: float) -> float:
+    """Percentil por el método del rango más cercano"""
+    if not ordenadas:
+        return 0.0
+    indice = min(len(ordenadas) - 1, max(0, int(round(fraccion * len(ordenadas))) - 1))
+    return ordenadas[indice]
+
+
+class ServidorPolitica:
+    """
+    Servidor de inferencia de la política greedy.
+    
+    Protocolo: una solicitud JSON por línea y una respuesta JSON por línea.
+    
+        {"id": 1, "estados": [...], "incluir_q": true}
+            -> {"id": 1, "acciones": [...], "valores_q": [[...], ...], "checkpoint": "..."}
+        {"tipo": "estadisticas"} -> latencias (percentiles), solicitudes, checkpoint
+        {"tipo": "ping"} -> {"ok": true, "checkpoint": "..."}
+    
+    Cada estado puede ser un código entero, una lista
+    [posicion_leon, distancia_impala, accion_impala, leon_escondido,
+    impala_puede_ver] o un diccionario como Estado.to_dict. Los estados
+    que el codificador no representa reciben la acción por defecto y
+    valores Q en cero.
+    
+    El checkpoint servido es el más reciente del catálogo de ruta_modelos.
+    Un ciclo en segundo plano revisa el catálogo (un stat por archivo) y,
+    si aparece uno más nuevo, lo carga y compila en un hilo y reemplaza el
+    modelo con una sola asignación: cada solicitud se responde completa con
+    el modelo anterior o con el nuevo.
+    """
+    
+    def __init__(self, ruta_modelos: str = "modelos",
+                 ruta_socket: Optional[str] = None,
+                 host: str = "127.0.0.1",
+                 puerto: int = 8765,
+                 intervalo_recarga: float = 2.0):
+        """
+        Inicializa el servidor (no carga ni escucha hasta iniciar).
+        
+        Args:
+            ruta_modelos: Directorio con los checkpoints
+            ruta_socket: Ruta de un socket Unix (si se da, no se usa TCP)
+            host: Dirección TCP local
+            puerto: Puerto TCP (0 = uno libre, ver direccion)
+            intervalo_recarga: Segundos entre revisiones del catálogo
+        """
+        self.ruta_modelos = ruta_modelos
+        self.ruta_socket = ruta_socket
+        self.host = host
+        self.puerto = puerto
+        self.intervalo_recarga = intervalo_recarga
+        
+        self.direccion: Optional[Any] = None
+        self.solicitudes = 0
+        self.estados_consultados = 0
+        self.errores = 0
+        self.recargas = 0
+        
+        self._modelo: Optional[_Modelo] = None
+        self._latencias: deque = deque(maxlen=VENTANA_LATENCIAS)
+        self._inicio = time.time()
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._tarea_recarga: Optional[asyncio.Task] = None
+    
+    # ------------------------------------------------------------------
+    # Modelo
+    # ------------------------------------------------------------------
+    
+    def _entrada_mas_reciente(self) -> Optional[Dict]:
+        """
+        Entrada del catálogo del checkpoint escrito más recientemente (None si no hay).
+        
+        Se elige por la fecha de modificación del archivo y no por la fecha
+        guardada en sus metadatos, que puede faltar o venir de otra máquina.
+        """
+        from storage.catalogo import CatalogoCheckpoints
+        
+        entradas = CatalogoCheckpoints(self.ruta_modelos).listar()
+        return max(entradas, key=lambda e: e['mtime_ns']) if entradas else None
+    
+    def _cargar(self, entrada: Dict) -> Optional[_Modelo]:
+        """Carga y compila un checkpoint (corre fuera del ciclo de eventos)"""
+        from storage.carga import cargar_conocimiento
+        
+        base = cargar_conocimiento(os.path.join(self.ruta_modelos, entrada['archivo']))
+        if base is None:
+            return None
+        radio = (entrada.get('abrevadero') or {}).get('RADIO')
+        codificador = CodificadorEstados(radio) if radio else None
+        return _Modelo(PoliticaCompilada.desde_base(base, codificador), entrada)
+    
+    def recargar_si_hay_nuevo(self) -> bool:
+        """
+        Carga el checkpoint más reciente si es distinto del servido.
+        
+        Returns:
+            True si se reemplazó el modelo
+        """
+        entrada = self._entrada_mas_reciente()
+        if entrada is None:
+            return False
+        actual = self._modelo
+        if actual is not None and actual.archivo == entrada['archivo'] and \
+                actual.mtime_ns == entrada.get('mtime_ns'):
+            return False
+        
+        modelo = self._cargar(entrada)
+        if modelo is None:
+            self.errores += 1
+            return False
+        self._modelo = modelo  # Reemplazo atómico: una sola asignación
+        self.recargas += 1
+        return True
+    
+    async def _ciclo_recarga(self):
+        """Revisa el catálogo periódicamente y recarga en un hilo"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.intervalo_recarga)
+            try:
+                await loop.run_in_executor(None, self.recargar_si_hay_nuevo)
+            except Exception as e:
+                self.errores += 1
+                print(f"Error al recargar checkpoint: {e}")
+    
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _codificar(politica: PoliticaCompilada, estado: Any) -> int:
+        """Código de un estado recibido como entero, lista o diccionario"""
+        if isinstance(estado, bool):
+            raise TypeError("Un estado no puede ser booleano")
+        if isinstance(estado, int):
+            return estado if 0 <= estado < politica.codificador.num_estados else CODIGO_DESCONOCIDO
+        if isinstance(estado, list):
+            estado = Estado(*estado)
+        else:
+            estado = Estado.from_dict(estado)
+        return politica.codificar(estado)
+    
+    def consultar(self, estados: List[Any], incluir_q: bool = True) -> Dict:
+        """
+        Responde una consulta por lotes con el modelo actual.
+        
+        Args:
+            estados: Estados en cualquiera de los formatos del protocolo
+            incluir_q: Si True, incluye la fila de valores Q de cada estado
+        
+        Returns:
+            Diccionario con acciones, valores_q (opcional) y checkpoint
+        """
+        modelo = self._modelo
+        if modelo is None:
+            raise RuntimeError(f"No hay checkpoints en {self.ruta_modelos}")
+        
+        politica = modelo.politica
+        tabla, q = politica.tabla, politica.q
+        num_acciones = politica.codificador.num_acciones
+        num_estados = politica.codificador.num_estados
+        codificar = self._codificar
+        
+        acciones = []
+        filas = [] if incluir_q else None
+        for estado in estados:
+            codigo = codificar(politica, estado)
+            if codigo < 0:
+                codigo = num_estados
+            acciones.append(ACCIONES_LEON[tabla[codigo]])
+            if incluir_q:
+                filas.append(q[codigo * num_acciones:(codigo + 1) * num_acciones].tolist())
+        
+        self.estados_consultados += len(estados)
+        respuesta = {'acciones': acciones, 'checkpoint': modelo.archivo}
+        if incluir_q:
+            respuesta['valores_q'] = filas
+        return respuesta
+    
+    def responder(self, mensaje: Dict) -> Dict:
+        """
+        Procesa una solicitud ya decodificada.
+        
+        Args:
+            mensaje: Solicitud del protocolo
+        
+        Returns:
+            Respuesta (con "error" si la solicitud no es válida)
+        """
+        if not isinstance(mensaje, dict):
+            self.errores += 1
+            return {'error': f"La solicitud debe ser un objeto JSON, no {type(mensaje).__name__}"}
+        
+        tipo = mensaje.get('tipo', 'consulta')
+        try:
+            if tipo == 'consulta':
+                respuesta = self.consultar(mensaje['estados'], mensaje.get('incluir_q', True))
+            elif tipo == 'estadisticas':
+                respuesta = self.obtener_estadisticas()
+            elif tipo == 'ping':
+                modelo = self._modelo
+                respuesta = {'ok': True, 'checkpoint': modelo.archivo if modelo else None}
+            else:
+                raise ValueError(f"Tipo de solicitud desconocido: {tipo}")
+        except Exception as e:
+            # Cualquier fallo se responde como error: una solicitud mala no
+            # debe cerrar la conexión
+            self.errores += 1
+            respuesta = {'error': f"{type(e).__name__}: {e}"}
+        
+        if 'id' in mensaje:
+            respuesta['id'] = mensaje['id']
+        return respuesta
+    
+    async def _atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        """Atiende una conexión: una respuesta por cada línea recibida"""
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                inicio = time.perf_counter()
+                try:
+                    respuesta = self.responder(json.loads(linea))
+                except json.JSONDecodeError as e:
+                    self.errores += 1
+                    respuesta = {'error': f"JSON inválido: {e}"}
+                except Exception as e:
+                    self.errores += 1
+                    respuesta = {'error': f"{type(e).__name__}: {e}"}
+                escritor.write(json.dumps(respuesta, separators=(',', ':')).encode() + b'\n')
+                self._latencias.append(time.perf_counter() - inicio)
+                self.solicitudes += 1
+                await escritor.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            escritor.close()
+    
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    
+    async def iniciar(self):
+        """Carga el checkpoint más reciente y empieza a escuchar"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.recargar_si_hay_nuevo)
+        
+        if self.ruta_socket:
+            if os.path.exists(self.ruta_socket):
+                os.remove(self.ruta_socket)
+            self._servidor = await asyncio.start_unix_server(
+                self._atender, path=self.ruta_socket, limit=LIMITE_LINEA
+            )
+            self.direccion = self.ruta_socket
+        else:
+            self._servidor = await asyncio.start_server(
+                self._atender, self.host, self.puerto, limit=LIMITE_LINEA
+            )
+            self.direccion = self._servidor.sockets[0].getsockname()[:2]
+        
+        self._tarea_recarga = asyncio.create_task(self._ciclo_recarga())
+    
+    async def detener(self):
+        """Deja de escuchar y cancela la recarga"""
+        if self._tarea_recarga is not None:
+            self._tarea_recarga.cancel()
+            self._tarea_recarga = None
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+        if self.ruta_socket and os.path.exists(self.ruta_socket):
+            os.remove(self.ruta_socket)
+    
+    async def servir(self):
+        """Inicia el servidor y atiende hasta que se cancele"""
+        await self.iniciar()
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.detener()
+    
+    def obtener_estadisticas(self) -> Dict:
+        """
+        Obtiene estadísticas del servidor.
+        
+        Returns:
+            Diccionario con solicitudes, estados consultados, errores,
+            recargas, checkpoint y latencias en milisegundos (p50, p90,
+            p99, máxima) de las últimas VENTANA_LATENCIAS solicitudes
+        """
+        latencias = sorted(self._latencias)
+        modelo = self._modelo
+        return {
+            'checkpoint': modelo.archivo if modelo else None,
+            'solicitudes': self.solicitudes,
+            'estados_consultados': self.estados_consultados,
+            'errores': self.errores,
+            'recargas': self.recargas,
+            'segundos_activo': round(time.time() - self._inicio, 2),
+            'latencia_ms': {
+                'p50': round(_percentil(latencias, 0.50) * 1000, 4),
+                'p90': round(_percentil(latencias, 0.90) * 1000, 4),
+                'p99': round(_percentil(latencias, 0.99) * 1000, 4),
+                'maxima': round((latencias[-1] if latencias else 0.0) * 1000, 4),
+            }
+        }
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        modelo = self._modelo
+        return (f"ServidorPolitica(Dirección={self.direccion}, "
+                f"Checkpoint={modelo.archivo if modelo else None}, Solicitudes={self.solicitudes})")
+
+
+class ClientePolitica:
+    """
+    Cliente síncrono mínimo del servidor de política.
+    
+    Solo usa socket y json, así que otra simulación puede copiarlo sin
+    depender del resto del proyecto.
+    """
+    
+    def __init__(self, direccion: Any, tiempo_espera: float = 10.0):
+        """
+        Conecta con el servidor.
+        
+        Args:
+            direccion: Ruta del socket Unix o tupla (host, puerto)
+            tiempo_espera: Segundos máximos por operación
+        """
+        if isinstance(direccion, str):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.settimeout(tiempo_espera)
+        self._socket.connect(tuple(direccion) if not isinstance(direccion, str) else direccion)
+        self._archivo = self._socket.makefile('rwb')
+        self._siguiente_id = 0
+    
+    def solicitar(self, mensaje: Dict) -> Dict:
+        """
+        Envía una solicitud y espera su respuesta.
+        
+        Args:
+            mensaje: Solicitud del protocolo
+        
+        Returns:
+            Respuesta del servidor
+        """
+        self._archivo.write(json.dumps(mensaje, separators=(',', ':')).encode() + b'\n')
+        self._archivo.flush()
+        linea = self._archivo.readline()
+        if not linea:
+            raise ConnectionError("El servidor cerró la conexión")
+        return json.loads(linea)
+    
+    def consultar(self, estados: List[Any], incluir_q: bool = True) -> Tuple[List[str], Optional[List]]:
+        """
+        Consulta la mejor acción (y valores Q) de un lote de estados.
+        
+        Args:
+            estados: Códigos, listas o diccionarios de estado
+            incluir_q: Si True, pide también los valores Q
+        
+        Returns:
+            Tupla (acciones, valores_q o None)
+        """
+        self._siguiente_id += 1
+        respuesta = self.solicitar({'id': self._siguiente_id, 'estados': estados, 'incluir_q': incluir_q})
+        if 'error' in respuesta:
+            raise ValueError(respuesta['error'])
+        return respuesta['acciones'], respuesta.get('valores_q')
+    
+    def estadisticas(self) -> Dict:
+        """Obtiene las estadísticas del servidor"""
+        return self.solicitar({'tipo': 'estadisticas'})
+    
+    def cerrar(self):
+        """Cierra la conexión"""
+        self._archivo.close()
+        self._socket.close()
+    
+    def __enter__(self) -> 'ClientePolitica':
+        return self
+    
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Servidor de la política greedy del león")
+    parser.add_argument("--modelos", default="modelos", help="Directorio de checkpoints")
+    parser.add_argument("--socket", help="Ruta de un socket Unix (por defecto TCP local)")
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección TCP")
+    parser.add_argument("--puerto", type=int, default=8765, help="Puerto TCP")
+    parser.add_argument("--intervalo", type=float, default=2.0,
+                        help="Segundos entre revisiones de checkpoints nuevos")
+    args = parser.parse_args()
+    
+    servidor = ServidorPolitica(args.modelos, args.socket, args.host, args.puerto, args.intervalo)
+    
+    async def principal():
+        await servidor.iniciar()
+        print(f"{servidor}")
+        print("Ctrl+C para detener")
+        try:
+            await servidor._servidor.serve_forever()
+        finally:
+            await servidor.detener()
+            print(f"\n{json.dumps(servidor.obtener_estadisticas(), indent=2, ensure_ascii=False)}")
+    
+    try:
+        asyncio.run(principal())
+    except KeyboardInterrupt:
+        pass
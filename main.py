@@ -5,13 +5,13 @@ Punto de entrada principal del programa
 
 import sys
 import os
-import json
 
 # Agregar el directorio actual al path de Python
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from ui.entrenamiento_ui import EntrenamientoUI
 from storage.carga import cargar_conocimiento
+from storage.catalogo import CatalogoCheckpoints
 
 
 def menu_principal():
@@ -102,19 +102,16 @@ def modo_visualizacion_terminal_grid():
             from storage.carga import cargar_conocimiento
             import os
             
-            # Buscar archivos de conocimiento disponibles
+            # Buscar archivos de conocimiento disponibles (en el catálogo)
             ruta_datos = "modelos"
-            archivos = []
-            if os.path.exists(ruta_datos):
-                archivos = sorted([f for f in os.listdir(ruta_datos) if f.endswith("_conocimiento.json")])
+            entradas = sorted(CatalogoCheckpoints(ruta_datos).listar(), key=lambda e: e['fecha'])
+            archivos = [entrada['archivo'] for entrada in entradas]
             
             if archivos:
                 print("\n📂 Bases de conocimiento disponibles:")
-                for i, archivo in enumerate(archivos, 1):
-                    # Obtener tamaño del archivo
-                    ruta = os.path.join(ruta_datos, archivo)
-                    tamaño_kb = os.path.getsize(ruta) / 1024
-                    print(f"   {i}. {archivo} ({tamaño_kb:.1f} KB)")
+                for i, entrada in enumerate(entradas, 1):
+                    tamaño_kb = entrada['tamano_bytes'] / 1024
+                    print(f"   {i}. {entrada['archivo']} ({tamaño_kb:.1f} KB)")
                 
                 # Preguntar cuál usar
                 seleccion = input(f"\n¿Cuál usar? (1-{len(archivos)}, Enter={len(archivos)}): ").strip()
@@ -131,18 +128,8 @@ def modo_visualizacion_terminal_grid():
                 ruta_completa = os.path.join(ruta_datos, archivo_seleccionado)
                 print(f"\n📥 Cargando: {archivo_seleccionado}")
                 
-                # Cargar también el archivo de configuración para verificar el RADIO
-                archivo_config = archivo_seleccionado.replace("_conocimiento.json", "_config.json")
-                ruta_config = os.path.join(ruta_datos, archivo_config)
-                radio_entrenamiento = None
-                if os.path.exists(ruta_config):
-                    try:
-                        with open(ruta_config, 'r') as f:
-                            config_data = json.load(f)
-                            if 'abrevadero' in config_data:
-                                radio_entrenamiento = config_data['abrevadero'].get('RADIO')
-                    except:
-                        pass
+                # RADIO de entrenamiento según el catálogo
+                radio_entrenamiento = (entradas[indice]['abrevadero'] or {}).get('RADIO')
                 
                 base_conocimientos = cargar_conocimiento(ruta_completa)
                 if base_conocimientos:
@@ -258,19 +245,16 @@ def modo_visualizacion_grid():
             from storage.carga import cargar_conocimiento
             import os
             
-            # Buscar archivos de conocimiento disponibles
+            # Buscar archivos de conocimiento disponibles (en el catálogo)
             ruta_datos = "modelos"
-            archivos = []
-            if os.path.exists(ruta_datos):
-                archivos = sorted([f for f in os.listdir(ruta_datos) if f.endswith("_conocimiento.json")])
+            entradas = sorted(CatalogoCheckpoints(ruta_datos).listar(), key=lambda e: e['fecha'])
+            archivos = [entrada['archivo'] for entrada in entradas]
             
             if archivos:
                 print("\n📂 Bases de conocimiento disponibles:")
-                for i, archivo in enumerate(archivos, 1):
-                    # Obtener tamaño del archivo
-                    ruta = os.path.join(ruta_datos, archivo)
-                    tamaño_kb = os.path.getsize(ruta) / 1024
-                    print(f"   {i}. {archivo} ({tamaño_kb:.1f} KB)")
+                for i, entrada in enumerate(entradas, 1):
+                    tamaño_kb = entrada['tamano_bytes'] / 1024
+                    print(f"   {i}. {entrada['archivo']} ({tamaño_kb:.1f} KB)")
                 
                 # Preguntar cuál usar
                 seleccion = input(f"\n¿Cuál usar? (1-{len(archivos)}, Enter={len(archivos)}): ").strip()
@@ -287,18 +271,8 @@ def modo_visualizacion_grid():
                 ruta_completa = os.path.join(ruta_datos, archivo_seleccionado)
                 print(f"\n📥 Cargando: {archivo_seleccionado}")
                 
-                # Cargar también el archivo de configuración para verificar el RADIO
-                archivo_config = archivo_seleccionado.replace("_conocimiento.json", "_config.json")
-                ruta_config = os.path.join(ruta_datos, archivo_config)
-                radio_entrenamiento = None
-                if os.path.exists(ruta_config):
-                    try:
-                        with open(ruta_config, 'r') as f:
-                            config_data = json.load(f)
-                            if 'abrevadero' in config_data:
-                                radio_entrenamiento = config_data['abrevadero'].get('RADIO')
-                    except:
-                        pass
+                # RADIO de entrenamiento según el catálogo
+                radio_entrenamiento = (entradas[indice]['abrevadero'] or {}).get('RADIO')
                 
                 base_conocimientos = cargar_conocimiento(ruta_completa)
                 if base_conocimientos:
@@ -3,11 +3,13 @@
 from .caceria import Caceria, ResultadoCaceria
 from .tiempo import TiempoSimulacion
 from .verificador import Verificador, CondicionHuida
+from .caceria_lote import CaceriaLote
 
 __all__ = [
     'Caceria', 
     'ResultadoCaceria', 
     'TiempoSimulacion', 
     'Verificador', 
-    'CondicionHuida'
+    'CondicionHuida',
+    'CaceriaLote'
 ]
@@ -5,6 +5,7 @@ Orquesta una incursión completa de cacería del león.
 
 from enum import Enum
 from typing import List, Optional, Tuple
+import math
 import random
 
 from environment import Abrevadero, Direccion
@@ -36,14 +37,19 @@ class Caceria:
     # Máximo de unidades de tiempo para una cacería
     MAX_TIEMPO = 50
     
-    def __init__(self, abrevadero: Abrevadero):
+    def __init__(self, abrevadero: Abrevadero, silenciosa: bool = False):
         """
         Inicializa una cacería.
         
         Args:
             abrevadero: Instancia del abrevadero
+            silenciosa: Si True, ejecuta los turnos en modo rápido: sin
+                        descripciones narrativas, sin snapshots del mundo y
+                        sin historia (para entrenamiento). Las interfaces
+                        usan el modo completo (default).
         """
         self.abrevadero = abrevadero
+        self.silenciosa = silenciosa
         self.tiempo = TiempoSimulacion()
         self.verificador = Verificador(abrevadero)
         
@@ -52,6 +58,7 @@ class Caceria:
         
         self.resultado: ResultadoCaceria = ResultadoCaceria.EN_PROGRESO
         self.razon_finalizacion: str = ""
+        self.condicion_huida: CondicionHuida = CondicionHuida.NO_HUYE
     
     def inicializar_caceria(self, posicion_inicial_leon: int,
                            comportamiento_impala: ModoBehaviorImpala = ModoBehaviorImpala.ALEATORIO,
@@ -71,6 +78,7 @@ class Caceria:
         
         self.resultado = ResultadoCaceria.EN_PROGRESO
         self.razon_finalizacion = ""
+        self.condicion_huida = CondicionHuida.NO_HUYE
         
         # Configurar comportamiento del impala
         self.comportamiento_impala = comportamiento_impala
@@ -92,11 +100,15 @@ class Caceria:
             accion_leon: Acción que ejecutará el león
             
         Returns:
-            Tupla (caceria_terminada, mensaje)
+            Tupla (caceria_terminada, mensaje). En modo silencioso el
+            mensaje es siempre "" (el resultado queda en self.resultado).
         """
         if self.resultado != ResultadoCaceria.EN_PROGRESO:
             return True, self.razon_finalizacion
         
+        if self.silenciosa:
+            return self._ejecutar_turno_silencioso(accion_leon), ""
+        
         # Avanzar tiempo
         self.tiempo.avanzar_tiempo()
         
@@ -108,6 +120,68 @@ class Caceria:
         desc_leon = self.leon.ejecutar_accion(accion_leon)
         
         # Actualizar posición exacta del león si avanzó o atacó
+        self._actualizar_posicion_leon(accion_leon)
+        
+        # 3. VERIFICAR CONDICIONES DEL MUNDO
+        resultado_verificacion = self._verificar_mundo(accion_impala)
+        
+        # 4. REGISTRAR EVENTO
+        estado_mundo = self.verificador.obtener_estado_mundo(self.leon, self.impala)
+        self.tiempo.registrar_evento(desc_impala, desc_leon, resultado_verificacion, estado_mundo)
+        
+        # 5. VERIFICAR FIN DE CACERÍA
+        terminada, mensaje = self._verificar_fin_caceria()
+        
+        return terminada, mensaje
+    
+    def _ejecutar_turno_silencioso(self, accion_leon: AccionLeon) -> bool:
+        """
+        Ejecuta un turno sin narrativa, snapshots ni historia.
+        
+        Aplica exactamente las mismas reglas que ejecutar_turno.
+        
+        Args:
+            accion_leon: Acción que ejecutará el león
+        
+        Returns:
+            True si la cacería terminó en este turno
+        """
+        self.tiempo.avanzar_tiempo()
+        
+        # 1. IMPALA ACTÚA PRIMERO
+        accion_impala = self._obtener_accion_impala()
+        self.impala.aplicar_accion(accion_impala)
+        
+        # 2. LEÓN REACCIONA
+        self.leon.aplicar_accion(accion_leon)
+        self._actualizar_posicion_leon(accion_leon)
+        
+        # 3. VERIFICAR CONDICIONES DEL MUNDO
+        debe_huir, condicion = self.verificador.verificar_condicion_huida(
+            self.leon, self.impala, accion_impala
+        )
+        if debe_huir and not self.impala.esta_huyendo:
+            self.impala.posicion_leon_detectada = self.leon.posicion
+            self.impala.aplicar_accion(AccionImpala.HUIR)
+            self.condicion_huida = condicion
+        
+        # 4. VERIFICAR FIN DE CACERÍA
+        if self.verificador.verificar_exito_caceria(self.leon, self.impala):
+            self.resultado = ResultadoCaceria.EXITO
+        elif (self.verificador.verificar_fracaso_caceria(self.leon, self.impala) or
+              self.tiempo.tiempo_actual >= self.MAX_TIEMPO):
+            self.resultado = ResultadoCaceria.FRACASO
+        else:
+            return False
+        return True
+    
+    def _actualizar_posicion_leon(self, accion_leon: AccionLeon):
+        """
+        Actualiza la posición exacta del león si avanzó o atacó.
+        
+        Args:
+            accion_leon: Acción ejecutada por el león
+        """
         if accion_leon == AccionLeon.AVANZAR:
             # Avanzar 1 cuadro
             if self.leon.posicion_exacta:
@@ -132,18 +206,6 @@ class Caceria:
                 pos_inicial = self.abrevadero.obtener_coordenadas(self.leon.posicion)
                 nueva_pos = self._calcular_avance_desde_posicion(pos_inicial, 2)
             self.leon.actualizar_posicion_exacta(nueva_pos)
-        
-        # 3. VERIFICAR CONDICIONES DEL MUNDO
-        resultado_verificacion = self._verificar_mundo(accion_impala)
-        
-        # 4. REGISTRAR EVENTO
-        estado_mundo = self.verificador.obtener_estado_mundo(self.leon, self.impala)
-        self.tiempo.registrar_evento(desc_impala, desc_leon, resultado_verificacion, estado_mundo)
-        
-        # 5. VERIFICAR FIN DE CACERÍA
-        terminada, mensaje = self._verificar_fin_caceria()
-        
-        return terminada, mensaje
     
     def _obtener_accion_impala(self) -> AccionImpala:
         """
@@ -184,8 +246,6 @@ class Caceria:
         Returns:
             Nueva posición (x, y)
         """
-        import math
-        
         x, y = posicion_actual
         centro_x, centro_y = self.abrevadero.CENTRO
         
@@ -227,6 +287,7 @@ class Caceria:
             
             # Forzar huida del impala
             self.impala.ejecutar_accion(AccionImpala.HUIR)
+            self.condicion_huida = condicion
             
             razones = {
                 CondicionHuida.LEON_VISIBLE: "¡Impala detecta al león! Inicia huida",
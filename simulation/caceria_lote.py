@@ -0,0 +1,479 @@
+"""
+Módulo de cacería por lotes.
+Ejecuta N cacerías en paralelo (en lockstep) usando arreglos.
+"""
+
+from array import array
+from typing import Callable, List, Optional, Sequence
+import math
+import random
+
+from environment import Abrevadero
+from agents.leon import Leon, AccionLeon
+from agents.impala import AccionImpala
+from simulation.caceria import Caceria, ResultadoCaceria, ModoBehaviorImpala
+from simulation.verificador import CondicionHuida
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+# Códigos numéricos de las acciones del león (en el orden de AccionLeon)
+ACCIONES_LEON = (AccionLeon.AVANZAR, AccionLeon.ESCONDERSE, AccionLeon.ATACAR)
+AVANZAR, ESCONDERSE, ATACAR = 0, 1, 2
+
+# Códigos numéricos de las acciones del impala (en el orden de AccionImpala)
+ACCIONES_IMPALA = tuple(AccionImpala)
+VER_IZQUIERDA, VER_DERECHA, VER_FRENTE, BEBER_AGUA, HUIR = range(5)
+
+# Códigos de resultado
+RESULTADOS = (ResultadoCaceria.EN_PROGRESO, ResultadoCaceria.EXITO, ResultadoCaceria.FRACASO)
+EN_PROGRESO, EXITO, FRACASO = 0, 1, 2
+
+# Códigos de la condición que provocó la huida
+CONDICIONES = (CondicionHuida.NO_HUYE, CondicionHuida.LEON_VISIBLE,
+               CondicionHuida.LEON_ATACA, CondicionHuida.DISTANCIA_MINIMA)
+NO_HUYE, LEON_VISIBLE, LEON_ATACA, DISTANCIA_MINIMA = range(4)
+
+# Distancia a la que el ataque alcanza al impala (ver Verificador)
+DISTANCIA_CAPTURA = 0.5
+
+
+def codificar_accion_leon(accion) -> int:
+    """
+    Convierte una acción del león (enum, string o código) a su código numérico.
+    
+    Args:
+        accion: AccionLeon, nombre de la acción ("avanzar") o código (0-2)
+    
+    Returns:
+        Código numérico de la acción
+    """
+    if isinstance(accion, AccionLeon):
+        return ACCIONES_LEON.index(accion)
+    if isinstance(accion, str):
+        return ACCIONES_LEON.index(AccionLeon(accion))
+    return int(accion)
+
+
+class CaceriaLote:
+    """
+    Ejecuta N cacerías simultáneas con las mismas reglas que Caceria y Verificador.
+    
+    El estado de cada cacería se guarda en arreglos paralelos (posición del
+    león en su rayo, banderas escondido/atacando, dirección de la vista del
+    impala, velocidad de huida, turno y resultado). Usa NumPy si está
+    instalado y el módulo array en caso contrario.
+    
+    Las coordenadas se redondean a 2 decimales igual que en Caceria; con
+    NumPy el redondeo usa np.round, que puede diferir de round() en empates
+    exactos del tercer decimal.
+    """
+    
+    MAX_TIEMPO = Caceria.MAX_TIEMPO
+    
+    def __init__(self, abrevadero: Abrevadero, num_cacerias: int,
+                 comportamiento_impala: ModoBehaviorImpala = ModoBehaviorImpala.ALEATORIO,
+                 secuencia_impala: Optional[List[AccionImpala]] = None,
+                 usar_numpy: Optional[bool] = None,
+                 semilla: Optional[int] = None):
+        """
+        Inicializa el lote de cacerías.
+        
+        Args:
+            abrevadero: Instancia del abrevadero
+            num_cacerias: Número de cacerías simultáneas (N)
+            comportamiento_impala: Modo de comportamiento del impala
+            secuencia_impala: Secuencia programada de acciones (si modo PROGRAMADO)
+            usar_numpy: Forzar (True) o evitar (False) NumPy; None = automático
+            semilla: Semilla para la aleatoriedad del impala
+        """
+        if num_cacerias <= 0:
+            raise ValueError(f"El lote debe tener al menos una cacería, recibido: {num_cacerias}")
+        if usar_numpy and np is None:
+            raise ValueError("NumPy no está instalado")
+        
+        self.abrevadero = abrevadero
+        self.n = num_cacerias
+        self.usar_numpy = (np is not None) if usar_numpy is None else usar_numpy
+        
+        self.comportamiento_impala = comportamiento_impala
+        if comportamiento_impala == ModoBehaviorImpala.PROGRAMADO:
+            if not secuencia_impala:
+                raise ValueError("Modo PROGRAMADO requiere secuencia_impala")
+            self.secuencia_impala = [ACCIONES_IMPALA.index(a) for a in secuencia_impala]
+        else:
+            self.secuencia_impala = None
+        
+        self._random = random.Random(semilla)
+        if self.usar_numpy:
+            self._rng = np.random.default_rng(semilla)
+        
+        self.reiniciar([1] * num_cacerias)
+    
+    def reiniciar(self, posiciones_iniciales: Sequence[int]):
+        """
+        Reinicia todas las cacerías del lote.
+        
+        Args:
+            posiciones_iniciales: Posición inicial del león (1-8) para cada cacería
+        """
+        if len(posiciones_iniciales) != self.n:
+            raise ValueError(f"Se esperaban {self.n} posiciones, recibido: {len(posiciones_iniciales)}")
+        
+        # Tablas de geometría del abrevadero (se reconstruyen si cambió RADIO)
+        self.abrevadero.actualizar_tablas()
+        self.distancias_posiciones = self.abrevadero.distancias_posiciones
+        self.tabla_vision = self.abrevadero.tabla_vision
+        if self.usar_numpy:
+            self._distancias_np = np.asarray(self.distancias_posiciones)
+            self._vision_np = np.asarray(self.tabla_vision, dtype=bool)
+        
+        xs = []
+        ys = []
+        for posicion in posiciones_iniciales:
+            x, y = self.abrevadero.obtener_coordenadas(posicion)
+            xs.append(x)
+            ys.append(y)
+        
+        if self.usar_numpy:
+            self.posicion = np.asarray(posiciones_iniciales, dtype=np.int8)
+            self.x = np.asarray(xs, dtype=np.float64)
+            self.y = np.asarray(ys, dtype=np.float64)
+            self.escondido = np.zeros(self.n, dtype=bool)
+            self.atacando = np.zeros(self.n, dtype=bool)
+            self.direccion = np.zeros(self.n, dtype=np.int16)
+            self.huyendo = np.zeros(self.n, dtype=bool)
+            self.velocidad_huida = np.zeros(self.n, dtype=np.int16)
+            self.tiempo = np.zeros(self.n, dtype=np.int16)
+            self.resultado = np.zeros(self.n, dtype=np.int8)
+            self.condicion = np.zeros(self.n, dtype=np.int8)
+            self.indice_secuencia = np.zeros(self.n, dtype=np.int32)
+        else:
+            self.posicion = array('b', posiciones_iniciales)
+            self.x = array('d', xs)
+            self.y = array('d', ys)
+            self.escondido = array('b', bytes(self.n))
+            self.atacando = array('b', bytes(self.n))
+            self.direccion = array('h', [0]) * self.n
+            self.huyendo = array('b', bytes(self.n))
+            self.velocidad_huida = array('h', [0]) * self.n
+            self.tiempo = array('h', [0]) * self.n
+            self.resultado = array('b', bytes(self.n))
+            self.condicion = array('b', bytes(self.n))
+            self.indice_secuencia = array('l', [0]) * self.n
+    
+    def ejecutar_turno(self, acciones) -> Sequence[bool]:
+        """
+        Ejecuta un turno en todas las cacerías que siguen en progreso.
+        
+        Args:
+            acciones: Código de acción del león (0=avanzar, 1=esconderse,
+                      2=atacar) para cada cacería. Las cacerías ya terminadas
+                      ignoran su acción.
+        
+        Returns:
+            Arreglo booleano con las cacerías que terminaron en este turno
+        """
+        if len(acciones) != self.n:
+            raise ValueError(f"Se esperaban {self.n} acciones, recibido: {len(acciones)}")
+        
+        if self.usar_numpy:
+            return self._turno_numpy(np.asarray(acciones, dtype=np.int8))
+        return self._turno_array(acciones)
+    
+    # Alias con el nombre habitual de los entornos de RL
+    step = ejecutar_turno
+    
+    def _acciones_impala_numpy(self, tranquilos):
+        """Sortea o lee de la secuencia la acción de cada impala tranquilo"""
+        if self.secuencia_impala is None:
+            return self._rng.integers(0, 4, size=self.n, dtype=np.int8)
+        
+        secuencia = np.asarray(self.secuencia_impala, dtype=np.int8)
+        acciones = secuencia[self.indice_secuencia % len(secuencia)]
+        self.indice_secuencia[tranquilos] += 1
+        return acciones
+    
+    def _turno_numpy(self, acciones):
+        """Implementación vectorizada del turno con NumPy"""
+        activas = self.resultado == EN_PROGRESO
+        self.tiempo[activas] += 1
+        
+        # 1. IMPALA ACTÚA PRIMERO
+        continuan_huida = activas & self.huyendo
+        tranquilos = activas & ~self.huyendo
+        self.velocidad_huida[continuan_huida] += 1
+        
+        accion_impala = self._acciones_impala_numpy(tranquilos)
+        accion_impala = np.where(self.huyendo, HUIR, accion_impala)
+        
+        gira_izq = tranquilos & (accion_impala == VER_IZQUIERDA)
+        gira_der = tranquilos & (accion_impala == VER_DERECHA)
+        self.direccion[gira_izq] = (self.direccion[gira_izq] - 90) % 360
+        self.direccion[gira_der] = (self.direccion[gira_der] + 90) % 360
+        
+        # HUIR dentro de una secuencia programada
+        inicia_huida = tranquilos & (accion_impala == HUIR)
+        self.huyendo[inicia_huida] = True
+        self.velocidad_huida[inicia_huida] = 1
+        
+        # 2. LEÓN REACCIONA
+        pueden_actuar = activas & ~self.atacando
+        avanza = activas & (acciones == AVANZAR)
+        self.escondido[pueden_actuar & (acciones == AVANZAR)] = False
+        self.escondido[pueden_actuar & (acciones == ESCONDERSE)] = True
+        inicia_ataque = pueden_actuar & (acciones == ATACAR)
+        self.atacando[inicia_ataque] = True
+        self.escondido[inicia_ataque] = False
+        
+        # Movimiento: AVANZAR tiene prioridad aunque el león ya esté atacando
+        cuadros = np.zeros(self.n, dtype=np.float64)
+        cuadros[avanza] = Leon.VELOCIDAD_AVANCE
+        cuadros[activas & ~avanza & self.atacando] = Leon.VELOCIDAD_ATAQUE
+        self._mover_numpy(cuadros)
+        
+        # 3. VERIFICAR CONDICIONES DEL MUNDO
+        pueden_huir = activas & ~self.huyendo
+        condicion = np.full(self.n, NO_HUYE, dtype=np.int8)
+        
+        distancia_anillo = self._distancias_np[self.posicion]
+        visible = self._leon_en_vision_numpy()
+        ve_leon = (accion_impala != BEBER_AGUA) & ~self.escondido & visible
+        
+        condicion[pueden_huir & ve_leon] = LEON_VISIBLE
+        condicion[pueden_huir & (distancia_anillo < self.abrevadero.DISTANCIA_MINIMA_HUIDA)] = DISTANCIA_MINIMA
+        condicion[pueden_huir & self.atacando] = LEON_ATACA
+        
+        detectado = condicion != NO_HUYE
+        self.huyendo[detectado] = True
+        self.velocidad_huida[detectado] = 1
+        self.condicion[detectado] = condicion[detectado]
+        
+        # 4. VERIFICAR FIN DE CACERÍA
+        distancia = np.sqrt(self.x * self.x + self.y * self.y)
+        exito = activas & self.atacando & (distancia <= DISTANCIA_CAPTURA)
+        fracaso = activas & ~exito & (
+            (self.huyendo & (self.velocidad_huida > Leon.VELOCIDAD_ATAQUE)) |
+            (self.tiempo >= self.MAX_TIEMPO)
+        )
+        self.resultado[exito] = EXITO
+        self.resultado[fracaso] = FRACASO
+        
+        return exito | fracaso
+    
+    def _mover_numpy(self, cuadros):
+        """Avanza a cada león `cuadros` hacia el centro sin pasarse"""
+        distancia = np.sqrt(self.x * self.x + self.y * self.y)
+        mover = (cuadros > 0) & (distancia > 0)
+        if not mover.any():
+            return
+        
+        d = distancia[mover]
+        avance = np.minimum(cuadros[mover], d)
+        self.x[mover] = np.round(self.x[mover] + (-self.x[mover] / d) * avance, 2)
+        self.y[mover] = np.round(self.y[mover] + (-self.y[mover] / d) * avance, 2)
+    
+    def _leon_en_vision_numpy(self):
+        """Evalúa la tabla de visibilidad posición×dirección para todo el lote"""
+        return self._vision_np[self.direccion // 45, self.posicion - 1]
+    
+    def _turno_array(self, acciones) -> List[bool]:
+        """Implementación con el módulo array (sin NumPy)"""
+        distancias_posiciones = self.distancias_posiciones
+        tabla_vision = self.tabla_vision
+        distancia_minima = self.abrevadero.DISTANCIA_MINIMA_HUIDA
+        velocidad_ataque = Leon.VELOCIDAD_ATAQUE
+        velocidad_avance = Leon.VELOCIDAD_AVANCE
+        max_tiempo = self.MAX_TIEMPO
+        secuencia = self.secuencia_impala
+        aleatorio = self._random.randrange
+        sqrt = math.sqrt
+        
+        posicion = self.posicion
+        x = self.x
+        y = self.y
+        escondido = self.escondido
+        atacando = self.atacando
+        direccion = self.direccion
+        huyendo = self.huyendo
+        velocidad_huida = self.velocidad_huida
+        tiempo = self.tiempo
+        resultado = self.resultado
+        
+        terminadas = [False] * self.n
+        
+        for i in range(self.n):
+            if resultado[i] != EN_PROGRESO:
+                continue
+            tiempo[i] += 1
+            
+            # 1. IMPALA ACTÚA PRIMERO
+            if huyendo[i]:
+                accion_impala = HUIR
+                velocidad_huida[i] += 1
+            else:
+                if secuencia is None:
+                    accion_impala = aleatorio(4)
+                else:
+                    accion_impala = secuencia[self.indice_secuencia[i] % len(secuencia)]
+                    self.indice_secuencia[i] += 1
+                
+                if accion_impala == VER_IZQUIERDA:
+                    direccion[i] = (direccion[i] - 90) % 360
+                elif accion_impala == VER_DERECHA:
+                    direccion[i] = (direccion[i] + 90) % 360
+                elif accion_impala == HUIR:
+                    huyendo[i] = 1
+                    velocidad_huida[i] = 1
+            
+            # 2. LEÓN REACCIONA
+            accion = acciones[i]
+            if not atacando[i]:
+                if accion == AVANZAR:
+                    escondido[i] = 0
+                elif accion == ESCONDERSE:
+                    escondido[i] = 1
+                elif accion == ATACAR:
+                    atacando[i] = 1
+                    escondido[i] = 0
+            
+            # Movimiento: AVANZAR tiene prioridad aunque el león ya esté atacando
+            if accion == AVANZAR:
+                cuadros = velocidad_avance
+            elif atacando[i]:
+                cuadros = velocidad_ataque
+            else:
+                cuadros = 0
+            
+            xi = x[i]
+            yi = y[i]
+            distancia = sqrt(xi * xi + yi * yi)
+            if cuadros and distancia > 0:
+                avance = min(cuadros, distancia)
+                xi = round(xi + (-xi / distancia) * avance, 2)
+                yi = round(yi + (-yi / distancia) * avance, 2)
+                x[i] = xi
+                y[i] = yi
+                distancia = sqrt(xi * xi + yi * yi)
+            
+            # 3. VERIFICAR CONDICIONES DEL MUNDO
+            if not huyendo[i]:
+                if atacando[i]:
+                    condicion = LEON_ATACA
+                elif distancias_posiciones[posicion[i]] < distancia_minima:
+                    condicion = DISTANCIA_MINIMA
+                elif (accion_impala != BEBER_AGUA and not escondido[i]
+                      and tabla_vision[direccion[i] // 45][posicion[i] - 1]):
+                    condicion = LEON_VISIBLE
+                else:
+                    condicion = NO_HUYE
+                
+                if condicion != NO_HUYE:
+                    huyendo[i] = 1
+                    velocidad_huida[i] = 1
+                    self.condicion[i] = condicion
+            
+            # 4. VERIFICAR FIN DE CACERÍA
+            if atacando[i] and distancia <= DISTANCIA_CAPTURA:
+                resultado[i] = EXITO
+                terminadas[i] = True
+            elif (huyendo[i] and velocidad_huida[i] > velocidad_ataque) or tiempo[i] >= max_tiempo:
+                resultado[i] = FRACASO
+                terminadas[i] = True
+        
+        return terminadas
+    
+    def ejecutar_hasta_terminar(self, estrategia: Callable[['CaceriaLote'], Sequence[int]]) -> Sequence[int]:
+        """
+        Ejecuta turnos hasta que todas las cacerías terminen.
+        
+        Args:
+            estrategia: Función que recibe el lote y devuelve el código de
+                        acción del león para cada cacería
+        
+        Returns:
+            Arreglo con el código de resultado de cada cacería
+        """
+        while not self.todas_terminadas():
+            self.ejecutar_turno(estrategia(self))
+        return self.resultado
+    
+    def distancias(self) -> Sequence[float]:
+        """
+        Calcula la distancia actual león-impala de cada cacería.
+        
+        Returns:
+            Arreglo con las distancias
+        """
+        if self.usar_numpy:
+            return np.sqrt(self.x * self.x + self.y * self.y)
+        return array('d', [math.sqrt(x * x + y * y) for x, y in zip(self.x, self.y)])
+    
+    def todas_terminadas(self) -> bool:
+        """Indica si ya no queda ninguna cacería en progreso"""
+        if self.usar_numpy:
+            return not (self.resultado == EN_PROGRESO).any()
+        return EN_PROGRESO not in self.resultado
+    
+    def obtener_resultados(self) -> List[ResultadoCaceria]:
+        """
+        Convierte los códigos de resultado a ResultadoCaceria.
+        
+        Returns:
+            Lista con el resultado de cada cacería
+        """
+        return [RESULTADOS[int(r)] for r in self.resultado]
+    
+    def obtener_resumen(self) -> dict:
+        """
+        Obtiene un resumen agregado del lote.
+        
+        Returns:
+            Diccionario con conteos y duración media
+        """
+        resultados = [int(r) for r in self.resultado]
+        terminadas = [int(t) for t, r in zip(self.tiempo, resultados) if r != EN_PROGRESO]
+        
+        return {
+            'cacerias': self.n,
+            'exitosas': resultados.count(EXITO),
+            'fallidas': resultados.count(FRACASO),
+            'en_progreso': resultados.count(EN_PROGRESO),
+            'duracion_media': round(sum(terminadas) / len(terminadas), 2) if terminadas else 0.0
+        }
+    
+    def __len__(self) -> int:
+        """Retorna el número de cacerías del lote"""
+        return self.n
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        backend = "numpy" if self.usar_numpy else "array"
+        return f"CaceriaLote(N={self.n}, Backend={backend})"
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    import time
+    
+    print("=== Pruebas de Cacería por Lotes ===\n")
+    
+    abrevadero = Abrevadero()
+    lote = CaceriaLote(abrevadero, 10000, semilla=42)
+    lote.reiniciar([random.randint(1, 8) for _ in range(len(lote))])
+    print(f"{lote}\n")
+    
+    # Estrategia simple: avanzar hasta estar cerca, luego atacar
+    def estrategia_simple(lote):
+        return [ATACAR if d < 4 else AVANZAR for d in lote.distancias()]
+    
+    inicio = time.time()
+    lote.ejecutar_hasta_terminar(estrategia_simple)
+    duracion = time.time() - inicio
+    
+    for key, value in lote.obtener_resumen().items():
+        print(f"  {key}: {value}")
+    print(f"\n  {len(lote) / duracion:.0f} cacerías/seg")
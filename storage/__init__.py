@@ -2,10 +2,23 @@
 
 from .guardado import guardar_conocimiento, guardar_estado_completo
 from .carga import cargar_conocimiento, cargar_estado_completo
+from .binario import guardar_binario, cargar_binario
+from .registro_cambios import RegistroCambios
+from .guardado_asincrono import GuardadoAsincrono
+from .catalogo import CatalogoCheckpoints
+from .importacion import importar_json_en_flujo
+from .fusion import fusionar_varios
 
 __all__ = [
     'guardar_conocimiento',
     'guardar_estado_completo',
     'cargar_conocimiento',
-    'cargar_estado_completo'
+    'cargar_estado_completo',
+    'guardar_binario',
+    'cargar_binario',
+    'RegistroCambios',
+    'GuardadoAsincrono',
+    'CatalogoCheckpoints',
+    'importar_json_en_flujo',
+    'fusionar_varios'
 ]
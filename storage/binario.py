@@ -0,0 +1,379 @@
+"""
+Módulo de checkpoints binarios.
+Guarda la tabla Q en un formato binario compacto que se carga con mmap sin parsear.
+"""
+
+from array import array
+from datetime import datetime
+from typing import Dict, Optional
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+from environment import Abrevadero
+from knowledge.base_conocimientos import BaseConocimientos
+from knowledge.base_densa import BaseConocimientosDensa
+from knowledge.codificacion import CodificadorEstados
+
+
+# Identificador del formato (primeros bytes del archivo)
+MAGIA = b'LVIQ'
+VERSION = 1
+
+# Sufijo de los archivos de conocimiento binarios
+EXTENSION = '.bin'
+
+# Cabecera fija (little-endian):
+#   magia, versión, orden de bytes de los arreglos (0 = little, 1 = big),
+#   RADIO, ANGULO_VISION, DISTANCIA_MINIMA_HUIDA,
+#   num_distancias, num_estados, num_acciones, pares conocidos, estados conocidos,
+#   experiencias guardadas, total_experiencias, cacerías exitosas, cacerías fallidas,
+#   longitud de los metadatos JSON
+_CABECERA = struct.Struct('<4sHHdddIIIIIIqqqI4x')
+
+_ORDEN_NATIVO = 0 if sys.byteorder == 'little' else 1
+
+
+def _alinear(tamano: int) -> int:
+    """Redondea un tamaño al múltiplo de 8 siguiente"""
+    return (tamano + 7) & ~7
+
+
+def _secciones(num_pares: int, num_estados: int, num_experiencias: int,
+               inicio: int) -> Dict[str, tuple]:
+    """
+    Calcula la posición de cada arreglo dentro del archivo.
+    
+    Args:
+        num_pares: Tamaño de la tabla (num_estados × num_acciones)
+        num_estados: Número de estados del codificador
+        num_experiencias: Experiencias guardadas
+        inicio: Posición donde empieza el primer arreglo
+    
+    Returns:
+        Diccionario nombre -> (desplazamiento, formato, elementos)
+    """
+    secciones = {}
+    desplazamiento = inicio
+    for nombre, formato, elementos in (
+        ('q', 'd', num_pares),
+        ('visitas', 'q', num_pares),
+        ('recompensas', 'd', num_experiencias),
+        ('estados', 'i', num_experiencias),
+        ('siguientes_estados', 'i', num_experiencias),
+        ('conocidos', 'B', num_pares),
+        ('acciones_por_estado', 'B', num_estados),
+        ('acciones', 'b', num_experiencias),
+        ('terminales', 'B', num_experiencias),
+        ('exitos', 'B', num_experiencias),
+    ):
+        secciones[nombre] = (desplazamiento, formato, elementos)
+        desplazamiento = _alinear(desplazamiento + struct.calcsize(formato) * elementos)
+    return secciones
+
+
+def es_binario(ruta_archivo: str) -> bool:
+    """
+    Verifica si un archivo es un checkpoint binario.
+    
+    Args:
+        ruta_archivo: Ruta del archivo
+    
+    Returns:
+        True si empieza con la firma del formato
+    """
+    try:
+        with open(ruta_archivo, 'rb') as f:
+            return f.read(len(MAGIA)) == MAGIA
+    except OSError:
+        return False
+
+
+def guardar_binario(base_conocimientos: BaseConocimientos,
+                    ruta_archivo: str,
+                    incluir_experiencias: bool = True,
+                    metadata: Optional[Dict] = None) -> bool:
+    """
+    Guarda la base de conocimientos en formato binario.
+    
+    Las bases que no son densas (o usan otro RADIO) se convierten primero a
+    BaseConocimientosDensa. El archivo se escribe en un temporal y se
+    renombra, así que un corte a mitad de escritura no deja un archivo roto.
+    
+    Args:
+        base_conocimientos: Base de conocimientos a guardar
+        ruta_archivo: Ruta del archivo de destino
+        incluir_experiencias: Si incluir las experiencias recientes
+        metadata: Metadatos adicionales (se guardan como JSON en la cabecera)
+    
+    Returns:
+        True si se guardó exitosamente
+    """
+    try:
+        escribir_binario(base_conocimientos, ruta_archivo, incluir_experiencias, metadata)
+        return True
+    
+    except Exception as e:
+        print(f"Error al guardar conocimiento binario: {e}")
+        return False
+
+
+def escribir_binario(base_conocimientos: BaseConocimientos,
+                     ruta_archivo: str,
+                     incluir_experiencias: bool = True,
+                     metadata: Optional[Dict] = None) -> Dict:
+    """
+    Escribe un checkpoint binario (ver guardar_binario) y describe lo escrito.
+    
+    El checksum se calcula sobre los bytes a medida que se escriben, sin
+    volver a leer el archivo.
+    
+    Args:
+        base_conocimientos: Base de conocimientos a guardar
+        ruta_archivo: Ruta del archivo de destino
+        incluir_experiencias: Si incluir las experiencias recientes
+        metadata: Metadatos adicionales (se guardan como JSON en la cabecera)
+    
+    Returns:
+        Diccionario con metadata, abrevadero y checksum ("sha256:<hex>") del archivo
+    """
+    directorio = os.path.dirname(ruta_archivo)
+    if directorio and not os.path.exists(directorio):
+        os.makedirs(directorio)
+    
+    codificador = CodificadorEstados(Abrevadero.RADIO)
+    base = base_conocimientos
+    if not (isinstance(base, BaseConocimientosDensa) and base.codificador.es_compatible(codificador)):
+        base = BaseConocimientosDensa.desde_base(base, codificador)
+    codificador = base.codificador
+    
+    # Experiencias en orden lógico (de la más antigua a la más reciente);
+    # las que el codificador no representa no caben en el formato
+    memoria = base.experiencias
+    posiciones = []
+    if incluir_experiencias:
+        posiciones = [memoria.indice_fisico(i) for i in range(len(memoria))]
+        posiciones = [i for i in posiciones if memoria.codificada(i)]
+    num_experiencias = len(posiciones)
+    
+    datos_metadata = {
+        'fecha_guardado': datetime.now().isoformat(),
+        'version': '1.0',
+        'estadisticas': base.obtener_estadisticas()
+    }
+    datos_metadata.update(metadata or {})
+    bytes_metadata = json.dumps(datos_metadata, ensure_ascii=False).encode('utf-8')
+    
+    cabecera = _CABECERA.pack(
+        MAGIA, VERSION, _ORDEN_NATIVO,
+        Abrevadero.RADIO, Abrevadero.ANGULO_VISION, Abrevadero.DISTANCIA_MINIMA_HUIDA,
+        codificador.num_distancias, codificador.num_estados, codificador.num_acciones,
+        base._num_pares, base._num_estados, num_experiencias,
+        base.total_experiencias, base.cacerias_exitosas, base.cacerias_fallidas,
+        len(bytes_metadata)
+    )
+    inicio = _alinear(len(cabecera) + len(bytes_metadata))
+    secciones = _secciones(len(base._q), codificador.num_estados, num_experiencias, inicio)
+    
+    arreglos = {
+        'q': base._q,
+        'visitas': base._visitas,
+        'conocidos': base._conocidos,
+        'acciones_por_estado': base._acciones_por_estado,
+    }
+    for nombre in ('recompensas', 'estados', 'siguientes_estados', 'acciones'):
+        columna = getattr(memoria, nombre)
+        arreglos[nombre] = array(columna.typecode, (columna[i] for i in posiciones))
+    for nombre in ('terminales', 'exitos'):
+        columna = getattr(memoria, nombre)
+        arreglos[nombre] = bytearray(columna[i] for i in posiciones)
+    
+    resumen = hashlib.sha256()
+    ruta_temporal = ruta_archivo + '.tmp'
+    with open(ruta_temporal, 'wb') as f:
+        def escribir(bloque):
+            f.write(bloque)
+            resumen.update(bloque)
+        
+        escribir(cabecera)
+        escribir(bytes_metadata)
+        for nombre, (desplazamiento, _, _) in secciones.items():
+            escribir(bytes(desplazamiento - f.tell()))
+            escribir(memoryview(arreglos[nombre]).cast('B'))
+    os.replace(ruta_temporal, ruta_archivo)
+    
+    return {
+        'metadata': datos_metadata,
+        'abrevadero': {
+            'RADIO': Abrevadero.RADIO,
+            'ANGULO_VISION': Abrevadero.ANGULO_VISION,
+            'DISTANCIA_MINIMA_HUIDA': Abrevadero.DISTANCIA_MINIMA_HUIDA
+        },
+        'checksum': f"sha256:{resumen.hexdigest()}"
+    }
+
+
+def leer_cabecera(ruta_archivo: str) -> Dict:
+    """
+    Lee solo la cabecera y los metadatos de un checkpoint binario.
+    
+    Args:
+        ruta_archivo: Ruta del archivo
+    
+    Returns:
+        Diccionario con parámetros del abrevadero, dimensiones, contadores y metadata
+    """
+    with open(ruta_archivo, 'rb') as f:
+        cabecera = f.read(_CABECERA.size)
+        if len(cabecera) < _CABECERA.size or cabecera[:len(MAGIA)] != MAGIA:
+            raise ValueError(f"No es un checkpoint binario: {ruta_archivo}")
+        
+        (_, version, orden, radio, angulo, distancia_minima,
+         num_distancias, num_estados, num_acciones, pares_conocidos, estados_conocidos,
+         num_experiencias, total_experiencias, exitosas, fallidas,
+         longitud_metadata) = _CABECERA.unpack(cabecera)
+        
+        if version > VERSION:
+            raise ValueError(f"Versión de checkpoint no soportada: {version}")
+        
+        metadata = json.loads(f.read(longitud_metadata).decode('utf-8'))
+    
+    return {
+        'version_formato': version,
+        'orden_bytes': orden,
+        'abrevadero': {
+            'RADIO': radio,
+            'ANGULO_VISION': angulo,
+            'DISTANCIA_MINIMA_HUIDA': distancia_minima
+        },
+        'num_distancias': num_distancias,
+        'num_estados': num_estados,
+        'num_acciones': num_acciones,
+        'pares_conocidos': pares_conocidos,
+        'estados_conocidos': estados_conocidos,
+        'num_experiencias': num_experiencias,
+        'total_experiencias': total_experiencias,
+        'cacerias_exitosas': exitosas,
+        'cacerias_fallidas': fallidas,
+        'inicio_datos': _alinear(_CABECERA.size + longitud_metadata),
+        'metadata': metadata
+    }
+
+
+def cargar_binario(ruta_archivo: str, usar_mmap: bool = True) -> BaseConocimientosDensa:
+    """
+    Carga un checkpoint binario como BaseConocimientosDensa.
+    
+    Con usar_mmap=True la tabla se usa directamente sobre el archivo mapeado
+    en memoria (copia privada al escribir): no se lee ni se parsea nada hasta
+    que se consulta, y las actualizaciones no modifican el archivo.
+    
+    Args:
+        ruta_archivo: Ruta del archivo
+        usar_mmap: Si False, copia los arreglos a memoria propia
+    
+    Returns:
+        Base de conocimientos densa
+    """
+    info = leer_cabecera(ruta_archivo)
+    codificador = CodificadorEstados(info['abrevadero']['RADIO'])
+    if (codificador.num_distancias != info['num_distancias'] or
+            codificador.num_estados != info['num_estados']):
+        raise ValueError("Las dimensiones del checkpoint no coinciden con su RADIO")
+    
+    secciones = _secciones(info['num_estados'] * info['num_acciones'], info['num_estados'],
+                           info['num_experiencias'], info['inicio_datos'])
+    intercambiar = info['orden_bytes'] != _ORDEN_NATIVO
+    
+    with open(ruta_archivo, 'rb') as f:
+        if usar_mmap and not intercambiar:
+            datos = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+        else:
+            datos = memoryview(f.read())
+    
+    def leer(nombre: str, copiar: bool):
+        desplazamiento, formato, elementos = secciones[nombre]
+        fin = desplazamiento + struct.calcsize(formato) * elementos
+        if fin > len(datos):
+            raise ValueError(f"Checkpoint truncado (sección {nombre})")
+        vista = datos[desplazamiento:fin]
+        if not copiar:
+            return vista.cast(formato)
+        arreglo = array(formato)
+        arreglo.frombytes(vista)
+        if intercambiar:
+            arreglo.byteswap()
+        return arreglo
+    
+    copiar_tabla = not usar_mmap or intercambiar
+    base = BaseConocimientosDensa(codificador)
+    base.asignar_arreglos(
+        leer('q', copiar_tabla),
+        leer('visitas', copiar_tabla),
+        leer('conocidos', copiar_tabla),
+        leer('acciones_por_estado', copiar_tabla),
+        num_pares=info['pares_conocidos'],
+        num_estados=info['estados_conocidos']
+    )
+    
+    base.total_experiencias = info['total_experiencias']
+    base.cacerias_exitosas = info['cacerias_exitosas']
+    base.cacerias_fallidas = info['cacerias_fallidas']
+    
+    # Las experiencias se copian a la memoria circular (son pocas). Si no
+    # caben, se conservan las más recientes, como en el buffer circular;
+    # la columna terminales no se lee porque se deduce del siguiente estado
+    columnas = {nombre: leer(nombre, True)
+                for nombre in ('estados', 'acciones', 'recompensas', 'siguientes_estados',
+                               'exitos')}
+    memoria = base.experiencias
+    for i in range(max(0, info['num_experiencias'] - memoria.capacidad), info['num_experiencias']):
+        memoria.agregar_codificada(
+            columnas['estados'][i],
+            columnas['acciones'][i],
+            columnas['recompensas'][i],
+            columnas['siguientes_estados'][i],
+            columnas['exitos'][i]
+        )
+    
+    return base
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    import tempfile
+    import time
+    from knowledge.base_conocimientos import Estado, Experiencia
+    from knowledge.codificacion import ACCIONES_LEON
+    from storage.guardado import guardar_conocimiento
+    from storage.carga import cargar_conocimiento
+    
+    print("=== Pruebas de Checkpoints Binarios ===\n")
+    
+    # Tabla completa: todos los pares del espacio de estados
+    bc = BaseConocimientosDensa()
+    for codigo in range(bc.codificador.num_estados):
+        for accion in range(len(ACCIONES_LEON)):
+            bc.actualizar_valor_q_codigo(codigo, accion, codigo * 0.01 + accion)
+    bc.agregar_experiencia(Experiencia(Estado(1, 5.0, "ver_frente", False, True), "avanzar",
+                                       1.0, Estado(1, 4.0, "ver_frente", False, True), False))
+    print(f"Pares: {len(bc)}")
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        for sufijo in ('.json', EXTENSION):
+            ruta = os.path.join(directorio, f"prueba_conocimiento{sufijo}")
+            
+            inicio = time.perf_counter()
+            guardar_conocimiento(bc, ruta)
+            guardado = time.perf_counter() - inicio
+            
+            inicio = time.perf_counter()
+            cargada = cargar_conocimiento(ruta)
+            carga = time.perf_counter() - inicio
+            
+            print(f"{sufijo:5s}: {os.path.getsize(ruta) / 1024:8.1f} KB | "
+                  f"guardar {guardado * 1000:7.1f} ms | cargar {carga * 1000:7.1f} ms | "
+                  f"pares={len(cargada.q_table)}")
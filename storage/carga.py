@@ -5,17 +5,29 @@ Deserializa y carga el conocimiento del león.
 
 import json
 import os
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict
 
 from knowledge.base_conocimientos import BaseConocimientos
+from storage.binario import EXTENSION as EXTENSION_BINARIA, es_binario, cargar_binario, leer_cabecera
+from storage.importacion import importar_json_en_flujo, leer_resumen_json
 
 
-def cargar_conocimiento(ruta_archivo: str) -> Optional[BaseConocimientos]:
+def cargar_conocimiento(ruta_archivo: str,
+                        incluir_experiencias: bool = False,
+                        callback_progreso: Optional[Callable[[int, int, int], None]] = None
+                        ) -> Optional[BaseConocimientos]:
     """
-    Carga una base de conocimientos desde un archivo JSON.
+    Carga una base de conocimientos desde un archivo JSON o binario.
+    
+    El formato se detecta por la firma del archivo; los checkpoints binarios
+    se cargan con mmap como BaseConocimientosDensa. Los JSON se leen en
+    flujo (ver storage.importacion), sin cargar el documento completo.
     
     Args:
         ruta_archivo: Ruta del archivo a cargar
+        incluir_experiencias: Si True, importa también las experiencias recientes del JSON
+        callback_progreso: Función llamada con (bytes_leidos, bytes_totales, entradas_q)
+                           mientras se lee un JSON
         
     Returns:
         BaseConocimientos cargada o None si falló
@@ -25,15 +37,14 @@ def cargar_conocimiento(ruta_archivo: str) -> Optional[BaseConocimientos]:
             print(f"Archivo no encontrado: {ruta_archivo}")
             return None
         
-        # Leer archivo
-        with open(ruta_archivo, 'r', encoding='utf-8') as f:
-            json_data = f.read()
-        
-        # Crear base de conocimientos e importar
-        bc = BaseConocimientos()
-        bc.importar_desde_json(json_data)
+        if es_binario(ruta_archivo):
+            return cargar_binario(ruta_archivo)
         
-        return bc
+        return importar_json_en_flujo(
+            ruta_archivo,
+            incluir_experiencias=incluir_experiencias,
+            callback_progreso=callback_progreso
+        )
     
     except Exception as e:
         print(f"Error al cargar conocimiento: {e}")
@@ -57,6 +68,11 @@ def cargar_estado_completo(ruta_directorio: str,
         ruta_bc = os.path.join(ruta_directorio, f"{nombre_base}_conocimiento.json")
         ruta_config = os.path.join(ruta_directorio, f"{nombre_base}_config.json")
         
+        # Si no hay JSON, buscar el checkpoint binario
+        ruta_binaria = os.path.join(ruta_directorio, f"{nombre_base}_conocimiento{EXTENSION_BINARIA}")
+        if not os.path.exists(ruta_bc) and os.path.exists(ruta_binaria):
+            ruta_bc = ruta_binaria
+        
         # Verificar existencia
         if not os.path.exists(ruta_bc):
             print(f"No se encontró archivo de conocimiento: {ruta_bc}")
@@ -98,9 +114,23 @@ def validar_archivo_conocimiento(ruta_archivo: str) -> Dict:
         if not os.path.exists(ruta_archivo):
             return {'valido': False, 'error': 'Archivo no existe'}
         
-        # Leer y parsear JSON
-        with open(ruta_archivo, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Checkpoint binario: basta con la cabecera
+        if es_binario(ruta_archivo):
+            info = leer_cabecera(ruta_archivo)
+            metadata = info['metadata']
+            stats = metadata.get('estadisticas', {})
+            return {
+                'valido': True,
+                'fecha_guardado': metadata.get('fecha_guardado', 'Desconocida'),
+                'version': metadata.get('version', 'Desconocida'),
+                'estados_unicos': info['estados_conocidos'],
+                'pares_estado_accion': info['pares_conocidos'],
+                'tasa_exito': stats.get('tasa_exito', 0),
+                'total_experiencias': info['total_experiencias']
+            }
+        
+        # Leer el JSON en flujo, sin conservar la tabla ni las experiencias
+        data, _ = leer_resumen_json(ruta_archivo)
         
         # Verificar estructura básica
         campos_requeridos = ['q_table', 'estadisticas']
@@ -126,7 +156,8 @@ def validar_archivo_conocimiento(ruta_archivo: str) -> Dict:
             'total_experiencias': stats.get('total_experiencias', 0)
         }
     
-    except json.JSONDecodeError:
+    except ValueError:
+        # Incluye json.JSONDecodeError
         return {'valido': False, 'error': 'JSON inválido'}
     except Exception as e:
         return {'valido': False, 'error': str(e)}
@@ -138,6 +169,9 @@ def fusionar_conocimientos(bc1: BaseConocimientos,
     """
     Fusiona dos bases de conocimientos.
     
+    Para fusionar muchas bases de una vez (con visitas y verificación del
+    abrevadero) ver storage.fusion.fusionar_varios.
+    
     Args:
         bc1: Primera base de conocimientos
         bc2: Segunda base de conocimientos
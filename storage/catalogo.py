@@ -0,0 +1,460 @@
+"""
+Módulo de catálogo de checkpoints.
+Índice de los guardados de un directorio para listarlos sin abrir cada archivo.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+import threading
+
+from storage.binario import EXTENSION as EXTENSION_BINARIA, leer_cabecera
+from storage.importacion import leer_resumen_json
+
+
+NOMBRE_CATALOGO = 'catalogo.json'
+VERSION_CATALOGO = 1
+
+# Sufijos de los archivos de conocimiento que se catalogan
+SUFIJOS_CONOCIMIENTO = ('_conocimiento.json', '_conocimiento' + EXTENSION_BINARIA)
+
+# Un único escritor del catálogo por proceso
+_BLOQUEO = threading.Lock()
+
+
+def es_checkpoint(nombre_archivo: str) -> bool:
+    """
+    Indica si un archivo es un checkpoint de conocimiento catalogable.
+    
+    Args:
+        nombre_archivo: Nombre (o ruta) del archivo
+    
+    Returns:
+        True si termina en _conocimiento.json o _conocimiento.bin
+    """
+    return nombre_archivo.endswith(SUFIJOS_CONOCIMIENTO)
+
+
+def calcular_checksum(ruta_archivo: str) -> str:
+    """
+    Calcula el SHA-256 de un archivo leyéndolo por bloques.
+    
+    Args:
+        ruta_archivo: Ruta del archivo
+    
+    Returns:
+        Checksum con el formato "sha256:<hex>"
+    """
+    resumen = hashlib.sha256()
+    with open(ruta_archivo, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            resumen.update(bloque)
+    return f"sha256:{resumen.hexdigest()}"
+
+
+def marca_tiempo(entrada: Dict) -> float:
+    """
+    Obtiene el momento de guardado de una entrada como timestamp.
+    
+    Args:
+        entrada: Entrada del catálogo
+    
+    Returns:
+        Segundos desde la época según la fecha de guardado; si falta o no
+        se puede interpretar (p. ej. 'Desconocida'), la fecha de modificación
+    """
+    try:
+        return datetime.fromisoformat(entrada['fecha']).timestamp()
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return entrada['mtime_ns'] / 1e9
+
+
+class CatalogoCheckpoints:
+    """
+    Índice de los checkpoints de un directorio (modelos/catalogo.json).
+    
+    Por cada archivo de conocimiento guarda fecha, estadísticas, parámetros
+    del Abrevadero, estadísticas de Q-Learning (si hay _config.json), tamaño
+    y checksum. El guardado lo actualiza en cada checkpoint; listar solo
+    hace un stat por archivo y compara tamaño y fecha de modificación, así
+    que un archivo copiado, modificado o borrado a mano se reindexa (o se
+    descarta) sin volver a leer los demás. reconstruir() lo regenera desde
+    cero.
+    """
+    
+    def __init__(self, ruta_directorio: str):
+        """
+        Inicializa el catálogo (no lee ni escribe hasta usarlo).
+        
+        Args:
+            ruta_directorio: Directorio con los checkpoints
+        """
+        self.ruta_directorio = ruta_directorio
+        self.ruta = os.path.join(ruta_directorio, NOMBRE_CATALOGO)
+    
+    def listar(self) -> List[Dict]:
+        """
+        Obtiene las entradas del catálogo, sincronizadas con el directorio.
+        
+        Si el índice no se puede guardar (p. ej. directorio de solo
+        lectura) se listan igual las entradas sincronizadas en memoria.
+        
+        Returns:
+            Lista de entradas, la más reciente primero
+        """
+        if not os.path.isdir(self.ruta_directorio):
+            return []
+        
+        with _BLOQUEO:
+            entradas = self._leer()
+            cambios = self._sincronizar(entradas)
+            if cambios:
+                self._escribir_si_se_puede(entradas)
+        
+        return sorted(entradas.values(), key=marca_tiempo, reverse=True)
+    
+    def buscar(self, radio: Optional[float] = None,
+               tasa_exito_minima: Optional[float] = None,
+               formato: Optional[str] = None,
+               tolerancia_radio: float = 0.1) -> List[Dict]:
+        """
+        Filtra las entradas del catálogo.
+        
+        Args:
+            radio: Solo checkpoints entrenados con este RADIO
+            tasa_exito_minima: Tasa de éxito mínima (%)
+            formato: 'json' o 'bin'
+            tolerancia_radio: Diferencia máxima de RADIO para considerarlo igual
+        
+        Returns:
+            Entradas que cumplen todos los filtros, la más reciente primero
+        """
+        resultado = []
+        for entrada in self.listar():
+            if radio is not None and not self.es_compatible(entrada, radio, tolerancia_radio):
+                continue
+            if tasa_exito_minima is not None and \
+                    entrada['estadisticas'].get('tasa_exito', 0) < tasa_exito_minima:
+                continue
+            if formato is not None and entrada['formato'] != formato:
+                continue
+            resultado.append(entrada)
+        return resultado
+    
+    def obtener(self, nombre_archivo: str) -> Optional[Dict]:
+        """
+        Obtiene la entrada de un archivo.
+        
+        Args:
+            nombre_archivo: Nombre del archivo de conocimiento
+        
+        Returns:
+            Entrada del catálogo o None si no existe
+        """
+        for entrada in self.listar():
+            if entrada['archivo'] == nombre_archivo:
+                return entrada
+        return None
+    
+    def registrar(self, ruta_archivo: str, contenido: Optional[Dict] = None,
+                  **campos) -> Optional[Dict]:
+        """
+        Agrega o actualiza la entrada de un checkpoint recién guardado.
+        
+        Args:
+            ruta_archivo: Ruta del archivo de conocimiento
+            contenido: metadata, estadisticas, abrevadero y checksum tal como
+                       se escribieron; con ellos la entrada se arma sin leer
+                       el archivo (None = leerlo)
+            **campos: Campos adicionales de la entrada (p. ej. q_learning)
+        
+        Returns:
+            Entrada registrada (None si el archivo no es un checkpoint)
+        """
+        nombre = os.path.basename(ruta_archivo)
+        if not es_checkpoint(nombre):
+            return None
+        
+        with _BLOQUEO:
+            entradas = self._leer()
+            if contenido is None:
+                entrada = self._indexar(nombre, leer_config=True)
+            else:
+                entrada = self._crear_entrada(nombre, contenido, leer_config=True)
+            entrada.update(campos)
+            entradas[nombre] = entrada
+            self._escribir(entradas)
+        
+        return entrada
+    
+    def anotar(self, ruta_archivo: str, **campos) -> bool:
+        """
+        Agrega campos a una entrada ya registrada sin volver a leer el archivo.
+        
+        Args:
+            ruta_archivo: Ruta del archivo de conocimiento
+            **campos: Campos a agregar o reemplazar
+        
+        Returns:
+            True si la entrada existía
+        """
+        nombre = os.path.basename(ruta_archivo)
+        with _BLOQUEO:
+            entradas = self._leer()
+            if nombre not in entradas:
+                return False
+            entradas[nombre].update(campos)
+            self._escribir(entradas)
+        return True
+    
+    def reconstruir(self) -> int:
+        """
+        Regenera el catálogo leyendo todos los checkpoints del directorio.
+        
+        Returns:
+            Número de checkpoints catalogados
+        """
+        with _BLOQUEO:
+            entradas: Dict[str, Dict] = {}
+            self._sincronizar(entradas)
+            self._escribir_si_se_puede(entradas)
+        return len(entradas)
+    
+    def verificar(self, nombre_archivo: str) -> bool:
+        """
+        Comprueba que el contenido de un checkpoint coincide con su checksum.
+        
+        Args:
+            nombre_archivo: Nombre del archivo de conocimiento
+        
+        Returns:
+            True si el archivo existe y su checksum coincide con el catálogo
+        """
+        entrada = self.obtener(nombre_archivo)
+        if entrada is None:
+            return False
+        ruta = os.path.join(self.ruta_directorio, nombre_archivo)
+        return calcular_checksum(ruta) == entrada['checksum']
+    
+    @staticmethod
+    def es_compatible(entrada: Dict, radio: float, tolerancia: float = 0.1) -> bool:
+        """
+        Indica si un checkpoint se entrenó con un RADIO dado.
+        
+        Args:
+            entrada: Entrada del catálogo
+            radio: RADIO actual
+            tolerancia: Diferencia máxima aceptada
+        
+        Returns:
+            True si el RADIO del checkpoint es conocido y coincide
+        """
+        radio_entrenamiento = (entrada.get('abrevadero') or {}).get('RADIO')
+        return radio_entrenamiento is not None and abs(radio_entrenamiento - radio) <= tolerancia
+    
+    def _leer(self) -> Dict[str, Dict]:
+        """Lee el catálogo del disco (vacío si no existe o está dañado)"""
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            if datos.get('version') != VERSION_CATALOGO:
+                return {}
+            return datos['checkpoints']
+        except (OSError, ValueError, KeyError):
+            return {}
+    
+    def _escribir(self, entradas: Dict[str, Dict]):
+        """Escribe el catálogo de forma atómica"""
+        from storage.guardado import escribir_atomico
+        
+        datos = {
+            'version': VERSION_CATALOGO,
+            'actualizado': datetime.now().isoformat(),
+            'checkpoints': entradas
+        }
+        escribir_atomico(self.ruta, json.dumps(datos, indent=2, ensure_ascii=False))
+    
+    def _escribir_si_se_puede(self, entradas: Dict[str, Dict]) -> bool:
+        """
+        Escribe el catálogo sin propagar errores de disco.
+        
+        El índice es solo una caché del directorio: si no se puede guardar,
+        el próximo listado vuelve a sincronizarlo.
+        
+        Returns:
+            True si se escribió
+        """
+        try:
+            self._escribir(entradas)
+            return True
+        except OSError:
+            return False
+    
+    def _sincronizar(self, entradas: Dict[str, Dict]) -> bool:
+        """
+        Pone el catálogo al día con el directorio (solo stat por archivo).
+        
+        Args:
+            entradas: Entradas actuales (se modifican en el lugar)
+        
+        Returns:
+            True si hubo cambios
+        """
+        presentes = {}
+        with os.scandir(self.ruta_directorio) as iterador:
+            for archivo in iterador:
+                if archivo.is_file() and es_checkpoint(archivo.name):
+                    presentes[archivo.name] = archivo.stat()
+        
+        cambios = False
+        for nombre in list(entradas):
+            if nombre not in presentes:
+                del entradas[nombre]
+                cambios = True
+        
+        for nombre, stat in presentes.items():
+            entrada = entradas.get(nombre)
+            if entrada is not None and entrada['tamano_bytes'] == stat.st_size and \
+                    entrada['mtime_ns'] == stat.st_mtime_ns:
+                continue
+            try:
+                entradas[nombre] = self._indexar(nombre, leer_config=True)
+            except Exception:
+                # Archivo ilegible (p. ej. a medio copiar): se omite
+                entradas.pop(nombre, None)
+            cambios = True
+        
+        return cambios
+    
+    def _indexar(self, nombre_archivo: str, leer_config: bool = False) -> Dict:
+        """
+        Construye la entrada de un checkpoint leyendo el archivo.
+        
+        Para los binarios basta la cabecera; los JSON se leen en flujo
+        saltando la tabla Q y las experiencias.
+        
+        Args:
+            nombre_archivo: Nombre del archivo de conocimiento
+            leer_config: Si True, toma el RADIO y Q-Learning del _config.json
+        
+        Returns:
+            Entrada del catálogo
+        """
+        ruta = os.path.join(self.ruta_directorio, nombre_archivo)
+        
+        if nombre_archivo.endswith(EXTENSION_BINARIA):
+            cabecera = leer_cabecera(ruta)
+            metadata = cabecera['metadata']
+            contenido = {
+                'metadata': metadata,
+                'estadisticas': metadata.get('estadisticas', {}),
+                'abrevadero': cabecera['abrevadero']
+            }
+        else:
+            datos, _ = leer_resumen_json(ruta)
+            contenido = {
+                'metadata': datos.get('metadata', {}),
+                'estadisticas': datos.get('estadisticas', {}),
+                'abrevadero': datos.get('abrevadero')
+            }
+        contenido['checksum'] = calcular_checksum(ruta)
+        
+        return self._crear_entrada(nombre_archivo, contenido, leer_config)
+    
+    def _crear_entrada(self, nombre_archivo: str, contenido: Dict,
+                       leer_config: bool = False) -> Dict:
+        """
+        Construye la entrada de un checkpoint a partir de su contenido.
+        
+        Del archivo solo se consultan el tamaño y la fecha de modificación.
+        
+        Args:
+            nombre_archivo: Nombre del archivo de conocimiento
+            contenido: metadata, estadisticas, abrevadero y checksum del archivo
+            leer_config: Si True, toma el RADIO y Q-Learning del _config.json
+        
+        Returns:
+            Entrada del catálogo
+        """
+        stat = os.stat(os.path.join(self.ruta_directorio, nombre_archivo))
+        
+        if nombre_archivo.endswith(EXTENSION_BINARIA):
+            formato = 'bin'
+            nombre_base = nombre_archivo[:-len('_conocimiento' + EXTENSION_BINARIA)]
+        else:
+            formato = 'json'
+            nombre_base = nombre_archivo[:-len('_conocimiento.json')]
+        
+        entrada = {
+            'archivo': nombre_archivo,
+            'nombre_base': nombre_base,
+            'formato': formato,
+            'fecha': contenido['metadata'].get('fecha_guardado', 'Desconocida'),
+            'estadisticas': contenido['estadisticas'],
+            'abrevadero': contenido['abrevadero'],
+            'tamano_bytes': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'checksum': contenido['checksum']
+        }
+        
+        if leer_config:
+            ruta_config = os.path.join(self.ruta_directorio, f"{nombre_base}_config.json")
+            if os.path.exists(ruta_config):
+                try:
+                    with open(ruta_config, 'r', encoding='utf-8') as f:
+                        config = json.load(f)
+                    entrada['q_learning'] = config.get('q_learning')
+                    if not entrada['abrevadero']:
+                        entrada['abrevadero'] = config.get('abrevadero')
+                except (OSError, ValueError):
+                    pass
+        
+        return entrada
+    
+    def __len__(self) -> int:
+        """Retorna el número de checkpoints catalogados"""
+        return len(self.listar())
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        return f"CatalogoCheckpoints(Ruta={self.ruta}, Checkpoints={len(self)})"
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    import tempfile
+    import time
+    from environment import Abrevadero
+    from knowledge.base_conocimientos import BaseConocimientos, Estado
+    from storage.guardado import guardar_conocimiento, listar_guardados
+    
+    print("=== Pruebas del Catálogo de Checkpoints ===\n")
+    
+    bc = BaseConocimientos()
+    for posicion in range(1, 9):
+        for distancia in range(1, 20):
+            estado = Estado(posicion, distancia / 2, "ver_frente", False, True)
+            bc.actualizar_valor_q(estado, "avanzar", float(distancia))
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        for i in range(20):
+            guardar_conocimiento(bc, os.path.join(directorio, f"prueba{i:02d}_conocimiento.json"))
+        guardar_conocimiento(bc, os.path.join(directorio, "prueba_conocimiento.bin"))
+        
+        catalogo = CatalogoCheckpoints(directorio)
+        print(f"{catalogo}")
+        
+        inicio = time.perf_counter()
+        guardados = listar_guardados(directorio)
+        print(f"listar_guardados (con catálogo): {len(guardados)} en "
+              f"{(time.perf_counter() - inicio) * 1000:.1f} ms")
+        
+        inicio = time.perf_counter()
+        catalogo.reconstruir()
+        print(f"reconstruir (leyendo todos): {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        
+        print(f"Compatibles con RADIO={Abrevadero.RADIO}: {len(catalogo.buscar(radio=Abrevadero.RADIO))}")
+        print(f"Checkpoints binarios: {[e['archivo'] for e in catalogo.buscar(formato='bin')]}")
+        print(f"¿prueba00 íntegro? {catalogo.verificar('prueba00_conocimiento.json')}")
@@ -0,0 +1,347 @@
+"""
+Módulo de fusión de checkpoints.
+Consolida N bases de conocimiento en una sola pasada sobre arreglos alineados.
+"""
+
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+import math
+import time
+
+from environment import Abrevadero
+from knowledge.base_conocimientos import BaseConocimientos
+from knowledge.base_densa import BaseConocimientosDensa
+from knowledge.codificacion import CodificadorEstados
+from storage.binario import es_binario, cargar_binario, leer_cabecera
+from storage.importacion import importar_json_en_flujo
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+ESTRATEGIAS = ('visitas', 'promedio', 'maximo', 'minimo', 'media_recortada')
+
+# Parámetros del abrevadero que deben coincidir entre las fuentes
+PARAMETROS_ABREVADERO = ('RADIO', 'ANGULO_VISION', 'DISTANCIA_MINIMA_HUIDA')
+
+Fuente = Union[str, BaseConocimientos]
+
+
+def _parametros_actuales() -> Dict[str, float]:
+    """Parámetros del Abrevadero con los que corre el programa"""
+    return {nombre: getattr(Abrevadero, nombre) for nombre in PARAMETROS_ABREVADERO}
+
+
+def _cargar_fuente(fuente: Fuente) -> Tuple[BaseConocimientos, Optional[Dict], str]:
+    """
+    Carga una fuente de la fusión.
+    
+    Args:
+        fuente: Ruta de un checkpoint (JSON o binario) o base en memoria
+    
+    Returns:
+        Tupla (base, parámetros del abrevadero o None si no se conocen, nombre)
+    """
+    if not isinstance(fuente, str):
+        return fuente, None, str(fuente)
+    
+    if es_binario(fuente):
+        # Con mmap solo se leen las páginas de la tabla
+        return cargar_binario(fuente), leer_cabecera(fuente)['abrevadero'], fuente
+    
+    otras_claves: Dict = {}
+    base = importar_json_en_flujo(fuente, BaseConocimientosDensa(), otras_claves=otras_claves)
+    return base, otras_claves.get('abrevadero'), fuente
+
+
+def _verificar_abrevadero(referencia: Dict, parametros: Optional[Dict], nombre: str,
+                          tolerancia: float) -> Optional[str]:
+    """Describe la diferencia de parámetros con la referencia (None si coinciden)"""
+    if parametros is None:
+        return None
+    diferencias = [
+        f"{clave}={parametros[clave]} (esperado {referencia[clave]})"
+        for clave in PARAMETROS_ABREVADERO
+        if clave in parametros and abs(parametros[clave] - referencia[clave]) > tolerancia
+    ]
+    if diferencias:
+        return f"{nombre}: {', '.join(diferencias)}"
+    return None
+
+
+def fusionar_varios(fuentes: Sequence[Fuente],
+                    estrategia: str = 'visitas',
+                    recorte: float = 0.1,
+                    abrevadero: Optional[Dict[str, float]] = None,
+                    tolerancia_abrevadero: float = 1e-6,
+                    usar_numpy: Optional[bool] = None,
+                    callback_progreso: Optional[Callable[[int, int], None]] = None
+                    ) -> Tuple[BaseConocimientosDensa, Dict]:
+    """
+    Fusiona N bases de conocimiento en una sola pasada.
+    
+    Cada fuente se lleva a la tabla densa [estados, acciones] y se acumula
+    par a par, así que el costo es O(N × pares) sin fusiones de a dos. Un
+    par es conocido si alguna fuente lo conoce (un Q de 0.0 cuenta como
+    valor, no como ausencia). Estrategias, sobre las fuentes que conocen
+    el par:
+        'visitas': promedio ponderado por visitas (si ninguna fuente tiene
+                   visitas del par, promedio simple; los JSON no guardan
+                   visitas)
+        'promedio': promedio simple
+        'maximo' / 'minimo': valor extremo
+        'media_recortada': promedio tras descartar la fracción `recorte` de
+                           valores en cada extremo
+    Las visitas del resultado son la suma de las visitas, igual que los
+    contadores de cacerías; las experiencias recientes no se fusionan.
+    
+    Args:
+        fuentes: Rutas de checkpoints (JSON o binarios) o bases en memoria
+        estrategia: Una de ESTRATEGIAS
+        recorte: Fracción descartada en cada extremo ('media_recortada', 0-0.5)
+        abrevadero: Parámetros esperados (default: los de la primera fuente
+                    que los guarde, o los del Abrevadero actual)
+        tolerancia_abrevadero: Diferencia máxima aceptada en cada parámetro
+        usar_numpy: Forzar (True) o evitar (False) NumPy; None = automático
+        callback_progreso: Función llamada con (fuentes_procesadas, total)
+    
+    Returns:
+        Tupla (base fusionada, reporte)
+    
+    Raises:
+        ValueError: Si no hay fuentes, la estrategia no existe o las fuentes
+                    se entrenaron con otro abrevadero
+    """
+    if not fuentes:
+        raise ValueError("Se necesita al menos una base para fusionar")
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estrategia desconocida: {estrategia} (opciones: {ESTRATEGIAS})")
+    if not 0 <= recorte < 0.5:
+        raise ValueError(f"El recorte debe estar en [0, 0.5), recibido: {recorte}")
+    if usar_numpy and np is None:
+        raise ValueError("NumPy no está instalado")
+    usar_numpy = (np is not None) if usar_numpy is None else usar_numpy
+    
+    inicio = time.time()
+    referencia = dict(abrevadero) if abrevadero else None
+    codificador = None
+    incompatibles: List[str] = []
+    acumulador = None
+    total_experiencias = exitosas = fallidas = 0
+    
+    for i, fuente in enumerate(fuentes):
+        base, parametros, nombre = _cargar_fuente(fuente)
+        
+        if referencia is None:
+            referencia = dict(parametros) if parametros else _parametros_actuales()
+        diferencia = _verificar_abrevadero(referencia, parametros, nombre, tolerancia_abrevadero)
+        if diferencia:
+            incompatibles.append(diferencia)
+            continue
+        
+        if codificador is None:
+            codificador = CodificadorEstados(referencia['RADIO'])
+            clase = _AcumuladorNumpy if usar_numpy else _AcumuladorArray
+            acumulador = clase(codificador.num_estados * codificador.num_acciones,
+                               guardar_valores=(estrategia == 'media_recortada'))
+        
+        if not (isinstance(base, BaseConocimientosDensa) and base.codificador.es_compatible(codificador)):
+            if isinstance(base, BaseConocimientosDensa):
+                incompatibles.append(f"{nombre}: {base.codificador} (esperado {codificador})")
+                continue
+            base = BaseConocimientosDensa.desde_base(base, codificador)
+        
+        acumulador.agregar(base._q, base._visitas, base._conocidos)
+        total_experiencias += base.total_experiencias
+        exitosas += base.cacerias_exitosas
+        fallidas += base.cacerias_fallidas
+        
+        if callback_progreso:
+            callback_progreso(i + 1, len(fuentes))
+    
+    if incompatibles:
+        raise ValueError("Checkpoints incompatibles con el abrevadero:\n  " + "\n  ".join(incompatibles))
+    
+    q, visitas, conocidos = acumulador.resultado(estrategia, recorte)
+    
+    num_acciones = codificador.num_acciones
+    acciones_por_estado = bytearray(codificador.num_estados)
+    for indice, conocido in enumerate(conocidos):
+        if conocido:
+            acciones_por_estado[indice // num_acciones] += 1
+    
+    fusionada = BaseConocimientosDensa(codificador)
+    fusionada.asignar_arreglos(
+        q, visitas, conocidos, acciones_por_estado,
+        num_pares=sum(1 for c in conocidos if c),
+        num_estados=sum(1 for a in acciones_por_estado if a)
+    )
+    fusionada.total_experiencias = total_experiencias
+    fusionada.cacerias_exitosas = exitosas
+    fusionada.cacerias_fallidas = fallidas
+    
+    reporte = {
+        'fuentes': len(fuentes),
+        'estrategia': estrategia,
+        'abrevadero': referencia,
+        'pares': len(fusionada),
+        'pares_compartidos': acumulador.pares_compartidos(),
+        'visitas_totales': sum(visitas),
+        'usar_numpy': usar_numpy,
+        'duracion_segundos': round(time.time() - inicio, 3)
+    }
+    return fusionada, reporte
+
+
+class _AcumuladorArray:
+    """Acumula las fuentes par a par con el módulo array (sin NumPy)"""
+    
+    def __init__(self, num_pares: int, guardar_valores: bool):
+        self.cuenta = array('q', bytes(8 * num_pares))
+        self.suma = array('d', bytes(8 * num_pares))
+        self.suma_ponderada = array('d', bytes(8 * num_pares))
+        self.visitas = array('q', bytes(8 * num_pares))
+        self.maximo = array('d', [-math.inf]) * num_pares
+        self.minimo = array('d', [math.inf]) * num_pares
+        self.valores: Optional[Dict[int, List[float]]] = {} if guardar_valores else None
+    
+    def agregar(self, q, visitas, conocidos):
+        """Suma una fuente (arreglos densos alineados)"""
+        for indice in (i for i, c in enumerate(conocidos) if c):
+            valor = q[indice]
+            veces = visitas[indice]
+            self.cuenta[indice] += 1
+            self.suma[indice] += valor
+            self.suma_ponderada[indice] += veces * valor
+            self.visitas[indice] += veces
+            if valor > self.maximo[indice]:
+                self.maximo[indice] = valor
+            if valor < self.minimo[indice]:
+                self.minimo[indice] = valor
+            if self.valores is not None:
+                self.valores.setdefault(indice, []).append(valor)
+    
+    def resultado(self, estrategia: str, recorte: float) -> Tuple[array, array, bytearray]:
+        """Calcula (q, visitas, conocidos) fusionados"""
+        q = array('d', bytes(8 * len(self.cuenta)))
+        conocidos = bytearray(len(self.cuenta))
+        
+        for indice, n in enumerate(self.cuenta):
+            if not n:
+                continue
+            conocidos[indice] = 1
+            if estrategia == 'visitas' and self.visitas[indice] > 0:
+                q[indice] = self.suma_ponderada[indice] / self.visitas[indice]
+            elif estrategia in ('visitas', 'promedio'):
+                q[indice] = self.suma[indice] / n
+            elif estrategia == 'maximo':
+                q[indice] = self.maximo[indice]
+            elif estrategia == 'minimo':
+                q[indice] = self.minimo[indice]
+            else:
+                valores = sorted(self.valores[indice])
+                t = min(int(recorte * n), (n - 1) // 2)
+                q[indice] = math.fsum(valores[t:n - t]) / (n - 2 * t)
+        
+        return q, self.visitas, conocidos
+    
+    def pares_compartidos(self) -> int:
+        """Pares conocidos por más de una fuente"""
+        return sum(1 for n in self.cuenta if n > 1)
+
+
+class _AcumuladorNumpy:
+    """Acumula las fuentes con operaciones vectorizadas de NumPy"""
+    
+    def __init__(self, num_pares: int, guardar_valores: bool):
+        self.cuenta = np.zeros(num_pares, dtype=np.int64)
+        self.suma = np.zeros(num_pares)
+        self.suma_ponderada = np.zeros(num_pares)
+        self.visitas = np.zeros(num_pares, dtype=np.int64)
+        self.maximo = np.full(num_pares, -np.inf)
+        self.minimo = np.full(num_pares, np.inf)
+        self.filas: Optional[List] = [] if guardar_valores else None
+    
+    def agregar(self, q, visitas, conocidos):
+        """Suma una fuente (arreglos densos alineados)"""
+        mascara = np.frombuffer(conocidos, dtype=np.uint8).astype(bool)
+        valores = np.where(mascara, np.frombuffer(q, dtype=np.float64), 0.0)
+        veces = np.where(mascara, np.frombuffer(visitas, dtype=np.int64), 0)
+        
+        self.cuenta += mascara
+        self.suma += valores
+        self.suma_ponderada += veces * valores
+        self.visitas += veces
+        np.maximum(self.maximo, np.where(mascara, valores, -np.inf), out=self.maximo)
+        np.minimum(self.minimo, np.where(mascara, valores, np.inf), out=self.minimo)
+        if self.filas is not None:
+            self.filas.append(np.where(mascara, valores, np.nan))
+    
+    def resultado(self, estrategia: str, recorte: float) -> Tuple[array, array, bytearray]:
+        """Calcula (q, visitas, conocidos) fusionados"""
+        conocidos = self.cuenta > 0
+        n = np.maximum(self.cuenta, 1)
+        
+        if estrategia in ('visitas', 'promedio'):
+            q = self.suma / n
+            if estrategia == 'visitas':
+                con_visitas = self.visitas > 0
+                q[con_visitas] = self.suma_ponderada[con_visitas] / self.visitas[con_visitas]
+        elif estrategia == 'maximo':
+            q = self.maximo
+        elif estrategia == 'minimo':
+            q = self.minimo
+        else:
+            # Los desconocidos (NaN) quedan al final de cada columna ordenada
+            ordenados = np.sort(np.vstack(self.filas), axis=0)
+            acumulados = np.vstack([np.zeros(ordenados.shape[1]),
+                                    np.cumsum(np.nan_to_num(ordenados), axis=0)])
+            t = np.minimum((recorte * self.cuenta).astype(np.int64), (self.cuenta - 1) // 2)
+            t = np.maximum(t, 0)
+            columnas = np.arange(ordenados.shape[1])
+            suma = acumulados[self.cuenta - t, columnas] - acumulados[t, columnas]
+            q = suma / np.maximum(self.cuenta - 2 * t, 1)
+        
+        q = np.where(conocidos, q, 0.0)
+        return (array('d', q.tobytes()), array('q', self.visitas.tobytes()),
+                bytearray(conocidos.astype(np.uint8).tobytes()))
+    
+    def pares_compartidos(self) -> int:
+        """Pares conocidos por más de una fuente"""
+        return int(np.count_nonzero(self.cuenta > 1))
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    import os
+    import tempfile
+    from learning.entrenamiento import Entrenador
+    from storage.guardado import guardar_conocimiento
+    
+    print("=== Pruebas de Fusión de Checkpoints ===\n")
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = []
+        for i in range(6):
+            entrenador = Entrenador(BaseConocimientosDensa())
+            entrenador.entrenar(300, verbose=False)
+            extension = '.bin' if i % 2 else '.json'
+            ruta = os.path.join(directorio, f"corrida{i}_conocimiento{extension}")
+            guardar_conocimiento(entrenador.base_conocimientos, ruta)
+            rutas.append(ruta)
+        print(f"{len(rutas)} checkpoints (JSON y binarios)\n")
+        
+        for estrategia in ESTRATEGIAS:
+            fusionada, reporte = fusionar_varios(rutas, estrategia=estrategia, recorte=0.2)
+            print(f"{estrategia:16s} {fusionada} | compartidos={reporte['pares_compartidos']} "
+                  f"visitas={reporte['visitas_totales']} ({reporte['duracion_segundos']} s)")
+        
+        # 50 checkpoints binarios
+        for i in range(50):
+            guardar_conocimiento(fusionada, os.path.join(directorio, f"copia{i}_conocimiento.bin"))
+        copias = [os.path.join(directorio, f"copia{i}_conocimiento.bin") for i in range(50)]
+        for usar_numpy in ([False, True] if np is not None else [False]):
+            _, reporte = fusionar_varios(copias, estrategia='media_recortada', usar_numpy=usar_numpy)
+            print(f"\n50 checkpoints (NumPy={usar_numpy}): {reporte['duracion_segundos']} s")
@@ -3,6 +3,7 @@ Módulo de guardado.
 Serializa y guarda el conocimiento del león.
 """
 
+import hashlib
 import json
 import os
 from datetime import datetime
@@ -11,6 +12,65 @@ from typing import Optional
 from knowledge.base_conocimientos import BaseConocimientos
 from knowledge.generalizacion import Generalizador
 from learning.q_learning import QLearning
+from storage.binario import EXTENSION as EXTENSION_BINARIA, escribir_binario
+
+
+def escribir_atomico(ruta_archivo: str, contenido: str) -> str:
+    """
+    Escribe un archivo de texto de forma atómica.
+    
+    El contenido se escribe en un archivo temporal junto al destino y luego
+    se renombra, así que un lector (o un corte a mitad de la escritura) ve
+    el archivo anterior completo o el nuevo completo, nunca uno a medias.
+    
+    Args:
+        ruta_archivo: Ruta del archivo de destino
+        contenido: Texto a escribir (UTF-8)
+    
+    Returns:
+        Checksum de los bytes escritos ("sha256:<hex>")
+    """
+    datos = contenido.encode('utf-8')
+    ruta_temporal = ruta_archivo + '.tmp'
+    try:
+        with open(ruta_temporal, 'wb') as f:
+            f.write(datos)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(ruta_temporal, ruta_archivo)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+    return f"sha256:{hashlib.sha256(datos).hexdigest()}"
+
+
+def _actualizar_catalogo(ruta_archivo: str, anotar: bool = False,
+                         contenido: Optional[dict] = None, **campos):
+    """
+    Registra un checkpoint en el catálogo de su directorio (si es un checkpoint).
+    
+    Un error en el catálogo no invalida el guardado: el catálogo se
+    resincroniza con el directorio la próxima vez que se lista.
+    
+    Args:
+        ruta_archivo: Ruta del archivo de conocimiento guardado
+        anotar: Si True, solo agrega campos a la entrada existente
+        contenido: Lo escrito en el archivo (ver CatalogoCheckpoints.registrar)
+        **campos: Campos adicionales de la entrada
+    """
+    from storage.catalogo import CatalogoCheckpoints, es_checkpoint
+    
+    if not es_checkpoint(ruta_archivo):
+        return
+    try:
+        catalogo = CatalogoCheckpoints(os.path.dirname(ruta_archivo) or '.')
+        if anotar:
+            catalogo.anotar(ruta_archivo, **campos)
+        else:
+            catalogo.registrar(ruta_archivo, contenido, **campos)
+    except Exception as e:
+        print(f"Advertencia: no se pudo actualizar el catálogo: {e}")
 
 
 def guardar_conocimiento(base_conocimientos: BaseConocimientos,
@@ -19,6 +79,8 @@ def guardar_conocimiento(base_conocimientos: BaseConocimientos,
     """
     Guarda la base de conocimientos en un archivo JSON.
     
+    Si la ruta termina en '.bin' se usa el formato binario (ver storage.binario).
+    
     Args:
         base_conocimientos: Base de conocimientos a guardar
         ruta_archivo: Ruta del archivo de destino
@@ -27,20 +89,31 @@ def guardar_conocimiento(base_conocimientos: BaseConocimientos,
     Returns:
         True si se guardó exitosamente
     """
+    if ruta_archivo.endswith(EXTENSION_BINARIA):
+        try:
+            contenido = escribir_binario(base_conocimientos, ruta_archivo, incluir_experiencias)
+        except Exception as e:
+            print(f"Error al guardar conocimiento binario: {e}")
+            return False
+        contenido['estadisticas'] = contenido['metadata']['estadisticas']
+        _actualizar_catalogo(ruta_archivo, contenido=contenido)
+        return True
+    
     try:
         # Crear directorio si no existe
         directorio = os.path.dirname(ruta_archivo)
         if directorio and not os.path.exists(directorio):
             os.makedirs(directorio)
         
-        # Generar JSON
-        json_data = base_conocimientos.exportar_a_json()
+        # Generar los datos una sola vez (sin pasar por un string intermedio)
+        data = base_conocimientos.exportar_a_dict()
+        if not incluir_experiencias:
+            data['experiencias_recientes'] = []
         
         # Obtener configuración del abrevadero
         from environment import Abrevadero
         
         # Agregar metadatos
-        data = json.loads(json_data)
         data['abrevadero'] = {
             'RADIO': Abrevadero.RADIO,
             'ANGULO_VISION': Abrevadero.ANGULO_VISION,
@@ -51,9 +124,14 @@ def guardar_conocimiento(base_conocimientos: BaseConocimientos,
             'version': '1.0'
         }
         
-        # Guardar archivo
-        with open(ruta_archivo, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # Guardar archivo (el catálogo se arma con lo escrito, sin releerlo)
+        checksum = escribir_atomico(ruta_archivo, json.dumps(data, indent=2, ensure_ascii=False))
+        _actualizar_catalogo(ruta_archivo, contenido={
+            'metadata': data['metadata'],
+            'estadisticas': data.get('estadisticas', {}),
+            'abrevadero': data['abrevadero'],
+            'checksum': checksum
+        })
         
         return True
     
@@ -70,6 +148,9 @@ def guardar_estado_completo(base_conocimientos: BaseConocimientos,
     """
     Guarda el estado completo del sistema de aprendizaje.
     
+    Para no detener el entrenamiento mientras se escribe, ver
+    storage.guardado_asincrono.GuardadoAsincrono.
+    
     Args:
         base_conocimientos: Base de conocimientos
         q_learning: Instancia de Q-Learning
@@ -77,13 +158,41 @@ def guardar_estado_completo(base_conocimientos: BaseConocimientos,
         ruta_directorio: Directorio donde guardar
         nombre_base: Nombre base para los archivos (default: timestamp)
         
+    Returns:
+        Diccionario con rutas de archivos guardados
+    """
+    return escribir_estado_completo(
+        base_conocimientos,
+        q_learning.obtener_estadisticas(),
+        ruta_directorio,
+        nombre_base
+    )
+
+
+def escribir_estado_completo(base_conocimientos: BaseConocimientos,
+                             estadisticas_ql: dict,
+                             ruta_directorio: str,
+                             nombre_base: Optional[str] = None) -> dict:
+    """
+    Escribe los tres archivos del estado completo (conocimiento, config y reporte).
+    
+    Solo necesita las estadísticas de Q-Learning ya calculadas, así que puede
+    ejecutarse sobre una instantánea en otro hilo o proceso. Cada archivo se
+    escribe de forma atómica.
+    
+    Args:
+        base_conocimientos: Base de conocimientos (o una copia)
+        estadisticas_ql: Resultado de QLearning.obtener_estadisticas()
+        ruta_directorio: Directorio donde guardar
+        nombre_base: Nombre base para los archivos (default: timestamp)
+        
     Returns:
         Diccionario con rutas de archivos guardados
     """
     try:
         # Crear directorio si no existe
         if not os.path.exists(ruta_directorio):
-            os.makedirs(ruta_directorio)
+            os.makedirs(ruta_directorio, exist_ok=True)
         
         # Generar nombre base si no se proporciona
         if nombre_base is None:
@@ -96,7 +205,8 @@ def guardar_estado_completo(base_conocimientos: BaseConocimientos,
         ruta_reporte = os.path.join(ruta_directorio, f"{nombre_base}_reporte.txt")
         
         # Guardar base de conocimientos
-        guardar_conocimiento(base_conocimientos, ruta_bc)
+        if not guardar_conocimiento(base_conocimientos, ruta_bc):
+            raise IOError(f"No se pudo escribir {ruta_bc}")
         
         # Obtener configuración del abrevadero
         from environment import Abrevadero
@@ -108,7 +218,7 @@ def guardar_estado_completo(base_conocimientos: BaseConocimientos,
         
         # Guardar configuración de Q-Learning
         config = {
-            'q_learning': q_learning.obtener_estadisticas(),
+            'q_learning': estadisticas_ql,
             'estadisticas_bc': base_conocimientos.obtener_estadisticas(),
             'abrevadero': abrevadero_config,
             'metadata': {
@@ -117,19 +227,18 @@ def guardar_estado_completo(base_conocimientos: BaseConocimientos,
             }
         }
         
-        with open(ruta_config, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        escribir_atomico(ruta_config, json.dumps(config, indent=2, ensure_ascii=False))
+        _actualizar_catalogo(ruta_bc, anotar=True, q_learning=estadisticas_ql)
         
         # Guardar reporte legible
         reporte = base_conocimientos.generar_reporte_legible()
         reporte += "\n\n" + "=" * 70 + "\n"
         reporte += "PARÁMETROS DE Q-LEARNING\n"
         reporte += "=" * 70 + "\n"
-        for key, value in q_learning.obtener_estadisticas().items():
+        for key, value in estadisticas_ql.items():
             reporte += f"{key}: {value}\n"
         
-        with open(ruta_reporte, 'w', encoding='utf-8') as f:
-            f.write(reporte)
+        escribir_atomico(ruta_reporte, reporte)
         
         return {
             'conocimiento': ruta_bc,
@@ -182,46 +291,33 @@ def listar_guardados(ruta_directorio: str) -> list:
     """
     Lista todos los guardados disponibles en un directorio.
     
+    Usa el catálogo del directorio (ver storage.catalogo), así que solo se
+    abren los archivos nuevos o modificados desde el último listado.
+    
     Args:
         ruta_directorio: Directorio a explorar
         
     Returns:
         Lista de diccionarios con información de guardados
     """
+    from storage.catalogo import CatalogoCheckpoints
+    
     try:
-        if not os.path.exists(ruta_directorio):
-            return []
-        
         guardados = []
-        archivos = os.listdir(ruta_directorio)
-        
-        # Buscar archivos de conocimiento
-        for archivo in archivos:
-            if archivo.endswith('_conocimiento.json'):
-                ruta_completa = os.path.join(ruta_directorio, archivo)
-                
-                # Leer metadata
-                try:
-                    with open(ruta_completa, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    metadata = data.get('metadata', {})
-                    stats = data.get('estadisticas', {})
-                    
-                    guardados.append({
-                        'archivo': archivo,
-                        'ruta': ruta_completa,
-                        'fecha': metadata.get('fecha_guardado', 'Desconocida'),
-                        'estados': stats.get('estados_unicos', 0),
-                        'tasa_exito': stats.get('tasa_exito', 0)
-                    })
-                
-                except Exception:
-                    pass
-        
-        # Ordenar por fecha (más reciente primero)
-        guardados.sort(key=lambda x: x['fecha'], reverse=True)
+        for entrada in CatalogoCheckpoints(ruta_directorio).listar():
+            stats = entrada['estadisticas']
+            guardados.append({
+                'archivo': entrada['archivo'],
+                'ruta': os.path.join(ruta_directorio, entrada['archivo']),
+                'nombre_base': entrada['nombre_base'],
+                'fecha': entrada['fecha'],
+                'estados': stats.get('estados_unicos', 0),
+                'tasa_exito': stats.get('tasa_exito', 0),
+                'radio': (entrada['abrevadero'] or {}).get('RADIO'),
+                'tamano_bytes': entrada['tamano_bytes']
+            })
         
+        # El catálogo ya viene ordenado por fecha (más reciente primero)
         return guardados
     
     except Exception as e:
@@ -0,0 +1,151 @@
+"""
+Módulo de guardado asíncrono.
+Escribe checkpoints en segundo plano sin detener el entrenamiento.
+"""
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+import os
+
+from knowledge.base_conocimientos import BaseConocimientos
+from knowledge.generalizacion import Generalizador
+from learning.q_learning import QLearning
+from storage.guardado import escribir_estado_completo
+
+
+class GuardadoAsincrono:
+    """
+    Guardado del estado completo en un hilo o proceso de trabajo.
+    
+    guardar() toma en el hilo que entrena una instantánea consistente de la
+    base (BaseConocimientos.copiar: copia de diccionarios o arreglos, sin
+    serializar) y de las estadísticas de Q-Learning, y encarga la escritura
+    de los tres archivos de guardar_estado_completo a un único trabajador.
+    Los guardados se escriben en orden y cada archivo se reemplaza de forma
+    atómica, así que en disco siempre hay un checkpoint completo.
+    
+    Con en_proceso=True la serialización JSON corre en otro proceso y no
+    compite con el entrenamiento por el GIL (a cambio de enviar la
+    instantánea por pickle).
+    """
+    
+    def __init__(self, en_proceso: bool = False, descartar_si_ocupado: bool = False):
+        """
+        Inicializa el guardado (el trabajador se crea en el primer guardado).
+        
+        Args:
+            en_proceso: Si True, escribe en un proceso aparte en vez de un hilo
+            descartar_si_ocupado: Si True, guardar() no hace nada mientras haya
+                                  un guardado sin terminar (útil para
+                                  checkpoints frecuentes)
+        """
+        self.en_proceso = en_proceso
+        self.descartar_si_ocupado = descartar_si_ocupado
+        
+        self.guardados_pedidos = 0
+        self.guardados_descartados = 0
+        
+        self._ejecutor: Optional[Executor] = None
+        self._ultimo: Optional[Future] = None
+    
+    def guardar(self, base_conocimientos: BaseConocimientos,
+                q_learning: QLearning,
+                generalizador: Optional[Generalizador],
+                ruta_directorio: str,
+                nombre_base: Optional[str] = None) -> Optional[Future]:
+        """
+        Toma una instantánea y la guarda en segundo plano.
+        
+        Mismos argumentos que guardar_estado_completo. El nombre por defecto
+        usa la hora de la instantánea, no la de la escritura.
+        
+        Returns:
+            Future que termina con el diccionario de guardar_estado_completo
+            (None si se descartó porque había un guardado en curso)
+        """
+        if self.descartar_si_ocupado and self.ocupado():
+            self.guardados_descartados += 1
+            return None
+        
+        if nombre_base is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            nombre_base = f"entrenamiento_{timestamp}"
+        
+        # Instantánea consistente: a partir de aquí el entrenamiento puede seguir
+        copia = base_conocimientos.copiar()
+        estadisticas_ql = q_learning.obtener_estadisticas()
+        
+        if self._ejecutor is None:
+            if self.en_proceso:
+                self._ejecutor = ProcessPoolExecutor(max_workers=1)
+            else:
+                self._ejecutor = ThreadPoolExecutor(max_workers=1)
+        
+        self._ultimo = self._ejecutor.submit(
+            escribir_estado_completo, copia, estadisticas_ql, ruta_directorio, nombre_base
+        )
+        self.guardados_pedidos += 1
+        return self._ultimo
+    
+    def ocupado(self) -> bool:
+        """Retorna True si hay un guardado sin terminar"""
+        return self._ultimo is not None and not self._ultimo.done()
+    
+    def esperar(self) -> Optional[dict]:
+        """
+        Espera a que terminen todos los guardados pedidos.
+        
+        Returns:
+            Resultado del último guardado (None si no se pidió ninguno)
+        """
+        if self._ultimo is None:
+            return None
+        return self._ultimo.result()
+    
+    def cerrar(self):
+        """Espera los guardados pendientes y libera el trabajador"""
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=True)
+            self._ejecutor = None
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        modo = "proceso" if self.en_proceso else "hilo"
+        return (f"GuardadoAsincrono(Modo={modo}, Pedidos={self.guardados_pedidos}, "
+                f"Descartados={self.guardados_descartados}, Ocupado={self.ocupado()})")
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    import tempfile
+    import time
+    from knowledge.base_densa import BaseConocimientosDensa
+    from learning.entrenamiento import Entrenador
+    from storage.guardado import guardar_estado_completo
+    
+    print("=== Pruebas de Guardado Asíncrono ===\n")
+    
+    entrenador = Entrenador(BaseConocimientosDensa())
+    entrenador.entrenar(3000, verbose=False)
+    print(f"{entrenador.base_conocimientos}\n")
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        inicio = time.perf_counter()
+        guardar_estado_completo(entrenador.base_conocimientos, entrenador.q_learning,
+                                entrenador.generalizador, directorio, "sincrono")
+        print(f"Guardado síncrono: {(time.perf_counter() - inicio) * 1000:.1f} ms bloqueado")
+        
+        for en_proceso in (False, True):
+            guardado = GuardadoAsincrono(en_proceso=en_proceso)
+            inicio = time.perf_counter()
+            futuro = guardado.guardar(entrenador.base_conocimientos, entrenador.q_learning,
+                                      entrenador.generalizador, directorio, "asincrono")
+            bloqueado = time.perf_counter() - inicio
+            resultado = futuro.result()
+            total = time.perf_counter() - inicio
+            guardado.cerrar()
+            print(f"{guardado}: {bloqueado * 1000:.1f} ms bloqueado, "
+                  f"{total * 1000:.1f} ms hasta terminar (éxito={resultado['exito']})")
+        
+        print(f"\nArchivos: {sorted(os.listdir(directorio))}")
@@ -0,0 +1,309 @@
+"""
+Módulo de importación en flujo.
+Lee checkpoints JSON grandes por bloques, sin cargar el documento completo en memoria.
+"""
+
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import json
+import os
+
+from knowledge.base_conocimientos import BaseConocimientos, Estado, Experiencia
+
+
+_ESPACIOS = ' \t\n\r'
+
+
+class LectorJSONIncremental:
+    """
+    Lector de un objeto JSON de nivel superior por bloques.
+    
+    Recorre las claves del objeto raíz en orden y, para cada valor, permite
+    decodificarlo completo (valores pequeños), iterar sus elementos uno a
+    uno (arreglos grandes) o saltarlo sin construir nada. El búfer solo
+    guarda lo que falta por consumir del bloque actual más un elemento, así
+    que la memoria no depende del tamaño del archivo.
+    """
+    
+    def __init__(self, archivo, tamano_bloque: int = 1 << 20,
+                 callback_progreso: Optional[Callable[[int], None]] = None):
+        """
+        Inicializa el lector.
+        
+        Args:
+            archivo: Archivo de texto abierto para lectura
+            tamano_bloque: Caracteres leídos por bloque
+            callback_progreso: Función llamada con los caracteres leídos tras cada bloque
+        """
+        self._archivo = archivo
+        self._tamano_bloque = tamano_bloque
+        self._callback_progreso = callback_progreso
+        self._decodificador = json.JSONDecoder()
+        
+        self._bufer = ''
+        self._posicion = 0
+        self._fin_archivo = False
+        self.caracteres_leidos = 0
+    
+    def _leer_bloque(self) -> bool:
+        """Agrega un bloque al búfer descartando lo ya consumido"""
+        if self._fin_archivo:
+            return False
+        bloque = self._archivo.read(self._tamano_bloque)
+        if not bloque:
+            self._fin_archivo = True
+            return False
+        self._bufer = self._bufer[self._posicion:] + bloque
+        self._posicion = 0
+        self.caracteres_leidos += len(bloque)
+        if self._callback_progreso:
+            self._callback_progreso(self.caracteres_leidos)
+        return True
+    
+    def _siguiente_caracter(self) -> str:
+        """Salta espacios y retorna el siguiente carácter sin consumirlo ('' al final)"""
+        while True:
+            while self._posicion < len(self._bufer) and self._bufer[self._posicion] in _ESPACIOS:
+                self._posicion += 1
+            if self._posicion < len(self._bufer):
+                return self._bufer[self._posicion]
+            if not self._leer_bloque():
+                return ''
+    
+    def _esperar(self, caracter: str):
+        """Consume un carácter de estructura o lanza un error"""
+        encontrado = self._siguiente_caracter()
+        if encontrado != caracter:
+            raise ValueError(f"JSON inválido: se esperaba '{caracter}' y se encontró "
+                             f"'{encontrado}' (carácter {self.caracteres_leidos - len(self._bufer) + self._posicion})")
+        self._posicion += 1
+    
+    def decodificar_valor(self) -> Any:
+        """
+        Decodifica el siguiente valor completo.
+        
+        Returns:
+            Valor decodificado
+        """
+        self._siguiente_caracter()
+        while True:
+            try:
+                valor, fin = self._decodificador.raw_decode(self._bufer, self._posicion)
+                # Un número al final del búfer podría seguir en el próximo bloque
+                if fin < len(self._bufer) or self._fin_archivo:
+                    self._posicion = fin
+                    return valor
+            except json.JSONDecodeError:
+                if self._fin_archivo:
+                    raise
+            if not self._leer_bloque():
+                self._fin_archivo = True
+    
+    def claves(self) -> Iterator[str]:
+        """
+        Itera las claves del objeto raíz.
+        
+        Después de recibir cada clave hay que consumir su valor con
+        decodificar_valor, elementos o saltar_valor.
+        
+        Returns:
+            Iterador de claves
+        """
+        self._esperar('{')
+        if self._siguiente_caracter() == '}':
+            self._posicion += 1
+            return
+        while True:
+            clave = self.decodificar_valor()
+            if not isinstance(clave, str):
+                raise ValueError("JSON inválido: clave que no es string")
+            self._esperar(':')
+            yield clave
+            if self._siguiente_caracter() == ',':
+                self._posicion += 1
+                continue
+            self._esperar('}')
+            return
+    
+    def elementos(self) -> Iterator[Any]:
+        """
+        Itera los elementos del arreglo que sigue, decodificando uno a la vez.
+        
+        Returns:
+            Iterador de elementos
+        """
+        self._esperar('[')
+        if self._siguiente_caracter() == ']':
+            self._posicion += 1
+            return
+        while True:
+            yield self.decodificar_valor()
+            if self._siguiente_caracter() == ',':
+                self._posicion += 1
+                continue
+            self._esperar(']')
+            return
+    
+    def saltar_valor(self):
+        """
+        Salta el siguiente valor sin conservarlo.
+        
+        Los arreglos se recorren elemento a elemento, así que saltar una
+        lista grande no necesita más memoria que uno de sus elementos.
+        """
+        if self._siguiente_caracter() == '[':
+            for _ in self.elementos():
+                pass
+        else:
+            self.decodificar_valor()
+
+
+def importar_json_en_flujo(ruta_archivo: str,
+                           base_conocimientos: Optional[BaseConocimientos] = None,
+                           incluir_experiencias: bool = False,
+                           callback_progreso: Optional[Callable[[int, int, int], None]] = None,
+                           tamano_bloque: int = 1 << 20,
+                           otras_claves: Optional[Dict[str, Any]] = None) -> BaseConocimientos:
+    """
+    Importa un checkpoint JSON insertando la tabla Q mientras se lee.
+    
+    Equivale a BaseConocimientos.importar_desde_json, pero nunca tiene el
+    documento completo en memoria: cada entrada de q_table se decodifica y
+    se inserta por separado, y experiencias_recientes se salta sin
+    decodificar salvo que se pida. Con una BaseConocimientosDensa como
+    destino la memoria máxima es la tabla densa más un bloque.
+    
+    Args:
+        ruta_archivo: Ruta del archivo JSON
+        base_conocimientos: Base donde importar (se limpia antes; default: nueva BaseConocimientos)
+        incluir_experiencias: Si True, importa también experiencias_recientes
+        callback_progreso: Función llamada tras cada bloque con
+                           (bytes_leidos, bytes_totales, entradas_q)
+        tamano_bloque: Caracteres leídos por bloque
+        otras_claves: Si se pasa un diccionario, se llena con las demás claves
+                      del documento (abrevadero, metadata)
+    
+    Returns:
+        Base de conocimientos importada
+    """
+    bc = base_conocimientos if base_conocimientos is not None else BaseConocimientos()
+    bc.limpiar()
+    
+    bytes_totales = os.path.getsize(ruta_archivo)
+    entradas = [0]
+    tiene_q_table = False
+    stats = None
+    
+    with open(ruta_archivo, 'r', encoding='utf-8') as f:
+        progreso = None
+        if callback_progreso is not None:
+            # Los caracteres leídos se convierten a bytes con la posición del archivo
+            progreso = lambda _: callback_progreso(f.buffer.tell(), bytes_totales, entradas[0])
+        lector = LectorJSONIncremental(f, tamano_bloque, progreso)
+        
+        for clave in lector.claves():
+            if clave == 'q_table':
+                tiene_q_table = True
+                actualizar_valor_q = bc.actualizar_valor_q
+                for item in lector.elementos():
+                    actualizar_valor_q(Estado.from_dict(item['estado']), item['accion'], item['valor_q'])
+                    entradas[0] += 1
+            
+            elif clave == 'estadisticas':
+                stats = lector.decodificar_valor()
+            
+            elif clave == 'experiencias_recientes':
+                if incluir_experiencias:
+                    for item in lector.elementos():
+                        bc.experiencias.append(Experiencia.from_dict(item))
+                else:
+                    lector.saltar_valor()
+            
+            elif otras_claves is not None:
+                otras_claves[clave] = lector.decodificar_valor()
+            
+            else:
+                lector.saltar_valor()
+    
+    if not tiene_q_table or stats is None:
+        raise ValueError(f"El archivo no tiene q_table y estadisticas: {ruta_archivo}")
+    
+    # Las estadísticas guardadas reemplazan a las que sumaron las experiencias
+    bc.total_experiencias = stats['total_experiencias']
+    bc.cacerias_exitosas = stats['cacerias_exitosas']
+    bc.cacerias_fallidas = stats['cacerias_fallidas']
+    
+    if callback_progreso is not None:
+        callback_progreso(bytes_totales, bytes_totales, entradas[0])
+    
+    return bc
+
+
+def leer_resumen_json(ruta_archivo: str,
+                      tamano_bloque: int = 1 << 20) -> Tuple[Dict[str, Any], int]:
+    """
+    Lee las claves pequeñas de un checkpoint JSON saltando las listas grandes.
+    
+    Args:
+        ruta_archivo: Ruta del archivo JSON
+        tamano_bloque: Caracteres leídos por bloque
+    
+    Returns:
+        Tupla (datos sin q_table ni experiencias_recientes, entradas de q_table)
+    """
+    datos = {}
+    entradas_q = 0
+    with open(ruta_archivo, 'r', encoding='utf-8') as f:
+        lector = LectorJSONIncremental(f, tamano_bloque)
+        for clave in lector.claves():
+            if clave == 'q_table':
+                datos['q_table'] = None
+                for _ in lector.elementos():
+                    entradas_q += 1
+            elif clave == 'experiencias_recientes':
+                datos[clave] = None
+                lector.saltar_valor()
+            else:
+                datos[clave] = lector.decodificar_valor()
+    return datos, entradas_q
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    import tempfile
+    import time
+    import tracemalloc
+    from knowledge.base_densa import BaseConocimientosDensa
+    from learning.entrenamiento import Entrenador
+    from storage.guardado import guardar_conocimiento
+    
+    print("=== Pruebas de Importación en Flujo ===\n")
+    
+    entrenador = Entrenador(BaseConocimientosDensa())
+    entrenador.entrenar(5000, verbose=False)
+    print(f"{entrenador.base_conocimientos}\n")
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "prueba_conocimiento.json")
+        guardar_conocimiento(entrenador.base_conocimientos, ruta)
+        print(f"Archivo: {os.path.getsize(ruta) / 1024:.1f} KB")
+        
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        with open(ruta, 'r', encoding='utf-8') as f:
+            BaseConocimientos().importar_desde_json(f.read())
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"importar_desde_json: {(time.perf_counter() - inicio) * 1000:.0f} ms, "
+              f"pico {pico / 1024:.0f} KB")
+        
+        for destino in (BaseConocimientos, BaseConocimientosDensa):
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            bc = importar_json_en_flujo(ruta, destino(), tamano_bloque=1 << 16)
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"En flujo ({destino.__name__}): {(time.perf_counter() - inicio) * 1000:.0f} ms, "
+                  f"pico {pico / 1024:.0f} KB, pares={len(bc)}")
+        
+        datos, entradas = leer_resumen_json(ruta)
+        print(f"\nResumen sin cargar la tabla: {entradas} entradas, claves={list(datos)}")
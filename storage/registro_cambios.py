@@ -0,0 +1,359 @@
+"""
+Módulo de registro de cambios.
+Log de escritura anticipada (solo agregar) de la tabla Q, con recuperación y compactación.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+import os
+import struct
+import threading
+import zlib
+
+from environment import Abrevadero
+from knowledge.base_conocimientos import BaseConocimientos
+from knowledge.base_densa import BaseConocimientosDensa
+from knowledge.codificacion import CodificadorEstados
+from storage.binario import EXTENSION as EXTENSION_BINARIA, guardar_binario, cargar_binario
+
+
+# Cabecera del archivo de log: firma, versión, RADIO del codificador
+MAGIA = b'LVWL'
+VERSION = 1
+_CABECERA = struct.Struct('<4sH2xd')
+
+# Cabecera de cada lote: marca, entradas, total_experiencias, exitosas, fallidas, CRC32
+_LOTE = struct.Struct('<4sIqqqI')
+MARCA_LOTE = b'LOTE'
+
+# Entrada: índice plano del par, valor Q, visitas
+_ENTRADA = struct.Struct('<idq')
+
+
+class RegistroCambios:
+    """
+    Log de escritura anticipada de la tabla Q.
+    
+    El conocimiento persistido es un snapshot completo (checkpoint binario)
+    más un log que solo crece, con los pares (estado, acción) modificados
+    desde el snapshot. Cada lote guarda el valor absoluto de Q y de las
+    visitas de los pares que cambiaron, así que guardar cuesta en proporción
+    a los cambios y no al tamaño de la tabla, y repetir un lote es idempotente.
+    
+    Archivos (a partir de ruta_base):
+        {ruta_base}_conocimiento.bin     snapshot
+        {ruta_base}_conocimiento.wal     log activo
+        {ruta_base}_conocimiento.wal.1   log sellado en compactación
+    
+    La compactación sella el log activo (lo renombra), sigue escribiendo en
+    uno nuevo y, en un hilo aparte, aplica el log sellado sobre el snapshot y
+    lo reemplaza de forma atómica. Si el proceso muere en cualquier punto,
+    recuperar() reconstruye el último estado registrado.
+    """
+    
+    def __init__(self, ruta_base: str, sincronizar: bool = True):
+        """
+        Inicializa el registro (no crea archivos hasta adjuntar o registrar).
+        
+        Args:
+            ruta_base: Ruta sin sufijo, p. ej. "modelos/entrenamiento_1"
+            sincronizar: Si True, hace fsync después de cada lote
+        """
+        self.ruta_snapshot = f"{ruta_base}_conocimiento{EXTENSION_BINARIA}"
+        self.ruta_registro = f"{ruta_base}_conocimiento.wal"
+        self.ruta_sellado = self.ruta_registro + '.1'
+        self.sincronizar = sincronizar
+        
+        self.codificador = CodificadorEstados(Abrevadero.RADIO)
+        self.entradas_en_registro = 0
+        self.lotes_escritos = 0
+        # Pares de una BaseConocimientos que el codificador no representa
+        # (fuera de rango); se omiten del log
+        self.pares_omitidos = 0
+        
+        self._bloqueo = threading.Lock()
+        self._ejecutor: Optional[ThreadPoolExecutor] = None
+        self._compactacion: Optional[Future] = None
+    
+    def adjuntar(self, base_conocimientos: BaseConocimientos) -> bool:
+        """
+        Empieza a registrar los cambios de una base.
+        
+        Escribe un snapshot completo de la base y descarta los logs
+        anteriores; a partir de aquí solo se guardan los cambios.
+        
+        Args:
+            base_conocimientos: Base a seguir
+        
+        Returns:
+            True si se guardó el snapshot inicial
+        """
+        self.esperar_compactacion()
+        base_conocimientos.extraer_cambios()
+        base_conocimientos.activar_seguimiento_cambios()
+        
+        if not guardar_binario(base_conocimientos, self.ruta_snapshot, incluir_experiencias=False):
+            return False
+        
+        with self._bloqueo:
+            for ruta in (self.ruta_sellado, self.ruta_registro):
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+            self.entradas_en_registro = 0
+        return True
+    
+    def registrar(self, base_conocimientos: BaseConocimientos) -> int:
+        """
+        Agrega al log un lote con los pares modificados desde el último lote.
+        
+        Los pares que el codificador no puede representar no se escriben y
+        se cuentan en pares_omitidos (recuperar() no los tendrá).
+        
+        Args:
+            base_conocimientos: Base adjuntada
+        
+        Returns:
+            Número de entradas escritas
+        """
+        por_indices = isinstance(base_conocimientos, BaseConocimientosDensa) and \
+            base_conocimientos.codificador.es_compatible(self.codificador)
+        if por_indices:
+            cambios = base_conocimientos.extraer_indices_cambiados()
+        else:
+            cambios = base_conocimientos.extraer_cambios()
+        
+        try:
+            if por_indices:
+                q = base_conocimientos._q
+                visitas = base_conocimientos._visitas
+                entradas = b''.join(_ENTRADA.pack(i, q[i], visitas[i]) for i in cambios)
+            else:
+                codificar_par = self.codificador.codificar_par
+                filas = []
+                for estado, accion in cambios:
+                    try:
+                        indice = codificar_par(estado, accion)
+                    except (ValueError, TypeError):
+                        # Sin índice en el log; devolverlo lo haría fallar en cada lote
+                        self.pares_omitidos += 1
+                        continue
+                    filas.append(_ENTRADA.pack(indice,
+                                               base_conocimientos.q_table.get((estado, accion), 0.0),
+                                               base_conocimientos.visitas.get((estado, accion), 0)))
+                entradas = b''.join(filas)
+            
+            num_entradas = len(entradas) // _ENTRADA.size
+            lote = _LOTE.pack(
+                MARCA_LOTE, num_entradas,
+                base_conocimientos.total_experiencias,
+                base_conocimientos.cacerias_exitosas,
+                base_conocimientos.cacerias_fallidas,
+                zlib.crc32(entradas)
+            )
+            
+            with self._bloqueo:
+                self._escribir_lote(lote + entradas)
+                self.entradas_en_registro += num_entradas
+                self.lotes_escritos += 1
+        except BaseException:
+            # Los cambios vuelven a la base para escribirse en el próximo lote
+            if por_indices:
+                base_conocimientos.devolver_indices_cambiados(cambios)
+            else:
+                base_conocimientos.devolver_cambios(cambios)
+            raise
+        
+        return num_entradas
+    
+    def _escribir_lote(self, datos: bytes):
+        """
+        Agrega un lote al log activo (crea el archivo con su cabecera si no existe).
+        
+        Si la escritura falla, el log se recorta a su tamaño anterior (o se
+        elimina si era nuevo): un lote a medias haría que recuperar()
+        descartara también los lotes válidos escritos después.
+        
+        Args:
+            datos: Cabecera del lote más sus entradas
+        """
+        nuevo = not os.path.exists(self.ruta_registro)
+        with open(self.ruta_registro, 'ab') as f:
+            tamano = f.tell()
+            try:
+                if nuevo:
+                    f.write(_CABECERA.pack(MAGIA, VERSION, Abrevadero.RADIO))
+                f.write(datos)
+                f.flush()
+                if self.sincronizar:
+                    os.fsync(f.fileno())
+            except BaseException:
+                try:
+                    if nuevo:
+                        os.remove(self.ruta_registro)
+                    else:
+                        f.truncate(tamano)
+                except OSError:
+                    pass
+                raise
+    
+    def recuperar(self) -> BaseConocimientosDensa:
+        """
+        Reconstruye la base: último snapshot más los logs pendientes.
+        
+        Un lote incompleto o corrupto al final de un log (corte durante la
+        escritura) se descarta junto con todo lo que le sigue.
+        
+        Returns:
+            Base de conocimientos densa recuperada
+        """
+        self.esperar_compactacion()
+        with self._bloqueo:
+            base = self._cargar_snapshot()
+            for ruta in (self.ruta_sellado, self.ruta_registro):
+                self._aplicar_registro(base, ruta)
+        return base
+    
+    def compactar(self, en_segundo_plano: bool = True) -> Optional[Future]:
+        """
+        Incorpora el log al snapshot.
+        
+        Args:
+            en_segundo_plano: Si True, escribe el snapshot en otro hilo
+        
+        Returns:
+            Future que termina con el número de pares del nuevo snapshot
+            (None si no había nada que compactar o ya hay una compactación)
+        """
+        if self._compactacion is not None and not self._compactacion.done():
+            return None
+        
+        with self._bloqueo:
+            if not os.path.exists(self.ruta_registro) and not os.path.exists(self.ruta_sellado):
+                return None
+            # Sellar el log activo; los lotes siguientes van a un log nuevo
+            if os.path.exists(self.ruta_registro) and not os.path.exists(self.ruta_sellado):
+                os.replace(self.ruta_registro, self.ruta_sellado)
+                self.entradas_en_registro = 0
+        
+        if not en_segundo_plano:
+            futuro = Future()
+            futuro.set_result(self._compactar_sellado())
+            return futuro
+        
+        if self._ejecutor is None:
+            self._ejecutor = ThreadPoolExecutor(max_workers=1)
+        self._compactacion = self._ejecutor.submit(self._compactar_sellado)
+        return self._compactacion
+    
+    def esperar_compactacion(self):
+        """Espera a que termine la compactación en curso (si hay una)"""
+        if self._compactacion is not None:
+            self._compactacion.result()
+            self._compactacion = None
+    
+    def cerrar(self):
+        """Espera la compactación en curso y libera el hilo de trabajo"""
+        self.esperar_compactacion()
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown()
+            self._ejecutor = None
+    
+    def _compactar_sellado(self) -> int:
+        """Aplica el log sellado al snapshot y lo elimina"""
+        base = self._cargar_snapshot()
+        self._aplicar_registro(base, self.ruta_sellado)
+        if not guardar_binario(base, self.ruta_snapshot, incluir_experiencias=False):
+            raise IOError(f"No se pudo escribir el snapshot {self.ruta_snapshot}")
+        # El snapshot ya contiene el log sellado
+        os.remove(self.ruta_sellado)
+        return len(base)
+    
+    def _cargar_snapshot(self) -> BaseConocimientosDensa:
+        """Carga el snapshot en memoria propia (o una base vacía si no existe)"""
+        if os.path.exists(self.ruta_snapshot):
+            return cargar_binario(self.ruta_snapshot, usar_mmap=False)
+        return BaseConocimientosDensa(self.codificador)
+    
+    def _aplicar_registro(self, base: BaseConocimientosDensa, ruta: str) -> int:
+        """
+        Aplica en orden los lotes válidos de un log.
+        
+        Args:
+            base: Base donde aplicar los cambios
+            ruta: Ruta del log
+        
+        Returns:
+            Número de lotes aplicados
+        """
+        if not os.path.exists(ruta):
+            return 0
+        
+        with open(ruta, 'rb') as f:
+            datos = f.read()
+        
+        if len(datos) < _CABECERA.size:
+            return 0
+        magia, _, radio = _CABECERA.unpack_from(datos)
+        if magia != MAGIA:
+            raise ValueError(f"No es un log de cambios: {ruta}")
+        if CodificadorEstados(radio).num_distancias != base.codificador.num_distancias:
+            raise ValueError(f"El log {ruta} usa otro RADIO ({radio})")
+        
+        num_acciones = base.codificador.num_acciones
+        aplicados = 0
+        posicion = _CABECERA.size
+        while posicion + _LOTE.size <= len(datos):
+            marca, num_entradas, total, exitosas, fallidas, crc = _LOTE.unpack_from(datos, posicion)
+            inicio = posicion + _LOTE.size
+            fin = inicio + num_entradas * _ENTRADA.size
+            if marca != MARCA_LOTE or fin > len(datos) or zlib.crc32(datos[inicio:fin]) != crc:
+                break  # Lote incompleto: la escritura se interrumpió aquí
+            
+            for indice, valor, visitas in _ENTRADA.iter_unpack(datos[inicio:fin]):
+                codigo_estado, codigo_accion = divmod(indice, num_acciones)
+                base.actualizar_valor_q_codigo(codigo_estado, codigo_accion, valor)
+                base._visitas[indice] = visitas
+            base.total_experiencias = total
+            base.cacerias_exitosas = exitosas
+            base.cacerias_fallidas = fallidas
+            
+            aplicados += 1
+            posicion = fin
+        
+        return aplicados
+    
+    def __str__(self) -> str:
+        """Representación en string"""
+        return (f"RegistroCambios(Snapshot={self.ruta_snapshot}, Lotes={self.lotes_escritos}, "
+                f"Entradas pendientes={self.entradas_en_registro}, Omitidos={self.pares_omitidos})")
+
+
+if __name__ == "__main__":
+    # Pruebas básicas
+    import tempfile
+    import time
+    from learning.entrenamiento import Entrenador
+    
+    print("=== Pruebas del Registro de Cambios ===\n")
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        registro = RegistroCambios(os.path.join(directorio, "prueba"), sincronizar=False)
+        entrenador = Entrenador(BaseConocimientosDensa())
+        
+        reportes = entrenador.entrenar_incremental(
+            600, checkpoint_cada=200, registro=registro, compactar_cada_entradas=500
+        )
+        registro.esperar_compactacion()
+        
+        print(f"{registro}")
+        for reporte in reportes:
+            print(f"  Lote: {reporte['checkpoint']['entradas']} entradas en "
+                  f"{reporte['checkpoint']['segundos'] * 1000:.2f} ms")
+        
+        # Simular un corte: recuperar desde disco
+        inicio = time.perf_counter()
+        recuperada = registro.recuperar()
+        print(f"\nRecuperada en {(time.perf_counter() - inicio) * 1000:.1f} ms: {recuperada}")
+        print(f"¿Igual a la base en memoria? "
+              f"{dict(recuperada.q_table) == dict(entrenador.base_conocimientos.q_table)}")
+        registro.cerrar()
@@ -0,0 +1,440 @@
+"""
+Benchmarks de simulación y entrenamiento.
+Ejecutar con: python -m tests.benchmarks [--base base.json] [--salida resultados.json]
+
+Cada benchmark reporta segundos por operación (el mínimo de varias
+repeticiones). Con --base los resultados se comparan contra una línea base
+guardada y cualquier operación más lenta que la tolerancia, o que falte
+respecto de la línea base, hace que el proceso termine con código 1.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import fnmatch
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from environment import Abrevadero, Direccion
+from agents.leon import AccionLeon
+from simulation.caceria import Caceria, ResultadoCaceria, ModoBehaviorImpala
+from knowledge.base_conocimientos import BaseConocimientos
+from knowledge.base_densa import BaseConocimientosDensa
+from knowledge.codificacion import CodificadorEstados, ACCIONES_LEON
+from learning.q_learning import QLearning
+from learning.recompensas import SistemaRecompensas
+from learning.entrenamiento import Entrenador
+
+
+# Versión del formato del JSON de resultados
+VERSION_FORMATO = 1
+
+# Tamaños de tabla (pares estado-acción) de los benchmarks de Q-Learning
+TAMANOS_TABLA = (1000, 10000, 100000, 1000000)
+
+# Tolerancia por defecto: 25% más lento que la línea base es regresión
+TOLERANCIA = 0.25
+
+# Estados consultados por repetición en los benchmarks de tabla
+CONSULTAS_TABLA = 20000
+
+
+def medir(funcion: Callable[[], None], operaciones: int, repeticiones: int) -> Dict:
+    """
+    Mide una función que ejecuta un número fijo de operaciones.
+    
+    Se usa el mínimo de las repeticiones: es el tiempo menos afectado por
+    otros procesos y el más estable entre ejecuciones.
+    
+    Args:
+        funcion: Función sin argumentos que ejecuta las operaciones
+        operaciones: Operaciones que ejecuta cada llamada
+        repeticiones: Veces que se llama a la función
+    
+    Returns:
+        Diccionario con segundos_por_op, ops_por_segundo, operaciones y repeticiones
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    mejor = min(tiempos) / operaciones
+    return {
+        'segundos_por_op': mejor,
+        'ops_por_segundo': 1.0 / mejor if mejor > 0 else math.inf,
+        'operaciones': operaciones,
+        'repeticiones': repeticiones
+    }
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+def bench_abrevadero(repeticiones: int) -> Dict[str, Dict]:
+    """Consultas de geometría del Abrevadero sobre las 8 posiciones"""
+    abrevadero = Abrevadero()
+    posiciones = list(range(1, 9)) * 1000
+    direcciones = list(Direccion)
+    pares = [(p, direcciones[i % len(direcciones)]) for i, p in enumerate(posiciones)]
+    centro = abrevadero.CENTRO
+    coordenadas = [abrevadero.obtener_coordenadas(p) for p in posiciones]
+    n = len(posiciones)
+    
+    def distancias():
+        for p in posiciones:
+            abrevadero.distancia_leon_impala(p)
+    
+    def vision():
+        for p, d in pares:
+            abrevadero.leon_en_angulo_vision(p, d)
+    
+    def coordenadas_posicion():
+        for p in posiciones:
+            abrevadero.obtener_coordenadas(p)
+    
+    def avance():
+        for p in posiciones:
+            abrevadero.calcular_nueva_posicion_avance(p)
+    
+    def distancia_puntos():
+        for c in coordenadas:
+            abrevadero.calcular_distancia(c, centro)
+    
+    return {
+        'abrevadero.distancia_leon_impala': medir(distancias, n, repeticiones),
+        'abrevadero.leon_en_angulo_vision': medir(vision, n, repeticiones),
+        'abrevadero.obtener_coordenadas': medir(coordenadas_posicion, n, repeticiones),
+        'abrevadero.calcular_nueva_posicion_avance': medir(avance, n, repeticiones),
+        'abrevadero.calcular_distancia': medir(distancia_puntos, n, repeticiones),
+    }
+
+
+def bench_caceria(repeticiones: int) -> Dict[str, Dict]:
+    """Costo de un turno y de una cacería completa"""
+    resultados = {}
+    turnos = 5000
+    
+    for silenciosa in (False, True):
+        caceria = Caceria(Abrevadero(), silenciosa=silenciosa)
+        
+        def ejecutar_turnos():
+            random.seed(0)
+            caceria.inicializar_caceria(1)
+            for i in range(turnos):
+                if caceria.resultado != ResultadoCaceria.EN_PROGRESO:
+                    caceria.inicializar_caceria(i % 8 + 1)
+                caceria.ejecutar_turno(AccionLeon.ESCONDERSE)
+        
+        nombre = 'caceria.ejecutar_turno' + ('_silenciosa' if silenciosa else '')
+        resultados[nombre] = medir(ejecutar_turnos, turnos, repeticiones)
+    
+    # Cacería completa con una estrategia fija: avanzar y atacar de cerca
+    episodios = 500
+    caceria = Caceria(Abrevadero(), silenciosa=True)
+    verificador = caceria.verificador
+    
+    def ejecutar_episodios():
+        random.seed(0)
+        for i in range(episodios):
+            caceria.inicializar_caceria(i % 8 + 1, ModoBehaviorImpala.ALEATORIO)
+            while caceria.resultado == ResultadoCaceria.EN_PROGRESO:
+                distancia = verificador.calcular_distancia_actual(caceria.leon)
+                caceria.ejecutar_turno(AccionLeon.ATACAR if distancia < 4 else AccionLeon.AVANZAR)
+    
+    resultados['caceria.episodio'] = medir(ejecutar_episodios, episodios, repeticiones)
+    return resultados
+
+
+def bench_entrenamiento(repeticiones: int) -> Dict[str, Dict]:
+    """Episodios de entrenamiento por segundo (base vacía en cada repetición)"""
+    resultados = {}
+    episodios = 500
+    
+    for clase in (BaseConocimientos, BaseConocimientosDensa):
+        def entrenar():
+            random.seed(0)
+            Entrenador(clase()).entrenar(episodios, verbose=False)
+        
+        nombre = 'entrenador.entrenar' + ('_densa' if clase is BaseConocimientosDensa else '')
+        resultados[nombre] = medir(entrenar, episodios, max(1, repeticiones // 2))
+    return resultados
+
+
+def _llenar_tabla(clase: type, pares: int) -> Tuple[BaseConocimientos, List]:
+    """
+    Crea una base con al menos un número de pares estado-acción conocidos.
+    
+    El codificador se agranda (más bins de distancia) hasta que caben los
+    estados, así que las dos clases guardan exactamente los mismos pares.
+    
+    Returns:
+        Tupla (base, estados conocidos)
+    """
+    num_acciones = len(ACCIONES_LEON)
+    estados_necesarios = -(-pares // num_acciones)
+    por_distancia = CodificadorEstados(0).num_estados
+    num_distancias = -(-estados_necesarios // por_distancia)
+    codificador = CodificadorEstados((num_distancias - 1) / 2)
+    
+    if clase is BaseConocimientosDensa:
+        base = BaseConocimientosDensa(codificador)
+    else:
+        base = clase()
+    
+    generador = random.Random(0)
+    estados = []
+    for codigo in range(estados_necesarios):
+        estado = codificador.decodificar(codigo)
+        estados.append(estado)
+        for accion in ACCIONES_LEON:
+            base.actualizar_valor_q(estado, accion, generador.uniform(-10, 10))
+    return base, estados
+
+
+def bench_q_learning(repeticiones: int, tamanos: Tuple[int, ...] = TAMANOS_TABLA) -> Dict[str, Dict]:
+    """QLearning.actualizar_valor_q y obtener_mejor_accion según el tamaño de la tabla"""
+    resultados = {}
+    acciones = list(ACCIONES_LEON)
+    
+    for clase in (BaseConocimientos, BaseConocimientosDensa):
+        sufijo = '_densa' if clase is BaseConocimientosDensa else ''
+        for tamano in tamanos:
+            base, estados = _llenar_tabla(clase, tamano)
+            ql = QLearning(base, SistemaRecompensas())
+            
+            # Accesos aleatorios: con tablas grandes no caben en caché
+            generador = random.Random(1)
+            muestra = [generador.choice(estados) for _ in range(CONSULTAS_TABLA + 1)]
+            elegidas = [generador.choice(acciones) for _ in range(CONSULTAS_TABLA)]
+            
+            def actualizar():
+                for i in range(CONSULTAS_TABLA):
+                    ql.actualizar_valor_q(muestra[i], elegidas[i], 1.0, muestra[i + 1], acciones)
+            
+            def mejor_accion():
+                for estado in muestra[:CONSULTAS_TABLA]:
+                    base.obtener_mejor_accion(estado, acciones)
+            
+            etiqueta = f"{tamano:.0e}".replace("+0", "")
+            resultados[f'q_learning.actualizar_valor_q{sufijo}[{etiqueta}]'] = medir(
+                actualizar, CONSULTAS_TABLA, repeticiones
+            )
+            resultados[f'base.obtener_mejor_accion{sufijo}[{etiqueta}]'] = medir(
+                mejor_accion, CONSULTAS_TABLA, repeticiones
+            )
+            del base, estados, ql
+    return resultados
+
+
+BENCHMARKS = {
+    'abrevadero': bench_abrevadero,
+    'caceria': bench_caceria,
+    'entrenamiento': bench_entrenamiento,
+    'q_learning': bench_q_learning,
+}
+
+
+def ejecutar_benchmarks(grupos: Optional[List[str]] = None,
+                        repeticiones: int = 5,
+                        tamanos: Tuple[int, ...] = TAMANOS_TABLA,
+                        filtro: Optional[str] = None,
+                        verbose: bool = False) -> Dict:
+    """
+    Ejecuta los benchmarks y arma el documento de resultados.
+    
+    Args:
+        grupos: Grupos de BENCHMARKS a ejecutar (default: todos)
+        repeticiones: Repeticiones de cada medición
+        tamanos: Tamaños de tabla de los benchmarks de Q-Learning
+        filtro: Patrón fnmatch sobre los nombres de los resultados
+        verbose: Si True, imprime cada resultado al obtenerlo
+    
+    Returns:
+        Diccionario con version, fecha, entorno, grupos, filtro y
+        resultados (cada medición indica su grupo)
+    """
+    grupos = grupos or list(BENCHMARKS)
+    desconocidos = [g for g in grupos if g not in BENCHMARKS]
+    if desconocidos:
+        raise ValueError(f"Grupos desconocidos: {desconocidos} (disponibles: {list(BENCHMARKS)})")
+    
+    resultados = {}
+    for grupo in grupos:
+        if grupo == 'q_learning':
+            medidos = BENCHMARKS[grupo](repeticiones, tamanos)
+        else:
+            medidos = BENCHMARKS[grupo](repeticiones)
+        for nombre, medicion in medidos.items():
+            if filtro and not fnmatch.fnmatch(nombre, filtro):
+                continue
+            resultados[nombre] = dict(medicion, grupo=grupo)
+            if verbose:
+                print(f"  {nombre:<50} {_formatear_tiempo(medicion['segundos_por_op']):>12}/op "
+                      f"{medicion['ops_por_segundo']:>14,.0f} op/s")
+    
+    return {
+        'version': VERSION_FORMATO,
+        'fecha': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'grupos': grupos,
+        'filtro': filtro,
+        'resultados': resultados
+    }
+
+
+def comparar_con_base(actual: Dict, base: Dict,
+                      tolerancia: float = TOLERANCIA) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Compara resultados contra una línea base.
+    
+    Args:
+        actual: Documento de resultados (ver ejecutar_benchmarks)
+        base: Documento de la línea base
+        tolerancia: Fracción de lentitud permitida (0.25 = hasta 25% más lento)
+    
+    Los benchmarks de la línea base que no aparecen en los resultados se
+    reportan como 'faltante' y cuentan como fallo (un benchmark renombrado
+    o eliminado no debe desaparecer en silencio), salvo los de grupos no
+    ejecutados o excluidos por el filtro de esta corrida.
+    
+    Returns:
+        Tupla (comparaciones, fallos); cada comparación tiene nombre,
+        base, actual (segundos por operación), cambio (fracción) y estado
+        ('ok', 'mejora', 'regresion', 'nuevo' o 'faltante'); los fallos son
+        las regresiones y las faltantes
+    """
+    if base.get('version') != VERSION_FORMATO:
+        raise ValueError(f"Versión de línea base incompatible: {base.get('version')} "
+                         f"(se esperaba {VERSION_FORMATO})")
+    
+    comparaciones = []
+    for nombre, medicion in actual['resultados'].items():
+        referencia = base['resultados'].get(nombre)
+        if referencia is None:
+            comparaciones.append({'nombre': nombre, 'base': None,
+                                  'actual': medicion['segundos_por_op'], 'cambio': None, 'estado': 'nuevo'})
+            continue
+        cambio = medicion['segundos_por_op'] / referencia['segundos_por_op'] - 1.0
+        if cambio > tolerancia:
+            estado = 'regresion'
+        elif cambio < -tolerancia:
+            estado = 'mejora'
+        else:
+            estado = 'ok'
+        comparaciones.append({'nombre': nombre, 'base': referencia['segundos_por_op'],
+                              'actual': medicion['segundos_por_op'], 'cambio': cambio, 'estado': estado})
+    
+    grupos, filtro = actual.get('grupos'), actual.get('filtro')
+    for nombre, referencia in base['resultados'].items():
+        if nombre in actual['resultados']:
+            continue
+        grupo = referencia.get('grupo')
+        if grupos is not None and grupo is not None and grupo not in grupos:
+            continue
+        if filtro and not fnmatch.fnmatch(nombre, filtro):
+            continue
+        comparaciones.append({'nombre': nombre, 'base': referencia['segundos_por_op'],
+                              'actual': None, 'cambio': None, 'estado': 'faltante'})
+    
+    fallos = [c for c in comparaciones if c['estado'] in ('regresion', 'faltante')]
+    return comparaciones, fallos
+
+
+def _formatear_tiempo(segundos: float) -> str:
+    """Formatea un tiempo con la unidad más legible"""
+    if segundos >= 1:
+        return f"{segundos:.3f} s"
+    if segundos >= 1e-3:
+        return f"{segundos * 1e3:.3f} ms"
+    if segundos >= 1e-6:
+        return f"{segundos * 1e6:.3f} µs"
+    return f"{segundos * 1e9:.1f} ns"
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada de la línea de comandos.
+    
+    Returns:
+        Código de salida (1 si hubo regresiones o benchmarks faltantes)
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks de León vs Impala")
+    parser.add_argument("--grupos", nargs="+", choices=list(BENCHMARKS),
+                        help="Grupos a ejecutar (default: todos)")
+    parser.add_argument("--filtro", help="Patrón de nombres a conservar (p. ej. 'q_learning.*')")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Repeticiones por medición")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS_TABLA),
+                        help="Tamaños de tabla (pares) para Q-Learning")
+    parser.add_argument("--salida", help="Archivo JSON donde escribir los resultados")
+    parser.add_argument("--base", help="Línea base JSON contra la que comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="Fracción de lentitud permitida antes de fallar (default: 0.25)")
+    parser.add_argument("--guardar-base", action="store_true",
+                        help="Escribe los resultados en --base en lugar de comparar")
+    args = parser.parse_args(argumentos)
+    
+    if args.guardar_base and not args.base:
+        parser.error("--guardar-base requiere --base")
+    
+    print("=== Benchmarks de León vs Impala ===\n")
+    resultados = ejecutar_benchmarks(args.grupos, args.repeticiones, tuple(args.tamanos),
+                                     args.filtro, verbose=True)
+    
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+    
+    if not args.base:
+        return 0
+    
+    if args.guardar_base:
+        with open(args.base, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {args.base}")
+        return 0
+    
+    with open(args.base, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    comparaciones, fallos = comparar_con_base(resultados, base, args.tolerancia)
+    regresiones = [c for c in fallos if c['estado'] == 'regresion']
+    faltantes = [c for c in fallos if c['estado'] == 'faltante']
+    
+    print(f"\nComparación con {args.base} (tolerancia {args.tolerancia:.0%}):")
+    for c in comparaciones:
+        cambio = "" if c['cambio'] is None else f"{c['cambio']:+.1%}"
+        print(f"  {c['estado'].upper():<10} {c['nombre']:<50} {cambio:>8}")
+    
+    if fallos:
+        print(f"\n{'!' * 70}")
+        if regresiones:
+            print(f"REGRESIÓN DE RENDIMIENTO: {len(regresiones)} benchmark(s) más de "
+                  f"{args.tolerancia:.0%} más lentos que la línea base")
+            for c in regresiones:
+                print(f"  {c['nombre']}: {_formatear_tiempo(c['base'])} -> "
+                      f"{_formatear_tiempo(c['actual'])} ({c['cambio']:+.1%})")
+        if faltantes:
+            print(f"BENCHMARKS FALTANTES: {len(faltantes)} benchmark(s) de la línea base "
+                  f"no se ejecutaron")
+            for c in faltantes:
+                print(f"  {c['nombre']}: {_formatear_tiempo(c['base'])} en la línea base")
+        print(f"{'!' * 70}")
+        return 1
+    
+    print("\nSin regresiones.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,10 +12,26 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from environment import Abrevadero, Direccion
 from agents.leon import Leon, AccionLeon
 from agents.impala import Impala, AccionImpala
-from simulation.caceria import Caceria, ResultadoCaceria
-from knowledge.base_conocimientos import BaseConocimientos, Estado
+from simulation.caceria import Caceria, ResultadoCaceria, ModoBehaviorImpala
+from simulation.caceria_lote import CaceriaLote, codificar_accion_leon
+from knowledge.base_conocimientos import BaseConocimientos, Estado, Experiencia
+from knowledge.codificacion import CodificadorEstados
+from knowledge.base_densa import BaseConocimientosDensa
+from knowledge.memoria_experiencias import MemoriaExperiencias
+from knowledge.generalizacion import Generalizador
 from learning.q_learning import QLearning
 from learning.recompensas import SistemaRecompensas
+from learning.entrenamiento import Entrenador, crear_estado_desde_caceria
+from learning.repeticion import ArbolSuma, RepeticionPriorizada
+from learning.planificacion import PlanificacionPriorizada
+from storage.guardado import guardar_conocimiento, listar_guardados
+from storage.carga import cargar_conocimiento
+from storage.registro_cambios import RegistroCambios
+from storage.guardado_asincrono import GuardadoAsincrono
+from storage.catalogo import CatalogoCheckpoints
+from storage.importacion import importar_json_en_flujo, leer_resumen_json
+from storage.fusion import fusionar_varios, np as np_fusion
+from learning.mdp_exacto import ModeloCaceria, iteracion_de_valores, iteracion_de_politicas, agregar_por_observacion, resolver_caceria, evaluar_politica
 
 
 def test_abrevadero_coordenadas():
@@ -44,6 +60,38 @@ def test_abrevadero_distancia():
     assert abs(distancia_leon - 9.5) < 0.01
 
 
+def test_abrevadero_tablas():
+    """Test: Las tablas precalculadas coinciden con la geometría y se reconstruyen"""
+    abrevadero = Abrevadero()
+    
+    for pos in range(1, 9):
+        coord = abrevadero.obtener_coordenadas(pos)
+        for direccion in Direccion:
+            assert abrevadero.leon_en_angulo_vision(pos, direccion) == \
+                abrevadero._calcular_vision(pos, direccion)
+            assert abrevadero.tabla_vision[direccion.value // 45][pos - 1] == \
+                abrevadero.leon_en_angulo_vision(pos, direccion)
+        
+        # Variantes con arreglos
+        assert abs(abrevadero.calcular_distancias([coord[0]], [coord[1]])[0] -
+                   abrevadero.distancia_leon_impala(pos)) < 1e-12
+        assert abs(abrevadero.calcular_angulos([0.0], [0.0], [coord[0]], [coord[1]])[0] -
+                   abrevadero.calcular_angulo((0, 0), coord)) < 1e-9
+    
+    # Cambiar RADIO o ANGULO_VISION reconstruye las tablas
+    abrevadero.RADIO = 5.0
+    abrevadero.ANGULO_VISION = 360
+    try:
+        assert abs(abrevadero.distancia_leon_impala(1) - 5.0) < 0.01
+        assert abrevadero.leon_en_angulo_vision(5, Direccion.NORTE)
+    finally:
+        del abrevadero.RADIO
+        del abrevadero.ANGULO_VISION
+    
+    assert abs(abrevadero.distancia_leon_impala(1) - 9.5) < 0.01
+    assert not abrevadero.leon_en_angulo_vision(5, Direccion.NORTE)
+
+
 def test_leon_acciones():
     """Test: León ejecuta acciones correctamente"""
     leon = Leon()
@@ -165,12 +213,1121 @@ def test_caceria_turno_a_turno():
     assert caceria.tiempo.obtener_tiempo_actual() > 0
 
 
+def test_caceria_silenciosa():
+    """Test: El modo silencioso sigue las mismas reglas sin generar historia"""
+    import random
+    
+    abrevadero = Abrevadero()
+    acciones = [AccionLeon.AVANZAR, AccionLeon.ESCONDERSE, AccionLeon.ATACAR]
+    
+    for semilla in range(100):
+        trazas = []
+        for silenciosa in (False, True):
+            caceria = Caceria(abrevadero, silenciosa=silenciosa)
+            generador = random.Random(semilla)
+            random.seed(semilla)
+            caceria.inicializar_caceria(generador.randint(1, 8))
+            
+            traza = []
+            terminada = False
+            while not terminada:
+                terminada, mensaje = caceria.ejecutar_turno(generador.choice(acciones))
+                traza.append((caceria.leon.posicion_exacta, caceria.leon.esta_escondido,
+                              caceria.impala.direccion_vista, caceria.impala.velocidad_huida))
+            trazas.append((caceria.resultado, caceria.condicion_huida, traza))
+        
+        assert trazas[0] == trazas[1]
+        assert mensaje == ""
+        assert caceria.tiempo.obtener_historia() == []
+
+
+def test_caceria_lote_equivale_a_caceria():
+    """Test: El motor por lotes sigue las mismas reglas que Caceria"""
+    abrevadero = Abrevadero()
+    secuencia = [AccionImpala.VER_DERECHA, AccionImpala.BEBER_AGUA, AccionImpala.VER_IZQUIERDA]
+    plan = [AccionLeon.ESCONDERSE, AccionLeon.AVANZAR, AccionLeon.AVANZAR] + [AccionLeon.ATACAR] * 50
+    
+    lote = CaceriaLote(abrevadero, 8, ModoBehaviorImpala.PROGRAMADO, secuencia)
+    lote.reiniciar(list(range(1, 9)))
+    turno = 0
+    while not lote.todas_terminadas():
+        lote.ejecutar_turno([codificar_accion_leon(plan[turno])] * 8)
+        turno += 1
+    
+    for posicion in range(1, 9):
+        caceria = Caceria(abrevadero)
+        caceria.inicializar_caceria(posicion, ModoBehaviorImpala.PROGRAMADO, secuencia)
+        turno = 0
+        while caceria.resultado == ResultadoCaceria.EN_PROGRESO:
+            caceria.ejecutar_turno(plan[turno])
+            turno += 1
+        
+        assert lote.obtener_resultados()[posicion - 1] == caceria.resultado
+        assert lote.tiempo[posicion - 1] == caceria.tiempo.obtener_tiempo_actual()
+
+
+def test_caceria_lote_numpy_equivale_a_array():
+    """Test: Las implementaciones NumPy y array del motor por lotes coinciden"""
+    import pytest
+    pytest.importorskip("numpy")
+    import random
+    
+    abrevadero = Abrevadero()
+    rng = random.Random(6)
+    impala = [AccionImpala.VER_IZQUIERDA, AccionImpala.VER_DERECHA,
+              AccionImpala.VER_FRENTE, AccionImpala.BEBER_AGUA]
+    n = 64
+    
+    for _ in range(10):
+        secuencia = [rng.choice(impala) for _ in range(rng.randint(1, 6))]
+        lotes = [CaceriaLote(abrevadero, n, ModoBehaviorImpala.PROGRAMADO, secuencia, usar_numpy=usar)
+                 for usar in (True, False)]
+        posiciones = [i % 8 + 1 for i in range(n)]
+        for lote in lotes:
+            lote.reiniciar(posiciones)
+        
+        while not lotes[1].todas_terminadas():
+            acciones = [rng.randrange(3) for _ in range(n)]
+            terminadas = [list(map(bool, lote.ejecutar_turno(acciones))) for lote in lotes]
+            assert terminadas[0] == terminadas[1]
+        
+        assert lotes[0].todas_terminadas()
+        for nombre in ('resultado', 'tiempo', 'condicion', 'escondido', 'atacando', 'velocidad_huida'):
+            assert list(map(int, getattr(lotes[0], nombre))) == list(map(int, getattr(lotes[1], nombre))), nombre
+        assert all(abs(a - b) < 1e-9 for a, b in zip(lotes[0].distancias(), lotes[1].distancias()))
+
+
+def test_codificador_estados():
+    """Test: El codificador empaqueta estados en enteros densos y los recupera"""
+    codificador = CodificadorEstados()
+    
+    codigos = set()
+    for posicion in range(1, 9):
+        for accion_impala in ["ver_frente", "huir", "beber_agua"]:
+            estado = Estado(posicion, 7.5, accion_impala, posicion % 2 == 0, True)
+            codigo = codificador.codificar(estado)
+            assert 0 <= codigo < codificador.num_estados
+            assert codificador.decodificar(codigo) == estado
+            codigos.add(codigo)
+    
+    # Estados distintos producen códigos distintos
+    assert len(codigos) == 24
+
+
+def test_base_densa_equivale_a_base():
+    """Test: El backend denso responde igual que el backend de diccionario"""
+    bc = BaseConocimientos()
+    densa = BaseConocimientosDensa()
+    acciones = ["avanzar", "esconderse", "atacar"]
+    
+    estado1 = Estado(1, 9.5, "ver_frente", False, True)
+    estado2 = Estado(4, 3.0, "huir", True, False)
+    
+    for base in (bc, densa):
+        base.actualizar_valor_q(estado1, "atacar", -2.0)
+        base.actualizar_valor_q(estado1, "esconderse", 3.5)
+        base.actualizar_valor_q(estado2, "avanzar", 0.0)
+        base.agregar_experiencia(Experiencia(estado1, "atacar", -3.0, None, False))
+    
+    for estado in (estado1, estado2):
+        assert densa.obtener_mejor_accion(estado, acciones) == bc.obtener_mejor_accion(estado, acciones)
+        for accion in acciones:
+            assert densa.obtener_valor_q(estado, accion) == bc.obtener_valor_q(estado, accion)
+            assert densa.obtener_visitas(estado, accion) == bc.obtener_visitas(estado, accion)
+    
+    assert densa.obtener_estadisticas() == bc.obtener_estadisticas()
+    assert densa.obtener_estados_conocidos() == bc.obtener_estados_conocidos()
+    assert dict(densa.q_table) == dict(bc.q_table)
+
+
+
+def test_memoria_experiencias():
+    """Test: La memoria de experiencias es un buffer circular de capacidad fija"""
+    memoria = MemoriaExperiencias(capacidad=5)
+    estado1 = Estado(2, 6.5, "ver_izquierda", False, True)
+    estado2 = Estado(2, 5.5, "beber_agua", True, False)
+    
+    experiencias = [Experiencia(estado1, "avanzar", float(i), estado2, False) for i in range(7)]
+    experiencias.append(Experiencia(estado2, "atacar", 100.0, None, True))
+    memoria.extend(experiencias)
+    
+    # Solo quedan las 5 más recientes, en orden
+    assert len(memoria) == 5
+    assert memoria.total_agregadas == 8
+    assert list(memoria) == experiencias[-5:]
+    assert memoria[-1] == experiencias[-1]
+    assert memoria[1:3] == experiencias[4:6]
+    
+    # La base de conocimientos usa la memoria y no crece más allá de su capacidad
+    bc = BaseConocimientos(capacidad_experiencias=5)
+    for experiencia in experiencias:
+        bc.agregar_experiencia(experiencia)
+    assert len(bc.experiencias) == 5
+    assert bc.total_experiencias == 8
+    assert '"experiencias_recientes"' in bc.exportar_a_json()
+    
+    # Los estados que el codificador no representa se guardan sin cambios
+    import tempfile
+    raros = [
+        Experiencia(Estado(2, 3.3, "ver_frente", False, True), "avanzar", 1.0, estado1, False),
+        Experiencia(estado1, "esconderse", -1.0, Estado(2, 50.0, "ver_frente", False, True), False),
+        Experiencia(Estado(2, 4.0, "dormir", False, True), "atacar", 2.0, None, False),
+    ]
+    bc = BaseConocimientos(capacidad_experiencias=5)
+    for experiencia in experiencias[:2] + raros:
+        bc.agregar_experiencia(experiencia)
+    assert list(bc.experiencias) == experiencias[:2] + raros
+    assert list(bc.copiar().experiencias) == experiencias[:2] + raros
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "raros_conocimiento.json")
+        assert guardar_conocimiento(bc, ruta)
+        cargada = cargar_conocimiento(ruta, incluir_experiencias=True)
+        assert list(cargada.experiencias) == experiencias[:2] + raros
+    
+    # Al sobrescribir su fila, la experiencia sin codificar se descarta
+    for experiencia in experiencias[2:6]:
+        bc.agregar_experiencia(experiencia)
+    assert list(bc.experiencias) == [raros[2]] + experiencias[2:6]
+    bc.agregar_experiencia(experiencias[6])
+    assert list(bc.experiencias) == experiencias[2:7]
+
+def test_repeticion_priorizada():
+    """Test: El árbol de sumas muestrea por prioridad y Q-Learning repite lotes"""
+    arbol = ArbolSuma(5)
+    for indice, prioridad in enumerate([1.0, 0.0, 3.0, 0.0, 4.0]):
+        arbol.actualizar(indice, prioridad)
+    
+    assert arbol.total() == 8.0
+    assert arbol.buscar(0.5) == 0
+    assert arbol.buscar(1.0) == 2
+    assert arbol.buscar(3.99) == 2
+    assert arbol.buscar(7.99) == 4
+    
+    # Las hojas con prioridad 0 nunca se muestrean
+    assert all(arbol.buscar(v / 10) in (0, 2, 4) for v in range(80))
+    
+    repeticion = RepeticionPriorizada(capacidad=50, tamano_lote=4, proporcion_repeticion=2.0)
+    ql = QLearning(BaseConocimientos(), SistemaRecompensas(), repeticion=repeticion)
+    acciones = ["avanzar", "esconderse", "atacar"]
+    estado1 = Estado(1, 1.0, "ver_frente", False, False)
+    
+    for _ in range(10):
+        ql.aprender_de_experiencia(Experiencia(estado1, "atacar", 100.0, None, True), acciones)
+    
+    stats = ql.obtener_estadisticas()
+    assert stats['actualizaciones_repeticion'] == 20
+    assert stats['transiciones_en_memoria'] == 10
+    
+    # Repetir acerca Q al valor terminal más rápido que solo en línea
+    sin_repeticion = QLearning(BaseConocimientos(), SistemaRecompensas())
+    for _ in range(10):
+        sin_repeticion.aprender_de_experiencia(Experiencia(estado1, "atacar", 100.0, None, True), acciones)
+    assert ql.base_conocimientos.obtener_valor_q(estado1, "atacar") > \
+        sin_repeticion.base_conocimientos.obtener_valor_q(estado1, "atacar")
+
+def test_entrenamiento_paralelo():
+    """Test: El entrenamiento paralelo fusiona las tablas y agrega el progreso"""
+    entrenador = Entrenador()
+    progreso = []
+    
+    reporte = entrenador.entrenar_paralelo(
+        300,
+        num_trabajadores=2,
+        episodios_por_sincronizacion=50,
+        callback_progreso=lambda *args: progreso.append(args),
+        semilla=7
+    )
+    
+    bc = entrenador.base_conocimientos
+    assert reporte['episodios'] == 300
+    assert reporte['rondas_sincronizacion'] == 3
+    assert entrenador.total_cacerias == 300
+    assert progreso[-1][0] == 300 and progreso[-1][4] == 300
+    
+    # Cada experiencia suma exactamente una visita
+    assert sum(bc.visitas.values()) == bc.total_experiencias
+    assert bc.cacerias_exitosas + bc.cacerias_fallidas == 300
+    assert len(bc.q_table) > 0
+    
+    # La memoria de repetición de cada trabajador se conserva entre rondas
+    entrenador = Entrenador(repeticion=RepeticionPriorizada(capacidad=100000))
+    reporte = entrenador.entrenar_paralelo(120, num_trabajadores=2,
+                                           episodios_por_sincronizacion=20, semilla=7)
+    assert reporte['rondas_sincronizacion'] == 3
+    assert reporte['transiciones_repeticion'] == entrenador.base_conocimientos.total_experiencias
+    
+    # También el modelo de planificación: con un trabajador contiene todos los pares visitados
+    entrenador = Entrenador(planificacion=PlanificacionPriorizada())
+    reporte = entrenador.entrenar_paralelo(60, num_trabajadores=1,
+                                           episodios_por_sincronizacion=20, semilla=7)
+    visitados = sum(1 for v in entrenador.base_conocimientos.visitas.values() if v > 0)
+    assert reporte['rondas_sincronizacion'] == 3
+    assert reporte['pares_modelo_planificacion'] == visitados
+
+def test_mdp_exacto():
+    """Test: El modelo exacto es una distribución válida y la política resuelta caza"""
+    modelo = ModeloCaceria(posiciones_iniciales=[3]).construir()
+    assert modelo.num_estados > 0
+    for filas in modelo.transiciones:
+        for resultados in filas:
+            assert abs(sum(p for p, _, _ in resultados) - 1.0) < 1e-9
+    
+    # Iteración de valores y de políticas llegan a los mismos valores
+    q_valores, _ = iteracion_de_valores(modelo)
+    q_politicas, _ = iteracion_de_politicas(modelo)
+    for fila_v, fila_p in zip(q_valores, q_politicas):
+        assert all(abs(a - b) < 1e-6 for a, b in zip(fila_v, fila_p))
+    
+    # Si el impala siempre bebe, la política óptima siempre atrapa al impala
+    modelo = ModeloCaceria(comportamiento_impala=ModoBehaviorImpala.PROGRAMADO,
+                           secuencia_impala=[AccionImpala.BEBER_AGUA])
+    bc, reporte = resolver_caceria(modelo=modelo)
+    assert reporte['estados_observables'] > 0
+    assert len(bc.q_table) == reporte['pares_estado_accion']
+    
+    acciones = ["avanzar", "esconderse", "atacar"]
+    por_posicion, _ = evaluar_politica(bc, modelo)
+    caceria = Caceria(Abrevadero(), silenciosa=True)
+    for posicion in range(1, 9):
+        caceria.inicializar_caceria(posicion, ModoBehaviorImpala.PROGRAMADO,
+                                    [AccionImpala.BEBER_AGUA])
+        turnos = 0
+        while caceria.resultado == ResultadoCaceria.EN_PROGRESO:
+            estado = crear_estado_desde_caceria(caceria)
+            accion, _ = bc.obtener_mejor_accion(estado, acciones)
+            caceria.ejecutar_turno(AccionLeon[accion.upper()])
+            turnos += 1
+        assert caceria.resultado == ResultadoCaceria.EXITO
+        
+        # Con el impala determinista la evaluación exacta es la cacería simulada
+        assert por_posicion[posicion]['probabilidad_exito'] == 1.0
+        assert por_posicion[posicion]['duracion_esperada'] == turnos
+    
+    # Con el impala aleatorio el león no ve el estado oculto: la política
+    # buscada sobre el Estado caza más que promediar los Q óptimos ocultos
+    # (la política de partida) y que avanzar siempre (base vacía)
+    modelo = ModeloCaceria().construir()
+    bc, reporte = resolver_caceria(modelo=modelo)
+    _, evaluacion = evaluar_politica(bc, modelo)
+    assert reporte['probabilidad_exito'] == evaluacion['probabilidad_exito']
+    assert reporte['valor_esperado_inicio'] <= reporte['cota_valor_inicio']
+    
+    promediada = BaseConocimientos()
+    for estado, (valores, _) in agregar_por_observacion(modelo, iteracion_de_valores(modelo)[0]).items():
+        for accion, valor in zip(acciones, valores):
+            promediada.actualizar_valor_q(estado, accion, valor)
+    _, base_promediada = evaluar_politica(promediada, modelo)
+    _, base_avanzar = evaluar_politica(BaseConocimientos(), modelo)
+    assert evaluacion['probabilidad_exito'] > 2 * base_promediada['probabilidad_exito']
+    assert evaluacion['probabilidad_exito'] > base_avanzar['probabilidad_exito']
+
+def test_evaluacion_exacta():
+    """Test: La evaluación exacta es una distribución sobre el final de la cacería"""
+    from learning.politica import PoliticaCompilada
+    
+    modelo = ModeloCaceria(posiciones_iniciales=[2, 6]).construir()
+    bc = BaseConocimientos()
+    bc.actualizar_valor_q(Estado(2, 6.5, "ver_frente", False, True), "esconderse", 1.0)
+    
+    por_posicion, reporte = evaluar_politica(bc, modelo)
+    assert set(por_posicion) == {2, 6}
+    for resultado in por_posicion.values():
+        assert abs(sum(resultado['probabilidad_por_turno']) - 1.0) < 1e-9
+        assert 0.0 <= resultado['probabilidad_exito'] <= 1.0
+        assert len(resultado['probabilidad_por_turno']) <= Caceria.MAX_TIEMPO
+    assert abs(reporte['probabilidad_exito'] -
+               sum(r['probabilidad_exito'] for r in por_posicion.values()) / 2) < 1e-12
+    
+    # La política compilada de la misma base da la misma evaluación
+    assert evaluar_politica(PoliticaCompilada.desde_base(bc), modelo)[0] == por_posicion
+    
+    # Siempre atacar desde lejos: coincide con las cacerías simuladas
+    atacar = BaseConocimientos()
+    for estado in set(modelo.observaciones):
+        atacar.actualizar_valor_q(estado, "atacar", 1.0)
+    por_posicion, _ = evaluar_politica(atacar, modelo)
+    caceria = Caceria(Abrevadero(), silenciosa=True)
+    for _ in range(20):
+        caceria.inicializar_caceria(2, ModoBehaviorImpala.ALEATORIO)
+        turnos = 0
+        while caceria.resultado == ResultadoCaceria.EN_PROGRESO:
+            caceria.ejecutar_turno(AccionLeon.ATACAR)
+            turnos += 1
+        assert caceria.resultado != ResultadoCaceria.EXITO
+        assert por_posicion[2]['probabilidad_por_turno'][turnos - 1] == 1.0
+    assert por_posicion[2]['probabilidad_exito'] == 0.0
+
+def test_planificacion_priorizada():
+    """Test: El barrido priorizado propaga el valor terminal hacia los predecesores"""
+    planificacion = PlanificacionPriorizada(pasos_por_paso_real=10)
+    ql = QLearning(BaseConocimientos(), SistemaRecompensas(), alpha=0.5,
+                   planificacion=planificacion)
+    acciones = ["avanzar", "esconderse", "atacar"]
+    estados = [Estado(1, d, "ver_frente", False, False) for d in (4.0, 3.0, 2.0, 1.0)]
+    
+    # Cadena de avances que termina en un ataque exitoso (cada transición una vez)
+    for estado, siguiente in zip(estados, estados[1:]):
+        ql.aprender_de_experiencia(Experiencia(estado, "avanzar", 0.0, siguiente, False), acciones)
+    ql.aprender_de_experiencia(Experiencia(estados[-1], "atacar", 100.0, None, True), acciones)
+    
+    # El modelo es determinista: la planificación deja los valores exactos
+    bc = ql.base_conocimientos
+    assert bc.obtener_valor_q(estados[-1], "atacar") == 100.0
+    assert abs(bc.obtener_valor_q(estados[0], "avanzar") - 100.0 * 0.9 ** 3) < 1e-9
+    
+    stats = ql.obtener_estadisticas()
+    assert stats['pasos_planificacion'] == 10
+    assert stats['pares_en_modelo'] == 4
+    assert stats['actualizaciones_planificacion'] > 0
+    
+    # El modelo promedia recompensas y siguientes estados observados
+    planificacion.observar(Experiencia(estados[-1], "atacar", -50.0, None, False))
+    assert planificacion.valor_esperado((estados[-1], "atacar"), bc, acciones, 0.9) == 25.0
+
+def test_checkpoint_binario():
+    """Test: El checkpoint binario conserva la tabla y se detecta al cargar y listar"""
+    import tempfile
+    
+    bc = BaseConocimientos()
+    estado1 = Estado(2, 6.5, "ver_frente", False, True)
+    estado2 = Estado(2, 5.5, "beber_agua", True, False)
+    bc.agregar_experiencia(Experiencia(estado1, "avanzar", 1.5, estado2, False))
+    bc.agregar_experiencia(Experiencia(estado2, "atacar", 100.0, None, True))
+    bc.actualizar_valor_q(estado1, "avanzar", 12.25)
+    bc.actualizar_valor_q(estado2, "atacar", -3.5)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "prueba_conocimiento.bin")
+        assert guardar_conocimiento(bc, ruta)
+        
+        cargada = cargar_conocimiento(ruta)
+        assert isinstance(cargada, BaseConocimientosDensa)
+        assert cargada.obtener_valor_q(estado1, "avanzar") == 12.25
+        assert cargada.obtener_valor_q(estado2, "atacar") == -3.5
+        assert cargada.obtener_visitas(estado1, "avanzar") == 1
+        assert cargada.obtener_estadisticas() == bc.obtener_estadisticas()
+        assert list(cargada.experiencias) == list(bc.experiencias)
+        
+        # Las actualizaciones sobre el mmap no modifican el archivo
+        cargada.actualizar_valor_q(estado1, "esconderse", 7.0)
+        assert len(cargada.q_table) == 3
+        assert cargar_conocimiento(ruta).obtener_valor_q(estado1, "esconderse") == 0.0
+        
+        guardados = listar_guardados(directorio)
+        assert len(guardados) == 1
+        assert guardados[0]['estados'] == 2
+        
+        # Si las experiencias no caben en la memoria, se cargan las más recientes
+        grande = BaseConocimientos(capacidad_experiencias=10005)
+        for i in range(10005):
+            grande.agregar_experiencia(Experiencia(estado1, "avanzar", float(i), estado2, False))
+        ruta = os.path.join(directorio, "grande_conocimiento.bin")
+        assert guardar_conocimiento(grande, ruta)
+        recompensas = [e.recompensa for e in cargar_conocimiento(ruta).experiencias]
+        assert recompensas == [float(i) for i in range(5, 10005)]
+
+def test_registro_cambios():
+    """Test: El log de cambios se recupera tras un corte y se compacta en el snapshot"""
+    import tempfile
+    
+    bc = BaseConocimientos()
+    estado1 = Estado(4, 8.0, "ver_frente", False, False)
+    estado2 = Estado(4, 7.0, "ver_frente", True, False)
+    bc.actualizar_valor_q(estado1, "avanzar", 1.0)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        registro = RegistroCambios(os.path.join(directorio, "prueba"), sincronizar=False)
+        assert registro.adjuntar(bc)
+        
+        # Solo se escriben los pares modificados
+        bc.actualizar_valor_q(estado1, "avanzar", 2.0)
+        bc.agregar_experiencia(Experiencia(estado2, "esconderse", -1.0, estado1, False))
+        assert registro.registrar(bc) == 2
+        
+        bc.actualizar_valor_q(estado2, "esconderse", 5.0)
+        assert registro.registrar(bc) == 1
+        
+        recuperada = registro.recuperar()
+        assert recuperada.obtener_valor_q(estado1, "avanzar") == 2.0
+        assert recuperada.obtener_valor_q(estado2, "esconderse") == 5.0
+        assert recuperada.obtener_visitas(estado2, "esconderse") == 1
+        assert recuperada.total_experiencias == 1
+        
+        # Si el lote no se puede escribir, los cambios quedan para el siguiente
+        ruta_registro = registro.ruta_registro
+        registro.ruta_registro = os.path.join(directorio, "no_existe", "prueba.wal")
+        bc.actualizar_valor_q(estado2, "atacar", 4.0)
+        try:
+            registro.registrar(bc)
+            assert False, "Se esperaba OSError"
+        except OSError:
+            pass
+        registro.ruta_registro = ruta_registro
+        assert registro.registrar(bc) == 1
+        assert registro.recuperar().obtener_valor_q(estado2, "atacar") == 4.0
+        
+        # Un par que el codificador no representa se omite sin repetirse
+        bc.actualizar_valor_q(Estado(4, 50.0, "ver_frente", False, False), "avanzar", 3.0)
+        bc.actualizar_valor_q(estado2, "atacar", 6.0)
+        assert registro.registrar(bc) == 1
+        assert registro.pares_omitidos == 1
+        assert registro.registrar(bc) == 0
+        assert registro.pares_omitidos == 1
+        assert registro.recuperar().obtener_valor_q(estado2, "atacar") == 6.0
+        
+        # Un lote cortado a mitad de escritura se descarta
+        bc.actualizar_valor_q(estado1, "atacar", 9.0)
+        registro.registrar(bc)
+        with open(registro.ruta_registro, 'r+b') as f:
+            f.truncate(os.path.getsize(registro.ruta_registro) - 3)
+        recuperada = registro.recuperar()
+        assert recuperada.obtener_valor_q(estado1, "atacar") == 0.0
+        assert recuperada.obtener_valor_q(estado2, "esconderse") == 5.0
+        
+        # La compactación incorpora el log al snapshot y lo elimina
+        registro.compactar().result()
+        assert not os.path.exists(registro.ruta_sellado)
+        assert cargar_conocimiento(registro.ruta_snapshot).obtener_valor_q(estado2, "esconderse") == 5.0
+        registro.cerrar()
+
+def test_guardado_asincrono():
+    """Test: El guardado en segundo plano usa una instantánea de la base"""
+    import tempfile
+    
+    bc = BaseConocimientosDensa()
+    ql = QLearning(bc, SistemaRecompensas())
+    estado = Estado(4, 8.0, "ver_frente", False, False)
+    bc.actualizar_valor_q(estado, "avanzar", 1.0)
+    
+    # La copia no cambia aunque la base siga aprendiendo
+    copia = bc.copiar()
+    bc.actualizar_valor_q(estado, "avanzar", 7.0)
+    assert copia.obtener_valor_q(estado, "avanzar") == 1.0
+    assert len(copia) == 1
+    
+    # La copia tiene los mismos atributos que una base nueva
+    dict_base = BaseConocimientos()
+    dict_base.actualizar_valor_q(estado, "atacar", 2.0)
+    for base in (bc, dict_base):
+        copia = base.copiar()
+        assert set(vars(copia)) == set(vars(type(base)()))
+        assert dict(copia.q_table) == dict(base.q_table)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        guardado = GuardadoAsincrono()
+        futuro = guardado.guardar(bc, ql, None, directorio, "prueba")
+        bc.actualizar_valor_q(estado, "avanzar", -3.0)
+        resultado = futuro.result()
+        guardado.cerrar()
+        
+        assert resultado['exito']
+        assert cargar_conocimiento(resultado['conocimiento']).obtener_valor_q(estado, "avanzar") == 7.0
+        assert os.path.exists(resultado['config'])
+        assert os.path.exists(resultado['reporte'])
+        # Escritura atómica: no quedan temporales
+        assert not [f for f in os.listdir(directorio) if f.endswith('.tmp')]
+
+def test_catalogo_checkpoints():
+    """Test: El catálogo se mantiene al guardar y se sincroniza con el directorio"""
+    import tempfile
+    from storage.guardado import guardar_estado_completo
+    
+    bc = BaseConocimientos()
+    bc.actualizar_valor_q(Estado(4, 8.0, "ver_frente", False, False), "avanzar", 1.0)
+    ql = QLearning(bc, SistemaRecompensas())
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        # Al guardar, la entrada se arma con lo escrito: no se relee el archivo
+        import storage.catalogo as modulo_catalogo
+        originales = modulo_catalogo.calcular_checksum, modulo_catalogo.leer_resumen_json, \
+            modulo_catalogo.leer_cabecera
+        lecturas = []
+        modulo_catalogo.calcular_checksum = modulo_catalogo.leer_resumen_json = \
+            modulo_catalogo.leer_cabecera = lambda *args: lecturas.append(args)
+        try:
+            guardar_estado_completo(bc, ql, None, directorio, "uno")
+            guardar_conocimiento(bc, os.path.join(directorio, "dos_conocimiento.bin"))
+        finally:
+            modulo_catalogo.calcular_checksum, modulo_catalogo.leer_resumen_json, \
+                modulo_catalogo.leer_cabecera = originales
+        assert lecturas == []
+        
+        # y coincide con la que se obtiene leyéndolo
+        catalogo = CatalogoCheckpoints(directorio)
+        for nombre in ("uno_conocimiento.json", "dos_conocimiento.bin"):
+            assert catalogo.obtener(nombre) == catalogo._indexar(nombre, leer_config=True)
+            assert catalogo.verificar(nombre)
+        
+        entrada = catalogo.obtener("uno_conocimiento.json")
+        assert entrada['abrevadero']['RADIO'] == Abrevadero.RADIO
+        assert entrada['q_learning']['alpha'] == ql.alpha
+        assert entrada['tamano_bytes'] == os.path.getsize(os.path.join(directorio, "uno_conocimiento.json"))
+        assert len(catalogo.buscar(radio=Abrevadero.RADIO)) == 2
+        assert [e['archivo'] for e in catalogo.buscar(formato='bin')] == ["dos_conocimiento.bin"]
+        assert {g['nombre_base'] for g in listar_guardados(directorio)} == {"uno", "dos"}
+        
+        # Un archivo borrado a mano desaparece del listado
+        os.remove(os.path.join(directorio, "dos_conocimiento.bin"))
+        assert len(listar_guardados(directorio)) == 1
+        
+        # Reconstruir desde cero
+        os.remove(catalogo.ruta)
+        assert catalogo.reconstruir() == 1
+        
+        # Si el índice no se puede escribir, se lista igual lo sincronizado
+        solo_lectura = CatalogoCheckpoints(directorio)
+        solo_lectura.ruta = os.path.join(directorio, "no_existe", "catalogo.json")
+        assert [e['archivo'] for e in solo_lectura.listar()] == ["uno_conocimiento.json"]
+        assert solo_lectura.reconstruir() == 1
+        
+        # Corrupción sin cambio de tamaño ni fecha: la detecta el checksum
+        ruta = os.path.join(directorio, "uno_conocimiento.json")
+        stat = os.stat(ruta)
+        with open(ruta, 'r+b') as f:
+            primero = f.read(1)
+            f.seek(0)
+            f.write(b' ' if primero != b' ' else b'\n')
+        os.utime(ruta, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert not catalogo.verificar("uno_conocimiento.json")
+
+        # Sin fecha de guardado se ordena por la fecha de modificación
+        import json
+        ruta_nueva = os.path.join(directorio, "tres_conocimiento.json")
+        guardar_conocimiento(bc, ruta_nueva)
+        with open(ruta_nueva, 'r', encoding='utf-8') as f:
+            datos = json.loads(f.read())
+        del datos['metadata']
+        ruta_vieja = os.path.join(directorio, "viejo_conocimiento.json")
+        with open(ruta_vieja, 'w', encoding='utf-8') as f:
+            json.dump(datos, f)
+        os.utime(ruta_vieja, (stat.st_mtime - 86400, stat.st_mtime - 86400))
+        entradas = catalogo.listar()
+        assert entradas[-1]['archivo'] == "viejo_conocimiento.json"
+        assert entradas[-1]['fecha'] == 'Desconocida'
+        assert entradas[0]['archivo'] == "tres_conocimiento.json"
+
+def test_importacion_en_flujo():
+    """Test: La importación en flujo equivale a importar_desde_json"""
+    import tempfile
+    
+    bc = BaseConocimientos()
+    estado1 = Estado(4, 8.0, "ver_frente", False, False)
+    estado2 = Estado(3, 7.5, "beber_agua", True, True)
+    bc.actualizar_valor_q(estado1, "avanzar", 1.25)
+    bc.actualizar_valor_q(estado2, "atacar", -3e-7)
+    bc.agregar_experiencia(Experiencia(estado1, "avanzar", 1.0, estado2, False))
+    bc.agregar_experiencia(Experiencia(estado2, "atacar", 100.0, None, True))
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "prueba_conocimiento.json")
+        guardar_conocimiento(bc, ruta)
+        
+        esperada = BaseConocimientos()
+        with open(ruta, 'r', encoding='utf-8') as f:
+            esperada.importar_desde_json(f.read())
+        
+        # Bloques diminutos para cortar números, strings y objetos
+        progreso = []
+        importada = importar_json_en_flujo(
+            ruta, tamano_bloque=7,
+            callback_progreso=lambda leidos, total, entradas: progreso.append((leidos, total, entradas))
+        )
+        assert dict(importada.q_table) == dict(esperada.q_table)
+        assert importada.obtener_estadisticas() == esperada.obtener_estadisticas()
+        assert len(importada.experiencias) == 0
+        assert progreso[-1] == (os.path.getsize(ruta), os.path.getsize(ruta), 2)
+        
+        # Las experiencias solo se importan si se piden
+        densa = importar_json_en_flujo(ruta, BaseConocimientosDensa(), incluir_experiencias=True)
+        assert densa.obtener_valor_q(estado2, "atacar") == -3e-7
+        assert [e.recompensa for e in densa.experiencias] == [1.0, 100.0]
+        assert densa.total_experiencias == 2
+        
+        datos, entradas = leer_resumen_json(ruta, tamano_bloque=5)
+        assert entradas == 2
+        assert datos['estadisticas'] == esperada.obtener_estadisticas()
+        assert datos['abrevadero']['RADIO'] == Abrevadero.RADIO
+
+def test_fusion_varios():
+    """Test: Fusión de N bases con estrategias ponderadas por visitas"""
+    import tempfile
+    
+    estado_a = Estado(4, 8.0, "ver_frente", False, False)
+    estado_b = Estado(2, 3.0, "beber_agua", True, False)
+    
+    b1 = BaseConocimientosDensa()
+    b1.actualizar_valor_q(estado_a, "avanzar", 1.0)
+    b1.actualizar_valor_q(estado_b, "atacar", 0.0)  # 0.0 es un valor conocido
+    for _ in range(3):
+        b1.agregar_experiencia(Experiencia(estado_a, "avanzar", 0.0, estado_b, False))
+    b2 = BaseConocimientos()
+    b2.actualizar_valor_q(estado_a, "avanzar", 4.0)
+    b2.agregar_experiencia(Experiencia(estado_a, "avanzar", 0.0, None, True))
+    b3 = BaseConocimientos()
+    b3.actualizar_valor_q(estado_a, "avanzar", 10.0)  # Sin visitas
+    
+    esperados = {'visitas': 1.75, 'promedio': 5.0, 'maximo': 10.0, 'minimo': 1.0, 'media_recortada': 4.0}
+    opciones_numpy = [False, True] if np_fusion is not None else [False]
+    for estrategia, esperado in esperados.items():
+        for usar_numpy in opciones_numpy:
+            fusionada, reporte = fusionar_varios([b1, b2, b3], estrategia=estrategia,
+                                                 recorte=0.34, usar_numpy=usar_numpy)
+            assert abs(fusionada.obtener_valor_q(estado_a, "avanzar") - esperado) < 1e-9
+            assert (estado_b, "atacar") in fusionada.q_table
+            assert fusionada.obtener_visitas(estado_a, "avanzar") == 4
+            assert len(fusionada) == 2
+            assert reporte['pares_compartidos'] == 1
+    assert fusionada.cacerias_exitosas == 1
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "uno_conocimiento.bin")
+        guardar_conocimiento(b1, ruta)
+        fusionada, _ = fusionar_varios([ruta, b2])
+        assert abs(fusionada.obtener_valor_q(estado_a, "avanzar") - 1.75) < 1e-9
+        
+        # Un checkpoint entrenado con otro abrevadero se rechaza
+        otro = {'RADIO': Abrevadero.RADIO + 1, 'ANGULO_VISION': Abrevadero.ANGULO_VISION,
+                'DISTANCIA_MINIMA_HUIDA': Abrevadero.DISTANCIA_MINIMA_HUIDA}
+        try:
+            fusionar_varios([ruta], abrevadero=otro)
+            assert False, "Debería rechazar el checkpoint"
+        except ValueError as e:
+            assert "RADIO" in str(e)
+
+def test_indice_similitud():
+    """Test: Índice de similitud equivale a la comparación contra todos los estados"""
+    import copy
+    import pickle
+    import random
+    
+    codificador = CodificadorEstados(Abrevadero.RADIO)
+    generalizador = Generalizador()
+    rng = random.Random(3)
+    
+    for clase in (BaseConocimientos, BaseConocimientosDensa):
+        bc = clase()
+        estados = [codificador.decodificar(rng.randrange(codificador.num_estados)) for _ in range(150)]
+        for estado in estados[:100]:
+            bc.actualizar_valor_q(estado, rng.choice(["avanzar", "esconderse", "atacar"]), rng.uniform(0.1, 5.0))
+        
+        def comprobar():
+            gen = generalizador.crear_estado_generalizado
+            conocidos = bc.obtener_estados_conocidos()
+            for estado in estados:
+                esperado = {e for e in conocidos if generalizador._son_similares(gen(estado), gen(e))}
+                assert set(generalizador.encontrar_estados_similares(estado, bc)) == esperado
+        
+        comprobar()
+        # Una base con índices suscritos se sigue pudiendo serializar y copiar
+        for copia in (pickle.loads(pickle.dumps(bc)), copy.deepcopy(bc)):
+            assert copia._indices == [] and dict(copia.q_table) == dict(bc.q_table)
+        
+        # El índice se mantiene con los estados que se agregan después
+        for estado in estados[100:]:
+            bc.actualizar_valor_q(estado, "avanzar", rng.uniform(0.1, 5.0))
+        comprobar()
+        
+        # La propagación por lotes equivale a propagar uno por uno
+        actualizaciones = [(e, "atacar", rng.uniform(0.1, 5.0)) for e in estados[:20]]
+        secuencial = bc.copiar()
+        for estado, accion, valor in actualizaciones:
+            generalizador.propagar_conocimiento(estado, accion, valor, secuencial)
+        escritos = generalizador.propagar_lote(actualizaciones, bc)
+        assert escritos > 0
+        assert dict(bc.q_table) == dict(secuencial.q_table)
+        
+        bc.limpiar()
+        assert generalizador.encontrar_estados_similares(estados[0], bc) == []
+
+def test_filas_por_estado():
+    """Test: Conjunto de estados y filas por estado se mantienen al escribir"""
+    import random
+    
+    codificador = CodificadorEstados(Abrevadero.RADIO)
+    acciones = ["avanzar", "esconderse", "atacar"]
+    rng = random.Random(5)
+    
+    bc = BaseConocimientos()
+    for _ in range(500):
+        estado = codificador.decodificar(rng.randrange(codificador.num_estados))
+        bc.actualizar_valor_q(estado, rng.choice(acciones), rng.uniform(-5.0, 5.0))
+    
+    estados = {estado for estado, _ in bc.q_table}
+    assert bc.obtener_estados_conocidos() == estados
+    stats = bc.obtener_estadisticas()
+    assert stats['estados_unicos'] == len(estados)
+    assert stats['pares_estado_accion'] == len(bc.q_table)
+    
+    # obtener_mejor_accion equivale a comparar obtener_valor_q acción por acción
+    for estado in list(estados)[:100] + [Estado(7, 0.5, "huir", True, True)]:
+        valores = [bc.obtener_valor_q(estado, a) for a in acciones]
+        mejor = max(range(3), key=lambda i: (valores[i], -i))
+        assert bc.obtener_mejor_accion(estado, acciones) == (acciones[mejor], valores[mejor])
+    
+    # La copia y la importación reconstruyen las filas; limpiar las vacía
+    copia = bc.copiar()
+    importada = BaseConocimientos()
+    importada.importar_desde_json(bc.exportar_a_json())
+    for otra in (copia, importada):
+        assert otra.obtener_estados_conocidos() == estados
+        assert otra.obtener_estadisticas()['estados_unicos'] == len(estados)
+    bc.limpiar()
+    assert bc.obtener_estadisticas()['estados_unicos'] == 0
+    assert copia.obtener_estadisticas()['estados_unicos'] == len(estados)
+
+def test_motor_reglas():
+    """Test: Motor de reglas compilado equivale a recorrer las reglas"""
+    import random
+    from knowledge.motor_reglas import CAMPOS
+    
+    codificador = CodificadorEstados(Abrevadero.RADIO)
+    generalizador = Generalizador()
+    rng = random.Random(11)
+    estados = [codificador.decodificar(rng.randrange(codificador.num_estados)) for _ in range(300)]
+    
+    def lineal(estado):
+        estado_gen = generalizador.crear_estado_generalizado(estado)
+        recomendaciones = [
+            (regla['accion'], regla['efectividad'])
+            for regla in generalizador.reglas_generalizacion
+            if all(estado_gen.get(k) == v for k, v in regla['patron'].items())
+        ]
+        recomendaciones.sort(key=lambda x: x[1], reverse=True)
+        return recomendaciones
+    
+    def agregar_reglas(cantidad):
+        for _ in range(cantidad):
+            patron = generalizador.crear_estado_generalizado(rng.choice(estados))
+            for campo in rng.sample(CAMPOS, rng.randint(0, 5)):
+                del patron[campo]
+            # Efectividades repetidas: los empates conservan el orden de creación
+            generalizador.crear_regla_generalizacion(
+                patron, rng.choice(["avanzar", "esconderse", "atacar"]), rng.choice([0.2, 0.5, 0.9])
+            )
+    
+    agregar_reglas(200)
+    for estado in estados:
+        assert generalizador.obtener_recomendacion_por_regla(estado) == lineal(estado)
+    
+    # Las reglas nuevas invalidan las consultas memorizadas
+    agregar_reglas(50)
+    generalizador.reglas_generalizacion.append(
+        {'patron': {'leon_escondido': True, 'otro_campo': 1}, 'accion': 'atacar', 'efectividad': 1.0}
+    )
+    for estado in estados:
+        assert generalizador.obtener_recomendacion_por_regla(estado) == lineal(estado)
+    assert len(generalizador.motor_reglas) == len(generalizador) == 251
+
+    # Cambios que no alteran la cantidad de reglas también recompilan
+    reglas = generalizador.reglas_generalizacion
+    reglas[0] = dict(reglas[0], accion='atacar', efectividad=0.95)
+    for estado in estados:
+        assert generalizador.obtener_recomendacion_por_regla(estado) == lineal(estado)
+    del reglas[1]
+    generalizador.crear_regla_generalizacion({'leon_escondido': False}, 'esconderse', 0.7)
+    for estado in estados:
+        assert generalizador.obtener_recomendacion_por_regla(estado) == lineal(estado)
+    generalizador.reglas_generalizacion = reglas[:100]
+    for estado in estados:
+        assert generalizador.obtener_recomendacion_por_regla(estado) == lineal(estado)
+    assert len(generalizador.motor_reglas) == 100
+
+def test_mineria_reglas():
+    """Test: Las reglas minadas reproducen la política greedy"""
+    from knowledge.mineria_reglas import minar_reglas, precision_reglas, np as np_mineria
+    
+    codificador = CodificadorEstados(Abrevadero.RADIO)
+    generalizador = Generalizador()
+    
+    # Política que depende solo de campos generalizados: atacar cerca,
+    # esconderse si el impala puede ver y avanzar en el resto
+    bc = BaseConocimientos()
+    for codigo in range(0, codificador.num_estados, 3):
+        estado = codificador.decodificar(codigo)
+        if generalizador.generalizar_distancia(estado.distancia_impala) in ("muy_cerca", "cerca"):
+            mejor = "atacar"
+        elif estado.impala_puede_ver:
+            mejor = "esconderse"
+        else:
+            mejor = "avanzar"
+        for accion in ["avanzar", "esconderse", "atacar"]:
+            bc.actualizar_valor_q(estado, accion, 1.0 if accion == mejor else -1.0)
+    
+    reglas, reporte = minar_reglas(bc, generalizador, precision_objetivo=1.0)
+    assert reporte['precision'] == reporte['precision_maxima'] == 1.0
+    assert precision_reglas(generalizador, bc) == 1.0
+    assert len(reglas) <= 4
+    assert all(regla['margen'] == 2.0 for regla in reglas if regla['efectividad'] == 1.0)
+    
+    # Con un objetivo menor alcanzan menos reglas, y max_reglas las limita
+    pocas, reporte = minar_reglas(bc, precision_objetivo=0.5, agregar=False)
+    assert len(pocas) < len(reglas) and reporte['precision'] >= 0.5
+    una, _ = minar_reglas(bc, max_reglas=1, agregar=False)
+    assert len(una) == 1
+    
+    # El objetivo por defecto se alcanza y uno por encima del tope se recorta
+    _, reporte = minar_reglas(bc, agregar=False)
+    assert reporte['objetivo_alcanzado'] and reporte['precision'] >= reporte['precision_objetivo']
+    estado = next(iter(bc.obtener_estados_conocidos()))
+    greedy, _ = bc.obtener_mejor_accion(estado, ["avanzar", "esconderse", "atacar"])
+    bc.actualizar_valor_q(estado, greedy, -2.0)
+    _, reporte = minar_reglas(bc, precision_objetivo=1.0, agregar=False)
+    assert reporte['precision_objetivo'] == reporte['precision_maxima'] < 1.0
+    assert reporte['objetivo_alcanzado'] == (reporte['precision'] >= reporte['precision_objetivo'])
+    
+    # NumPy produce las mismas reglas
+    if np_mineria is not None:
+        assert minar_reglas(bc, agregar=False, usar_numpy=True)[0] == \
+            minar_reglas(bc, agregar=False, usar_numpy=False)[0]
+
+def test_politica_compilada():
+    """Test: La política compilada equivale a obtener_mejor_accion"""
+    import random
+    from learning.politica import PoliticaCompilada, CODIGO_DESCONOCIDO
+    
+    codificador = CodificadorEstados(Abrevadero.RADIO)
+    acciones = ["avanzar", "esconderse", "atacar"]
+    rng = random.Random(2)
+    
+    for clase in (BaseConocimientos, BaseConocimientosDensa):
+        bc = clase()
+        for _ in range(800):
+            estado = codificador.decodificar(rng.randrange(codificador.num_estados))
+            bc.actualizar_valor_q(estado, rng.choice(acciones), rng.choice([-2.0, 0.0, 1.5, 3.0]))
+        
+        politica = PoliticaCompilada.desde_base(bc)
+        assert len(politica) == len(bc.obtener_estados_conocidos())
+        for codigo in range(codificador.num_estados):
+            estado = codificador.decodificar(codigo)
+            accion, valor = bc.obtener_mejor_accion(estado, acciones)
+            assert politica.act(estado) == politica.act(codigo) == accion
+            assert politica.valor(codigo) == valor
+            assert politica.valores_q(codigo) == [bc.obtener_valor_q(estado, a) for a in acciones]
+        
+        # Estados fuera del codificador usan la acción por defecto
+        lejos = Estado(1, Abrevadero.RADIO + 5, "ver_frente", False, False)
+        assert politica.codificar(lejos) == CODIGO_DESCONOCIDO
+        assert politica.act(lejos) == "avanzar"
+        assert list(politica.act_lote([0, 1, CODIGO_DESCONOCIDO])) == \
+            [acciones.index(politica.act(0)), acciones.index(politica.act(1)), 0]
+    
+    # Con una cacería en curso usa el mismo estado que el entrenamiento
+    caceria = Caceria(Abrevadero())
+    caceria.inicializar_caceria(3, ModoBehaviorImpala.ALEATORIO)
+    caceria.ejecutar_turno(AccionLeon.AVANZAR)
+    estado = crear_estado_desde_caceria(caceria)
+    assert politica.codificar(caceria) == codificador.codificar(estado)
+    assert politica.act(caceria) == bc.obtener_mejor_accion(estado, acciones)[0]
+
+def test_servidor_politica():
+    """Test: El servidor responde por lotes y recarga checkpoints nuevos"""
+    import asyncio
+    import tempfile
+    import threading
+    import time
+    from learning.servidor_politica import ServidorPolitica, ClientePolitica
+    
+    codificador = CodificadorEstados(Abrevadero.RADIO)
+    estado = Estado(3, 4.5, "ver_frente", False, True)
+    codigo = codificador.codificar(estado)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        bc = BaseConocimientos()
+        bc.actualizar_valor_q(estado, "esconderse", 2.0)
+        guardar_conocimiento(bc, os.path.join(directorio, "uno_conocimiento.json"))
+        
+        servidor = ServidorPolitica(directorio, puerto=0, intervalo_recarga=0.05)
+        loop = asyncio.new_event_loop()
+        listo = threading.Event()
+        
+        def correr():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(servidor.iniciar())
+            listo.set()
+            loop.run_forever()
+        
+        hilo = threading.Thread(target=correr, daemon=True)
+        hilo.start()
+        assert listo.wait(10)
+        
+        try:
+            with ClientePolitica(servidor.direccion) as cliente:
+                acciones, valores = cliente.consultar([codigo, [3, 4.5, "ver_frente", False, True], estado.to_dict(), -1])
+                assert acciones == ["esconderse", "esconderse", "esconderse", "avanzar"]
+                assert valores[0] == [0.0, 2.0, 0.0] and valores[3] == [0.0, 0.0, 0.0]
+                assert cliente.consultar([codigo], incluir_q=False)[1] is None
+                
+                respuesta = cliente.solicitar({'id': 7, 'estados': [[1, 2]]})
+                assert respuesta['id'] == 7 and 'error' in respuesta
+                
+                # Un checkpoint más reciente reemplaza al servido
+                time.sleep(0.01)
+                bc.actualizar_valor_q(estado, "atacar", 5.0)
+                guardar_conocimiento(bc, os.path.join(directorio, "dos_conocimiento.json"))
+                limite = time.time() + 10
+                while cliente.consultar([codigo])[0] != ["atacar"]:
+                    assert time.time() < limite
+                    time.sleep(0.02)
+                
+                stats = cliente.estadisticas()
+                assert stats['checkpoint'] == "dos_conocimiento.json"
+                assert stats['recargas'] == 2 and stats['errores'] == 1
+                assert stats['solicitudes'] >= 4
+                assert 0 <= stats['latencia_ms']['p50'] <= stats['latencia_ms']['p99'] <= stats['latencia_ms']['maxima']
+                
+                # JSON que no es un objeto o estados booleanos: error sin cerrar la conexión
+                for mensaje in ([1, 2], "x", 3, {'estados': [True]}):
+                    assert 'error' in cliente.solicitar(mensaje)
+                assert cliente.consultar([codigo])[0] == ["atacar"]
+        finally:
+            asyncio.run_coroutine_threadsafe(servidor.detener(), loop).result(10)
+            loop.call_soon_threadsafe(loop.stop)
+            hilo.join(10)
+            loop.close()
+
+    # Se sirve el último archivo escrito, aunque otro declare una fecha posterior
+    with tempfile.TemporaryDirectory() as directorio:
+        import json
+        ruta_copiada = os.path.join(directorio, "copiado_conocimiento.json")
+        guardar_conocimiento(bc, ruta_copiada)
+        with open(ruta_copiada, 'r', encoding='utf-8') as f:
+            datos = json.loads(f.read())
+        datos['metadata']['fecha_guardado'] = "2099-01-01T00:00:00"
+        with open(ruta_copiada, 'w', encoding='utf-8') as f:
+            json.dump(datos, f)
+        os.utime(ruta_copiada, (time.time() - 3600, time.time() - 3600))
+        guardar_conocimiento(bc, os.path.join(directorio, "local_conocimiento.json"))
+        
+        servidor = ServidorPolitica(directorio, puerto=0)
+        assert servidor._entrada_mas_reciente()['archivo'] == "local_conocimiento.json"
+
+def test_consultas_por_lote():
+    """Test: Las consultas por lote equivalen a obtener_mejor_accion"""
+    import random
+    from knowledge.base_conocimientos import np
+    
+    codificador = CodificadorEstados(Abrevadero.RADIO)
+    acciones = ["avanzar", "esconderse", "atacar"]
+    rng = random.Random(4)
+    codigos = [rng.randrange(codificador.num_estados) for _ in range(300)] + [-1, codificador.num_estados]
+    estados = [codificador.decodificar(c) if 0 <= c < codificador.num_estados
+               else Estado(1, Abrevadero.RADIO + 5, "ver_frente", False, False) for c in codigos]
+    mascaras = [None, [True, False, True], [[i % 2 == 0, i % 5 != 0, i % 3 == 0] for i in range(len(codigos))]]
+    
+    for clase in (BaseConocimientos, BaseConocimientosDensa):
+        bc = clase()
+        for codigo in codigos[:200]:
+            estado = codificador.decodificar(codigo)
+            bc.actualizar_valor_q(estado, rng.choice(acciones), rng.choice([-2.0, 0.0, 1.5, 3.0]))
+        
+        for usar_numpy in ([False, True] if np is not None else [False]):
+            for entrada in (codigos, estados):
+                for mascara in mascaras:
+                    mejores, valores, filas = bc.obtener_mejor_accion_lote(entrada, mascara, usar_numpy)
+                    for i, estado in enumerate(estados):
+                        permitidas = mascara[i] if mascara and isinstance(mascara[0], list) else mascara
+                        posibles = [a for j, a in enumerate(acciones) if permitidas is None or permitidas[j]]
+                        if i >= 300:
+                            # Fuera del codificador: fila en cero
+                            assert list(filas[i]) == [0.0, 0.0, 0.0]
+                            assert acciones[mejores[i]] == posibles[0] and valores[i] == 0.0
+                            continue
+                        assert list(filas[i]) == [bc.obtener_valor_q(estado, a) for a in acciones]
+                        if not posibles:
+                            assert mejores[i] == -1 and valores[i] == float('-inf')
+                            continue
+                        accion, valor = bc.obtener_mejor_accion(estado, posibles)
+                        assert acciones[mejores[i]] == accion and valores[i] == valor
+            
+            if usar_numpy:
+                mejores, _, filas = bc.obtener_mejor_accion_lote(np.array(codigos), usar_numpy=True)
+                assert filas.shape == (len(codigos), 3) and mejores.dtype == np.int8
+
+def test_evaluacion_monte_carlo():
+    """Test: La evaluación por Monte Carlo se detiene por estrato y cuenta las huidas"""
+    from learning.evaluacion import evaluar_monte_carlo, semiancho_wilson
+    
+    inferior, superior, semiancho = semiancho_wilson(0, 100)
+    assert inferior == 0.0 and 0.0 < semiancho < 0.02 and superior > 0.0
+    
+    # Con el impala programado cada posición es determinista: basta el mínimo
+    bc = BaseConocimientos()
+    por_posicion, reporte = evaluar_monte_carlo(
+        bc, ModoBehaviorImpala.PROGRAMADO, [AccionImpala.BEBER_AGUA],
+        posiciones_iniciales=[1, 4], min_episodios=40, episodios_por_tarea=20,
+        num_trabajadores=2, semilla=1
+    )
+    caceria = Caceria(Abrevadero(), silenciosa=True)
+    for posicion, resultado in por_posicion.items():
+        caceria.inicializar_caceria(posicion, ModoBehaviorImpala.PROGRAMADO, [AccionImpala.BEBER_AGUA])
+        while caceria.resultado == ResultadoCaceria.EN_PROGRESO:
+            caceria.ejecutar_turno(AccionLeon.AVANZAR)
+        
+        assert resultado['detenida_por'] == 'precision'
+        assert resultado['tasa_exito'] == (1.0 if caceria.resultado == ResultadoCaceria.EXITO else 0.0)
+        assert resultado['duracion_media'] == caceria.tiempo.tiempo_actual
+        assert resultado['condiciones_huida'][caceria.condicion_huida.name] == resultado['episodios']
+    assert reporte['episodios'] == sum(r['episodios'] for r in por_posicion.values())
+    
+    # Con un objetivo inalcanzable cada estrato se detiene en el máximo
+    por_posicion, _ = evaluar_monte_carlo(bc, posiciones_iniciales=[5], semiancho_objetivo=0.0,
+                                          max_episodios=60, episodios_por_tarea=25, num_trabajadores=1)
+    resultado = por_posicion[5]
+    assert resultado['episodios'] == 60 and resultado['detenida_por'] == 'maximo'
+    assert sum(resultado['condiciones_huida'].values()) == 60
+    assert resultado['intervalo'][0] <= resultado['tasa_exito'] <= resultado['intervalo'][1]
+
+def test_benchmarks():
+    """Test: Los benchmarks se comparan con la línea base y fallan ante regresiones"""
+    import json
+    import tempfile
+    from tests.benchmarks import ejecutar_benchmarks, comparar_con_base, main, _llenar_tabla
+    
+    resultados = ejecutar_benchmarks(['abrevadero'], repeticiones=1)
+    assert all(m['segundos_por_op'] > 0 for m in resultados['resultados'].values())
+    
+    # Ambas bases guardan los mismos pares aunque el tamaño exceda el codificador por defecto
+    for clase in (BaseConocimientos, BaseConocimientosDensa):
+        base, estados = _llenar_tabla(clase, 20000)
+        assert len(base.q_table) == 3 * len(estados) >= 20000
+    
+    rapida = json.loads(json.dumps(resultados))
+    for medicion in rapida['resultados'].values():
+        medicion['segundos_por_op'] /= 10
+    rapida['resultados']['abrevadero.eliminado'] = {'segundos_por_op': 1.0}
+    
+    comparaciones, fallos = comparar_con_base(resultados, rapida, tolerancia=0.25)
+    estados = {c['nombre']: c['estado'] for c in comparaciones}
+    assert estados.pop('abrevadero.eliminado') == 'faltante'
+    assert set(estados.values()) == {'regresion'}
+    assert len(fallos) == len(resultados['resultados']) + 1
+    _, fallos = comparar_con_base(resultados, resultados)
+    assert fallos == []
+    
+    # Los faltantes de grupos no ejecutados o filtrados no cuentan
+    rapida['resultados']['caceria.episodio'] = {'segundos_por_op': 1.0, 'grupo': 'caceria'}
+    rapida['resultados']['abrevadero.eliminado']['grupo'] = 'abrevadero'
+    _, fallos = comparar_con_base(resultados, rapida, tolerancia=100)
+    assert [c['nombre'] for c in fallos] == ['abrevadero.eliminado']
+    _, fallos = comparar_con_base(dict(resultados, filtro='abrevadero.distancia*'), rapida, tolerancia=100)
+    assert fallos == []
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "base.json")
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(rapida, f)
+        assert main(['--grupos', 'abrevadero', '--repeticiones', '1', '--base', ruta]) == 1
+        assert main(['--grupos', 'abrevadero', '--repeticiones', '1', '--base', ruta, '--guardar-base']) == 0
+        assert main(['--grupos', 'abrevadero', '--repeticiones', '1', '--base', ruta, '--tolerancia', '10']) == 0
+
 if __name__ == "__main__":
     print("Ejecutando tests básicos...\n")
     
     tests = [
         ("Abrevadero - Coordenadas", test_abrevadero_coordenadas),
         ("Abrevadero - Distancia", test_abrevadero_distancia),
+        ("Abrevadero - Tablas", test_abrevadero_tablas),
         ("León - Acciones", test_leon_acciones),
         ("Impala - Acciones", test_impala_acciones),
         ("Base Conocimientos", test_base_conocimientos),
@@ -178,6 +1335,32 @@ if __name__ == "__main__":
         ("Sistema Recompensas", test_recompensas),
         ("Cacería Completa", test_caceria_completa),
         ("Cacería Turno a Turno", test_caceria_turno_a_turno),
+        ("Cacería Silenciosa", test_caceria_silenciosa),
+        ("Cacería por Lotes", test_caceria_lote_equivale_a_caceria),
+        ("Cacería por Lotes - NumPy", test_caceria_lote_numpy_equivale_a_array),
+        ("Codificador de Estados", test_codificador_estados),
+        ("Base de Conocimientos Densa", test_base_densa_equivale_a_base),
+        ("Memoria de Experiencias", test_memoria_experiencias),
+        ("Repetición Priorizada", test_repeticion_priorizada),
+        ("Entrenamiento Paralelo", test_entrenamiento_paralelo),
+        ("MDP Exacto", test_mdp_exacto),
+        ("Evaluación Exacta", test_evaluacion_exacta),
+        ("Evaluación Monte Carlo", test_evaluacion_monte_carlo),
+        ("Benchmarks", test_benchmarks),
+        ("Planificación Priorizada", test_planificacion_priorizada),
+        ("Checkpoint Binario", test_checkpoint_binario),
+        ("Registro de Cambios", test_registro_cambios),
+        ("Guardado Asíncrono", test_guardado_asincrono),
+        ("Catálogo de Checkpoints", test_catalogo_checkpoints),
+        ("Importación en Flujo", test_importacion_en_flujo),
+        ("Fusión de Varias Bases", test_fusion_varios),
+        ("Índice de Similitud", test_indice_similitud),
+        ("Filas por Estado", test_filas_por_estado),
+        ("Motor de Reglas", test_motor_reglas),
+        ("Minería de Reglas", test_mineria_reglas),
+        ("Política Compilada", test_politica_compilada),
+        ("Servidor de Política", test_servidor_politica),
+        ("Consultas por Lote", test_consultas_por_lote),
     ]
     
     exitosos = 0
@@ -194,6 +1377,11 @@ if __name__ == "__main__":
         except Exception as e:
             print(f"✗ {nombre}: ERROR - {e}")
             fallidos += 1
+        except BaseException as e:
+            # pytest.importorskip: dependencia opcional no instalada
+            if type(e).__name__ != 'Skipped':
+                raise
+            print(f"- {nombre}: omitido ({e})")
     
     print(f"\n{'=' * 50}")
     print(f"Resultados: {exitosos} exitosos, {fallidos} fallidos")
@@ -7,7 +7,8 @@ import os
 
 from learning.entrenamiento import Entrenador
 from simulation.caceria import ModoBehaviorImpala
-from storage.guardado import guardar_estado_completo, listar_guardados
+from storage.guardado import listar_guardados
+from storage.guardado_asincrono import GuardadoAsincrono
 from storage.carga import cargar_estado_completo
 
 
@@ -20,6 +21,10 @@ class EntrenamientoUI:
         """Inicializa la interfaz"""
         self.entrenador = Entrenador()
         self.directorio_datos = "modelos"
+        
+        # Los guardados se escriben en segundo plano
+        self.guardado = GuardadoAsincrono()
+        self._guardado_pendiente = None
     
     def ejecutar_entrenamiento_interactivo(self):
         """Ejecuta un entrenamiento con configuración interactiva"""
@@ -61,6 +66,16 @@ class EntrenamientoUI:
         if entrada_comp == '2':
             comportamiento = ModoBehaviorImpala.PROGRAMADO
         
+        # Procesos en paralelo
+        print(f"\nProcesos en paralelo (1-{os.cpu_count() or 1})")
+        print("Presiona Enter para entrenar en un solo proceso")
+        entrada_proc = input("Procesos: ").strip()
+        
+        try:
+            num_procesos = max(1, int(entrada_proc)) if entrada_proc else 1
+        except ValueError:
+            num_procesos = 1
+        
         # Confirmación
         print("\n" + "=" * 70)
         print("RESUMEN DE CONFIGURACIÓN")
@@ -68,6 +83,7 @@ class EntrenamientoUI:
         print(f"Episodios: {num_episodios}")
         print(f"Posiciones: {posiciones if posiciones else 'Todas (1-8)'}")
         print(f"Comportamiento impala: {comportamiento.value}")
+        print(f"Procesos: {num_procesos}")
         print("=" * 70)
         
         confirmar = input("\n¿Iniciar entrenamiento? (s/n): ").strip().lower()
@@ -90,13 +106,23 @@ class EntrenamientoUI:
                   f"Sesión: {tasa_sesion:.1f}% | "
                   f"Total acumulado: {tasa_total:.1f}% ({exitosas_totales}/{cacerias_totales})")
         
-        reporte = self.entrenador.entrenar(
-            num_episodios=num_episodios,
-            posiciones_iniciales=posiciones,
-            comportamiento_impala=comportamiento,
-            verbose=False,
-            callback_progreso=callback_progreso
-        )
+        if num_procesos > 1:
+            reporte = self.entrenador.entrenar_paralelo(
+                num_episodios=num_episodios,
+                num_trabajadores=num_procesos,
+                posiciones_iniciales=posiciones,
+                comportamiento_impala=comportamiento,
+                verbose=False,
+                callback_progreso=callback_progreso
+            )
+        else:
+            reporte = self.entrenador.entrenar(
+                num_episodios=num_episodios,
+                posiciones_iniciales=posiciones,
+                comportamiento_impala=comportamiento,
+                verbose=False,
+                callback_progreso=callback_progreso
+            )
         
         # Mostrar resultados
         self._mostrar_resultados(reporte)
@@ -118,6 +144,9 @@ class EntrenamientoUI:
         print(f"Tasa de éxito: {reporte['tasa_exito']}%")
         print(f"Duración: {reporte['duracion_segundos']} segundos")
         print(f"Velocidad: {reporte['episodios_por_segundo']} episodios/seg")
+        if 'num_trabajadores' in reporte:
+            print(f"Procesos: {reporte['num_trabajadores']} "
+                  f"({reporte['rondas_sincronizacion']} rondas de sincronización)")
         
         print("\nBase de Conocimientos:")
         for key, value in reporte['estadisticas_bc'].items():
@@ -128,17 +157,32 @@ class EntrenamientoUI:
             print(f"  {key}: {value}")
     
     def _guardar_entrenamiento(self):
-        """Guarda el estado del entrenamiento"""
+        """Guarda el estado del entrenamiento (la escritura sigue en segundo plano)"""
         nombre = input("Nombre para este entrenamiento (opcional): ").strip()
         
-        resultado = guardar_estado_completo(
+        self._informar_guardado(esperar=True)
+        self._guardado_pendiente = self.guardado.guardar(
             self.entrenador.base_conocimientos,
             self.entrenador.q_learning,
             self.entrenador.generalizador,
             self.directorio_datos,
             nombre if nombre else None
         )
+        print("\nGuardando en segundo plano...")
         
+    def _informar_guardado(self, esperar: bool = False):
+        """
+        Muestra el resultado del último guardado si ya terminó.
+        
+        Args:
+            esperar: Si True, espera a que termine el guardado pendiente
+        """
+        futuro = self._guardado_pendiente
+        if futuro is None or (not esperar and not futuro.done()):
+            return
+        self._guardado_pendiente = None
+        
+        resultado = futuro.result()
         if resultado.get('exito'):
             print("\n✓ Entrenamiento guardado exitosamente")
             print(f"  Conocimiento: {resultado['conocimiento']}")
@@ -149,6 +193,7 @@ class EntrenamientoUI:
     
     def cargar_entrenamiento_previo(self) -> bool:
         """Carga un entrenamiento guardado previamente"""
+        self._informar_guardado(esperar=True)
         guardados = listar_guardados(self.directorio_datos)
         
         if not guardados:
@@ -170,12 +215,8 @@ class EntrenamientoUI:
             if 0 <= seleccion < len(guardados):
                 guardado = guardados[seleccion]
                 
-                # Extraer nombre base del archivo
-                nombre_archivo = guardado['archivo']
-                nombre_base = nombre_archivo.replace('_conocimiento.json', '')
-                
                 # Cargar
-                resultado = cargar_estado_completo(self.directorio_datos, nombre_base)
+                resultado = cargar_estado_completo(self.directorio_datos, guardado['nombre_base'])
                 
                 if resultado and resultado.get('exito'):
                     self.entrenador.base_conocimientos = resultado['base_conocimientos']
@@ -191,6 +232,8 @@ class EntrenamientoUI:
     def menu_principal(self):
         """Muestra el menú principal de entrenamiento"""
         while True:
+            self._informar_guardado()
+            
             print("\n" + "=" * 70)
             print("SISTEMA DE ENTRENAMIENTO - LEÓN VS IMPALA")
             print("=" * 70)
@@ -216,6 +259,8 @@ class EntrenamientoUI:
                 self._listar_entrenamientos()
             
             elif opcion == '5':
+                self._informar_guardado(esperar=True)
+                self.guardado.cerrar()
                 print("\n¡Hasta luego!")
                 break
             
@@ -240,6 +285,7 @@ class EntrenamientoUI:
     
     def _listar_entrenamientos(self):
         """Lista todos los entrenamientos guardados"""
+        self._informar_guardado(esperar=True)
         guardados = listar_guardados(self.directorio_datos)
         
         if not guardados:
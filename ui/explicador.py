@@ -225,21 +225,18 @@ class Explicador:
         distancias = ["muy_cerca", "cerca", "media", "lejos"]
         acciones = ["avanzar", "esconderse", "atacar"]
         
+        # Mejor (acción, valor) por categoría en una sola pasada por los estados
+        mejores = {}
+        estados = list(self.base_conocimientos.obtener_estados_conocidos())
+        codigos, valores, _ = self.base_conocimientos.obtener_mejor_accion_lote(estados)
+        for estado, codigo, valor in zip(estados, codigos, valores):
+            dist = self.generalizador.generalizar_distancia(estado.distancia_impala)
+            if dist not in mejores or valor > mejores[dist][1]:
+                mejores[dist] = (acciones[codigo], float(valor))
+        
         for dist in distancias:
-            mejor_valor = -float('inf')
-            mejor_accion = None
-            
-            # Buscar estados con esta distancia
-            for estado in self.base_conocimientos.obtener_estados_conocidos():
-                estado_gen = self.generalizador.crear_estado_generalizado(estado)
-                if estado_gen['distancia_categoria'] == dist:
-                    for accion in acciones:
-                        valor = self.base_conocimientos.obtener_valor_q(estado, accion)
-                        if valor > mejor_valor:
-                            mejor_valor = valor
-                            mejor_accion = accion
-            
-            if mejor_accion:
+            if dist in mejores:
+                mejor_accion, mejor_valor = mejores[dist]
                 lineas.append(f"  • Cuando está {dist}: {mejor_accion.upper()} (Q={mejor_valor:.2f})")
         
         return "\n".join(lineas)
@@ -11,7 +11,8 @@ import time
 from environment import Abrevadero, Direccion
 from simulation.caceria import Caceria, ModoBehaviorImpala, ResultadoCaceria
 from agents.leon import AccionLeon
-from knowledge.base_conocimientos import BaseConocimientos, Estado
+from knowledge.base_conocimientos import BaseConocimientos
+from learning.politica import PoliticaCompilada
 from learning.q_learning import QLearning
 
 
@@ -372,52 +373,19 @@ class InterfazTerminalGrid:
         
         input("\nPresiona Enter para comenzar...")
         
+        # Política greedy compilada: cada turno es una consulta a la tabla
+        politica = None
+        if usar_agente_entrenado and self.agente_q:
+            politica = PoliticaCompilada.desde_base(self.agente_q.base_conocimientos)
+        
         turno = 0
         
         while self.caceria.resultado == ResultadoCaceria.EN_PROGRESO:
             turno += 1
             
             # Decidir acción del león
-            if usar_agente_entrenado and self.agente_q:
-                from simulation.verificador import Verificador
-                from agents.leon import AccionLeon as AL
-                from agents.impala import AccionImpala
-                verificador = Verificador(self.abrevadero)
-                
-                # Crear objeto Estado correctamente (no usar dict)
-                distancia = verificador.calcular_distancia_actual(self.caceria.leon)
-                distancia_redondeada = round(distancia * 2) / 2
-                
-                # Determinar acción del impala
-                accion_impala_str = "ver_frente"
-                accion_impala_enum = AccionImpala.VER_FRENTE
-                if self.caceria.impala.esta_huyendo:
-                    accion_impala_str = "huir"
-                    accion_impala_enum = AccionImpala.HUIR
-                
-                # Verificar si el impala puede ver al león
-                impala_puede_ver = verificador.impala_puede_ver_leon(
-                    self.caceria.leon, self.caceria.impala, accion_impala_enum
-                )
-                
-                # Crear objeto Estado
-                estado = Estado(
-                    posicion_leon=self.caceria.leon.posicion,
-                    distancia_impala=distancia_redondeada,
-                    accion_impala=accion_impala_str,
-                    leon_escondido=self.caceria.leon.esta_escondido,
-                    impala_puede_ver=impala_puede_ver
-                )
-                
-                acciones_posibles = [AL.AVANZAR.value, AL.ESCONDERSE.value, AL.ATACAR.value]
-                accion_str, _ = self.agente_q.seleccionar_accion(estado, acciones_posibles, forzar_exploracion=False)
-                # Convertir string a enum
-                if accion_str == AL.AVANZAR.value:
-                    accion_leon = AL.AVANZAR
-                elif accion_str == AL.ESCONDERSE.value:
-                    accion_leon = AL.ESCONDERSE
-                else:
-                    accion_leon = AL.ATACAR
+            if politica is not None:
+                accion_leon = AccionLeon(politica.act(self.caceria))
             else:
                 # Modo manual
                 self._limpiar_pantalla()
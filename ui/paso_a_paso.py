@@ -10,6 +10,8 @@ from simulation.caceria import Caceria, ModoBehaviorImpala, AccionLeon
 from agents.leon import Leon
 from agents.impala import Impala
 from knowledge.base_conocimientos import BaseConocimientos
+from knowledge.codificacion import ACCIONES_LEON
+from learning.politica import PoliticaCompilada
 
 
 class PasoAPasoUI:
@@ -27,6 +29,7 @@ class PasoAPasoUI:
         self.abrevadero = Abrevadero()
         self.caceria = Caceria(self.abrevadero)
         self.base_conocimientos = base_conocimientos
+        self.politica: Optional[PoliticaCompilada] = None
     
     def visualizar_caceria(self, posicion_inicial: int = 1,
                           comportamiento_impala: ModoBehaviorImpala = ModoBehaviorImpala.ALEATORIO):
@@ -44,6 +47,10 @@ class PasoAPasoUI:
         # Inicializar cacería
         self.caceria.inicializar_caceria(posicion_inicial, comportamiento_impala)
         
+        # Compilar la política greedy (la base pudo cambiar desde la última cacería)
+        if self.base_conocimientos:
+            self.politica = PoliticaCompilada.desde_base(self.base_conocimientos)
+        
         print(f"\nPosición inicial del león: {posicion_inicial}")
         print(f"Comportamiento del impala: {comportamiento_impala.value}")
         print("\nPresiona Enter para avanzar cada turno, 'q' para terminar")
@@ -115,33 +122,21 @@ class PasoAPasoUI:
         print(f"\nDISTANCIA: {distancia:.2f} cuadros")
     
     def _decidir_accion_con_conocimiento(self, acciones: list) -> str:
-        """Decide la acción usando la base de conocimientos"""
-        # Crear estado actual
-        from knowledge.base_conocimientos import Estado
-        from agents.impala import AccionImpala
-        
-        distancia = self.caceria.verificador.calcular_distancia_actual(self.caceria.leon)
-        
-        # Determinar acción actual del impala
-        accion_impala_actual = AccionImpala.HUIR if self.caceria.impala.esta_huyendo else AccionImpala.VER_FRENTE
+        """Decide la acción usando la política compilada de la base de conocimientos"""
+        if self.politica is None:
+            self.politica = PoliticaCompilada.desde_base(self.base_conocimientos)
         
-        # Verificar si el impala puede ver al león
-        impala_ve_leon = self.caceria.verificador.impala_puede_ver_leon(
-            self.caceria.leon, 
-            self.caceria.impala, 
-            accion_impala_actual
-        )
+        # Mejor acción: una consulta a la tabla con el estado actual de la cacería
+        codigo = self.politica.codificar(self.caceria)
+        accion = self.politica.act(codigo)
+        valor_q = self.politica.valor(codigo)
         
-        estado = Estado(
-            posicion_leon=self.caceria.leon.posicion,
-            distancia_impala=round(distancia * 2) / 2,
-            accion_impala="ver_frente",  # Simplificado
-            leon_escondido=self.caceria.leon.esta_escondido,
-            impala_puede_ver=impala_ve_leon
-        )
-        
-        # Obtener mejor acción
-        accion, valor_q = self.base_conocimientos.obtener_mejor_accion(estado, acciones)
+        # Si la acción compilada no está disponible, la mejor de las disponibles
+        if accion not in acciones:
+            fila = dict(zip(ACCIONES_LEON, self.politica.valores_q(codigo)))
+            disponibles = [a for a in ACCIONES_LEON if a in acciones]
+            accion = max(disponibles, key=lambda a: fila[a])
+            valor_q = fila[accion]
         
         print(f"\nACCIÓN DECIDIDA POR EL LEÓN: {accion.upper()}")
         print(f"Valor Q: {valor_q:.2f}")
@@ -216,6 +211,10 @@ class PasoAPasoUI:
         
         self.caceria.inicializar_caceria(posicion_inicial, ModoBehaviorImpala.ALEATORIO)
         
+        # Compilar la política greedy (la base pudo cambiar desde la última cacería)
+        if self.base_conocimientos:
+            self.politica = PoliticaCompilada.desde_base(self.base_conocimientos)
+        
         turno = 0
         acciones_leon = ["avanzar", "esconderse", "atacar"]
         